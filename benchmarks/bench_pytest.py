@@ -0,0 +1,35 @@
+"""The benchmark suite as pytest-benchmark tests.
+
+Run with ``pytest benchmarks/bench_pytest.py`` (requires ``pytest-benchmark``);
+set ``CORONA_BENCH_SCALE`` to ``100k`` or ``1m`` for larger runs. Each round
+processes the full scale so pytest-benchmark's statistics are per run.
+"""
+import os
+
+import pytest
+
+from suite import BENCHMARKS, SCALES, iter_metric_chunks
+
+pytest.importorskip("pytest_benchmark")
+
+SCALE = os.environ.get("CORONA_BENCH_SCALE", "1k")
+COUNT = SCALES[SCALE]
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return list(iter_metric_chunks(COUNT))
+
+
+@pytest.mark.parametrize("bench", BENCHMARKS, ids=[b.name for b in BENCHMARKS])
+def test_benchmark(benchmark, bench, chunks):
+    if bench.max_count is not None and COUNT > bench.max_count:
+        pytest.skip(f"{bench.name} is limited to {bench.max_count} metrics")
+    benchmark.extra_info["count"] = COUNT
+
+    def run():
+        process = bench.setup()
+        for chunk in chunks:
+            process(chunk)
+
+    benchmark.pedantic(run, rounds=3, warmup_rounds=1)
@@ -0,0 +1,46 @@
+"""Per-metric timing of the model serializers.
+
+Run with ``python benchmarks/bench_serializers.py [count]``.
+"""
+import io
+import sys
+import time
+from typing import Callable, List
+
+from rdflib import Graph
+
+from corona_framework.corona_tool import add_metric_to_graph
+from corona_framework.models import BaseMetric
+from corona_framework.rdf_writer import TurtleStreamWriter
+
+from suite import make_metrics
+
+
+def time_per_metric(func: Callable[[BaseMetric], object], metrics: List[BaseMetric]) -> float:
+    """Returns the mean wall-clock time per metric in microseconds."""
+    start = time.perf_counter()
+    for metric in metrics:
+        func(metric)
+    return (time.perf_counter() - start) / len(metrics) * 1e6
+
+
+def main(count: int = 2000) -> None:
+    metrics = make_metrics(count)
+    graph = Graph()
+    writer = TurtleStreamWriter(io.StringIO())
+    cases = {
+        "to_ttl": lambda m: m.to_ttl(),
+        "to_prometheus": lambda m: m.to_prometheus(),
+        "to_haystack_json": lambda m: m.to_haystack_json(),
+        "add_metric_to_graph": lambda m: add_metric_to_graph(m, graph),
+        "stream_ttl": writer.write_metric,
+    }
+    print(f"{count} metrics")
+    for name, func in cases.items():
+        # Warm up once so per-class caches are populated before timing
+        func(metrics[0])
+        print(f"  {name:<22} {time_per_metric(func, metrics):9.1f} us/metric")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
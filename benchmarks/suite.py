@@ -0,0 +1,365 @@
+"""Throughput and peak-memory benchmarks for serializers, graph building and validation.
+
+Synthetic metrics follow the ``demo_metrics`` patterns with unique instance
+URIs, many source devices and varying counters. Each benchmark processes the
+requested number of metrics in chunks; only the processing of a chunk is
+timed, and peak memory is what the benchmark allocates on top of the chunk
+itself (so a streaming serializer stays flat while graph building grows).
+
+    python benchmarks/suite.py run --scale 1k -o results.json
+    python benchmarks/suite.py run --scale 1k -o benchmarks/baselines/1k.json   # refresh a baseline
+    python benchmarks/suite.py compare benchmarks/baselines/1k.json results.json --threshold 0.3
+
+``compare`` exits with status 1 when any benchmark's throughput drops (or its
+peak memory grows) by more than the threshold. Benchmarks that are too slow
+for a scale (pyshacl at 1M) declare a maximum count and are skipped above it.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from rdflib import Graph
+
+from corona_framework.batch import MetricBatch
+from corona_framework.corona_tool import add_metric_to_graph
+from corona_framework.demo_metrics import generate_all_sample_metrics
+from corona_framework.graph_cache import load_graph
+from corona_framework.haystack import HaystackGridWriter, ZincGridWriter
+from corona_framework.models import BaseMetric
+from corona_framework.pipeline import Batch, Pipeline, Serialize, TextSink
+from corona_framework.rdf_writer import NQuadsStreamWriter, NTriplesStreamWriter, TurtleStreamWriter
+from corona_framework.shape_compiler import ShapeValidator, compile_shapes
+from corona_framework.targeted_validation import load_targeted_validator
+from corona_framework.validate_model import ontology_path, shapes_file_path
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK_SIZE = 5_000
+_START = datetime(2024, 1, 1)
+
+
+class _NullStream:
+    """A text stream that discards everything, so streaming writers are measured without buffering output."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def make_metrics(count: int, first: int = 0) -> List[BaseMetric]:
+    """Builds the synthetic metrics numbered ``first`` to ``first + count - 1``, cycling through the demo samples.
+
+    Every benchmark script uses this factory, so they all measure the same data as the baselines.
+    """
+    samples = generate_all_sample_metrics()
+    counter_fields = [
+        [name for name, value in sample if isinstance(value, int) and name in type(sample).model_fields]
+        for sample in samples
+    ]
+    metrics = []
+    for i in range(first, first + count):
+        sample_index = i % len(samples)
+        device = i // len(samples) % 1000
+        update: Dict[str, Any] = {
+            "metric_instance_uri": f"urn:corona:bench:{i}",
+            "source_entity_uri": f"http://example.com/device/bench{device}",
+            "metric_identifier": f"bench_{sample_index}_{device}",
+            "timestamp": _START + timedelta(seconds=i),
+        }
+        update.update({name: i * 7 + n for n, name in enumerate(counter_fields[sample_index])})
+        metrics.append(samples[sample_index].model_copy(update=update))
+    return metrics
+
+
+def iter_metric_chunks(count: int, chunk_size: int = CHUNK_SIZE) -> Iterator[List[BaseMetric]]:
+    """Yields ``count`` synthetic metrics (see ``make_metrics``) in chunks."""
+    for start in range(0, count, chunk_size):
+        yield make_metrics(min(chunk_size, count - start), start)
+
+
+# Validation data in the namespace targeted by data/corona-shapes.ttl
+_VALIDATION_HEADER = """\
+<http://coronastandard.org/2022#NetworkInterfaceMetric> <http://www.w3.org/2000/01/rdf-schema#subClassOf> <http://coronastandard.org/2022#PerformanceMetric> .
+<http://coronastandard.org/2022#ApplicationMetric> <http://www.w3.org/2000/01/rdf-schema#subClassOf> <http://coronastandard.org/2022#PerformanceMetric> .
+<http://www.example.org/network-ontology#Iface> <http://www.w3.org/2000/01/rdf-schema#subClassOf> <http://www.example.org/network-ontology#HWNetEntity> .
+"""
+_VALIDATION_INSTANCE = """\
+<urn:m:{i}> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://coronastandard.org/2022#{cls}> .
+<urn:m:{i}> <http://coronastandard.org/2022#observedFrom> <urn:iface:{device}> .
+<urn:iface:{device}> <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://www.example.org/network-ontology#Iface> .
+<urn:m:{i}> <http://coronastandard.org/2022#metric-identifier> "bench-{i}"^^<http://www.w3.org/2001/XMLSchema#string> .
+<urn:m:{i}> <http://coronastandard.org/2022#{counter}> "{value}"^^<http://www.w3.org/2001/XMLSchema#unsignedLong> .
+"""
+
+
+def validation_graph(first: int, count: int) -> Graph:
+    """Builds ``count`` metric instances that the shipped shapes actually target."""
+    lines = [_VALIDATION_HEADER]
+    for i in range(first, first + count):
+        cls, counter = ("NetworkInterfaceMetric", "bytesReceived") if i % 2 else ("ApplicationMetric", "readPropertyRequests")
+        lines.append(_VALIDATION_INSTANCE.format(i=i, cls=cls, counter=counter, device=i % 1000, value=i * 13))
+    return Graph().parse(data="".join(lines), format="nt")
+
+
+class Benchmark(NamedTuple):
+    """A named benchmark: ``setup()`` returns a callable that processes one chunk of metrics."""
+    name: str
+    setup: Callable[[], Callable[[List[BaseMetric]], Any]]
+    max_count: Optional[int] = None
+
+
+def _each(func: Callable[[BaseMetric], Any]) -> Callable[[], Callable[[List[BaseMetric]], Any]]:
+    def setup() -> Callable[[List[BaseMetric]], Any]:
+        def process(chunk: List[BaseMetric]) -> None:
+            for metric in chunk:
+                func(metric)
+        return process
+    return setup
+
+
+def _graph_builder() -> Callable[[List[BaseMetric]], Any]:
+    graph = Graph()
+
+    def process(chunk: List[BaseMetric]) -> Graph:
+        for metric in chunk:
+            add_metric_to_graph(metric, graph)
+        return graph
+    return process
+
+
+def _streamer(writer_cls: type) -> Callable[[], Callable[[List[BaseMetric]], Any]]:
+    def setup() -> Callable[[List[BaseMetric]], Any]:
+        writer = writer_cls(_NullStream())
+        writer.write_header()
+
+        def process(chunk: List[BaseMetric]) -> None:
+            for metric in chunk:
+                writer.write_metric(metric)
+        return process
+    return setup
+
+
+def _batch_ntriples() -> Callable[[List[BaseMetric]], Any]:
+    def process(chunk: List[BaseMetric]) -> None:
+        by_class: Dict[type, List[BaseMetric]] = {}
+        for metric in chunk:
+            by_class.setdefault(type(metric), []).append(metric)
+        for metrics in by_class.values():
+            MetricBatch.from_metrics(metrics).write_ntriples(_NullStream())  # type: ignore[arg-type]
+    return process
+
+
+def _pyshacl_validation() -> Callable[[List[BaseMetric]], Any]:
+    from pyshacl import validate
+
+    shapes = load_graph(shapes_file_path)
+    offset = [0]
+
+    def process(chunk: List[BaseMetric]) -> None:
+        data = validation_graph(offset[0], len(chunk))
+        offset[0] += len(chunk)
+        validate(data, shacl_graph=shapes, inference="rdfs", debug=False)
+    return process
+
+
+def _targeted_validation() -> Callable[[List[BaseMetric]], Any]:
+    validator = load_targeted_validator(shapes_file_path, ontology_path)
+    offset = [0]
+
+    def process(chunk: List[BaseMetric]) -> None:
+        data = validation_graph(offset[0], len(chunk))
+        offset[0] += len(chunk)
+        validator.validate(data)
+    return process
+
+
+def _compiled_validation() -> Callable[[List[BaseMetric]], Any]:
+    validator = ShapeValidator(compile_shapes(load_graph(shapes_file_path)))
+    offset = [0]
+
+    def process(chunk: List[BaseMetric]) -> None:
+        data = validation_graph(offset[0], len(chunk))
+        offset[0] += len(chunk)
+        validator.validate_graph(data)
+    return process
+
+
+def _from_rows(trusted: bool, validation_sample_rate: float = 0.0) -> Callable[[], Callable[[List[BaseMetric]], Any]]:
+    """Rebuilds each chunk from tuple rows; converting metrics to rows is part of the timed work."""
+    def setup() -> Callable[[List[BaseMetric]], Any]:
+        def process(chunk: List[BaseMetric]) -> None:
+            by_class: Dict[type, List[tuple]] = {}
+            for metric in chunk:
+                by_class.setdefault(type(metric), []).append(tuple(metric.__dict__.values()))
+            for metric_cls, rows in by_class.items():
+                metric_cls.from_rows(rows, trusted=trusted, validation_sample_rate=validation_sample_rate)
+        return process
+    return setup
+
+
+def _pipeline_ntriples() -> Callable[[List[BaseMetric]], Any]:
+    """Runs each chunk through the asyncio pipeline (batching, serialization in the loop, text sink)."""
+    async def source(chunk: List[BaseMetric]):
+        for metric in chunk:
+            yield metric
+
+    def process(chunk: List[BaseMetric]) -> None:
+        stages = [Batch(size=256), Serialize("ntriples")]
+        asyncio.run(Pipeline([source(chunk)], stages, [TextSink(_NullStream())]).run())
+    return process
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("to_ttl", _each(lambda m: m.to_ttl()), max_count=100_000),
+    Benchmark("to_prometheus", _each(lambda m: m.to_prometheus())),
+    Benchmark("to_haystack_json", _each(lambda m: m.to_haystack_json())),
+    Benchmark("add_metric_to_graph", _graph_builder, max_count=100_000),
+    Benchmark("stream_ttl", _streamer(TurtleStreamWriter)),
+    Benchmark("stream_ntriples", _streamer(NTriplesStreamWriter)),
+    Benchmark("stream_nquads", _streamer(NQuadsStreamWriter)),
+    Benchmark("haystack_grid", _streamer(HaystackGridWriter)),
+    Benchmark("haystack_zinc", _streamer(ZincGridWriter)),
+    Benchmark("batch_ntriples", _batch_ntriples),
+    Benchmark("pipeline_ntriples", _pipeline_ntriples),
+    Benchmark("validate_pyshacl", _pyshacl_validation, max_count=1_000),
+    Benchmark("validate_targeted", _targeted_validation, max_count=1_000),
+    Benchmark("validate_compiled", _compiled_validation, max_count=100_000),
+    Benchmark("construct_validated", _from_rows(trusted=False)),
+    Benchmark("construct_trusted", _from_rows(trusted=True)),
+    Benchmark("construct_trusted_sampled", _from_rows(trusted=True, validation_sample_rate=0.01)),
+]
+
+
+def _timed_pass(benchmark: Benchmark, count: int) -> float:
+    process = benchmark.setup()
+    gc.collect()
+    elapsed = 0.0
+    for chunk in iter_metric_chunks(count):
+        start = time.perf_counter()
+        process(chunk)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def _memory_pass(benchmark: Benchmark, count: int) -> int:
+    """Peak bytes allocated by the benchmark beyond the chunk it is processing."""
+    process = benchmark.setup()
+    gc.collect()
+    peak = 0
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        for chunk in iter_metric_chunks(count):
+            chunk_bytes = tracemalloc.get_traced_memory()[0] - base
+            tracemalloc.reset_peak()
+            process(chunk)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base - chunk_bytes)
+            del chunk
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(benchmark: Benchmark, count: int, measure_memory: bool = True, repeat: int = 3) -> Dict[str, Any]:
+    """Runs one benchmark over ``count`` metrics; returns the best of ``repeat`` timings, throughput and peak bytes.
+
+    tracemalloc slows allocation-heavy code several times over, so memory is measured in a separate pass.
+    """
+    # Warm per-class caches outside the measurement
+    benchmark.setup()(next(iter_metric_chunks(3)))
+    elapsed = min(_timed_pass(benchmark, count) for _ in range(repeat))
+    return {
+        "count": count,
+        "seconds": round(elapsed, 6),
+        "throughput": round(count / elapsed, 1) if elapsed else None,
+        "peak_bytes": _memory_pass(benchmark, count) if measure_memory else None,
+    }
+
+
+def run_suite(scale: str, names: Optional[List[str]] = None, measure_memory: bool = True, repeat: int = 3) -> Dict[str, Any]:
+    """Runs the selected benchmarks at ``scale`` and returns the JSON-ready results."""
+    count = SCALES[scale]
+    results: Dict[str, Any] = {}
+    for benchmark in BENCHMARKS:
+        if names and benchmark.name not in names:
+            continue
+        if benchmark.max_count is not None and count > benchmark.max_count:
+            continue
+        results[f"{benchmark.name}@{scale}"] = result = run_benchmark(benchmark, count, measure_memory, repeat)
+        memory = f", peak {result['peak_bytes'] / 1e6:.1f} MB" if result["peak_bytes"] is not None else ""
+        print(f"  {benchmark.name:<20} {result['throughput']:>12,.0f} metrics/s{memory}", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "scale": scale,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.25) -> List[str]:
+    """Returns a description of every benchmark that regressed by more than ``threshold`` (0.25 = 25%)."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        if base.get("throughput") and result.get("throughput") and result["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {result['throughput']:,.0f}/s vs baseline {base['throughput']:,.0f}/s")
+        # Ignore tiny allocations, where noise dominates the ratio
+        if base.get("peak_bytes") and result.get("peak_bytes") and result["peak_bytes"] > max(base["peak_bytes"], 1 << 20) * (1 + threshold):
+            regressions.append(f"{name}: peak memory {result['peak_bytes']:,} B vs baseline {base['peak_bytes']:,} B")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run the benchmarks and write JSON results.")
+    run.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    run.add_argument("--only", action="append", help="Benchmark name to run (repeatable).")
+    run.add_argument("--repeat", type=int, default=3, help="Timed passes per benchmark; the fastest is kept (default 3).")
+    run.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass, which is slow.")
+    run.add_argument("-o", "--output", help="Write results here instead of stdout.")
+    compare = commands.add_parser("compare", help="Fail if results regressed against a baseline.")
+    compare.add_argument("baseline")
+    compare.add_argument("results")
+    compare.add_argument("--threshold", type=float, default=0.25, help="Allowed relative regression (default 0.25).")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(args.scale, args.only, measure_memory=not args.no_memory, repeat=args.repeat)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        current = json.load(f)
+    regressions = compare_results(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
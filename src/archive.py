@@ -0,0 +1,411 @@
+"""Compressed, memory-mappable archive of metric time series.
+
+Hourly TTL or JSON exports spend about 100 bytes per counter value. An archive
+stores metrics column-wise instead, grouped into series by metric class and
+the metadata that identifies a reading's source (identifier, entity, observer,
+name, description), with one column per metric field:
+
+* timestamps as zigzag varints of their delta-of-delta (epoch microseconds),
+  so regularly sampled series cost one byte per reading;
+* integer values the same way, since counters grow at a near-constant rate;
+* float values as varints of the XOR with the previous value's IEEE-754 bits
+  (a byte-aligned take on Gorilla's XOR encoding);
+* strings (instance URIs, string fields) as length-prefixed UTF-8, deflated.
+
+Each series is cut into chunks of ``chunk_size`` readings whose time span is
+recorded in a JSON index at the end of the file. ``ArchiveReader`` maps the
+file and decodes straight from ``memoryview`` slices of the chunks that
+overlap a requested range; nothing else is read or copied.
+
+File layout: ``MAGIC``, chunk blobs, the UTF-8 JSON index, then a footer of
+the index offset and length (little-endian u64) and ``MAGIC`` again.
+"""
+import heapq
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .batch import epoch_microseconds
+from .models import BaseMetric, get_construction_plan, get_metric_class, get_serialization_plan
+
+MAGIC = b"CRNARC01"
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 1024
+
+# Metadata fields that, together with the class and timestamp kind, identify a series
+SERIES_FIELDS = ('metric_identifier', 'source_entity_uri', 'source_entity_address', 'observed_from', 'metric_name', 'description')
+
+_FOOTER = struct.Struct("<QQ8s")
+_DOUBLE = struct.Struct("<d")
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class ArchiveError(ValueError):
+    """Raised for files that are not valid archives."""
+
+
+# --- column codecs -----------------------------------------------------------
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(buffer: memoryview, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_delta_of_delta(values: Sequence[int]) -> bytes:
+    """Encodes integers as zigzag varints of their second differences."""
+    out = bytearray()
+    previous = delta = 0
+    for value in values:
+        new_delta = value - previous
+        dod = new_delta - delta
+        _put_varint(out, (dod << 1) if dod >= 0 else ((-dod << 1) - 1))
+        previous, delta = value, new_delta
+    return bytes(out)
+
+
+def decode_delta_of_delta(buffer: memoryview, count: int) -> List[int]:
+    values = []
+    pos = previous = delta = 0
+    for _ in range(count):
+        zigzag, pos = _get_varint(buffer, pos)
+        delta += (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1)
+        previous += delta
+        values.append(previous)
+    return values
+
+
+def encode_xor_floats(values: Sequence[float]) -> bytes:
+    """Encodes floats as varints of the XOR of consecutive IEEE-754 bit patterns."""
+    out = bytearray()
+    previous = 0
+    for value in values:
+        bits = int.from_bytes(_DOUBLE.pack(value), "little")
+        _put_varint(out, bits ^ previous)
+        previous = bits
+    return bytes(out)
+
+
+def decode_xor_floats(buffer: memoryview, count: int) -> List[float]:
+    values = []
+    pos = previous = 0
+    for _ in range(count):
+        xored, pos = _get_varint(buffer, pos)
+        previous ^= xored
+        values.append(_DOUBLE.unpack(previous.to_bytes(8, "little"))[0])
+    return values
+
+
+def encode_strings(values: Sequence[str]) -> bytes:
+    out = bytearray()
+    for value in values:
+        data = value.encode("utf-8")
+        _put_varint(out, len(data))
+        out += data
+    return zlib.compress(bytes(out))
+
+
+def decode_strings(buffer: memoryview, count: int) -> List[str]:
+    data = memoryview(zlib.decompress(buffer))
+    values = []
+    pos = 0
+    for _ in range(count):
+        length, pos = _get_varint(data, pos)
+        values.append(str(data[pos:pos + length], "utf-8"))
+        pos += length
+    return values
+
+
+_ENCODERS: Dict[str, Callable[[Sequence[Any]], bytes]] = {'i': encode_delta_of_delta, 'f': encode_xor_floats, 's': encode_strings}
+_DECODERS: Dict[str, Callable[[memoryview, int], List[Any]]] = {'i': decode_delta_of_delta, 'f': decode_xor_floats, 's': decode_strings}
+
+
+def _column_kind(values: Sequence[Any]) -> str:
+    """'n' (all null), 'i', 'f' or 's'; upper case when some values are null and a presence bitmap precedes the data."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return 'n'
+    if all(type(v) is int for v in present):
+        kind = 'i'
+    elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        kind = 'f'
+    elif all(isinstance(v, str) for v in present):
+        kind = 's'
+    else:
+        raise ValueError(f"Cannot archive values of types {sorted({type(v).__name__ for v in present})}")
+    return kind.upper() if len(present) < len(values) else kind
+
+
+def _encode_column(kind: str, values: Sequence[Any]) -> bytes:
+    if kind == 'n':
+        return b""
+    if kind.isupper():
+        bitmap = bytearray((len(values) + 7) // 8)
+        for i, value in enumerate(values):
+            if value is not None:
+                bitmap[i >> 3] |= 1 << (i & 7)
+        present = [v for v in values if v is not None]
+        return bytes(bitmap) + _ENCODERS[kind.lower()](present)
+    return _ENCODERS[kind](values)
+
+
+def _decode_column(kind: str, buffer: memoryview, count: int) -> List[Any]:
+    if kind == 'n':
+        return [None] * count
+    if kind.islower():
+        return _DECODERS[kind](buffer, count)
+    size = (count + 7) // 8
+    flags = [bool(buffer[i >> 3] & (1 << (i & 7))) for i in range(count)]
+    present = iter(_DECODERS[kind.lower()](buffer[size:], sum(flags)))
+    return [next(present) if flag else None for flag in flags]
+
+
+# --- writer ------------------------------------------------------------------
+
+class _SeriesBuffer:
+    """Readings of one series waiting to be written as a chunk."""
+
+    def __init__(self, index: Dict[str, Any], fields: Tuple[str, ...]) -> None:
+        self.index = index
+        self.fields = fields
+        self.timestamps: List[int] = []
+        self.uris: List[str] = []
+        self.values: List[List[Any]] = [[] for _ in fields]
+
+
+class ArchiveWriter:
+    """Appends metrics to a new archive file; chunks are written as they fill, the index on ``close``."""
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.path = path
+        self.chunk_size = chunk_size
+        self.metrics_written = 0
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._series: Dict[Tuple[Any, ...], _SeriesBuffer] = {}
+        self._index: List[Dict[str, Any]] = []
+
+    def add(self, metric: BaseMetric) -> None:
+        """Buffers one metric, writing its series' chunk once it holds ``chunk_size`` readings."""
+        metric_cls = type(metric)
+        aware = metric.timestamp.tzinfo is not None
+        key = (metric_cls, aware) + tuple(getattr(metric, name) for name in SERIES_FIELDS)
+        series = self._series.get(key)
+        if series is None:
+            fields = tuple(field.name for field in get_serialization_plan(metric_cls).fields)
+            index = {
+                "type": metric_cls.__name__,
+                "aware": aware,
+                "meta": {name: value for name, value in zip(SERIES_FIELDS, key[2:]) if value is not None},
+                "fields": list(fields),
+                "chunks": [],
+            }
+            self._index.append(index)
+            series = self._series[key] = _SeriesBuffer(index, fields)
+        series.timestamps.append(epoch_microseconds(metric.timestamp))
+        series.uris.append(metric.metric_instance_uri)
+        for column, name in zip(series.values, series.fields):
+            column.append(getattr(metric, name))
+        self.metrics_written += 1
+        if len(series.timestamps) >= self.chunk_size:
+            self._flush(series)
+
+    def add_all(self, metrics: Iterable[BaseMetric]) -> int:
+        for metric in metrics:
+            self.add(metric)
+        return self.metrics_written
+
+    def _flush(self, series: _SeriesBuffer) -> None:
+        if not series.timestamps:
+            return
+        kinds = "".join(_column_kind(values) for values in series.values)
+        sections = [encode_delta_of_delta(series.timestamps), encode_strings(series.uris)]
+        sections.extend(_encode_column(kind, values) for kind, values in zip(kinds, series.values))
+        series.index["chunks"].append({
+            "offset": self._file.tell(),
+            "count": len(series.timestamps),
+            "start": min(series.timestamps),
+            "end": max(series.timestamps),
+            "kinds": kinds,
+            "sections": [len(section) for section in sections],
+        })
+        for section in sections:
+            self._file.write(section)
+        series.timestamps, series.uris = [], []
+        series.values = [[] for _ in series.fields]
+
+    def close(self) -> None:
+        """Writes the remaining chunks, the index and the footer."""
+        if self._file.closed:
+            return
+        for series in self._series.values():
+            self._flush(series)
+        index = json.dumps({"version": FORMAT_VERSION, "series": self._index}, separators=(",", ":")).encode("utf-8")
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(_FOOTER.pack(offset, len(index), MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def write_archive(path: str, metrics: Iterable[BaseMetric], chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Writes ``metrics`` to a new archive at ``path``; returns the number written."""
+    with ArchiveWriter(path, chunk_size) as writer:
+        return writer.add_all(metrics)
+
+
+# --- reader ------------------------------------------------------------------
+
+class SeriesInfo(NamedTuple):
+    """One series in an archive, as listed by ``ArchiveReader.series``."""
+    metric_type: str
+    meta: Dict[str, str]
+    readings: int
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+
+def _to_datetime(microseconds: int, aware: bool) -> datetime:
+    return (_EPOCH_UTC if aware else _EPOCH) + timedelta(microseconds=microseconds)
+
+
+def _bound(timestamp: Optional[datetime]) -> Optional[int]:
+    return None if timestamp is None else epoch_microseconds(timestamp)
+
+
+class ArchiveReader:
+    """Reads an archive through a read-only memory map.
+
+    Range bounds are inclusive and compared as epoch microseconds, so naive
+    bounds match naive series and are taken as UTC for timezone-aware ones.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(MAGIC) + _FOOTER.size:
+                raise ArchiveError(f"{path} is too small to be a corona archive")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        offset, length, magic = _FOOTER.unpack_from(self._view, size - _FOOTER.size)
+        if self._view[:len(MAGIC)] != MAGIC or magic != MAGIC:
+            self.close()
+            raise ArchiveError(f"{path} is not a corona archive")
+        index = json.loads(bytes(self._view[offset:offset + length]))
+        if index.get("version") != FORMAT_VERSION:
+            self.close()
+            raise ArchiveError(f"Unsupported archive version {index.get('version')}")
+        self._index: List[Dict[str, Any]] = index["series"]
+
+    def series(self) -> List[SeriesInfo]:
+        """Lists the series in the archive with their reading counts and time spans."""
+        result = []
+        for series in self._index:
+            chunks = series["chunks"]
+            aware = series["aware"]
+            result.append(SeriesInfo(
+                series["type"], dict(series["meta"]), sum(c["count"] for c in chunks),
+                _to_datetime(min(c["start"] for c in chunks), aware) if chunks else None,
+                _to_datetime(max(c["end"] for c in chunks), aware) if chunks else None,
+            ))
+        return result
+
+    def __len__(self) -> int:
+        return sum(c["count"] for series in self._index for c in series["chunks"])
+
+    def _decode_chunk(self, series: Dict[str, Any], chunk: Dict[str, Any], start: Optional[int],
+                      end: Optional[int]) -> Iterator[Tuple[int, BaseMetric]]:
+        """Yields (epoch microseconds, metric) for the chunk's readings inside the range, in stored order."""
+        plan = get_construction_plan(get_metric_class(series["type"]))
+        aware, meta, fields = series["aware"], series["meta"], series["fields"]
+        count = chunk["count"]
+        pos = chunk["offset"]
+        views = []
+        for length in chunk["sections"]:
+            views.append(self._view[pos:pos + length])
+            pos += length
+        timestamps = decode_delta_of_delta(views[0], count)
+        uris = decode_strings(views[1], count)
+        columns = [_decode_column(kind, view, count) for kind, view in zip(chunk["kinds"], views[2:])]
+        for view in views:
+            view.release()
+        for row, us in enumerate(timestamps):
+            if (start is not None and us < start) or (end is not None and us > end):
+                continue
+            values = dict(meta)
+            values["metric_instance_uri"] = uris[row]
+            values["timestamp"] = _to_datetime(us, aware)
+            for name, column in zip(fields, columns):
+                if column[row] is not None:
+                    values[name] = column[row]
+            yield us, plan.construct(values)
+
+    def _series_metrics(self, series: Dict[str, Any], start: Optional[int], end: Optional[int]) -> Iterator[Tuple[int, int, BaseMetric]]:
+        """Yields (epoch microseconds, sequence, metric) in timestamp order, decoding one chunk at a time.
+
+        Chunks are visited by start time; readings are held back only until no
+        later chunk can contain an earlier one, so out-of-order writes still
+        come out sorted without decoding the whole series.
+        """
+        chunks = sorted((c for c in series["chunks"]
+                         if (start is None or c["end"] >= start) and (end is None or c["start"] <= end)),
+                        key=lambda c: c["start"])
+        pending: List[Tuple[int, int, BaseMetric]] = []
+        sequence = 0
+        for chunk in chunks:
+            while pending and pending[0][0] < chunk["start"]:
+                yield heapq.heappop(pending)
+            for us, metric in self._decode_chunk(series, chunk, start, end):
+                heapq.heappush(pending, (us, sequence, metric))
+                sequence += 1
+        while pending:
+            yield heapq.heappop(pending)
+
+    def read(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             metric_type: Optional[str] = None, metric_identifier: Optional[str] = None) -> Iterator[BaseMetric]:
+        """Yields the metrics in ``[start, end]`` in timestamp order, optionally only one class or identifier."""
+        start_us, end_us = _bound(start), _bound(end)
+        streams = [
+            self._series_metrics(series, start_us, end_us) for series in self._index
+            if (metric_type is None or series["type"] == metric_type)
+            and (metric_identifier is None or series["meta"].get("metric_identifier") == metric_identifier)
+        ]
+        for _, _, metric in heapq.merge(*streams, key=lambda item: item[0]):
+            yield metric
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
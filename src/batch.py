@@ -0,0 +1,426 @@
+"""Columnar storage for many readings of a single metric class.
+
+A ``MetricBatch`` keeps one metric class as columns instead of one pydantic
+object per reading: integer counter fields live in typed ``array('Q')``
+columns and float fields in ``array('d')`` columns, each with a null mask,
+repeated strings (observer, entity, identifier, ...) and other values such as
+booleans are dictionary-encoded, and timestamps are stored as epoch
+microseconds. The
+batch serializers work column by column, formatting each distinct string and
+each Prometheus label set once rather than once per reading.
+"""
+import io
+import typing
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Type, Union
+
+from rdflib.namespace import XSD
+
+from .models import (
+    BaseMetric,
+    get_construction_plan,
+    get_serialization_plan,
+    haystack_entity_ref,
+    prometheus_label_string,
+)
+from .rdf_writer import NTriplesStreamWriter, metadata_statement, timestamp_statement, type_statement, value_object
+
+_XSD_INTEGER = str(XSD.integer)
+_XSD_FLOAT = str(XSD.float)
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Metadata columns that are dictionary-encoded; metric_instance_uri is unique per reading and kept as a plain list
+STRING_METADATA_FIELDS = ('observed_from', 'description', 'metric_identifier', 'metric_name', 'source_entity_uri', 'source_entity_address')
+
+
+def _format_statement(writer: NTriplesStreamWriter, statement: Tuple[str, Tuple[Any, ...]]) -> Tuple[str, str]:
+    return writer.iri(statement[0]), writer.term(statement[1])
+
+
+class StringColumn:
+    """Dictionary-encoded column of optional strings; code 0 is reserved for ``None``."""
+
+    def __init__(self) -> None:
+        self.codes = array('I')
+        self.values: List[Optional[str]] = [None]
+        self._index: Dict[Optional[str], int] = {None: 0}
+
+    def append(self, value: Optional[str]) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        return self.values[self.codes[row]]
+
+
+class ValueColumn:
+    """Dictionary-encoded column of optional non-numeric values (strings, booleans, ...); code 0 is reserved for ``None``."""
+
+    def __init__(self) -> None:
+        self.codes = array('I')
+        self.values: List[Any] = [None]
+        self._index: Dict[Tuple[type, Any], int] = {(type(None), None): 0}
+
+    def append(self, value: Any) -> None:
+        # Keyed by type as well, so that e.g. True and 1 in a loosely typed field stay distinct
+        key = (type(value), value)
+        code = self._index.get(key)
+        if code is None:
+            code = self._index[key] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+
+class CounterColumn:
+    """Unsigned 64-bit integer column with a null mask (1 = value present)."""
+
+    def __init__(self) -> None:
+        self.data = array('Q')
+        self.mask = bytearray()
+
+    def append(self, value: Optional[int]) -> None:
+        if value is None:
+            self.data.append(0)
+            self.mask.append(0)
+            return
+        self.data.append(value)
+        self.mask.append(1)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, row: int) -> Optional[int]:
+        return self.data[row] if self.mask[row] else None
+
+    def present(self) -> Iterator[Tuple[int, int]]:
+        """Yields (row, value) for every non-null entry."""
+        data = self.data
+        return ((row, data[row]) for row, flag in enumerate(self.mask) if flag)
+
+
+class FloatColumn:
+    """Double-precision float column with a null mask (1 = value present)."""
+
+    def __init__(self) -> None:
+        self.data = array('d')
+        self.mask = bytearray()
+
+    def append(self, value: Optional[float]) -> None:
+        if value is None:
+            self.data.append(0.0)
+            self.mask.append(0)
+            return
+        self.data.append(value)
+        self.mask.append(1)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, row: int) -> Optional[float]:
+        return self.data[row] if self.mask[row] else None
+
+    def present(self) -> Iterator[Tuple[int, float]]:
+        """Yields (row, value) for every non-null entry."""
+        data = self.data
+        return ((row, data[row]) for row, flag in enumerate(self.mask) if flag)
+
+
+def epoch_microseconds(timestamp: datetime) -> int:
+    """Microseconds since the epoch; naive timestamps are counted from the naive epoch without a timezone conversion."""
+    delta = timestamp - (_EPOCH_UTC if timestamp.tzinfo is not None else _EPOCH)
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class _BatchSchema:
+    """Column layout for a metric class, derived once from its serialization plan."""
+
+    def __init__(self, metric_cls: Type[BaseMetric]) -> None:
+        self.plan = get_serialization_plan(metric_cls)
+        self.counter_fields: List[str] = []
+        self.float_fields: List[str] = []
+        self.value_fields: List[str] = []
+        for field in self.plan.fields:
+            annotation = metric_cls.model_fields[field.name].annotation
+            args = typing.get_args(annotation)
+            if annotation is int or (int in args and bool not in args):
+                self.counter_fields.append(field.name)
+            elif annotation is float or (float in args and not {int, bool, str} & set(args)):
+                self.float_fields.append(field.name)
+            else:
+                self.value_fields.append(field.name)
+
+
+_SCHEMA_CACHE: Dict[type, _BatchSchema] = {}
+
+
+def _get_schema(metric_cls: Type[BaseMetric]) -> _BatchSchema:
+    schema = _SCHEMA_CACHE.get(metric_cls)
+    if schema is None:
+        schema = _SCHEMA_CACHE[metric_cls] = _BatchSchema(metric_cls)
+    return schema
+
+
+def counter_field_names(metric_cls: Type[BaseMetric]) -> List[str]:
+    """Names of the integer counter fields of a metric class, in plan order."""
+    return _get_schema(metric_cls).counter_fields
+
+
+class MetricBatch:
+    """Column-oriented container for readings of one ``BaseMetric`` subclass."""
+
+    def __init__(self, metric_cls: Type[BaseMetric]) -> None:
+        self.metric_cls = metric_cls
+        self._schema = _get_schema(metric_cls)
+        self.instance_uris: List[str] = []
+        # Epoch microseconds; naive and aware timestamps cannot be mixed within one batch
+        self.timestamps = array('q')
+        self._aware: Optional[bool] = None
+        self.metadata: Dict[str, StringColumn] = {name: StringColumn() for name in STRING_METADATA_FIELDS}
+        self.counters: Dict[str, CounterColumn] = {name: CounterColumn() for name in self._schema.counter_fields}
+        self.floats: Dict[str, FloatColumn] = {name: FloatColumn() for name in self._schema.float_fields}
+        self.values: Dict[str, ValueColumn] = {name: ValueColumn() for name in self._schema.value_fields}
+
+    @classmethod
+    def from_metrics(cls, metrics: Iterable[BaseMetric], metric_cls: Optional[Type[BaseMetric]] = None) -> "MetricBatch":
+        """Builds a batch from model instances; the class is taken from the first metric if not given."""
+        batch: Optional[MetricBatch] = cls(metric_cls) if metric_cls else None
+        for metric in metrics:
+            if batch is None:
+                batch = cls(type(metric))
+            batch.append(metric)
+        if batch is None:
+            raise ValueError("Cannot infer the metric class of an empty batch; pass metric_cls")
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.instance_uris)
+
+    def append(self, metric: BaseMetric) -> None:
+        """Appends one reading; the metric must be an instance of the batch's class."""
+        if type(metric) is not self.metric_cls:
+            raise TypeError(f"MetricBatch of {self.metric_cls.__name__} cannot hold {type(metric).__name__}")
+        # Check everything that can fail before touching any column so a rejected reading leaves the batch intact
+        counter_values = [getattr(metric, name) for name in self.counters]
+        for name, value in zip(self.counters, counter_values):
+            if value is not None and not 0 <= value < 2**64:
+                raise ValueError(f"Counter column '{name}' holds xsd:unsignedLong values, got {value}")
+        self.timestamps.append(self._encode_timestamp(metric.timestamp))
+        self.instance_uris.append(metric.metric_instance_uri)
+        for name, column in self.metadata.items():
+            column.append(getattr(metric, name))
+        for counter, value in zip(self.counters.values(), counter_values):
+            counter.append(value)
+        for name, floats in self.floats.items():
+            floats.append(getattr(metric, name))
+        for name, values in self.values.items():
+            values.append(getattr(metric, name))
+
+    def extend(self, metrics: Iterable[BaseMetric]) -> None:
+        """Appends every reading in ``metrics``."""
+        for metric in metrics:
+            self.append(metric)
+
+    def _encode_timestamp(self, timestamp: datetime) -> int:
+        aware = timestamp.tzinfo is not None
+        if self._aware is None:
+            self._aware = aware
+        elif self._aware != aware:
+            raise ValueError("MetricBatch cannot mix naive and timezone-aware timestamps")
+        return epoch_microseconds(timestamp)
+
+    def timestamp_at(self, row: int) -> datetime:
+        """Returns the timestamp of a row; aware timestamps come back normalized to UTC."""
+        return (_EPOCH_UTC if self._aware else _EPOCH) + timedelta(microseconds=self.timestamps[row])
+
+    def _timestamps_ms(self) -> List[int]:
+        """Epoch milliseconds per row, interpreting naive timestamps in local time like ``datetime.timestamp``."""
+        if self._aware:
+            return [us // 1000 for us in self.timestamps]
+        if not self.timestamps:
+            return []
+        # The local UTC offset can differ across DST changes, so compute it per distinct hour
+        offsets: Dict[int, int] = {}
+        result = []
+        for us in self.timestamps:
+            hour = us // 3_600_000_000
+            offset = offsets.get(hour)
+            if offset is None:
+                naive = _EPOCH + timedelta(microseconds=hour * 3_600_000_000)
+                offset = offsets[hour] = int(naive.timestamp() * 1000) - hour * 3_600_000
+            result.append(us // 1000 + offset)
+        return result
+
+    def metric_at(self, row: int) -> BaseMetric:
+        """Rebuilds the model instance for one row without re-running validation."""
+        values: Dict[str, Any] = {
+            "metric_instance_uri": self.instance_uris[row],
+            "timestamp": self.timestamp_at(row),
+        }
+        for name, strings in self.metadata.items():
+            values[name] = strings[row]
+        for name, counter in self.counters.items():
+            values[name] = counter[row]
+        for name, floats in self.floats.items():
+            values[name] = floats[row]
+        for name, column in self.values.items():
+            values[name] = column[row]
+        return get_construction_plan(self.metric_cls).construct(values)
+
+    def __iter__(self) -> Iterator[BaseMetric]:
+        return (self.metric_at(row) for row in range(len(self)))
+
+    def to_metrics(self) -> List[BaseMetric]:
+        """Converts the batch back to model instances."""
+        return list(self)
+
+    def _columns_in_plan_order(self) -> Iterator[Tuple[int, Union[CounterColumn, FloatColumn, ValueColumn]]]:
+        """Yields (plan index, column) for every value field."""
+        for index, field in enumerate(self._schema.plan.fields):
+            name = field.name
+            if name in self.counters:
+                yield index, self.counters[name]
+            elif name in self.floats:
+                yield index, self.floats[name]
+            else:
+                yield index, self.values[name]
+
+    def _column_values(self, column: Union[CounterColumn, FloatColumn, ValueColumn]) -> Iterator[Tuple[int, Any]]:
+        if isinstance(column, ValueColumn):
+            return ((row, column.values[code]) for row, code in enumerate(column.codes) if code)
+        return column.present()
+
+    def _label_strings(self) -> List[str]:
+        """Per-row Prometheus label strings, each distinct label set rendered once."""
+        columns = [self.metadata[name].codes for name in ('source_entity_uri', 'source_entity_address', 'observed_from', 'metric_identifier')]
+        values = [self.metadata[name].values for name in ('source_entity_uri', 'source_entity_address', 'observed_from', 'metric_identifier')]
+        rendered: Dict[Tuple[int, ...], str] = {}
+        labels = []
+        for key in zip(*columns):
+            label_str = rendered.get(key)
+            if label_str is None:
+                label_str = rendered[key] = prometheus_label_string(*(v[c] for v, c in zip(values, key)))
+            labels.append(label_str)
+        return labels
+
+    def to_prometheus(self, prefix: str = "bacnet") -> List[str]:
+        """Serializes the batch to Prometheus exposition format with one HELP/TYPE header per family."""
+        plan = self._schema.plan
+        families = plan.prometheus_families(prefix)
+        labels = self._label_strings()
+        timestamps_ms = self._timestamps_ms()
+        lines: List[str] = []
+        for index, column in self._columns_in_plan_order():
+            family = families[index]
+            samples = []
+            for row, value in self._column_values(column):
+                try:
+                    prom_value = float(value)
+                except (ValueError, TypeError):
+                    prom_value = 0.0
+                samples.append(f"{family.name}{labels[row]} {prom_value} {timestamps_ms[row]}")
+            if samples:
+                lines.append(f"# HELP {family.name} {family.help or plan.fields[index].key}")
+                lines.append(f"# TYPE {family.name} {family.type}")
+                lines.extend(samples)
+                lines.append("")
+        return lines
+
+    def to_haystack_json(self) -> List[Dict[str, Any]]:
+        """Serializes the batch to Haystack JSON rows, ordered by field and then by reading."""
+        entity_codes = zip(self.metadata['source_entity_uri'].codes, self.metadata['source_entity_address'].codes)
+        uri_values = self.metadata['source_entity_uri'].values
+        address_values = self.metadata['source_entity_address'].values
+        entity_cache: Dict[Tuple[int, int], str] = {}
+        entities = []
+        for codes in entity_codes:
+            ref = entity_cache.get(codes)
+            if ref is None:
+                ref = entity_cache[codes] = haystack_entity_ref(uri_values[codes[0]], address_values[codes[1]])
+            entities.append(ref)
+        ts = [self.timestamp_at(row).isoformat() for row in range(len(self))]
+        observer = self.metadata['observed_from']
+        metric_id = self.metadata['metric_identifier']
+
+        rows: List[Dict[str, Any]] = []
+        for index, column in self._columns_in_plan_order():
+            key = self._schema.plan.fields[index].key
+            for row, value in self._column_values(column):
+                rows.append({
+                    "entity": entities[row],
+                    "metric": key,
+                    "val": value,
+                    "ts": ts[row],
+                    "observer": observer[row],
+                    "metricId": metric_id[row],
+                })
+        return rows
+
+    def write_ntriples(self, stream: TextIO) -> None:
+        """Writes the batch as N-Triples, one column at a time, formatting each distinct term once."""
+        writer = NTriplesStreamWriter(stream)
+        subjects = [writer.iri(uri) for uri in self.instance_uris]
+
+        predicate, obj = type_statement(self.metric_cls)
+        type_suffix = f" {writer.iri(predicate)} {writer.term(obj)} .\n"
+        stream.write("".join(subject + type_suffix for subject in subjects))
+
+        source_uris = self.metadata['source_entity_uri']
+        has_source_uri = [bool(source_uris.values[code]) for code in source_uris.codes]
+        for name, strings in self.metadata.items():
+            # Empty strings are skipped like unset values, matching metric_statements
+            suffixes = [" {} {} .\n".format(*_format_statement(writer, metadata_statement(name, v))) if v else None for v in strings.values]
+            # sourceAddress is only emitted for readings without a source_entity_uri
+            skip = has_source_uri if name == 'source_entity_address' else None
+            stream.write("".join(
+                subjects[row] + suffix
+                for row, code in enumerate(strings.codes)
+                if (suffix := suffixes[code]) is not None and not (skip and skip[row])
+            ))
+
+        stream.write("".join(
+            "{} {} {} .\n".format(subjects[row], *_format_statement(writer, timestamp_statement(self.timestamp_at(row))))
+            for row in range(len(self))
+        ))
+
+        for index, column in self._columns_in_plan_order():
+            field = self._schema.plan.fields[index]
+            predicate_text = writer.iri(field.predicate)
+            if isinstance(column, CounterColumn):
+                datatype = writer.iri(field.datatype or _XSD_INTEGER)
+                stream.write("".join(
+                    f'{subjects[row]} {predicate_text} "{value}"^^{datatype} .\n'
+                    for row, value in column.present()
+                ))
+            elif isinstance(column, FloatColumn):
+                datatype = writer.iri(field.datatype or _XSD_FLOAT)
+                stream.write("".join(
+                    f'{subjects[row]} {predicate_text} "{value}"^^{datatype} .\n'
+                    for row, value in column.present()
+                ))
+            else:
+                objects = [None] + [writer.term(value_object(v)) for v in column.values[1:]]
+                stream.write("".join(
+                    f"{subjects[row]} {predicate_text} {objects[code]} .\n"
+                    for row, code in enumerate(column.codes) if code
+                ))
+
+    def to_ntriples(self) -> str:
+        """Returns the batch serialized as N-Triples."""
+        buffer = io.StringIO()
+        self.write_ntriples(buffer)
+        return buffer.getvalue()
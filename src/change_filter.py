@@ -0,0 +1,126 @@
+"""Change-only export: suppress metric snapshots, or fields, that did not change.
+
+Collectors snapshot every series each interval, yet many values (BBMD table
+sizes, foreign device registrations, devices seen through routers, idle
+service counters) rarely move. ``ChangeFilter`` remembers the last emitted
+values of each series, keyed by metric class, ``metric_identifier``, source
+entity and observer, and passes on only what changed:
+
+* ``mode="fields"`` (the default) emits a copy of the snapshot with its
+  unchanged value fields set to None, and nothing if no field changed;
+* ``mode="instances"`` emits whole snapshots in which any field changed.
+
+Fields a snapshot leaves unset (None) count as unchanged. With ``heartbeat``
+seconds, a series last emitted in full at least that long ago (by metric
+timestamp) is emitted in full again, so consumers can tell a quiet series from
+a dead one. Metadata fields are never compared.
+
+``filter`` returns None for a suppressed snapshot, so it can be used as a
+pipeline ``Map`` function; ``filter_all`` wraps an iterable of metrics ahead
+of any writer, ``to_ttl`` or ``to_haystack_json``.
+"""
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .batch import epoch_microseconds
+from .models import BaseMetric, get_construction_plan, get_serialization_plan
+
+MODES = ('fields', 'instances')
+
+SeriesKey = Tuple[type, Optional[str], Optional[str], Optional[str]]
+
+
+class ChangeFilterStats(NamedTuple):
+    """Snapshot and field counts seen and suppressed by a ``ChangeFilter``."""
+    seen: int
+    emitted: int
+    heartbeats: int
+    fields_seen: int
+    fields_emitted: int
+    series: int
+
+    @property
+    def suppressed(self) -> int:
+        return self.seen - self.emitted
+
+    @property
+    def reduction(self) -> float:
+        """How many times fewer values were emitted than seen."""
+        if not self.fields_emitted:
+            return float("inf") if self.fields_seen else 1.0
+        return self.fields_seen / self.fields_emitted
+
+    def summary(self) -> str:
+        return (f"Emitted {self.emitted} of {self.seen} snapshots and {self.fields_emitted} of {self.fields_seen} values "
+                f"({self.heartbeats} heartbeats, {self.series} series)")
+
+
+class ChangeFilter:
+    """Passes on only the snapshots (or fields) whose values changed since their series was last emitted."""
+
+    def __init__(self, mode: str = 'fields', heartbeat: Optional[float] = None) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown change filter mode '{mode}'; use one of {MODES}")
+        self.mode = mode
+        self.heartbeat_us = None if heartbeat is None else int(heartbeat * 1_000_000)
+        # series -> (last emitted value per field, epoch microseconds of the last full emission)
+        self._last: Dict[SeriesKey, Tuple[Tuple[object, ...], int]] = {}
+        self._fields: Dict[type, Tuple[str, ...]] = {}
+        self._seen = self._emitted = self._heartbeats = self._fields_seen = self._fields_emitted = 0
+
+    def _field_names(self, metric_cls: type) -> Tuple[str, ...]:
+        names = self._fields.get(metric_cls)
+        if names is None:
+            names = self._fields[metric_cls] = tuple(field.name for field in get_serialization_plan(metric_cls).fields)
+        return names
+
+    def filter(self, metric: BaseMetric) -> Optional[BaseMetric]:
+        """Returns ``metric`` (or a copy holding only its changed fields), or None if nothing changed."""
+        metric_cls = type(metric)
+        names = self._field_names(metric_cls)
+        data = metric.__dict__
+        values = tuple(data[name] for name in names)
+        key = (metric_cls, metric.metric_identifier, metric.source_entity_uri or metric.source_entity_address, metric.observed_from)
+        timestamp_us = epoch_microseconds(metric.timestamp)
+        self._seen += 1
+        present = sum(value is not None for value in values)
+        self._fields_seen += present
+
+        previous = self._last.get(key)
+        if previous is None or (self.heartbeat_us is not None and timestamp_us - previous[1] >= self.heartbeat_us):
+            if previous is not None:
+                self._heartbeats += 1
+                values = tuple(last if value is None else value for value, last in zip(values, previous[0]))
+            self._last[key] = (values, timestamp_us)
+            self._emitted += 1
+            self._fields_emitted += present
+            return metric
+
+        last_values, last_full_us = previous
+        changed = [value is not None and value != last for value, last in zip(values, last_values)]
+        if not any(changed):
+            return None
+        self._last[key] = (tuple(last if value is None else value for value, last in zip(values, last_values)), last_full_us)
+        self._emitted += 1
+        if self.mode == 'instances' or all(changed[i] or values[i] is None for i in range(len(values))):
+            self._fields_emitted += present
+            return metric
+        update = dict(data)
+        for name, is_changed in zip(names, changed):
+            if not is_changed:
+                update[name] = None
+        self._fields_emitted += sum(changed)
+        return get_construction_plan(metric_cls).construct(update)
+
+    def filter_all(self, metrics: Iterable[BaseMetric]) -> Iterator[BaseMetric]:
+        """Yields the changed snapshots of ``metrics`` in order."""
+        for metric in metrics:
+            result = self.filter(metric)
+            if result is not None:
+                yield result
+
+    def stats(self) -> ChangeFilterStats:
+        return ChangeFilterStats(self._seen, self._emitted, self._heartbeats, self._fields_seen, self._fields_emitted, len(self._last))
+
+    def reset(self) -> None:
+        """Forgets every series, so the next snapshot of each is emitted in full."""
+        self._last.clear()
@@ -0,0 +1,221 @@
+"""Chunked SHACL validation for large metric graphs.
+
+Instead of running pyshacl with RDFS inference over an entire data graph at
+once, the graph is split into self-contained chunks: a group of metric
+instances (root subjects), everything each one says, every triple pointing at
+it, the descriptions of the nodes it references and of the nodes referencing
+it (following blank nodes all the way down), and the schema triples (class/property hierarchy, domains and
+ranges) found in the data. Each chunk is validated on its own, sequentially
+or in a process pool, and the results are merged into a single report.
+
+This gives the same results as full-graph validation for shapes whose
+constraints look at most one hop away from the focus node, which covers every
+shape in ``data/corona-shapes.ttl``. The memory pyshacl needs for inference
+and validation is bounded by the chunk size rather than by the size of the
+data file. The data graph itself is still parsed whole before chunking:
+Turtle may describe a subject anywhere in the file, so instances cannot be
+cut out of a stream.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Set, Tuple
+
+from pyshacl import validate
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.compare import to_canonical_graph
+from rdflib.namespace import OWL, RDF, RDFS
+from rdflib.term import Node
+
+SH = Namespace("http://www.w3.org/ns/shacl#")
+
+Triple = Tuple[Node, Node, Node]
+
+SCHEMA_PREDICATES = {RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range}
+SCHEMA_TYPES = {RDFS.Class, RDF.Property, OWL.Class, OWL.ObjectProperty, OWL.DatatypeProperty}
+
+# Identity of a validation result when merging; shape nodes are blank and differ between processes
+_RESULT_KEY_PREDICATES = (SH.focusNode, SH.resultPath, SH.sourceConstraintComponent, SH.value, SH.resultMessage, SH.resultSeverity)
+
+
+def schema_subjects(graph: Graph) -> Set[Node]:
+    """Returns the subjects that describe vocabulary (classes and properties) rather than data."""
+    subjects = set()
+    for s, p, o in graph:
+        if p in SCHEMA_PREDICATES or (p == RDF.type and o in SCHEMA_TYPES):
+            subjects.add(s)
+    return subjects
+
+
+def instance_roots(graph: Graph, schema: Set[Node]) -> List[Node]:
+    """Returns the data subjects to use as chunk roots: every IRI subject plus unreferenced blank nodes."""
+    roots = []
+    for s in graph.subjects(unique=True):
+        if s in schema:
+            continue
+        if isinstance(s, BNode) and next(graph.subjects(None, s), None) is not None:
+            continue
+        roots.append(s)
+    return roots
+
+
+def instance_triples(graph: Graph, root: Node, schema: Set[Node]) -> Set[Triple]:
+    """Collects the self-contained description of one metric instance."""
+    outgoing = list(graph.triples((root, None, None)))
+    incoming = list(graph.triples((None, None, root)))
+    triples: Set[Triple] = set(outgoing) | set(incoming)
+    # Nodes the root points at and nodes pointing at it (for inverse paths and sh:targetObjectsOf) are described too
+    pending = [o for _, _, o in outgoing if not isinstance(o, Literal)] + [s for s, _, _ in incoming]
+    pending = [node for node in pending if node != root and node not in schema]
+    seen = {root}
+    while pending:
+        node = pending.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        for triple in graph.triples((node, None, None)):
+            triples.add(triple)
+            # Referenced IRIs contribute one hop; blank node structures are followed all the way
+            if isinstance(triple[2], BNode):
+                pending.append(triple[2])
+    return triples
+
+
+def iter_chunks(graph: Graph, chunk_size: int = 500) -> Iterator[Graph]:
+    """Splits ``graph`` into chunks of up to ``chunk_size`` metric instances, each with the schema triples."""
+    schema = schema_subjects(graph)
+    schema_triples = [t for s in schema for t in graph.triples((s, None, None))]
+    roots = instance_roots(graph, schema)
+    for start in range(0, len(roots), chunk_size):
+        chunk = Graph()
+        for prefix, namespace in graph.namespaces():
+            chunk.bind(prefix, namespace, override=False)
+        for triple in schema_triples:
+            chunk.add(triple)
+        for root in roots[start:start + chunk_size]:
+            for triple in instance_triples(graph, root, schema):
+                chunk.add(triple)
+        yield chunk
+
+
+def copy_description(source: Graph, node: Node, target: Graph) -> None:
+    """Copies a node's triples, following blank nodes."""
+    for s, p, o in source.triples((node, None, None)):
+        target.add((s, p, o))
+        if isinstance(o, BNode):
+            copy_description(source, o, target)
+
+
+def _node_key(graph: Graph, node: Node) -> str:
+    """Identifies a result's node; blank nodes by their canonicalized description, which pyshacl copies into the report."""
+    if not isinstance(node, BNode):
+        return node.n3()
+    description = Graph()
+    copy_description(graph, node, description)
+    # Blank nodes are relabelled when chunks cross process boundaries, so their labels can't be compared
+    return "[" + " ".join(sorted(f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in to_canonical_graph(description))) + "]"
+
+
+def _result_key(graph: Graph, result: Node) -> Tuple[str, ...]:
+    return tuple(",".join(sorted(_node_key(graph, o) for o in graph.objects(result, p))) for p in _RESULT_KEY_PREDICATES)
+
+
+def _format_result(graph: Graph, result: Node) -> str:
+    """Renders one result in the style of pyshacl's text report."""
+    def first(predicate: URIRef) -> Optional[Node]:
+        return next(graph.objects(result, predicate), None)
+
+    component = first(SH.sourceConstraintComponent)
+    component_name = str(component).split("#")[-1] if component else "Unknown"
+    severity = first(SH.resultSeverity)
+    kind = "Constraint Violation" if severity == SH.Violation else "Validation Result"
+    lines = [f"{kind} in {component_name} ({component}):"]
+    if severity is not None:
+        lines.append(f"\tSeverity: sh:{str(severity).split('#')[-1]}")
+    for label, predicate in (("Focus Node", SH.focusNode), ("Value Node", SH.value), ("Result Path", SH.resultPath), ("Message", SH.resultMessage)):
+        value = first(predicate)
+        if value is not None:
+            lines.append(f"\t{label}: {value if predicate == SH.resultMessage else value.n3()}")
+    return "\n".join(lines)
+
+
+class ValidationReportBuilder:
+    """Merges per-chunk pyshacl results into one report, dropping duplicate results."""
+
+    def __init__(self) -> None:
+        self.graph = Graph()
+        self.graph.bind("sh", SH)
+        self.report = BNode()
+        self.graph.add((self.report, RDF.type, SH.ValidationReport))
+        self.conforms = True
+        self.chunks = 0
+        self._keys: Set[Tuple[str, ...]] = set()
+        self._texts: List[str] = []
+
+    def add(self, conforms: bool, results_graph: Graph) -> None:
+        self.chunks += 1
+        self.conforms = self.conforms and conforms
+        for result in results_graph.objects(None, SH.result):
+            key = _result_key(results_graph, result)
+            if key in self._keys:
+                continue
+            self._keys.add(key)
+            copy_description(results_graph, result, self.graph)
+            self.graph.add((self.report, SH.result, result))
+            self._texts.append(_format_result(results_graph, result))
+
+    @property
+    def result_count(self) -> int:
+        return len(self._keys)
+
+    def build(self) -> Tuple[bool, Graph, str]:
+        """Returns ``(conforms, results_graph, results_text)`` like ``pyshacl.validate``."""
+        self.graph.set((self.report, SH.conforms, Literal(self.conforms)))
+        text = ["Validation Report", f"Conforms: {self.conforms}"]
+        if self._texts:
+            text.append(f"Results ({len(self._texts)}):")
+            text.extend(self._texts)
+        return self.conforms, self.graph, "\n".join(text) + "\n"
+
+
+# Shapes graph held by each pool worker, parsed once in the initializer
+_worker_shapes: Optional[Graph] = None
+
+
+def _init_worker(shapes_nt: str) -> None:
+    global _worker_shapes
+    _worker_shapes = Graph().parse(data=shapes_nt, format="nt")
+
+
+def _validate_chunk_nt(data_nt: str, inference: Optional[str]) -> Tuple[bool, str]:
+    data_graph = Graph().parse(data=data_nt, format="nt")
+    conforms, results_graph, _ = validate(data_graph, shacl_graph=_worker_shapes, inference=inference, debug=False)
+    return conforms, results_graph.serialize(format="nt")
+
+
+def validate_chunked(
+    data_graph: Graph,
+    shapes_graph: Graph,
+    chunk_size: int = 500,
+    workers: int = 1,
+    inference: Optional[str] = "rdfs",
+) -> Tuple[bool, Graph, str]:
+    """Validates ``data_graph`` chunk by chunk and returns a merged ``(conforms, results_graph, results_text)``."""
+    builder = ValidationReportBuilder()
+    if workers <= 1:
+        for chunk in iter_chunks(data_graph, chunk_size):
+            conforms, results_graph, _ = validate(chunk, shacl_graph=shapes_graph, inference=inference, debug=False)
+            builder.add(conforms, results_graph)
+        return builder.build()
+
+    shapes_nt = shapes_graph.serialize(format="nt")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shapes_nt,)) as pool:
+        # Submit lazily in a bounded window so only a few serialized chunks are in flight at once
+        pending = []
+        for chunk in iter_chunks(data_graph, chunk_size):
+            pending.append(pool.submit(_validate_chunk_nt, chunk.serialize(format="nt"), inference))
+            if len(pending) >= workers * 2:
+                conforms, results_nt = pending.pop(0).result()
+                builder.add(conforms, Graph().parse(data=results_nt, format="nt"))
+        for future in pending:
+            conforms, results_nt = future.result()
+            builder.add(conforms, Graph().parse(data=results_nt, format="nt"))
+    return builder.build()
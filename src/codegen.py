@@ -0,0 +1,271 @@
+"""Generates metric model classes from the Corona ontology and shapes.
+
+``models.py`` declares its classes by hand and resolves predicates with name
+heuristics. This module instead reads ``corona-ontology.ttl`` (through
+``OntologyIndex``) and ``corona-shapes.ttl`` and writes ``generated_models.py``:
+one ``BaseMetric`` subclass per ontology metric class, with
+
+* a field per property, typed from its ``rdfs:range`` (or the shape's
+  ``sh:datatype`` when the ontology gives none), with ``ge=0`` for unsigned types;
+* ``TYPE_URI`` and ``ONTOLOGY_PROPERTIES`` fixing each property's IRI, datatype
+  and Prometheus type, which ``SerializationPlan`` and the stream writers use;
+* ``to_ttl``, ``to_prometheus`` and ``to_haystack_json`` unrolled field by
+  field, with IRIs, names and help texts as literals.
+
+A property belongs to the class named by its ``rdfs:domain``, else by its
+``rdfs:subPropertyOf`` (the ontology uses the metric classes as
+super-properties), else by a shape targeting a class whose ``sh:path`` lists
+it. Properties of the root class (``corona:PerformanceMetric``) are the
+metadata every ``BaseMetric`` already has. Counters are properties typed
+``xsd:unsignedLong`` or derived from ``LifetimeMetric``; other numbers are
+gauges, and resource-valued properties are left out of ``to_prometheus``.
+
+    corona-cli codegen            # rewrite src/generated_models.py
+    corona-cli codegen --check    # exit 1 if it is out of date
+"""
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, RDFS, SH, XSD
+
+from .graph_cache import load_graph
+from .models import METADATA_FIELDS
+from .ontology_index import OntologyIndex
+from .rdf_writer import DEFAULT_PREFIXES, TurtleFormatter
+from .validate_model import ontology_path, shapes_file_path
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generated_models.py")
+
+# XSD datatype local name -> (Python type, minimum value)
+_XSD_TYPES: Dict[str, Tuple[str, Optional[int]]] = {
+    "integer": ("int", None), "int": ("int", None), "long": ("int", None), "short": ("int", None),
+    "nonNegativeInteger": ("int", 0), "positiveInteger": ("int", 1),
+    "unsignedLong": ("int", 0), "unsignedInt": ("int", 0), "unsignedShort": ("int", 0),
+    "float": ("float", None), "double": ("float", None), "decimal": ("float", None),
+    "boolean": ("bool", None), "string": ("str", None),
+}
+_COUNTER_DATATYPES = frozenset({str(XSD.unsignedLong), str(XSD.nonNegativeInteger)})
+
+
+class PropertySpec(NamedTuple):
+    """One generated field; ``datatype`` is None for properties whose values are resources."""
+    field_name: str
+    key: str
+    predicate: str
+    datatype: Optional[str]
+    python_type: str
+    minimum: Optional[int]
+    prometheus_type: str
+    description: str
+
+
+class ClassSpec(NamedTuple):
+    """One generated model class."""
+    name: str
+    type_uri: str
+    description: str
+    properties: Tuple[PropertySpec, ...]
+
+
+def local_name(uri: str) -> str:
+    return re.split(r"[#/]", uri)[-1]
+
+
+def field_name(key: str) -> str:
+    """Converts a camelCase property name to a snake_case field name, e.g. ``iAmResponsesSent`` -> ``i_am_responses_sent``."""
+    s1 = re.sub(r"(.)([A-Z][a-z]+)", r"\1_\2", key.replace("-", "_"))
+    return re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", s1).lower()
+
+
+def _shape_paths(shapes: Optional[Graph]) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """Property local names listed per target class local name, and each property's ``sh:datatype``."""
+    paths: Dict[str, List[str]] = {}
+    datatypes: Dict[str, str] = {}
+    if shapes is None:
+        return paths, datatypes
+    for shape, target in shapes.subject_objects(SH.targetClass):
+        for node in shapes.objects(shape, SH.property):
+            path = shapes.value(node, SH.path)
+            if not isinstance(path, URIRef) or path.startswith(str(SH)):
+                continue
+            paths.setdefault(local_name(str(target)), []).append(local_name(str(path)))
+            datatype = shapes.value(node, SH.datatype)
+            if datatype is not None:
+                datatypes[local_name(str(path))] = str(datatype)
+    return paths, datatypes
+
+
+def model_specs(ontology: Graph, shapes: Optional[Graph] = None) -> List[ClassSpec]:
+    """Works out the classes and fields to generate; see the module docstring for the rules."""
+    index = OntologyIndex(ontology)
+    classes = {str(c) for c in ontology.subjects(RDF.type, RDFS.Class)}
+    roots = {c for c in classes if ontology.value(URIRef(c), RDFS.subClassOf) is None}
+    metric_classes = {local_name(c): c for c in classes - roots}
+    shape_paths, shape_datatypes = _shape_paths(shapes)
+    by_shape = {prop: cls for cls, props in shape_paths.items() for prop in props}
+    lifetime = {c for c in classes if local_name(c) == "LifetimeMetric"}
+
+    members: Dict[str, List[PropertySpec]] = {uri: [] for uri in metric_classes.values()}
+    for uri in sorted(index.properties, key=local_name):
+        info = index.properties[uri]
+        if any(d in roots for d in info.domains):
+            continue
+        key = local_name(uri)
+        owners = [c for c in info.domains + info.super_properties if c in members]
+        owner = owners[0] if owners else metric_classes.get(by_shape.get(key, ""))
+        if owner is None or field_name(key) in METADATA_FIELDS:
+            continue
+        range_ = ontology.value(URIRef(uri), RDFS.range)
+        datatype = str(range_) if range_ is not None else shape_datatypes.get(key)
+        if datatype is not None and datatype.startswith(str(XSD)):
+            python_type, minimum = _XSD_TYPES.get(local_name(datatype), ("str", None))
+        else:
+            datatype, python_type, minimum = None, "str", None
+        counter = python_type == "int" and (datatype in _COUNTER_DATATYPES or any(p in lifetime for p in info.super_properties))
+        description = " ".join((info.comment or info.label or key).split())
+        members[owner].append(PropertySpec(field_name(key), key, uri, datatype, python_type, minimum,
+                                           "counter" if counter else "gauge", description))
+
+    specs = []
+    for name in sorted(metric_classes):
+        uri = metric_classes[name]
+        if members[uri]:
+            comment = ontology.value(URIRef(uri), RDFS.comment)
+            specs.append(ClassSpec(name, uri, " ".join(str(comment or name).split()), tuple(members[uri])))
+    return specs
+
+
+def turtle_prefixes(specs: List[ClassSpec], ontology: Graph) -> Dict[str, str]:
+    """``DEFAULT_PREFIXES`` plus the ontology's own prefix for its namespace, renamed if that prefix is taken."""
+    prefixes = dict(DEFAULT_PREFIXES)
+    namespaces = sorted({uri[:-len(local_name(uri))] for spec in specs for uri in [spec.type_uri] + [p.predicate for p in spec.properties]})
+    bound = {str(ns): prefix for prefix, ns in ontology.namespaces()}
+    for namespace in namespaces:
+        if namespace in prefixes.values():
+            continue
+        base = bound.get(namespace) or "ns"
+        prefix, n = base, 0
+        while prefix in prefixes:
+            n += 1
+            prefix = f"{base}{n}"
+        prefixes[prefix] = namespace
+    return prefixes
+
+
+def _field_line(prop: PropertySpec) -> str:
+    args = ["None"]
+    if prop.key != prop.field_name:
+        args.append(f"alias={prop.key!r}")
+    if prop.minimum is not None:
+        args.append(f"ge={prop.minimum}")
+    args.append(f"description={prop.description!r}")
+    return f"    {prop.field_name}: Optional[{prop.python_type}] = Field({', '.join(args)})"
+
+
+def _ttl_lines(prop: PropertySpec, writer: TurtleFormatter) -> List[str]:
+    value = f"self.{prop.field_name}"
+    lead = f" ;\n    {writer.iri(prop.predicate)} "
+    if prop.datatype is None:
+        statement = f"parts.append({lead!r} + _TURTLE.term(value_object({value})))"
+    elif prop.python_type in ("int", "float", "bool"):
+        lexical = f"str({value}).lower()" if prop.python_type == "bool" else value
+        statement = "parts.append(f" + repr(lead + '"{' + lexical + '}"^^' + writer.iri(prop.datatype)) + ")"
+    else:
+        statement = f"parts.append({lead!r} + _TURTLE.term(('literal', str({value}), {prop.datatype!r})))"
+    return [f"        if {value} is not None:", f"            {statement}"]
+
+
+def _prometheus_lines(prop: PropertySpec) -> List[str]:
+    if prop.python_type == "str":
+        return []  # resource-valued properties have no sample value
+    value = f"self.{prop.field_name}"
+    suffix = "_total" if prop.prometheus_type == "counter" else ""
+    help_text = " " + prop.description.replace('"', '\\"')
+    return [
+        f"        if {value} is not None:",
+        f"            name = prefix + {'_' + prop.field_name + suffix!r}",
+        f"            lines += ('# HELP ' + name + {help_text!r}, '# TYPE ' + name + {' ' + prop.prometheus_type!r},",
+        f"                      f'{{name}}{{labels}} {{float({value})}} {{timestamp_ms}}', '')",
+    ]
+
+
+def _haystack_lines(prop: PropertySpec) -> List[str]:
+    value = f"self.{prop.field_name}"
+    return [
+        f"        if {value} is not None:",
+        f"            rows.append({{'entity': entity, 'metric': {prop.key!r}, 'val': {value}, 'ts': ts, 'observer': observer, 'metricId': metric_id}})",
+    ]
+
+
+def generate_module(specs: List[ClassSpec], prefixes: Dict[str, str], sources: Tuple[str, ...] = ()) -> str:
+    """Returns the source of the generated models module."""
+    writer = TurtleFormatter(prefixes)
+    header = writer.header()
+    out = [
+        f'"""Metric models generated from {" and ".join(sources) or "the Corona ontology"} by ``corona-cli codegen``.',
+        "",
+        "Do not edit by hand: change the ontology or shapes and regenerate. See ``codegen``",
+        "for how properties are assigned to classes and typed.",
+        '"""',
+        "from typing import Any, ClassVar, Dict, List, Optional",
+        "",
+        "from pydantic import Field",
+        "",
+        "from .models import BaseMetric, OntologyProperty, haystack_entity_ref, prometheus_label_string",
+        "from .rdf_writer import TurtleFormatter, value_object",
+        "",
+        "PREFIXES: Dict[str, str] = {",
+        *(f"    {p!r}: {ns!r}," for p, ns in prefixes.items()),
+        "}",
+        "_TURTLE = TurtleFormatter(PREFIXES)",
+        f"_TTL_HEADER = {header!r}",
+    ]
+    for spec in specs:
+        out += [
+            "",
+            "",
+            f"class {spec.name}(BaseMetric):",
+            f"    {spec.description!r}" if '"' in spec.description else f'    """{spec.description}"""',
+            f"    TYPE_URI: ClassVar[str] = {spec.type_uri!r}",
+            "    ONTOLOGY_PROPERTIES: ClassVar[Dict[str, OntologyProperty]] = {",
+            *(f"        {p.field_name!r}: OntologyProperty({p.predicate!r}, {p.datatype!r}, {p.prometheus_type!r})," for p in spec.properties),
+            "    }",
+            "",
+            *(_field_line(p) for p in spec.properties),
+            "",
+            "    def to_ttl(self) -> str:",
+            '        """Serializes the metric to a standalone Turtle document."""',
+            "        parts = [_TTL_HEADER, _TURTLE.format_head(self)]",
+            *(line for p in spec.properties for line in _ttl_lines(p, writer)),
+            "        parts.append(' .\\n')",
+            "        return ''.join(parts)",
+            "",
+            '    def to_prometheus(self, prefix: str = "bacnet") -> List[str]:',
+            '        """Serializes the metric to Prometheus exposition format."""',
+            "        labels = prometheus_label_string(self.source_entity_uri, self.source_entity_address, self.observed_from, self.metric_identifier)",
+            "        timestamp_ms = int(self.timestamp.timestamp() * 1000)",
+            "        lines: List[str] = []",
+            *(line for p in spec.properties for line in _prometheus_lines(p)),
+            "        return lines",
+            "",
+            "    def to_haystack_json(self) -> List[Dict[str, Any]]:",
+            '        """Serializes the metric to Project Haystack JSON rows, one per value."""',
+            "        entity = haystack_entity_ref(self.source_entity_uri, self.source_entity_address)",
+            "        ts = self.timestamp.isoformat()",
+            "        observer, metric_id = self.observed_from, self.metric_identifier",
+            "        rows: List[Dict[str, Any]] = []",
+            *(line for p in spec.properties for line in _haystack_lines(p)),
+            "        return rows",
+        ]
+    return "\n".join(out) + "\n"
+
+
+def generate_models(ontology_file: str = ontology_path, shapes_file: Optional[str] = shapes_file_path, use_cache: bool = True) -> str:
+    """Reads the ontology (and shapes) and returns the generated module source."""
+    ontology = load_graph(ontology_file, format="turtle", use_cache=use_cache)
+    shapes = load_graph(shapes_file, format="turtle", use_cache=use_cache) if shapes_file else None
+    specs = model_specs(ontology, shapes)
+    sources = tuple(os.path.basename(path) for path in (ontology_file, shapes_file) if path)
+    return generate_module(specs, turtle_prefixes(specs, ontology), sources)
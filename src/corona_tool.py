@@ -1,97 +1,176 @@
+import asyncio
 import click
+import glob
 import json
 import sys
 import os
-from typing import List, Dict, Any
-from rdflib import Graph, Literal, URIRef
-from rdflib.namespace import RDF, RDFS, XSD
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, TextIO, cast
+from rdflib import Dataset, Graph, URIRef
 
 # Assuming these imports are correct relative to the project structure
 try:
-    from .models import BaseMetric, CORONA, BACNET, format_rdflib_literal, to_camel_case
+    from .models import BaseMetric, get_serialization_plan
+    from . import archive
+    from . import change_filter
+    from . import models
+    from . import daemon
     from . import demo_metrics
+    from . import multi_validation
+    from . import pipeline
+    from . import prometheus
+    from . import rdf_writer
+    from . import stream_convert
     from . import validate_model
+    from . import validation_cache
 except ImportError as e:
     print(f"Error importing modules: {e}", file=sys.stderr)
     sys.exit(1)
 
-def add_metric_to_graph(metric: BaseMetric, g: Graph) -> None:
-    """Adds the triples for a single metric instance to an existing RDFLib Graph."""
+def add_metric_to_graph(metric: BaseMetric, g: Graph, graph_name: str | None = None) -> None:
+    """Adds the triples for a single metric instance to an existing RDFLib Graph.
+
+    With ``graph_name``, ``g`` must be an rdflib ``Dataset`` and the triples go
+    to that named graph (see ``rdf_writer.observer_graph``), ready for
+    ``g.serialize(format='nquads')``.
+    """
+    if graph_name is not None:
+        if not isinstance(g, Dataset):
+            raise TypeError("Named graphs need an rdflib Dataset")
+        g = g.graph(URIRef(graph_name))
     try:
         instance_uri = URIRef(metric.metric_instance_uri)
     except Exception as e:
         print(f"Warning: Invalid metric_instance_uri '{metric.metric_instance_uri}': {e}", file=sys.stderr)
         return
 
+    plan = get_serialization_plan(type(metric))
+    # Shared terms: only the instance IRI is new per metric
+    pool = models.DEFAULT_TERM_POOL
+
     # Add type triple
-    g.add((instance_uri, RDF.type, CORONA[metric.__class__.__name__]))
+    g.add((instance_uri, models.P_TYPE, plan.type_uri))
 
     # Add common fields
     if metric.observed_from:
-        observed_from_term = format_rdflib_literal(metric.observed_from)
-        g.add((instance_uri, CORONA.observedFrom, observed_from_term))
+        g.add((instance_uri, models.P_OBSERVED_FROM, pool.term(metric.observed_from)))
     if metric.description:
-        g.add((instance_uri, RDFS.comment, Literal(metric.description)))
+        g.add((instance_uri, models.P_COMMENT, pool.literal(metric.description)))
     if metric.metric_identifier:
-        g.add((instance_uri, CORONA['metric-identifier'], Literal(metric.metric_identifier, datatype=XSD.string)))
+        g.add((instance_uri, models.P_METRIC_IDENTIFIER, pool.literal(metric.metric_identifier, models.XSD_STRING)))
     if metric.metric_name:
-        g.add((instance_uri, RDFS.label, Literal(metric.metric_name)))
+        g.add((instance_uri, models.P_LABEL, pool.literal(metric.metric_name)))
     if metric.timestamp:
-        g.add((instance_uri, CORONA.observedAt, format_rdflib_literal(metric.timestamp)))
+        g.add((instance_uri, models.P_OBSERVED_AT, pool.term(metric.timestamp)))
     if metric.source_entity_uri:
         try:
-            source_uri = URIRef(metric.source_entity_uri)
-            g.add((instance_uri, CORONA.metricSource, source_uri))
+            g.add((instance_uri, models.P_METRIC_SOURCE, pool.uri(metric.source_entity_uri)))
         except Exception as e:
             print(f"Warning: Could not create URIRef from source_entity_uri '{metric.source_entity_uri}': {e}", file=sys.stderr)
     elif metric.source_entity_address:
-        g.add((instance_uri, CORONA.sourceAddress, Literal(metric.source_entity_address)))
+        g.add((instance_uri, models.P_SOURCE_ADDRESS, pool.literal(metric.source_entity_address)))
 
     # Add specific metric value fields
-    metric_fields = metric._get_metric_fields()
-    for field_name, value in metric_fields.items():
-        if value is None:
-            continue
+    for field in plan.fields:
+        value = getattr(metric, field.name)
+        if value is not None:
+            g.add((instance_uri, field.predicate, pool.term(value) if field.datatype is None else pool.literal(value, field.datatype)))
 
-        pydantic_field = metric.model_fields.get(field_name)
-        prop_name_camel = pydantic_field.alias if pydantic_field and pydantic_field.alias else to_camel_case(field_name)
-        namespace = BACNET if "bacnet" in field_name.lower() or any(term in prop_name_camel.lower() for term in ["who", "cov", "bbmd", "readproperty", "iam", "ihave", "routed", "forwarded"]) else CORONA
-        prop_uri = namespace[prop_name_camel]
-        g.add((instance_uri, prop_uri, format_rdflib_literal(value)))
+def _sample_metrics(metric_type: str) -> List[BaseMetric]:
+    """Returns the demo metrics selected by a --type option."""
+    if metric_type == 'app':
+        return [demo_metrics.generate_sample_bacnet_app_metric()]
+    elif metric_type == 'cov':
+        return [demo_metrics.generate_sample_cov_metric()]
+    elif metric_type == 'router':
+        return [demo_metrics.generate_sample_router_metric()]
+    return demo_metrics.generate_all_sample_metrics()
+
+def _render_with_daemon(metrics: List[BaseMetric], output_format: str) -> str | None:
+    """Serializes metrics through a running daemon; returns None if none is available or it fails."""
+    client = daemon.connect_if_running()
+    if client is None:
+        return None
+    try:
+        with client:
+            return client.convert(metrics, output_format)
+    except (OSError, daemon.DaemonError) as e:
+        print(f"Warning: corona daemon request failed, serializing locally: {e}", file=sys.stderr)
+        return None
 
 @click.group()
 def cli() -> None:
     """Corona Standard CLI Tool"""
     pass
 
+def _graph_name(graph_by: str, interval: int) -> Any:
+    """Returns the N-Quads ``graph_name`` function selected by --graph-by/--interval."""
+    return rdf_writer.observer_graph if graph_by == 'observer' else rdf_writer.interval_graph(interval)
+
+def _write_rdf(metrics: List[BaseMetric], output_format: str, stream: Any, graph_name: Any) -> int:
+    """Streams metrics as ttl, ntriples or nquads without building a Graph."""
+    if output_format == 'nquads':
+        return rdf_writer.write_metrics_nquads(metrics, stream, graph_name)
+    if output_format == 'ntriples':
+        return rdf_writer.write_metrics_ntriples(metrics, stream)
+    return rdf_writer.write_metrics_ttl(metrics, stream)
+
+RDF_FORMATS = ('ttl', 'ntriples', 'nquads')
+GRAPH_BY_OPTION = click.option('--graph-by', type=click.Choice(['observer', 'interval']), default='observer', show_default=True,
+                               help='N-Quads named graph per metric: its observed_from, or its collection interval.')
+INTERVAL_OPTION = click.option('--interval', default=3600, show_default=True, type=click.IntRange(min=1),
+                               help='Collection interval in seconds for --graph-by interval.')
+
+CHANGES_OPTION = click.option('--changes', type=click.Choice(change_filter.MODES),
+                              help="Only export what changed per series: just the changed 'fields', or whole changed 'instances'.")
+HEARTBEAT_OPTION = click.option('--heartbeat', type=click.FloatRange(min=0, min_open=True),
+                                help='With --changes, re-export a full snapshot of each series at least this often (seconds of metric time).')
+
+def _change_filter(changes: str | None, heartbeat: float | None) -> 'change_filter.ChangeFilter | None':
+    """Returns the ChangeFilter selected by --changes/--heartbeat, if any."""
+    if changes is None:
+        if heartbeat is not None:
+            raise click.UsageError("--heartbeat needs --changes")
+        return None
+    return change_filter.ChangeFilter(changes, heartbeat)
+
 @cli.command()
 @click.option('--type', 'metric_type', type=click.Choice(['app', 'cov', 'router', 'all']), default='all', help='Type of sample metric(s) to generate.')
-@click.option('--format', 'output_format', type=click.Choice(['ttl', 'haystack', 'prometheus', 'json']), default='ttl', help='Output format for the generated metrics.')
+@click.option('--format', 'output_format', type=click.Choice(['ttl', 'ntriples', 'nquads', 'haystack', 'prometheus', 'json']), default='ttl', help='Output format for the generated metrics.')
 @click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help='Optional file path to write the output to.')
-def generate(metric_type: str, output_format: str, output: str | None) -> None:
+@GRAPH_BY_OPTION
+@INTERVAL_OPTION
+@click.option('--no-daemon', is_flag=True, help='Serialize locally even if a corona daemon is running.')
+def generate(metric_type: str, output_format: str, output: str | None, graph_by: str, interval: int, no_daemon: bool) -> None:
     """Generate sample metrics and serialize them."""
-    metrics: List[BaseMetric] = []
-    if metric_type == 'all':
-        metrics = demo_metrics.generate_all_sample_metrics()
-    elif metric_type == 'app':
-        metrics.append(demo_metrics.generate_sample_bacnet_app_metric())
-    elif metric_type == 'cov':
-        metrics.append(demo_metrics.generate_sample_cov_metric())
-    elif metric_type == 'router':
-        metrics.append(demo_metrics.generate_sample_router_metric())
+    metrics = _sample_metrics(metric_type)
 
     output_str = ""
 
-    if output_format == 'ttl':
-        combined_graph = Graph()
-        combined_graph.bind("corona", CORONA)
-        combined_graph.bind("bacnet", BACNET)
-        combined_graph.bind("xsd", XSD)
-        combined_graph.bind("rdf", RDF)
-        combined_graph.bind("rdfs", RDFS)
-        for metric in metrics:
-            add_metric_to_graph(metric, combined_graph)
-        output_str = combined_graph.serialize(format='turtle')
+    # The daemon only names N-Quads graphs after observers
+    use_daemon = not no_daemon and not (output_format == 'nquads' and graph_by != 'observer')
+    daemon_output = _render_with_daemon(metrics, output_format) if use_daemon else None
+    if daemon_output is not None:
+        # Serialized by the warm daemon; the output is identical to the local path
+        output_str = daemon_output
+        if output_format in RDF_FORMATS and not output:
+            sys.stdout.write(output_str)
+            return
+    elif output_format in RDF_FORMATS:
+        # Stream the triples directly instead of building a combined Graph
+        graph_name = _graph_name(graph_by, interval)
+        if output:
+            try:
+                with open(output, 'w') as f:
+                    _write_rdf(metrics, output_format, f, graph_name)
+                click.echo(f"Output written to {output}")
+            except IOError as e:
+                click.echo(f"Error writing to file {output}: {e}", err=True)
+        else:
+            _write_rdf(metrics, output_format, sys.stdout, graph_name)
+        return
     elif output_format == 'haystack':
         output_dicts: List[Dict[str, Any]] = []
         for metric in metrics:
@@ -99,13 +178,12 @@ def generate(metric_type: str, output_format: str, output: str | None) -> None:
         output_str = json.dumps(output_dicts)
 
     else:
-        output_lines: List[str] = []
+        output_lines: List[Any] = []
         for metric in metrics:
             if output_format == 'prometheus':
                 output_lines.extend(metric.to_prometheus())
             elif output_format == 'json':
-                # Use model_dump_json for Pydantic v2 for direct JSON string output
-                output_lines.append(json.loads(metric.model_dump_json())) # Parse back to dict for consistent list handling
+                output_lines.append(metric.model_dump(mode='json'))
 
         if output_format == 'haystack' or output_format == 'json':
             # Dump the list of dicts/objects as a single JSON array
@@ -124,23 +202,333 @@ def generate(metric_type: str, output_format: str, output: str | None) -> None:
         click.echo(output_str)
 
 @cli.command()
-@click.option('--file', 'model_file', type=click.Path(exists=True, dir_okay=False, readable=True), help='Path to the TTL model file to validate. Defaults to the example file.')
-def validate(model_file: str | None) -> None:
-    """Validate a metric model (TTL file) against SHACL shapes."""
-    # Pass analyze_flag=False as default
+@click.argument('input_file', metavar='INPUT', default='-')
+@click.option('--format', 'output_format', type=click.Choice(stream_convert.OUTPUT_FORMATS), default='ttl', show_default=True, help='Output format.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help='File to write to instead of stdout.')
+@click.option('--type', 'default_type', help='Model class (e.g. BacnetApplicationMetric) for records without a "type" field.')
+@click.option('--strict', is_flag=True, help='Stop at the first invalid record instead of skipping it.')
+@GRAPH_BY_OPTION
+@INTERVAL_OPTION
+@CHANGES_OPTION
+@HEARTBEAT_OPTION
+def convert(input_file: str, output_format: str, output: str | None, default_type: str | None, strict: bool,
+            graph_by: str, interval: int, changes: str | None, heartbeat: float | None) -> None:
+    """Convert NDJSON metric records from INPUT (default stdin) one at a time."""
+    errors: List[stream_convert.RecordError] | None = None if strict else []
+    options = {'graph_name': _graph_name(graph_by, interval)} if output_format == 'nquads' else {}
+    changes_filter = _change_filter(changes, heartbeat)
     try:
-        validate_model.validate_model(model_path=model_file, analyze_flag=False)
-    except Exception as e:
-        click.echo(f"Validation error: {e}", err=True)
+        with click.open_file(input_file, 'r', encoding='utf-8') as source, \
+                click.open_file(output or '-', 'w', encoding='utf-8') as sink:
+            written = stream_convert.convert_stream(source, cast(TextIO, sink), output_format, default_type, errors, changes_filter, **options)
+    except BrokenPipeError:
+        # The reader (e.g. ``head``) went away; stop quietly without a traceback at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    for error in errors or []:
+        click.echo(f"Warning: skipped {error}", err=True)
+    if changes_filter is not None:
+        click.echo(changes_filter.stats().summary(), err=True)
+    if output:
+        click.echo(f"Converted {written} metrics to {output}")
+    if errors:
+        sys.exit(1)
+
+def _parse_datetime(ctx: click.Context, param: click.Parameter, value: str | None) -> datetime | None:
+    """Click callback accepting ISO 8601 timestamps, with or without a UTC offset."""
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise click.BadParameter(f"'{value}' is not an ISO 8601 timestamp")
+
+@cli.group('archive')
+def archive_group() -> None:
+    """Create and read compressed metric archives."""
+
+@archive_group.command('create')
+@click.argument('inputs', metavar='INPUT...', nargs=-1, required=True)
+@click.option('-o', '--output', required=True, type=click.Path(dir_okay=False, writable=True), help='Archive file to create.')
+@click.option('--type', 'default_type', help='Model class (e.g. BacnetApplicationMetric) for records without a "type" field.')
+@click.option('--chunk-size', default=archive.DEFAULT_CHUNK_SIZE, show_default=True, type=click.IntRange(min=1), help='Readings per series chunk, the unit of range reads.')
+def archive_create(inputs: tuple[str, ...], output: str, default_type: str | None, chunk_size: int) -> None:
+    """Archive NDJSON metric records from INPUT files ('-' for stdin)."""
+    errors: List[stream_convert.RecordError] = []
+    try:
+        with archive.ArchiveWriter(output, chunk_size) as writer:
+            for input_file in inputs:
+                with click.open_file(input_file, 'r', encoding='utf-8') as source:
+                    writer.add_all(stream_convert.read_ndjson_metrics(source, default_type, errors))
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    for error in errors:
+        click.echo(f"Warning: skipped {error}", err=True)
+    click.echo(f"Archived {writer.metrics_written} metrics to {output} ({os.path.getsize(output)} bytes)")
+    if errors:
+        sys.exit(1)
+
+@archive_group.command('info')
+@click.argument('archive_file', metavar='ARCHIVE', type=click.Path(exists=True, dir_okay=False))
+def archive_info(archive_file: str) -> None:
+    """List the series in an archive."""
+    try:
+        with archive.ArchiveReader(archive_file) as reader:
+            series = reader.series()
+    except archive.ArchiveError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    for info in series:
+        identifier = info.meta.get('metric_identifier') or info.meta.get('source_entity_uri') or info.meta.get('source_entity_address') or '-'
+        click.echo(f"{info.metric_type}\t{identifier}\t{info.readings}\t{info.start.isoformat() if info.start else '-'}\t{info.end.isoformat() if info.end else '-'}")
+    click.echo(f"{len(series)} series, {sum(info.readings for info in series)} metrics")
+
+@archive_group.command('export')
+@click.argument('archive_file', metavar='ARCHIVE', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'output_format', type=click.Choice(stream_convert.OUTPUT_FORMATS), default='ttl', show_default=True, help='Output format.')
+@click.option('--start', callback=_parse_datetime, help='First timestamp to export (ISO 8601, inclusive).')
+@click.option('--end', callback=_parse_datetime, help='Last timestamp to export (ISO 8601, inclusive).')
+@click.option('--type', 'metric_type', help='Only export this model class, e.g. RouterBBMDMetric.')
+@click.option('--metric-id', 'metric_identifier', help='Only export series with this metric identifier.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help='File to write to instead of stdout.')
+@GRAPH_BY_OPTION
+@INTERVAL_OPTION
+@CHANGES_OPTION
+@HEARTBEAT_OPTION
+def archive_export(archive_file: str, output_format: str, start: datetime | None, end: datetime | None,
+                   metric_type: str | None, metric_identifier: str | None, output: str | None, graph_by: str, interval: int,
+                   changes: str | None, heartbeat: float | None) -> None:
+    """Export a time range of an archive in timestamp order."""
+    options = {'graph_name': _graph_name(graph_by, interval)} if output_format == 'nquads' else {}
+    changes_filter = _change_filter(changes, heartbeat)
+    try:
+        with archive.ArchiveReader(archive_file) as reader, click.open_file(output or '-', 'w', encoding='utf-8') as sink:
+            writer = stream_convert.stream_writer(output_format, cast(TextIO, sink), **options)
+            writer.write_header()
+            metrics = reader.read(start, end, metric_type, metric_identifier)
+            for metric in metrics if changes_filter is None else changes_filter.filter_all(metrics):
+                writer.write_metric(metric)
+            writer.write_footer()
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    if changes_filter is not None:
+        click.echo(changes_filter.stats().summary(), err=True)
+    if output:
+        click.echo(f"Exported {writer.metrics_written} metrics to {output}")
+
+@cli.command('serve-prometheus')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to bind the HTTP exporter to.')
+@click.option('--port', default=9108, show_default=True, type=int, help='Port to serve /metrics on.')
+@click.option('--interval', default=15.0, show_default=True, type=float, help='Seconds between registry updates.')
+@click.option('--type', 'metric_type', type=click.Choice(['app', 'cov', 'router', 'all']), default='all', help='Type of sample metric(s) to serve.')
+@click.option('--prefix', default='bacnet', show_default=True, help='Prometheus metric name prefix.')
+def serve_prometheus(host: str, port: int, interval: float, metric_type: str, prefix: str) -> None:
+    """Serve sample metrics on a Prometheus /metrics endpoint."""
+    registry = prometheus.PrometheusRegistry(prefix=prefix)
+    registry.update(_sample_metrics(metric_type))
+    exporter = prometheus.PrometheusExporter(registry, host=host, port=port)
+    exporter.start()
+    click.echo(f"Serving Prometheus metrics on http://{exporter.address[0]}:{exporter.address[1]}/metrics")
+    try:
+        while True:
+            time.sleep(interval)
+            registry.update(_sample_metrics(metric_type))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
+
+@cli.command()
+@click.option('--devices', default=100, show_default=True, type=click.IntRange(min=1), help='Simulated BACnet devices.')
+@click.option('--ticks', default=10, show_default=True, type=click.IntRange(min=1), help='Readings taken from every device.')
+@click.option('--interval', default=1.0, show_default=True, type=float, help='Seconds between readings (simulated time unless --realtime).')
+@click.option('--realtime', is_flag=True, help='Pace readings by the wall clock instead of producing them as fast as possible.')
+@click.option('--format', 'output_format', type=click.Choice(pipeline.SERIALIZE_FORMATS), default='ntriples', show_default=True, help='Output format.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help='File to append to instead of writing to stdout.')
+@click.option('--rotate-size', type=click.IntRange(min=1), help='Rotate the output file once it would exceed this many bytes.')
+@click.option('--rotate-interval', type=click.FloatRange(min=0, min_open=True), help='Rotate the output file after this many seconds.')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip rotated output files.')
+@click.option('--batch-size', default=256, show_default=True, type=click.IntRange(min=1), help='Metrics serialized together.')
+@click.option('--workers', default=0, show_default=True, type=click.IntRange(min=0), help='Processes used for serialization (0 serializes in the event loop).')
+@click.option('--queue-size', default=1024, show_default=True, type=click.IntRange(min=1), help='Capacity of each pipeline queue.')
+@CHANGES_OPTION
+@HEARTBEAT_OPTION
+def simulate(devices: int, ticks: int, interval: float, realtime: bool, output_format: str, output: str | None,
+             rotate_size: int | None, rotate_interval: float | None, compress: bool, batch_size: int, workers: int, queue_size: int,
+             changes: str | None, heartbeat: float | None) -> None:
+    """Run simulated BACnet devices through the collection pipeline and report throughput and latency."""
+    source = pipeline.SimulatedBacnetSource(devices=devices, interval=interval, ticks=ticks, realtime=realtime)
+    changes_filter = _change_filter(changes, heartbeat)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+    stages = [pipeline.Batch(batch_size), pipeline.Serialize(output_format, executor, concurrency=max(1, 2 * workers))]
+    if changes_filter is not None:
+        stages.insert(0, pipeline.Map(changes_filter.filter))
+    sink: pipeline.FileSink | pipeline.TextSink
+    if output:
+        sink = pipeline.FileSink(output, max_bytes=rotate_size, max_interval=rotate_interval, compress=compress)
+    elif rotate_size or rotate_interval or compress:
+        raise click.UsageError("--rotate-size, --rotate-interval and --gzip need -o/--output")
+    else:
+        sink = pipeline.TextSink()
+    try:
+        stats = asyncio.run(pipeline.Pipeline([source], stages, [sink], queue_size=queue_size).run())
+    except KeyboardInterrupt:
+        sys.exit(1)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    click.echo(stats.summary(), err=True)
+    if changes_filter is not None:
+        click.echo(changes_filter.stats().summary(), err=True)
+    if isinstance(sink, pipeline.FileSink):
+        file_stats = sink.file.stats()
+        click.echo(f"Wrote {file_stats.bytes_written} bytes in {file_stats.flushes} flushes (max {file_stats.max_flush_seconds * 1000:.1f} ms), "
+                   f"{file_stats.rotations} rotations", err=True)
+
+@cli.command()
+@click.argument('paths', nargs=-1)
+@click.option('--file', 'model_files', multiple=True, help='TTL model file, directory or glob pattern to validate (repeatable). Defaults to the example file.')
+@click.option('--chunk-size', type=click.IntRange(min=1), help='Validate in chunks of this many metric instances to bound memory (single file only).')
+@click.option('--workers', type=click.IntRange(min=1),
+              help='Processes used to validate files (or chunks, with --chunk-size) in parallel. Defaults to one per CPU, at most one per file, '
+                   'for several files and to 1 for chunks; 1 validates in this process.')
+@click.option('--json', 'json_output', is_flag=True, help='Print a machine-readable JSON summary of every file.')
+@click.option('--no-cache', is_flag=True, help='Parse the shapes graph from Turtle instead of using the on-disk parse cache.')
+@click.option('--targeted', is_flag=True, help='Expand the data from the precomputed ontology hierarchy and skip shapes without instances instead of full RDFS inference (single file only).')
+@click.option('--no-result-cache', is_flag=True, help='Validate every metric instance instead of reusing cached verdicts for unchanged ones (single file only).')
+@click.option('--no-daemon', is_flag=True, help='Validate in this process even if a corona daemon is running.')
+def validate(paths: tuple[str, ...], model_files: tuple[str, ...], chunk_size: int | None, workers: int | None, json_output: bool, no_cache: bool,
+             targeted: bool, no_result_cache: bool, no_daemon: bool) -> None:
+    """Validate metric models (TTL files, directories or globs) against SHACL shapes.
+
+    Exits with status 1 if any model does not conform or cannot be validated.
+    """
+    patterns = list(model_files) + list(paths)
+    single_file = len(patterns) <= 1 and not json_output and not any(os.path.isdir(p) or glob.has_magic(p) for p in patterns)
+    if chunk_size and targeted:
+        click.echo("Validation error: --targeted cannot be combined with --chunk-size.", err=True)
+        sys.exit(2)
+    if not single_file:
+        if chunk_size or targeted:
+            click.echo(f"Validation error: {'--chunk-size' if chunk_size else '--targeted'} only applies to a single model file.", err=True)
+            sys.exit(2)
+        summary = multi_validation.validate_files(multi_validation.expand_model_paths(patterns), workers=workers, use_cache=not no_cache)
+        if json_output:
+            click.echo(summary.to_json())
+        else:
+            for result in summary.results:
+                status = "PASS" if result.conforms else "FAIL"
+                detail = result.error or f"{result.violations} violation(s), {result.triples} triples"
+                click.echo(f"{status} {result.path}: {detail} ({result.seconds:.2f}s)")
+            failed = sum(1 for r in summary.results if not r.conforms)
+            click.echo(f"{len(summary.results) - failed}/{len(summary.results)} file(s) conform ({summary.seconds:.2f}s)")
+        sys.exit(0 if summary.conforms and summary.results else 1)
+
+    model_file = patterns[0] if patterns else None
+    # Chunked and targeted validation always run locally; everything else can use a running daemon
+    client = None if no_daemon or chunk_size or targeted else daemon.connect_if_running()
+    conforms = _validate_with_daemon(client, model_file or validate_model.example_model_path) if client is not None else None
+    if conforms is None:
+        result_cache = None if no_result_cache else validation_cache.ValidationCache.load()
+        # Pass analyze_flag=False as default
+        try:
+            conforms = validate_model.validate_model(model_path=model_file, analyze_flag=False, chunk_size=chunk_size, workers=workers or 1,
+                                                     use_cache=not no_cache, result_cache=result_cache, targeted=targeted)
+        except Exception as e:
+            click.echo(f"Validation error: {e}", err=True)
+            conforms = False
+        if result_cache is not None:
+            result_cache.save()
+    sys.exit(0 if conforms else 1)
+
+def _validate_with_daemon(client: 'daemon.DaemonClient', model_path: str) -> bool | None:
+    """Validates a model file through a running daemon, printing what validate_model prints.
+
+    Returns None, without printing results, if the validation should run locally instead:
+    the file could not be read here, or the connection to the daemon failed or timed out.
+    """
+    with client:
+        try:
+            with open(model_path) as f:
+                ttl = f.read()
+        except OSError:
+            return None
+        try:
+            result = client.validate(ttl)
+        except OSError as e:
+            print(f"Warning: corona daemon request failed, validating locally: {e}", file=sys.stderr)
+            return None
+        except daemon.DaemonError as e:
+            click.echo(f"Validation error: {e}", err=True)
+            return False
+    click.echo(f"Loaded model from {model_path}")
+    click.echo(f"Model contains {result['triples']} triples")
+    click.echo(f"Validated by corona daemon at {client.socket_path}")
+    if result['conforms']:
+        click.echo("\nValidation successful! The data conforms to the SHACL shapes.")
+    else:
+        click.echo("\nValidation failed. See details below:")
+        click.echo(result['results_text'])
+    return bool(result['conforms'])
+
+@cli.command('daemon')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='Unix socket to listen on. Defaults to $CORONA_SOCKET or a per-user runtime socket.')
+@click.option('--workers', default=2, show_default=True, type=click.IntRange(min=1), help='Validation worker processes.')
+@click.option('--no-cache', is_flag=True, help='Parse the shapes and ontology from Turtle instead of using the on-disk parse cache.')
+def daemon_command(socket_path: str | None, workers: int, no_cache: bool) -> None:
+    """Run a daemon that keeps shapes and the ontology loaded and serves requests on a Unix socket."""
+    server = daemon.CoronaDaemon(socket_path=socket_path, workers=workers, use_cache=not no_cache)
+    click.echo(f"Corona daemon listening on {server.socket_path} ({workers} worker(s))")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        click.echo(f"Daemon error: {e}", err=True)
 
 @cli.command()
 @click.option('--ontology', 'ontology_file', type=click.Path(exists=True, dir_okay=False, readable=True), help='Path to the ontology TTL file to analyze. Defaults to the one in validate_model.py.')
-def analyze(ontology_file: str | None) -> None:
+@click.option('--json', 'json_output', is_flag=True, help='Print the ontology index as JSON.')
+@click.option('--no-cache', is_flag=True, help='Parse the ontology from Turtle instead of using the on-disk parse cache.')
+def analyze(ontology_file: str | None, json_output: bool, no_cache: bool) -> None:
     """Analyze the Corona ontology structure."""
     try:
-        validate_model.analyze_ontology(ont_path=ontology_file)
+        validate_model.analyze_ontology(ont_path=ontology_file, use_cache=not no_cache, json_output=json_output)
     except Exception as e:
         click.echo(f"Analysis error: {e}", err=True)
 
+@cli.command()
+@click.option('--ontology', 'ontology_file', type=click.Path(exists=True, dir_okay=False, readable=True), default=validate_model.ontology_path, help='Ontology TTL file to generate from.')
+@click.option('--shapes', 'shapes_file', type=click.Path(exists=True, dir_okay=False, readable=True), default=validate_model.shapes_file_path, help='SHACL shapes TTL file used to place and type properties the ontology leaves open.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help='Module to write. Defaults to generated_models.py in the package.')
+@click.option('--check', is_flag=True, help='Only check that the module is up to date; exit with status 1 if it is not.')
+def codegen(ontology_file: str, shapes_file: str, output: str | None, check: bool) -> None:
+    """Generate metric model classes from the ontology and shapes."""
+    from . import codegen as codegen_module
+    output = output or codegen_module.DEFAULT_OUTPUT
+    source = codegen_module.generate_models(ontology_file, shapes_file)
+    try:
+        with open(output, encoding='utf-8') as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if check:
+        if current != source:
+            click.echo(f"{output} is out of date; run 'corona-cli codegen'", err=True)
+            sys.exit(1)
+        click.echo(f"{output} is up to date")
+    elif current != source:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(source)
+        click.echo(f"Generated {output}")
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,329 @@
+"""Long-running corona daemon and its thin client.
+
+Every CLI invocation pays for interpreter start-up, importing rdflib and
+pyshacl, and parsing the shapes and ontology before doing a few milliseconds
+of real work. ``CoronaDaemon`` loads the shapes and ontology once and serves
+requests over a Unix domain socket using a JSON-lines protocol: each request is
+one JSON object on its own line and gets exactly one JSON object back.
+
+Requests carry an ``op`` and optional ``id`` (echoed in the response):
+
+* ``{"op": "validate", "ttl": "..."}`` validates a Turtle payload;
+* ``{"op": "convert", "metrics": [...], "format": "ttl"}`` serializes metric
+  JSON objects (each with a ``type`` naming its model class) to ttl,
+  ntriples, nquads, prometheus, haystack or json;
+* ``{"op": "analyze"}`` returns the ontology analysis report (``"json": true``
+  returns the ontology index instead);
+* ``{"op": "ping"}`` (which reports the RDF term pool hit rate) and
+  ``{"op": "shutdown"}``.
+
+Responses are ``{"id": ..., "ok": true, "result": {...}}`` or
+``{"id": ..., "ok": false, "error": "..."}``.
+
+Clients only talk to a socket owned by the current user and not accessible to
+anyone else, since whatever answers on it is trusted with validation verdicts.
+Without ``$XDG_RUNTIME_DIR`` the default socket lives in a private (0700)
+per-user directory under the temp directory.
+"""
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from pyshacl import validate
+from rdflib import Graph
+
+from . import rdf_writer
+from .chunked_validation import ValidationReportBuilder, _init_worker, _validate_chunk_nt
+from .graph_cache import load_graph
+from .models import DEFAULT_TERM_POOL, BaseMetric, get_metric_class
+from .ontology_index import OntologyIndex
+from .validate_model import ontology_path, print_ontology_index, shapes_file_path
+
+OUTPUT_FORMATS = ('ttl', 'ntriples', 'nquads', 'haystack', 'prometheus', 'json')
+
+# Seconds the CLI waits on a daemon before falling back to doing the work itself
+CLIENT_TIMEOUT = 30.0
+
+
+class DaemonError(Exception):
+    """Raised by the client when the daemon reports a failed request."""
+
+
+def default_socket_path() -> str:
+    """Returns ``$CORONA_SOCKET``, or a per-user socket in the runtime directory or a private temp directory."""
+    configured = os.environ.get("CORONA_SOCKET")
+    if configured:
+        return configured
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"corona-{uid}.sock")
+    return os.path.join(tempfile.gettempdir(), f"corona-{uid}", "daemon.sock")
+
+
+def is_private(path: str) -> bool:
+    """True if ``path`` is owned by the current user and grants no access to group or others."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    uid = os.getuid() if hasattr(os, "getuid") else st.st_uid
+    return st.st_uid == uid and not stat.S_IMODE(st.st_mode) & 0o077
+
+
+def render_metrics(metrics: List[BaseMetric], output_format: str) -> str:
+    """Serializes metrics to one of ``OUTPUT_FORMATS``, as printed by ``corona-cli generate``."""
+    if output_format == 'ttl':
+        buffer = io.StringIO()
+        rdf_writer.write_metrics_ttl(metrics, buffer)
+        return buffer.getvalue()
+    if output_format in ('ntriples', 'nquads'):
+        return "".join((metric.to_ntriples() if output_format == 'ntriples' else metric.to_nquads()) for metric in metrics)
+    if output_format == 'haystack':
+        return json.dumps([row for metric in metrics for row in metric.to_haystack_json()])
+    if output_format == 'prometheus':
+        return "\n".join(line for metric in metrics for line in metric.to_prometheus())
+    if output_format == 'json':
+        return json.dumps([metric.model_dump(mode='json') for metric in metrics], indent=2)
+    raise ValueError(f"Unknown output format '{output_format}'")
+
+
+def metric_to_request(metric: BaseMetric) -> Dict[str, Any]:
+    """Encodes a metric as a ``convert`` request item."""
+    data = metric.model_dump(mode='json')
+    data['type'] = type(metric).__name__
+    return data
+
+
+def metric_from_request(data: Dict[str, Any], default_type: Optional[str] = None) -> BaseMetric:
+    """Decodes a ``convert`` request item into its model class."""
+    fields = dict(data)
+    type_name = fields.pop('type', None) or default_type
+    if not type_name:
+        raise ValueError("Metric is missing its 'type'")
+    return get_metric_class(type_name).model_validate(fields)
+
+
+class CoronaDaemon:
+    """Keeps the shapes and ontology graphs warm and answers JSON-lines requests on a Unix socket.
+
+    Connections are handled on their own threads. Validation runs in a pool of
+    ``workers`` processes (each holding its own copy of the shapes graph) so
+    concurrent clients validate in parallel; with ``workers=1`` it runs in the
+    connection thread.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, workers: int = 1, use_cache: bool = True,
+                 shapes_path: str = shapes_file_path, ont_path: str = ontology_path) -> None:
+        self.socket_path = socket_path or default_socket_path()
+        self.workers = workers
+        self.shapes_graph = load_graph(shapes_path, format="turtle", use_cache=use_cache)
+        self.ontology_graph = load_graph(ont_path, format="turtle", use_cache=use_cache)
+        self.ontology_index = OntologyIndex(self.ontology_graph)
+        self._pool: Optional[Executor] = None
+        if workers > 1:
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(self.shapes_graph.serialize(format="nt"),))
+        # print_ontology_index prints, and stdout redirection is process-wide
+        self._stdout_lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answers one decoded request."""
+        response: Dict[str, Any] = {"id": request.get("id")}
+        try:
+            op = request.get("op")
+            handler = getattr(self, f"_op_{op}", None) if isinstance(op, str) else None
+            if handler is None:
+                raise ValueError(f"Unknown op '{op}'")
+            response["result"] = handler(request)
+            response["ok"] = True
+        except Exception as e:
+            response["ok"] = False
+            response["error"] = f"{type(e).__name__}: {e}"
+        return response
+
+    def _op_ping(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        stats = DEFAULT_TERM_POOL.stats()
+        return {"pid": os.getpid(), "workers": self.workers,
+                "term_pool": dict(stats._asdict(), hit_rate=round(stats.hit_rate, 4))}
+
+    def _op_validate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        data_graph = Graph().parse(data=request["ttl"], format="turtle")
+        inference = request.get("inference", "rdfs")
+        if self._pool is not None:
+            conforms, results_nt = self._pool.submit(_validate_chunk_nt, data_graph.serialize(format="nt"), inference).result()
+            builder = ValidationReportBuilder()
+            builder.add(conforms, Graph().parse(data=results_nt, format="nt"))
+            conforms, _, results_text = builder.build()
+        else:
+            conforms, _, results_text = validate(data_graph, shacl_graph=self.shapes_graph, inference=inference, debug=False)
+        return {"conforms": conforms, "results_text": results_text, "triples": len(data_graph)}
+
+    def _op_convert(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        metrics = [metric_from_request(item, request.get("metric_type")) for item in request.get("metrics", [])]
+        return {"output": render_metrics(metrics, request.get("format", "ttl"))}
+
+    def _op_analyze(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get("json"):
+            return {"index": self.ontology_index.to_dict()}
+        buffer = io.StringIO()
+        with self._stdout_lock, contextlib.redirect_stdout(buffer):
+            print_ontology_index(self.ontology_index)
+        return {"output": buffer.getvalue(), "triples": len(self.ontology_graph)}
+
+    def _op_shutdown(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # shutdown() blocks until serve_forever returns, so it cannot run on a handler thread
+        threading.Thread(target=self.stop, daemon=True).start()
+        return {}
+
+    def _bind(self) -> socketserver.ThreadingUnixStreamServer:
+        directory = os.path.dirname(self.socket_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700)
+        if os.path.exists(self.socket_path):
+            if _connectable(self.socket_path):
+                raise RuntimeError(f"A corona daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)  # stale socket left by a daemon that did not exit cleanly
+        handler = type("DaemonHandler", (_RequestHandler,), {"corona_daemon": self})
+        # Create the socket without group or other access rather than tightening it after the fact
+        old_umask = os.umask(0o177)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(self.socket_path, handler)
+        finally:
+            os.umask(old_umask)
+        server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)
+        self._server = server
+        return server
+
+    def start(self) -> None:
+        """Starts serving from a background thread."""
+        server = self._bind()
+        self._thread = threading.Thread(target=server.serve_forever, name="corona-daemon", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Serves in the calling thread until stopped."""
+        try:
+            self._bind().serve_forever()
+        finally:
+            self._close()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._close()
+
+    def _close(self) -> None:
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    corona_daemon: CoronaDaemon
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Request must be a JSON object")
+            except ValueError as e:
+                response: Dict[str, Any] = {"id": None, "ok": False, "error": f"Invalid request: {e}"}
+            else:
+                response = self.corona_daemon.handle(request)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def _connectable(socket_path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+class DaemonClient:
+    """Sends JSON-lines requests to a running daemon over one connection."""
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = None) -> None:
+        self.socket_path = socket_path or default_socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(self.socket_path)
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+
+    def request(self, op: str, **params: Any) -> Dict[str, Any]:
+        """Sends one request and returns its ``result``; raises ``DaemonError`` if it failed."""
+        self._next_id += 1
+        self._file.write(json.dumps({"id": self._next_id, "op": op, **params}).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise DaemonError("Daemon closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "Unknown error"))
+        return response.get("result", {})
+
+    def validate(self, ttl: str, inference: Optional[str] = "rdfs") -> Dict[str, Any]:
+        return self.request("validate", ttl=ttl, inference=inference)
+
+    def convert(self, metrics: Iterable[BaseMetric], output_format: str) -> str:
+        return self.request("convert", metrics=[metric_to_request(m) for m in metrics], format=output_format)["output"]
+
+    def analyze(self) -> str:
+        return self.request("analyze")["output"]
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def connect_if_running(socket_path: Optional[str] = None, timeout: Optional[float] = None) -> Optional[DaemonClient]:
+    """Returns a client if a daemon is listening on a private ``socket_path``, else None.
+
+    Requests time out after ``timeout`` seconds (``CLIENT_TIMEOUT`` by default)
+    with ``OSError``, so callers can fall back to local execution.
+    """
+    path = socket_path or default_socket_path()
+    if not os.path.exists(path):
+        return None
+    if not is_private(path):
+        print(f"Warning: Ignoring corona daemon socket {path}: it must be owned by the current user with mode 0600",
+              file=sys.stderr)
+        return None
+    try:
+        return DaemonClient(path, timeout=CLIENT_TIMEOUT if timeout is None else timeout)
+    except OSError:
+        return None
@@ -0,0 +1,217 @@
+"""Background batching file sink with size/interval rotation and gzip.
+
+``RotatingFileSink`` accepts serialized chunks (N-Triples, N-Quads,
+Prometheus or NDJSON text) from a producer and appends them to a file from a
+background thread, so a collector never waits on the disk unless it gets more
+than ``max_queue`` chunks ahead. Chunks are gathered in memory and written
+together once ``batch_bytes`` have accumulated or ``flush_interval`` seconds
+have passed.
+
+The active file is always ``path``. When it reaches ``max_bytes`` or is older
+than ``max_interval`` seconds it is renamed to ``path.N`` (N counting up from
+the highest segment already on disk) and, with ``compress=True``, gzipped to
+``path.N.gz``. Rotation happens between chunks, so every segment of a
+line-based format is valid on its own.
+
+``stats()`` reports the queue depth and flush latency, and
+``prometheus_lines()`` exposes the same figures in the Prometheus text format.
+"""
+import glob
+import gzip
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+class FileSinkStats(NamedTuple):
+    """Counters of a ``RotatingFileSink``; latencies are in seconds."""
+    queue_depth: int
+    chunks_written: int
+    bytes_written: int
+    flushes: int
+    rotations: int
+    last_flush_seconds: float
+    max_flush_seconds: float
+
+
+class RotatingFileSink:
+    """Appends text chunks to ``path`` from a background thread, rotating and optionally gzipping segments."""
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, max_interval: Optional[float] = None, compress: bool = False,
+                 batch_bytes: int = 1 << 20, flush_interval: float = 1.0, max_queue: int = 1024) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_interval = max_interval
+        self.compress = compress
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[object]" = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._chunks_written = 0
+        self._bytes_written = 0
+        self._flushes = 0
+        self._rotations = 0
+        self._last_flush = 0.0
+        self._max_flush = 0.0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._segment = self._last_segment()
+        # Chunks are encoded once, as they are batched, so batch_bytes and max_bytes both count UTF-8 bytes
+        self._file = open(path, "ab")
+        self._file_size = self._file.tell()
+        self._opened = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="corona-file-sink", daemon=True)
+        self._thread.start()
+
+    def _last_segment(self) -> int:
+        pattern = re.compile(re.escape(os.path.basename(self.path)) + r"\.(\d+)(?:\.gz)?$")
+        numbers = [int(m.group(1)) for m in map(pattern.match, map(os.path.basename, glob.glob(glob.escape(self.path) + ".*"))) if m]
+        return max(numbers, default=0)
+
+    def write(self, chunk: str, timeout: Optional[float] = None) -> None:
+        """Queues a chunk; blocks while ``max_queue`` chunks are already waiting (``queue.Full`` after ``timeout``)."""
+        self._check()
+        if self._closed:
+            raise ValueError("write to closed sink")
+        self._queue.put(chunk, timeout=timeout)
+
+    def flush(self) -> None:
+        """Blocks until everything queued so far is on disk."""
+        self._check()
+        if not self._closed:
+            done = threading.Event()
+            self._queue.put((_FLUSH, done))
+            done.wait()
+            self._check()
+
+    def close(self) -> None:
+        """Writes everything still queued, closes the active file and stops the thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        self._check()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise OSError(f"File sink for {self.path} failed: {self._error}") from self._error
+
+    def __enter__(self) -> "RotatingFileSink":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def stats(self) -> FileSinkStats:
+        with self._lock:
+            return FileSinkStats(self._queue.qsize(), self._chunks_written, self._bytes_written, self._flushes,
+                                 self._rotations, self._last_flush, self._max_flush)
+
+    def prometheus_lines(self, prefix: str = "corona_file_sink") -> List[str]:
+        """The sink's stats in the Prometheus text exposition format."""
+        stats = self.stats()
+        lines = []
+        for name, kind, help_text, value in (
+            ("queue_depth", "gauge", "Chunks waiting to be written.", stats.queue_depth),
+            ("chunks_written_total", "counter", "Chunks written to disk.", stats.chunks_written),
+            ("bytes_written_total", "counter", "Bytes written to disk.", stats.bytes_written),
+            ("flushes_total", "counter", "Batches flushed to disk.", stats.flushes),
+            ("rotations_total", "counter", "Files rotated.", stats.rotations),
+            ("last_flush_seconds", "gauge", "Duration of the most recent flush.", stats.last_flush_seconds),
+            ("max_flush_seconds", "gauge", "Longest flush so far.", stats.max_flush_seconds),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name} {value}")
+        return lines
+
+    # --- background thread ---------------------------------------------------
+
+    def _run(self) -> None:
+        pending: List[bytes] = []
+        pending_bytes = 0
+        deadline = None
+        while True:
+            wake = deadline
+            if self.max_interval is not None and self._file_size and self._error is None:
+                # Rotate idle files on time as well
+                rotate_at = self._opened + self.max_interval
+                wake = rotate_at if wake is None else min(wake, rotate_at)
+            timeout = None if wake is None else max(0.0, wake - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            try:
+                if isinstance(item, str):
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                    data = item.encode("utf-8")
+                    pending.append(data)
+                    pending_bytes += len(data)
+                    if pending_bytes < self.batch_bytes:
+                        continue
+                self._write_batch(pending)
+            except BaseException as e:
+                # Keep draining so producers never block on a dead sink; they see the error on their next call
+                self._error = self._error or e
+            pending, pending_bytes, deadline = [], 0, None
+            if isinstance(item, tuple):
+                item[1].set()
+            elif item is _CLOSE:
+                self._file.close()
+                return
+
+    def _write_batch(self, chunks: List[bytes]) -> None:
+        if self._error is not None or self._file.closed:
+            return
+        began = time.perf_counter()
+        if self._due_for_rotation(0):
+            self._rotate()
+        if not chunks:
+            return
+        written = 0
+        for chunk in chunks:
+            size = len(chunk)
+            if self._due_for_rotation(size):
+                self._rotate()
+            self._file.write(chunk)
+            self._file_size += size
+            written += size
+        self._file.flush()
+        elapsed = time.perf_counter() - began
+        with self._lock:
+            self._chunks_written += len(chunks)
+            self._bytes_written += written
+            self._flushes += 1
+            self._last_flush = elapsed
+            self._max_flush = max(self._max_flush, elapsed)
+
+    def _due_for_rotation(self, incoming: int) -> bool:
+        if not self._file_size:
+            return False
+        if self.max_bytes is not None and self._file_size + incoming > self.max_bytes:
+            return True
+        return self.max_interval is not None and time.monotonic() - self._opened >= self.max_interval
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._segment += 1
+        segment = f"{self.path}.{self._segment}"
+        os.replace(self.path, segment)
+        if self.compress:
+            with open(segment, "rb") as source, gzip.open(segment + ".gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.unlink(segment)
+        self._file = open(self.path, "ab")
+        self._file_size = 0
+        self._opened = time.monotonic()
+        with self._lock:
+            self._rotations += 1
@@ -0,0 +1,574 @@
+"""Metric models generated from corona-ontology.ttl and corona-shapes.ttl by ``corona-cli codegen``.
+
+Do not edit by hand: change the ontology or shapes and regenerate. See ``codegen``
+for how properties are assigned to classes and typed.
+"""
+from typing import Any, ClassVar, Dict, List, Optional
+
+from pydantic import Field
+
+from .models import BaseMetric, OntologyProperty, haystack_entity_ref, prometheus_label_string
+from .rdf_writer import TurtleFormatter, value_object
+
+PREFIXES: Dict[str, str] = {
+    'corona': 'http://example.com/corona#',
+    'bacnet': 'https://data.ashrae.org/bacnet#',
+    'xsd': 'http://www.w3.org/2001/XMLSchema#',
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'rdfs': 'http://www.w3.org/2000/01/rdf-schema#',
+    'corona1': 'http://example.org/standards/corona/metrics#',
+}
+_TURTLE = TurtleFormatter(PREFIXES)
+_TTL_HEADER = '@prefix corona: <http://example.com/corona#> .\n@prefix bacnet: <https://data.ashrae.org/bacnet#> .\n@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .\n@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n@prefix corona1: <http://example.org/standards/corona/metrics#> .\n\n'
+
+
+class ApplicationMetric(BaseMetric):
+    """A performance metric primarily associated with application-level interactions or protocol behavior."""
+    TYPE_URI: ClassVar[str] = 'http://example.org/standards/corona/metrics#ApplicationMetric'
+    ONTOLOGY_PROPERTIES: ClassVar[Dict[str, OntologyProperty]] = {
+        'confirmed_cov_notifications_received': OntologyProperty('http://example.org/standards/corona/metrics#confirmedCOVNotificationsReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'confirmed_cov_notifications_sent': OntologyProperty('http://example.org/standards/corona/metrics#confirmedCOVNotificationsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'directed_who_has_requests_sent': OntologyProperty('http://example.org/standards/corona/metrics#directedWhoHasRequestsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'directed_who_is_requests_sent': OntologyProperty('http://example.org/standards/corona/metrics#directedWhoIsRequestsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'global_broadcast_message_count': OntologyProperty('http://example.org/standards/corona/metrics#globalBroadcastMessageCount', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'global_who_has_requests_sent': OntologyProperty('http://example.org/standards/corona/metrics#globalWhoHasRequestsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'global_who_is_requests_sent': OntologyProperty('http://example.org/standards/corona/metrics#globalWhoIsRequestsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'i_am_responses_received': OntologyProperty('http://example.org/standards/corona/metrics#iAmResponsesReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'i_am_responses_sent': OntologyProperty('http://example.org/standards/corona/metrics#iAmResponsesSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'messages_forwarded': OntologyProperty('http://example.org/standards/corona/metrics#messagesForwarded', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'messages_routed': OntologyProperty('http://example.org/standards/corona/metrics#messagesRouted', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'read_property_requests': OntologyProperty('http://example.org/standards/corona/metrics#readPropertyRequests', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'read_property_requests_received': OntologyProperty('http://example.org/standards/corona/metrics#readPropertyRequestsReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'read_property_requests_sent': OntologyProperty('http://example.org/standards/corona/metrics#readPropertyRequestsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'read_property_responses': OntologyProperty('http://example.org/standards/corona/metrics#readPropertyResponses', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'read_property_responses_received': OntologyProperty('http://example.org/standards/corona/metrics#readPropertyResponsesReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'read_property_responses_sent': OntologyProperty('http://example.org/standards/corona/metrics#readPropertyResponsesSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'request_success_percentage': OntologyProperty('http://example.org/standards/corona/metrics#requestSuccessPercentage', 'http://www.w3.org/2001/XMLSchema#float', 'gauge'),
+        'routed_devices_seen': OntologyProperty('http://example.org/standards/corona/metrics#routedDevicesSeen', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'routed_messages_received': OntologyProperty('http://example.org/standards/corona/metrics#routedMessagesReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'routed_messages_sent': OntologyProperty('http://example.org/standards/corona/metrics#routedMessagesSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'routed_via': OntologyProperty('http://example.org/standards/corona/metrics#routedVia', None, 'gauge'),
+        'total_bacnet_messages_sent': OntologyProperty('http://example.org/standards/corona/metrics#totalBacnetMessagesSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'total_broadcasts_sent': OntologyProperty('http://example.org/standards/corona/metrics#totalBroadcastsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'total_properties': OntologyProperty('http://example.org/standards/corona/metrics#totalProperties', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'unconfirmed_cov_notifications_received': OntologyProperty('http://example.org/standards/corona/metrics#unconfirmedCOVNotificationsReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'unconfirmed_cov_notifications_sent': OntologyProperty('http://example.org/standards/corona/metrics#unconfirmedCOVNotificationsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'who_is_requests_received': OntologyProperty('http://example.org/standards/corona/metrics#whoIsRequestsReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'who_is_requests_sent': OntologyProperty('http://example.org/standards/corona/metrics#whoIsRequestsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+    }
+
+    confirmed_cov_notifications_received: Optional[int] = Field(None, alias='confirmedCOVNotificationsReceived', ge=0, description='Total number of confirmed COV notifications received.')
+    confirmed_cov_notifications_sent: Optional[int] = Field(None, alias='confirmedCOVNotificationsSent', ge=0, description='Total number of confirmed COV notifications sent.')
+    directed_who_has_requests_sent: Optional[int] = Field(None, alias='directedWhoHasRequestsSent', ge=0, description='Number of directed WhoHas requests sent.')
+    directed_who_is_requests_sent: Optional[int] = Field(None, alias='directedWhoIsRequestsSent', ge=0, description='Number of directed WhoIs requests sent.')
+    global_broadcast_message_count: Optional[int] = Field(None, alias='globalBroadcastMessageCount', ge=0, description='Total number of global broadcast messages sent or received.')
+    global_who_has_requests_sent: Optional[int] = Field(None, alias='globalWhoHasRequestsSent', ge=0, description='Number of global WhoHas requests sent.')
+    global_who_is_requests_sent: Optional[int] = Field(None, alias='globalWhoIsRequestsSent', ge=0, description='Number of global WhoIs requests sent.')
+    i_am_responses_received: Optional[int] = Field(None, alias='iAmResponsesReceived', ge=0, description='Total number of IAm responses received.')
+    i_am_responses_sent: Optional[int] = Field(None, alias='iAmResponsesSent', ge=0, description='Total number of IAm responses sent.')
+    messages_forwarded: Optional[int] = Field(None, alias='messagesForwarded', ge=0, description='Total number of messages forwarded by this device acting as a BBMD.')
+    messages_routed: Optional[int] = Field(None, alias='messagesRouted', ge=0, description='Total number of messages routed by this device acting as a router.')
+    read_property_requests: Optional[int] = Field(None, alias='readPropertyRequests', ge=0, description='Total number of ReadProperty requests sent.')
+    read_property_requests_received: Optional[int] = Field(None, alias='readPropertyRequestsReceived', ge=0, description='Total number of ReadProperty requests received.')
+    read_property_requests_sent: Optional[int] = Field(None, alias='readPropertyRequestsSent', ge=0, description='Total number of ReadProperty requests sent.')
+    read_property_responses: Optional[int] = Field(None, alias='readPropertyResponses', ge=0, description='Total number of ReadProperty responses received.')
+    read_property_responses_received: Optional[int] = Field(None, alias='readPropertyResponsesReceived', ge=0, description='Total number of ReadProperty responses received.')
+    read_property_responses_sent: Optional[int] = Field(None, alias='readPropertyResponsesSent', ge=0, description='Total number of ReadProperty responses sent.')
+    request_success_percentage: Optional[float] = Field(None, alias='requestSuccessPercentage', description='The percentage of successful request-response transactions over a defined measurement interval. Calculation details (e.g., timeout criteria) are implementation-defined.')
+    routed_devices_seen: Optional[int] = Field(None, alias='routedDevicesSeen', ge=0, description='Number of unique devices on other networks that have been seen through routing.')
+    routed_messages_received: Optional[int] = Field(None, alias='routedMessagesReceived', ge=0, description='Total number of messages received that were routed from other networks.')
+    routed_messages_sent: Optional[int] = Field(None, alias='routedMessagesSent', ge=0, description='Total number of messages routed and sent to other networks.')
+    routed_via: Optional[str] = Field(None, alias='routedVia', description='Identifies the router or gateway device through which this message was routed.')
+    total_bacnet_messages_sent: Optional[int] = Field(None, alias='totalBacnetMessagesSent', ge=0, description='Total number of BACnet messages sent by this device.')
+    total_broadcasts_sent: Optional[int] = Field(None, alias='totalBroadcastsSent', ge=0, description='Total number of broadcast messages (any type) sent by this device.')
+    total_properties: Optional[int] = Field(None, alias='totalProperties', ge=0, description='Total number of properties available in the BACnet object.')
+    unconfirmed_cov_notifications_received: Optional[int] = Field(None, alias='unconfirmedCOVNotificationsReceived', ge=0, description='Total number of unconfirmed COV notifications received.')
+    unconfirmed_cov_notifications_sent: Optional[int] = Field(None, alias='unconfirmedCOVNotificationsSent', ge=0, description='Total number of unconfirmed COV notifications sent.')
+    who_is_requests_received: Optional[int] = Field(None, alias='whoIsRequestsReceived', ge=0, description='Total number of WhoIs requests received.')
+    who_is_requests_sent: Optional[int] = Field(None, alias='whoIsRequestsSent', ge=0, description='Total number of WhoIs requests sent.')
+
+    def to_ttl(self) -> str:
+        """Serializes the metric to a standalone Turtle document."""
+        parts = [_TTL_HEADER, _TURTLE.format_head(self)]
+        if self.confirmed_cov_notifications_received is not None:
+            parts.append(f' ;\n    corona1:confirmedCOVNotificationsReceived "{self.confirmed_cov_notifications_received}"^^xsd:unsignedLong')
+        if self.confirmed_cov_notifications_sent is not None:
+            parts.append(f' ;\n    corona1:confirmedCOVNotificationsSent "{self.confirmed_cov_notifications_sent}"^^xsd:unsignedLong')
+        if self.directed_who_has_requests_sent is not None:
+            parts.append(f' ;\n    corona1:directedWhoHasRequestsSent "{self.directed_who_has_requests_sent}"^^xsd:unsignedLong')
+        if self.directed_who_is_requests_sent is not None:
+            parts.append(f' ;\n    corona1:directedWhoIsRequestsSent "{self.directed_who_is_requests_sent}"^^xsd:unsignedLong')
+        if self.global_broadcast_message_count is not None:
+            parts.append(f' ;\n    corona1:globalBroadcastMessageCount "{self.global_broadcast_message_count}"^^xsd:unsignedLong')
+        if self.global_who_has_requests_sent is not None:
+            parts.append(f' ;\n    corona1:globalWhoHasRequestsSent "{self.global_who_has_requests_sent}"^^xsd:unsignedLong')
+        if self.global_who_is_requests_sent is not None:
+            parts.append(f' ;\n    corona1:globalWhoIsRequestsSent "{self.global_who_is_requests_sent}"^^xsd:unsignedLong')
+        if self.i_am_responses_received is not None:
+            parts.append(f' ;\n    corona1:iAmResponsesReceived "{self.i_am_responses_received}"^^xsd:unsignedLong')
+        if self.i_am_responses_sent is not None:
+            parts.append(f' ;\n    corona1:iAmResponsesSent "{self.i_am_responses_sent}"^^xsd:unsignedLong')
+        if self.messages_forwarded is not None:
+            parts.append(f' ;\n    corona1:messagesForwarded "{self.messages_forwarded}"^^xsd:unsignedLong')
+        if self.messages_routed is not None:
+            parts.append(f' ;\n    corona1:messagesRouted "{self.messages_routed}"^^xsd:unsignedLong')
+        if self.read_property_requests is not None:
+            parts.append(f' ;\n    corona1:readPropertyRequests "{self.read_property_requests}"^^xsd:unsignedLong')
+        if self.read_property_requests_received is not None:
+            parts.append(f' ;\n    corona1:readPropertyRequestsReceived "{self.read_property_requests_received}"^^xsd:unsignedLong')
+        if self.read_property_requests_sent is not None:
+            parts.append(f' ;\n    corona1:readPropertyRequestsSent "{self.read_property_requests_sent}"^^xsd:unsignedLong')
+        if self.read_property_responses is not None:
+            parts.append(f' ;\n    corona1:readPropertyResponses "{self.read_property_responses}"^^xsd:unsignedLong')
+        if self.read_property_responses_received is not None:
+            parts.append(f' ;\n    corona1:readPropertyResponsesReceived "{self.read_property_responses_received}"^^xsd:unsignedLong')
+        if self.read_property_responses_sent is not None:
+            parts.append(f' ;\n    corona1:readPropertyResponsesSent "{self.read_property_responses_sent}"^^xsd:unsignedLong')
+        if self.request_success_percentage is not None:
+            parts.append(f' ;\n    corona1:requestSuccessPercentage "{self.request_success_percentage}"^^xsd:float')
+        if self.routed_devices_seen is not None:
+            parts.append(f' ;\n    corona1:routedDevicesSeen "{self.routed_devices_seen}"^^xsd:unsignedLong')
+        if self.routed_messages_received is not None:
+            parts.append(f' ;\n    corona1:routedMessagesReceived "{self.routed_messages_received}"^^xsd:unsignedLong')
+        if self.routed_messages_sent is not None:
+            parts.append(f' ;\n    corona1:routedMessagesSent "{self.routed_messages_sent}"^^xsd:unsignedLong')
+        if self.routed_via is not None:
+            parts.append(' ;\n    corona1:routedVia ' + _TURTLE.term(value_object(self.routed_via)))
+        if self.total_bacnet_messages_sent is not None:
+            parts.append(f' ;\n    corona1:totalBacnetMessagesSent "{self.total_bacnet_messages_sent}"^^xsd:unsignedLong')
+        if self.total_broadcasts_sent is not None:
+            parts.append(f' ;\n    corona1:totalBroadcastsSent "{self.total_broadcasts_sent}"^^xsd:unsignedLong')
+        if self.total_properties is not None:
+            parts.append(f' ;\n    corona1:totalProperties "{self.total_properties}"^^xsd:unsignedLong')
+        if self.unconfirmed_cov_notifications_received is not None:
+            parts.append(f' ;\n    corona1:unconfirmedCOVNotificationsReceived "{self.unconfirmed_cov_notifications_received}"^^xsd:unsignedLong')
+        if self.unconfirmed_cov_notifications_sent is not None:
+            parts.append(f' ;\n    corona1:unconfirmedCOVNotificationsSent "{self.unconfirmed_cov_notifications_sent}"^^xsd:unsignedLong')
+        if self.who_is_requests_received is not None:
+            parts.append(f' ;\n    corona1:whoIsRequestsReceived "{self.who_is_requests_received}"^^xsd:unsignedLong')
+        if self.who_is_requests_sent is not None:
+            parts.append(f' ;\n    corona1:whoIsRequestsSent "{self.who_is_requests_sent}"^^xsd:unsignedLong')
+        parts.append(' .\n')
+        return ''.join(parts)
+
+    def to_prometheus(self, prefix: str = "bacnet") -> List[str]:
+        """Serializes the metric to Prometheus exposition format."""
+        labels = prometheus_label_string(self.source_entity_uri, self.source_entity_address, self.observed_from, self.metric_identifier)
+        timestamp_ms = int(self.timestamp.timestamp() * 1000)
+        lines: List[str] = []
+        if self.confirmed_cov_notifications_received is not None:
+            name = prefix + '_confirmed_cov_notifications_received_total'
+            lines += ('# HELP ' + name + ' Total number of confirmed COV notifications received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.confirmed_cov_notifications_received)} {timestamp_ms}', '')
+        if self.confirmed_cov_notifications_sent is not None:
+            name = prefix + '_confirmed_cov_notifications_sent_total'
+            lines += ('# HELP ' + name + ' Total number of confirmed COV notifications sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.confirmed_cov_notifications_sent)} {timestamp_ms}', '')
+        if self.directed_who_has_requests_sent is not None:
+            name = prefix + '_directed_who_has_requests_sent_total'
+            lines += ('# HELP ' + name + ' Number of directed WhoHas requests sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.directed_who_has_requests_sent)} {timestamp_ms}', '')
+        if self.directed_who_is_requests_sent is not None:
+            name = prefix + '_directed_who_is_requests_sent_total'
+            lines += ('# HELP ' + name + ' Number of directed WhoIs requests sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.directed_who_is_requests_sent)} {timestamp_ms}', '')
+        if self.global_broadcast_message_count is not None:
+            name = prefix + '_global_broadcast_message_count_total'
+            lines += ('# HELP ' + name + ' Total number of global broadcast messages sent or received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.global_broadcast_message_count)} {timestamp_ms}', '')
+        if self.global_who_has_requests_sent is not None:
+            name = prefix + '_global_who_has_requests_sent_total'
+            lines += ('# HELP ' + name + ' Number of global WhoHas requests sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.global_who_has_requests_sent)} {timestamp_ms}', '')
+        if self.global_who_is_requests_sent is not None:
+            name = prefix + '_global_who_is_requests_sent_total'
+            lines += ('# HELP ' + name + ' Number of global WhoIs requests sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.global_who_is_requests_sent)} {timestamp_ms}', '')
+        if self.i_am_responses_received is not None:
+            name = prefix + '_i_am_responses_received_total'
+            lines += ('# HELP ' + name + ' Total number of IAm responses received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.i_am_responses_received)} {timestamp_ms}', '')
+        if self.i_am_responses_sent is not None:
+            name = prefix + '_i_am_responses_sent_total'
+            lines += ('# HELP ' + name + ' Total number of IAm responses sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.i_am_responses_sent)} {timestamp_ms}', '')
+        if self.messages_forwarded is not None:
+            name = prefix + '_messages_forwarded_total'
+            lines += ('# HELP ' + name + ' Total number of messages forwarded by this device acting as a BBMD.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.messages_forwarded)} {timestamp_ms}', '')
+        if self.messages_routed is not None:
+            name = prefix + '_messages_routed_total'
+            lines += ('# HELP ' + name + ' Total number of messages routed by this device acting as a router.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.messages_routed)} {timestamp_ms}', '')
+        if self.read_property_requests is not None:
+            name = prefix + '_read_property_requests_total'
+            lines += ('# HELP ' + name + ' Total number of ReadProperty requests sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.read_property_requests)} {timestamp_ms}', '')
+        if self.read_property_requests_received is not None:
+            name = prefix + '_read_property_requests_received_total'
+            lines += ('# HELP ' + name + ' Total number of ReadProperty requests received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.read_property_requests_received)} {timestamp_ms}', '')
+        if self.read_property_requests_sent is not None:
+            name = prefix + '_read_property_requests_sent_total'
+            lines += ('# HELP ' + name + ' Total number of ReadProperty requests sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.read_property_requests_sent)} {timestamp_ms}', '')
+        if self.read_property_responses is not None:
+            name = prefix + '_read_property_responses_total'
+            lines += ('# HELP ' + name + ' Total number of ReadProperty responses received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.read_property_responses)} {timestamp_ms}', '')
+        if self.read_property_responses_received is not None:
+            name = prefix + '_read_property_responses_received_total'
+            lines += ('# HELP ' + name + ' Total number of ReadProperty responses received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.read_property_responses_received)} {timestamp_ms}', '')
+        if self.read_property_responses_sent is not None:
+            name = prefix + '_read_property_responses_sent_total'
+            lines += ('# HELP ' + name + ' Total number of ReadProperty responses sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.read_property_responses_sent)} {timestamp_ms}', '')
+        if self.request_success_percentage is not None:
+            name = prefix + '_request_success_percentage'
+            lines += ('# HELP ' + name + ' The percentage of successful request-response transactions over a defined measurement interval. Calculation details (e.g., timeout criteria) are implementation-defined.', '# TYPE ' + name + ' gauge',
+                      f'{name}{labels} {float(self.request_success_percentage)} {timestamp_ms}', '')
+        if self.routed_devices_seen is not None:
+            name = prefix + '_routed_devices_seen_total'
+            lines += ('# HELP ' + name + ' Number of unique devices on other networks that have been seen through routing.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.routed_devices_seen)} {timestamp_ms}', '')
+        if self.routed_messages_received is not None:
+            name = prefix + '_routed_messages_received_total'
+            lines += ('# HELP ' + name + ' Total number of messages received that were routed from other networks.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.routed_messages_received)} {timestamp_ms}', '')
+        if self.routed_messages_sent is not None:
+            name = prefix + '_routed_messages_sent_total'
+            lines += ('# HELP ' + name + ' Total number of messages routed and sent to other networks.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.routed_messages_sent)} {timestamp_ms}', '')
+        if self.total_bacnet_messages_sent is not None:
+            name = prefix + '_total_bacnet_messages_sent_total'
+            lines += ('# HELP ' + name + ' Total number of BACnet messages sent by this device.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.total_bacnet_messages_sent)} {timestamp_ms}', '')
+        if self.total_broadcasts_sent is not None:
+            name = prefix + '_total_broadcasts_sent_total'
+            lines += ('# HELP ' + name + ' Total number of broadcast messages (any type) sent by this device.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.total_broadcasts_sent)} {timestamp_ms}', '')
+        if self.total_properties is not None:
+            name = prefix + '_total_properties_total'
+            lines += ('# HELP ' + name + ' Total number of properties available in the BACnet object.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.total_properties)} {timestamp_ms}', '')
+        if self.unconfirmed_cov_notifications_received is not None:
+            name = prefix + '_unconfirmed_cov_notifications_received_total'
+            lines += ('# HELP ' + name + ' Total number of unconfirmed COV notifications received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.unconfirmed_cov_notifications_received)} {timestamp_ms}', '')
+        if self.unconfirmed_cov_notifications_sent is not None:
+            name = prefix + '_unconfirmed_cov_notifications_sent_total'
+            lines += ('# HELP ' + name + ' Total number of unconfirmed COV notifications sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.unconfirmed_cov_notifications_sent)} {timestamp_ms}', '')
+        if self.who_is_requests_received is not None:
+            name = prefix + '_who_is_requests_received_total'
+            lines += ('# HELP ' + name + ' Total number of WhoIs requests received.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.who_is_requests_received)} {timestamp_ms}', '')
+        if self.who_is_requests_sent is not None:
+            name = prefix + '_who_is_requests_sent_total'
+            lines += ('# HELP ' + name + ' Total number of WhoIs requests sent.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.who_is_requests_sent)} {timestamp_ms}', '')
+        return lines
+
+    def to_haystack_json(self) -> List[Dict[str, Any]]:
+        """Serializes the metric to Project Haystack JSON rows, one per value."""
+        entity = haystack_entity_ref(self.source_entity_uri, self.source_entity_address)
+        ts = self.timestamp.isoformat()
+        observer, metric_id = self.observed_from, self.metric_identifier
+        rows: List[Dict[str, Any]] = []
+        if self.confirmed_cov_notifications_received is not None:
+            rows.append({'entity': entity, 'metric': 'confirmedCOVNotificationsReceived', 'val': self.confirmed_cov_notifications_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.confirmed_cov_notifications_sent is not None:
+            rows.append({'entity': entity, 'metric': 'confirmedCOVNotificationsSent', 'val': self.confirmed_cov_notifications_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.directed_who_has_requests_sent is not None:
+            rows.append({'entity': entity, 'metric': 'directedWhoHasRequestsSent', 'val': self.directed_who_has_requests_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.directed_who_is_requests_sent is not None:
+            rows.append({'entity': entity, 'metric': 'directedWhoIsRequestsSent', 'val': self.directed_who_is_requests_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.global_broadcast_message_count is not None:
+            rows.append({'entity': entity, 'metric': 'globalBroadcastMessageCount', 'val': self.global_broadcast_message_count, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.global_who_has_requests_sent is not None:
+            rows.append({'entity': entity, 'metric': 'globalWhoHasRequestsSent', 'val': self.global_who_has_requests_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.global_who_is_requests_sent is not None:
+            rows.append({'entity': entity, 'metric': 'globalWhoIsRequestsSent', 'val': self.global_who_is_requests_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.i_am_responses_received is not None:
+            rows.append({'entity': entity, 'metric': 'iAmResponsesReceived', 'val': self.i_am_responses_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.i_am_responses_sent is not None:
+            rows.append({'entity': entity, 'metric': 'iAmResponsesSent', 'val': self.i_am_responses_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.messages_forwarded is not None:
+            rows.append({'entity': entity, 'metric': 'messagesForwarded', 'val': self.messages_forwarded, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.messages_routed is not None:
+            rows.append({'entity': entity, 'metric': 'messagesRouted', 'val': self.messages_routed, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.read_property_requests is not None:
+            rows.append({'entity': entity, 'metric': 'readPropertyRequests', 'val': self.read_property_requests, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.read_property_requests_received is not None:
+            rows.append({'entity': entity, 'metric': 'readPropertyRequestsReceived', 'val': self.read_property_requests_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.read_property_requests_sent is not None:
+            rows.append({'entity': entity, 'metric': 'readPropertyRequestsSent', 'val': self.read_property_requests_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.read_property_responses is not None:
+            rows.append({'entity': entity, 'metric': 'readPropertyResponses', 'val': self.read_property_responses, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.read_property_responses_received is not None:
+            rows.append({'entity': entity, 'metric': 'readPropertyResponsesReceived', 'val': self.read_property_responses_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.read_property_responses_sent is not None:
+            rows.append({'entity': entity, 'metric': 'readPropertyResponsesSent', 'val': self.read_property_responses_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.request_success_percentage is not None:
+            rows.append({'entity': entity, 'metric': 'requestSuccessPercentage', 'val': self.request_success_percentage, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.routed_devices_seen is not None:
+            rows.append({'entity': entity, 'metric': 'routedDevicesSeen', 'val': self.routed_devices_seen, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.routed_messages_received is not None:
+            rows.append({'entity': entity, 'metric': 'routedMessagesReceived', 'val': self.routed_messages_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.routed_messages_sent is not None:
+            rows.append({'entity': entity, 'metric': 'routedMessagesSent', 'val': self.routed_messages_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.routed_via is not None:
+            rows.append({'entity': entity, 'metric': 'routedVia', 'val': self.routed_via, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.total_bacnet_messages_sent is not None:
+            rows.append({'entity': entity, 'metric': 'totalBacnetMessagesSent', 'val': self.total_bacnet_messages_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.total_broadcasts_sent is not None:
+            rows.append({'entity': entity, 'metric': 'totalBroadcastsSent', 'val': self.total_broadcasts_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.total_properties is not None:
+            rows.append({'entity': entity, 'metric': 'totalProperties', 'val': self.total_properties, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.unconfirmed_cov_notifications_received is not None:
+            rows.append({'entity': entity, 'metric': 'unconfirmedCOVNotificationsReceived', 'val': self.unconfirmed_cov_notifications_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.unconfirmed_cov_notifications_sent is not None:
+            rows.append({'entity': entity, 'metric': 'unconfirmedCOVNotificationsSent', 'val': self.unconfirmed_cov_notifications_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.who_is_requests_received is not None:
+            rows.append({'entity': entity, 'metric': 'whoIsRequestsReceived', 'val': self.who_is_requests_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.who_is_requests_sent is not None:
+            rows.append({'entity': entity, 'metric': 'whoIsRequestsSent', 'val': self.who_is_requests_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        return rows
+
+
+class LifetimeMetric(BaseMetric):
+    """A performance metric that accumulates over the lifetime of the system."""
+    TYPE_URI: ClassVar[str] = 'http://example.org/standards/corona/metrics#LifetimeMetric'
+    ONTOLOGY_PROPERTIES: ClassVar[Dict[str, OntologyProperty]] = {
+        'successful_responses': OntologyProperty('http://example.org/standards/corona/metrics#successfulResponses', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'total_requests': OntologyProperty('http://example.org/standards/corona/metrics#totalRequests', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+    }
+
+    successful_responses: Optional[int] = Field(None, alias='successfulResponses', ge=0, description='Total number of successful responses received within the measurement interval for calculating success percentage.')
+    total_requests: Optional[int] = Field(None, alias='totalRequests', ge=0, description='Total number of requests sent within the measurement interval for calculating success percentage.')
+
+    def to_ttl(self) -> str:
+        """Serializes the metric to a standalone Turtle document."""
+        parts = [_TTL_HEADER, _TURTLE.format_head(self)]
+        if self.successful_responses is not None:
+            parts.append(f' ;\n    corona1:successfulResponses "{self.successful_responses}"^^xsd:unsignedLong')
+        if self.total_requests is not None:
+            parts.append(f' ;\n    corona1:totalRequests "{self.total_requests}"^^xsd:unsignedLong')
+        parts.append(' .\n')
+        return ''.join(parts)
+
+    def to_prometheus(self, prefix: str = "bacnet") -> List[str]:
+        """Serializes the metric to Prometheus exposition format."""
+        labels = prometheus_label_string(self.source_entity_uri, self.source_entity_address, self.observed_from, self.metric_identifier)
+        timestamp_ms = int(self.timestamp.timestamp() * 1000)
+        lines: List[str] = []
+        if self.successful_responses is not None:
+            name = prefix + '_successful_responses_total'
+            lines += ('# HELP ' + name + ' Total number of successful responses received within the measurement interval for calculating success percentage.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.successful_responses)} {timestamp_ms}', '')
+        if self.total_requests is not None:
+            name = prefix + '_total_requests_total'
+            lines += ('# HELP ' + name + ' Total number of requests sent within the measurement interval for calculating success percentage.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.total_requests)} {timestamp_ms}', '')
+        return lines
+
+    def to_haystack_json(self) -> List[Dict[str, Any]]:
+        """Serializes the metric to Project Haystack JSON rows, one per value."""
+        entity = haystack_entity_ref(self.source_entity_uri, self.source_entity_address)
+        ts = self.timestamp.isoformat()
+        observer, metric_id = self.observed_from, self.metric_identifier
+        rows: List[Dict[str, Any]] = []
+        if self.successful_responses is not None:
+            rows.append({'entity': entity, 'metric': 'successfulResponses', 'val': self.successful_responses, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.total_requests is not None:
+            rows.append({'entity': entity, 'metric': 'totalRequests', 'val': self.total_requests, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        return rows
+
+
+class NetworkInterfaceMetric(BaseMetric):
+    """A performance metric primarily associated with a network interface's activity."""
+    TYPE_URI: ClassVar[str] = 'http://example.org/standards/corona/metrics#NetworkInterfaceMetric'
+    ONTOLOGY_PROPERTIES: ClassVar[Dict[str, OntologyProperty]] = {
+        'broadcast_packets_received': OntologyProperty('http://example.org/standards/corona/metrics#broadcastPacketsReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'broadcast_packets_sent': OntologyProperty('http://example.org/standards/corona/metrics#broadcastPacketsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'broadcast_relayed': OntologyProperty('http://example.org/standards/corona/metrics#broadcastRelayed', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'bytes_received': OntologyProperty('http://example.org/standards/corona/metrics#bytesReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'bytes_sent': OntologyProperty('http://example.org/standards/corona/metrics#bytesSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'error_packets_received': OntologyProperty('http://example.org/standards/corona/metrics#errorPacketsReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'link_speed': OntologyProperty('http://example.org/standards/corona/metrics#linkSpeed', 'http://www.w3.org/2001/XMLSchema#unsignedInt', 'gauge'),
+        'network_utilization': OntologyProperty('http://example.org/standards/corona/metrics#networkUtilization', 'http://www.w3.org/2001/XMLSchema#float', 'gauge'),
+        'packets_dropped_received': OntologyProperty('http://example.org/standards/corona/metrics#packetsDroppedReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'packets_received': OntologyProperty('http://example.org/standards/corona/metrics#packetsReceived', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+        'packets_sent': OntologyProperty('http://example.org/standards/corona/metrics#packetsSent', 'http://www.w3.org/2001/XMLSchema#unsignedLong', 'counter'),
+    }
+
+    broadcast_packets_received: Optional[int] = Field(None, alias='broadcastPacketsReceived', ge=0, description='Total number of broadcast packets received on an interface.')
+    broadcast_packets_sent: Optional[int] = Field(None, alias='broadcastPacketsSent', ge=0, description='Total number of broadcast packets sent from an interface.')
+    broadcast_relayed: Optional[int] = Field(None, alias='broadcastRelayed', ge=0, description='Total number of broadcast packets relayed by this device (acting as a router or gateway).')
+    bytes_received: Optional[int] = Field(None, alias='bytesReceived', ge=0, description='Total number of octets (bytes) received on an interface since the last counter reset or initialization. Wraparound behavior is implementation-defined.')
+    bytes_sent: Optional[int] = Field(None, alias='bytesSent', ge=0, description='Total number of octets (bytes) sent from an interface since the last counter reset or initialization. Wraparound behavior is implementation-defined.')
+    error_packets_received: Optional[int] = Field(None, alias='errorPacketsReceived', ge=0, description='Total number of inbound packets received with errors (e.g., CRC errors, framing errors).')
+    link_speed: Optional[int] = Field(None, alias='linkSpeed', ge=0, description='The configured or negotiated speed of the network link. Units should be specified separately (e.g., Mbps).')
+    network_utilization: Optional[float] = Field(None, alias='networkUtilization', description='The percentage of available bandwidth currently being used on the network interface, typically calculated over a recent interval.')
+    packets_dropped_received: Optional[int] = Field(None, alias='packetsDroppedReceived', ge=0, description='Total number of inbound packets discarded, e.g., due to buffer overflows or lack of resources.')
+    packets_received: Optional[int] = Field(None, alias='packetsReceived', ge=0, description='Total number of network packets (frames) received on an interface, including errored packets.')
+    packets_sent: Optional[int] = Field(None, alias='packetsSent', ge=0, description='Total number of network packets (frames) transmitted from an interface.')
+
+    def to_ttl(self) -> str:
+        """Serializes the metric to a standalone Turtle document."""
+        parts = [_TTL_HEADER, _TURTLE.format_head(self)]
+        if self.broadcast_packets_received is not None:
+            parts.append(f' ;\n    corona1:broadcastPacketsReceived "{self.broadcast_packets_received}"^^xsd:unsignedLong')
+        if self.broadcast_packets_sent is not None:
+            parts.append(f' ;\n    corona1:broadcastPacketsSent "{self.broadcast_packets_sent}"^^xsd:unsignedLong')
+        if self.broadcast_relayed is not None:
+            parts.append(f' ;\n    corona1:broadcastRelayed "{self.broadcast_relayed}"^^xsd:unsignedLong')
+        if self.bytes_received is not None:
+            parts.append(f' ;\n    corona1:bytesReceived "{self.bytes_received}"^^xsd:unsignedLong')
+        if self.bytes_sent is not None:
+            parts.append(f' ;\n    corona1:bytesSent "{self.bytes_sent}"^^xsd:unsignedLong')
+        if self.error_packets_received is not None:
+            parts.append(f' ;\n    corona1:errorPacketsReceived "{self.error_packets_received}"^^xsd:unsignedLong')
+        if self.link_speed is not None:
+            parts.append(f' ;\n    corona1:linkSpeed "{self.link_speed}"^^xsd:unsignedInt')
+        if self.network_utilization is not None:
+            parts.append(f' ;\n    corona1:networkUtilization "{self.network_utilization}"^^xsd:float')
+        if self.packets_dropped_received is not None:
+            parts.append(f' ;\n    corona1:packetsDroppedReceived "{self.packets_dropped_received}"^^xsd:unsignedLong')
+        if self.packets_received is not None:
+            parts.append(f' ;\n    corona1:packetsReceived "{self.packets_received}"^^xsd:unsignedLong')
+        if self.packets_sent is not None:
+            parts.append(f' ;\n    corona1:packetsSent "{self.packets_sent}"^^xsd:unsignedLong')
+        parts.append(' .\n')
+        return ''.join(parts)
+
+    def to_prometheus(self, prefix: str = "bacnet") -> List[str]:
+        """Serializes the metric to Prometheus exposition format."""
+        labels = prometheus_label_string(self.source_entity_uri, self.source_entity_address, self.observed_from, self.metric_identifier)
+        timestamp_ms = int(self.timestamp.timestamp() * 1000)
+        lines: List[str] = []
+        if self.broadcast_packets_received is not None:
+            name = prefix + '_broadcast_packets_received_total'
+            lines += ('# HELP ' + name + ' Total number of broadcast packets received on an interface.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.broadcast_packets_received)} {timestamp_ms}', '')
+        if self.broadcast_packets_sent is not None:
+            name = prefix + '_broadcast_packets_sent_total'
+            lines += ('# HELP ' + name + ' Total number of broadcast packets sent from an interface.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.broadcast_packets_sent)} {timestamp_ms}', '')
+        if self.broadcast_relayed is not None:
+            name = prefix + '_broadcast_relayed_total'
+            lines += ('# HELP ' + name + ' Total number of broadcast packets relayed by this device (acting as a router or gateway).', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.broadcast_relayed)} {timestamp_ms}', '')
+        if self.bytes_received is not None:
+            name = prefix + '_bytes_received_total'
+            lines += ('# HELP ' + name + ' Total number of octets (bytes) received on an interface since the last counter reset or initialization. Wraparound behavior is implementation-defined.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.bytes_received)} {timestamp_ms}', '')
+        if self.bytes_sent is not None:
+            name = prefix + '_bytes_sent_total'
+            lines += ('# HELP ' + name + ' Total number of octets (bytes) sent from an interface since the last counter reset or initialization. Wraparound behavior is implementation-defined.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.bytes_sent)} {timestamp_ms}', '')
+        if self.error_packets_received is not None:
+            name = prefix + '_error_packets_received_total'
+            lines += ('# HELP ' + name + ' Total number of inbound packets received with errors (e.g., CRC errors, framing errors).', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.error_packets_received)} {timestamp_ms}', '')
+        if self.link_speed is not None:
+            name = prefix + '_link_speed'
+            lines += ('# HELP ' + name + ' The configured or negotiated speed of the network link. Units should be specified separately (e.g., Mbps).', '# TYPE ' + name + ' gauge',
+                      f'{name}{labels} {float(self.link_speed)} {timestamp_ms}', '')
+        if self.network_utilization is not None:
+            name = prefix + '_network_utilization'
+            lines += ('# HELP ' + name + ' The percentage of available bandwidth currently being used on the network interface, typically calculated over a recent interval.', '# TYPE ' + name + ' gauge',
+                      f'{name}{labels} {float(self.network_utilization)} {timestamp_ms}', '')
+        if self.packets_dropped_received is not None:
+            name = prefix + '_packets_dropped_received_total'
+            lines += ('# HELP ' + name + ' Total number of inbound packets discarded, e.g., due to buffer overflows or lack of resources.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.packets_dropped_received)} {timestamp_ms}', '')
+        if self.packets_received is not None:
+            name = prefix + '_packets_received_total'
+            lines += ('# HELP ' + name + ' Total number of network packets (frames) received on an interface, including errored packets.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.packets_received)} {timestamp_ms}', '')
+        if self.packets_sent is not None:
+            name = prefix + '_packets_sent_total'
+            lines += ('# HELP ' + name + ' Total number of network packets (frames) transmitted from an interface.', '# TYPE ' + name + ' counter',
+                      f'{name}{labels} {float(self.packets_sent)} {timestamp_ms}', '')
+        return lines
+
+    def to_haystack_json(self) -> List[Dict[str, Any]]:
+        """Serializes the metric to Project Haystack JSON rows, one per value."""
+        entity = haystack_entity_ref(self.source_entity_uri, self.source_entity_address)
+        ts = self.timestamp.isoformat()
+        observer, metric_id = self.observed_from, self.metric_identifier
+        rows: List[Dict[str, Any]] = []
+        if self.broadcast_packets_received is not None:
+            rows.append({'entity': entity, 'metric': 'broadcastPacketsReceived', 'val': self.broadcast_packets_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.broadcast_packets_sent is not None:
+            rows.append({'entity': entity, 'metric': 'broadcastPacketsSent', 'val': self.broadcast_packets_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.broadcast_relayed is not None:
+            rows.append({'entity': entity, 'metric': 'broadcastRelayed', 'val': self.broadcast_relayed, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.bytes_received is not None:
+            rows.append({'entity': entity, 'metric': 'bytesReceived', 'val': self.bytes_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.bytes_sent is not None:
+            rows.append({'entity': entity, 'metric': 'bytesSent', 'val': self.bytes_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.error_packets_received is not None:
+            rows.append({'entity': entity, 'metric': 'errorPacketsReceived', 'val': self.error_packets_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.link_speed is not None:
+            rows.append({'entity': entity, 'metric': 'linkSpeed', 'val': self.link_speed, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.network_utilization is not None:
+            rows.append({'entity': entity, 'metric': 'networkUtilization', 'val': self.network_utilization, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.packets_dropped_received is not None:
+            rows.append({'entity': entity, 'metric': 'packetsDroppedReceived', 'val': self.packets_dropped_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.packets_received is not None:
+            rows.append({'entity': entity, 'metric': 'packetsReceived', 'val': self.packets_received, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.packets_sent is not None:
+            rows.append({'entity': entity, 'metric': 'packetsSent', 'val': self.packets_sent, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        return rows
+
+
+class SampledMetric(BaseMetric):
+    """A performance metric observed over a specific time interval."""
+    TYPE_URI: ClassVar[str] = 'http://example.org/standards/corona/metrics#SampledMetric'
+    ONTOLOGY_PROPERTIES: ClassVar[Dict[str, OntologyProperty]] = {
+        'read_command_latency': OntologyProperty('http://example.org/standards/corona/metrics#readCommandLatency', 'http://www.w3.org/2001/XMLSchema#float', 'gauge'),
+        'write_command_latency': OntologyProperty('http://example.org/standards/corona/metrics#writeCommandLatency', 'http://www.w3.org/2001/XMLSchema#float', 'gauge'),
+    }
+
+    read_command_latency: Optional[float] = Field(None, alias='readCommandLatency', description='Average time duration between sending a read request and receiving the corresponding response. Units should be specified separately, typically milliseconds.')
+    write_command_latency: Optional[float] = Field(None, alias='writeCommandLatency', description='Average time duration between sending a write request and receiving the corresponding response or acknowledgment. Units should be specified separately, typically milliseconds.')
+
+    def to_ttl(self) -> str:
+        """Serializes the metric to a standalone Turtle document."""
+        parts = [_TTL_HEADER, _TURTLE.format_head(self)]
+        if self.read_command_latency is not None:
+            parts.append(f' ;\n    corona1:readCommandLatency "{self.read_command_latency}"^^xsd:float')
+        if self.write_command_latency is not None:
+            parts.append(f' ;\n    corona1:writeCommandLatency "{self.write_command_latency}"^^xsd:float')
+        parts.append(' .\n')
+        return ''.join(parts)
+
+    def to_prometheus(self, prefix: str = "bacnet") -> List[str]:
+        """Serializes the metric to Prometheus exposition format."""
+        labels = prometheus_label_string(self.source_entity_uri, self.source_entity_address, self.observed_from, self.metric_identifier)
+        timestamp_ms = int(self.timestamp.timestamp() * 1000)
+        lines: List[str] = []
+        if self.read_command_latency is not None:
+            name = prefix + '_read_command_latency'
+            lines += ('# HELP ' + name + ' Average time duration between sending a read request and receiving the corresponding response. Units should be specified separately, typically milliseconds.', '# TYPE ' + name + ' gauge',
+                      f'{name}{labels} {float(self.read_command_latency)} {timestamp_ms}', '')
+        if self.write_command_latency is not None:
+            name = prefix + '_write_command_latency'
+            lines += ('# HELP ' + name + ' Average time duration between sending a write request and receiving the corresponding response or acknowledgment. Units should be specified separately, typically milliseconds.', '# TYPE ' + name + ' gauge',
+                      f'{name}{labels} {float(self.write_command_latency)} {timestamp_ms}', '')
+        return lines
+
+    def to_haystack_json(self) -> List[Dict[str, Any]]:
+        """Serializes the metric to Project Haystack JSON rows, one per value."""
+        entity = haystack_entity_ref(self.source_entity_uri, self.source_entity_address)
+        ts = self.timestamp.isoformat()
+        observer, metric_id = self.observed_from, self.metric_identifier
+        rows: List[Dict[str, Any]] = []
+        if self.read_command_latency is not None:
+            rows.append({'entity': entity, 'metric': 'readCommandLatency', 'val': self.read_command_latency, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        if self.write_command_latency is not None:
+            rows.append({'entity': entity, 'metric': 'writeCommandLatency', 'val': self.write_command_latency, 'ts': ts, 'observer': observer, 'metricId': metric_id})
+        return rows
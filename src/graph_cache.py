@@ -0,0 +1,168 @@
+"""On-disk cache of parsed ontology and shapes graphs.
+
+Parsing Turtle dominates the start-up time of short CLI runs such as
+``corona-cli validate``. Graphs loaded through ``load_graph`` are stored in a
+user cache directory in a compact binary form (a marshalled term table plus
+integer triples), keyed by the SHA-256 of the source file's content, so a
+changed TTL file is re-parsed automatically and stale entries are simply never
+read again. ``load_rdfs_closure`` caches the RDFS closure of a graph the same
+way.
+
+The cache lives in ``$CORONA_CACHE_DIR`` if set, otherwise in
+``$XDG_CACHE_HOME/corona-framework`` (``~/.cache/corona-framework``).
+"""
+import contextlib
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import rdflib
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.term import Node
+
+# Bump when the on-disk layout changes
+CACHE_FORMAT_VERSION = 1
+
+_TermRecord = Tuple[str, str, Optional[str], Optional[str]]
+
+
+def cache_dir() -> str:
+    """Returns the directory cache entries are written to."""
+    configured = os.environ.get("CORONA_CACHE_DIR")
+    if configured:
+        return configured
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "corona-framework")
+
+
+def content_hash(path: str) -> str:
+    """Returns the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_path(kind: str, digest: str, format: str) -> str:
+    key = f"{kind}-{format}-{digest[:32]}-v{CACHE_FORMAT_VERSION}-rdflib{rdflib.__version__}"
+    return os.path.join(cache_dir(), key + ".bin")
+
+
+def _term_record(term: Node) -> _TermRecord:
+    if isinstance(term, Literal):
+        return ("l", str(term), str(term.datatype) if term.datatype else None, term.language)
+    if isinstance(term, BNode):
+        return ("b", str(term), None, None)
+    return ("u", str(term), None, None)
+
+
+def _term_from_record(record: _TermRecord) -> Node:
+    kind, value, datatype, language = record
+    if kind == "u":
+        return URIRef(value)
+    if kind == "b":
+        return BNode(value)
+    if language:
+        return Literal(value, lang=language)
+    return Literal(value, datatype=URIRef(datatype) if datatype else None)
+
+
+def encode_graph(graph: Graph) -> bytes:
+    """Encodes a graph as a term table plus integer triples."""
+    index: Dict[Node, int] = {}
+    terms: List[_TermRecord] = []
+    triples: List[int] = []
+    for triple in graph:
+        for term in triple:
+            position = index.get(term)
+            if position is None:
+                position = index[term] = len(terms)
+                terms.append(_term_record(term))
+            triples.append(position)
+    namespaces = [(prefix, str(namespace)) for prefix, namespace in graph.namespaces()]
+    return marshal.dumps((CACHE_FORMAT_VERSION, namespaces, terms, triples))
+
+
+def decode_graph(data: bytes) -> Graph:
+    """Rebuilds a graph encoded by ``encode_graph``."""
+    version, namespaces, terms, triples = marshal.loads(data)
+    if version != CACHE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache format version {version}")
+    graph = Graph()
+    for prefix, namespace in namespaces:
+        graph.bind(prefix, namespace, override=True, replace=True)
+    nodes = [_term_from_record(record) for record in terms]
+    graph.addN((nodes[triples[i]], nodes[triples[i + 1]], nodes[triples[i + 2]], graph) for i in range(0, len(triples), 3))
+    return graph
+
+
+def _read_entry(path: str) -> Optional[Graph]:
+    try:
+        with open(path, "rb") as f:
+            return decode_graph(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        # A truncated or foreign file is treated as a miss and overwritten
+        print(f"Warning: Ignoring unreadable cache entry {path}: {e}", file=sys.stderr)
+        return None
+
+
+def write_atomically(path: str, data: bytes) -> None:
+    """Replaces ``path`` with ``data`` so concurrent CLI runs never see a partial file; errors are only warned about."""
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+        print(f"Warning: Could not write cache entry {path}: {e}", file=sys.stderr)
+
+
+def _write_entry(path: str, graph: Graph) -> None:
+    write_atomically(path, encode_graph(graph))
+
+
+def load_graph(path: str, format: str = "turtle", use_cache: bool = True) -> Graph:
+    """Parses ``path``, or loads it from the cache when its content has been parsed before."""
+    if not use_cache:
+        return Graph().parse(path, format=format)
+    entry = _entry_path("graph", content_hash(path), format)
+    graph = _read_entry(entry)
+    if graph is None:
+        graph = Graph().parse(path, format=format)
+        _write_entry(entry, graph)
+    return graph
+
+
+def rdfs_closure(graph: Graph) -> Graph:
+    """Returns a copy of ``graph`` expanded with its RDFS entailments."""
+    from owlrl import DeductiveClosure, RDFS_Semantics
+
+    closure = Graph()
+    for prefix, namespace in graph.namespaces():
+        closure.bind(prefix, namespace, override=True, replace=True)
+    closure += graph
+    DeductiveClosure(RDFS_Semantics, axiomatic_triples=False, datatype_axioms=False).expand(closure)
+    return closure
+
+
+def load_rdfs_closure(path: str, format: str = "turtle", use_cache: bool = True) -> Graph:
+    """Returns the RDFS closure of the graph in ``path``, cached by the file's content hash."""
+    if not use_cache:
+        return rdfs_closure(Graph().parse(path, format=format))
+    entry = _entry_path("rdfs", content_hash(path), format)
+    closure = _read_entry(entry)
+    if closure is None:
+        closure = rdfs_closure(load_graph(path, format=format))
+        _write_entry(entry, closure)
+    return closure
@@ -0,0 +1,179 @@
+"""Haystack grid serializers: JSON v4 grids and Zinc.
+
+``BaseMetric.to_haystack_json`` emits one dict per metric value, repeating the
+entity, timestamp, observer and metric id in each. The grid writers here emit
+one row per metric instance instead, with a column per metric key, under a
+column header shared by every row. The header is derived from the metric
+classes up front, so grids can be streamed over any number of instances.
+
+Entity refs use the id from ``haystack_entity_ref`` with characters Haystack
+does not allow in ref ids replaced by ``_``; the original id is kept as the
+ref's display string. Timestamps are written in UTC; naive timestamps are
+taken to be local time, as ``datetime.timestamp`` does, so a metric gets the
+same instant here as in ``to_prometheus`` and ``PrometheusRegistry``.
+"""
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+from .models import BaseMetric, get_serialization_plan, haystack_entity_ref, metric_classes
+
+HAYSTACK_VERSION = "3.0"
+
+# Columns every grid starts with, before the metric keys
+METADATA_COLUMNS = ("entity", "ts", "observer", "metricId")
+
+_ZINC_ESCAPES = str.maketrans({
+    "\\": "\\\\", '"': '\\"', "$": "\\$", "\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f",
+})
+
+
+def haystack_columns(classes: Iterable[type]) -> List[str]:
+    """Returns the grid columns for metrics of ``classes``: the metadata columns then every metric key, in first-seen order."""
+    columns = list(METADATA_COLUMNS)
+    seen = set(columns)
+    for metric_cls in classes:
+        for field in get_serialization_plan(metric_cls).fields:
+            if field.key not in seen:
+                seen.add(field.key)
+                columns.append(field.key)
+    return columns
+
+
+def ref_id(ref: str) -> str:
+    """Turns a ``haystack_entity_ref`` string into a valid Haystack ref id (without the ``@``)."""
+    return "".join(c if c.isascii() and (c.isalnum() or c in "_:-.~") else "_" for c in ref.lstrip("@"))
+
+
+def utc_datetime(timestamp: datetime) -> str:
+    """Formats a timestamp (naive ones in local time) as a Haystack UTC dateTime without the timezone name."""
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+class _GridWriter(ABC):
+    """Shared row layout for the grid writers; subclasses format cells."""
+
+    def __init__(self, stream: TextIO, classes: Optional[Sequence[type]] = None) -> None:
+        self.stream = stream
+        self.classes = list(metric_classes() if classes is None else classes)
+        self.columns = haystack_columns(self.classes)
+        self.metrics_written = 0
+        self._layouts: Dict[type, Tuple[Tuple[str, str, int], ...]] = {}
+        self._refs: Dict[str, Tuple[str, str]] = {}
+
+    def _layout(self, metric_cls: type) -> Tuple[Tuple[str, str, int], ...]:
+        """(field name, column, column index) for each of a class's metric values."""
+        layout = self._layouts.get(metric_cls)
+        if layout is None:
+            index = {column: i for i, column in enumerate(self.columns)}
+            fields = get_serialization_plan(metric_cls).fields
+            missing = [field.key for field in fields if field.key not in index]
+            if missing:
+                raise ValueError(f"{metric_cls.__name__} has keys {missing} that are not grid columns")
+            layout = self._layouts[metric_cls] = tuple((field.name, field.key, index[field.key]) for field in fields)
+        return layout
+
+    def _entity(self, metric: BaseMetric) -> Tuple[str, str]:
+        """The entity's (ref id, display string), cached since many readings share an entity."""
+        ref = haystack_entity_ref(metric.source_entity_uri, metric.source_entity_address)
+        entity = self._refs.get(ref)
+        if entity is None:
+            entity = (ref_id(ref), ref[1:])
+            if len(self._refs) < 65536:
+                self._refs[ref] = entity
+        return entity
+
+    def row(self, metric: BaseMetric) -> Dict[str, Any]:
+        """The non-null cells of a metric's row, keyed by column, as plain Python values."""
+        cells: Dict[str, Any] = {"entity": self._entity(metric), "ts": utc_datetime(metric.timestamp)}
+        if metric.observed_from is not None:
+            cells["observer"] = metric.observed_from
+        if metric.metric_identifier is not None:
+            cells["metricId"] = metric.metric_identifier
+        for name, column, _ in self._layout(type(metric)):
+            value = getattr(metric, name)
+            if value is not None:
+                cells[column] = value
+        return cells
+
+    def write_all(self, metrics: Iterable[BaseMetric]) -> int:
+        """Writes the header, every metric and the footer; returns the number of metrics written."""
+        self.write_header()
+        for metric in metrics:
+            self.write_metric(metric)
+        self.write_footer()
+        return self.metrics_written
+
+    @abstractmethod
+    def write_header(self) -> None:
+        """Writes everything before the first row."""
+
+    @abstractmethod
+    def write_metric(self, metric: BaseMetric) -> None:
+        """Writes one metric's row."""
+
+    @abstractmethod
+    def write_footer(self) -> None:
+        """Writes everything after the last row."""
+
+
+class HaystackGridWriter(_GridWriter):
+    """Streams metrics as a Haystack JSON (v4 encoding) grid, one row per metric."""
+
+    def write_header(self) -> None:
+        header = {"_kind": "grid", "meta": {"ver": HAYSTACK_VERSION}, "cols": [{"name": c} for c in self.columns]}
+        self.stream.write(json.dumps(header, separators=(",", ":"))[:-1] + ',"rows":[')
+
+    def write_metric(self, metric: BaseMetric) -> None:
+        cells = self.row(metric)
+        ref, dis = cells["entity"]
+        cells["entity"] = {"_kind": "ref", "val": ref, "dis": dis}
+        cells["ts"] = {"_kind": "dateTime", "val": cells["ts"], "tz": "UTC"}
+        separator = "," if self.metrics_written else ""
+        self.stream.write(separator + json.dumps(cells, separators=(",", ":")))
+        self.metrics_written += 1
+
+    def write_footer(self) -> None:
+        self.stream.write("]}\n")
+
+
+def zinc_scalar(value: Any) -> str:
+    """Formats a str, bool or number cell in Zinc."""
+    if isinstance(value, str):
+        return f'"{value.translate(_ZINC_ESCAPES)}"'
+    if isinstance(value, bool):
+        return "T" if value else "F"
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "INF" if value > 0 else "-INF"
+        return repr(value)
+    return str(value)
+
+
+class ZincGridWriter(_GridWriter):
+    """Streams metrics as a Zinc grid, one row per metric."""
+
+    def write_header(self) -> None:
+        self.stream.write(f'ver:"{HAYSTACK_VERSION}"\n' + ",".join(self.columns) + "\n")
+
+    def write_metric(self, metric: BaseMetric) -> None:
+        ref, dis = self._entity(metric)
+        row = [""] * len(self.columns)
+        row[0] = f'@{ref} "{dis.translate(_ZINC_ESCAPES)}"'
+        row[1] = f"{utc_datetime(metric.timestamp)} UTC"
+        if metric.observed_from is not None:
+            row[2] = zinc_scalar(metric.observed_from)
+        if metric.metric_identifier is not None:
+            row[3] = zinc_scalar(metric.metric_identifier)
+        for name, _, index in self._layout(type(metric)):
+            value = getattr(metric, name)
+            if value is not None:
+                row[index] = str(value) if type(value) is int else zinc_scalar(value)
+        self.stream.write(",".join(row) + "\n")
+        self.metrics_written += 1
+
+    def write_footer(self) -> None:
+        """A Zinc grid ends with its last row."""
@@ -0,0 +1,296 @@
+"""In-memory ring-buffer time series with 1m/5m/1h downsampling tiers.
+
+``MetricStore`` keeps recent history in process so dashboards can ask for
+the last hour of a device without re-reading exported files. Every numeric
+value field of every series (metric class, ``metric_identifier``, source
+entity, observer) gets its own ``_Series``:
+
+* a raw ring of the last ``raw_capacity`` samples, as ``array('q')``
+  timestamps (epoch microseconds) and ``array('d')`` values;
+* one ring of buckets per ``Tier`` (by default 1m, 5m and 1h), each bucket
+  holding min, max, last, sum and sample count, rolled up as samples arrive.
+
+All arrays are allocated at full capacity when a series is created and
+overwrite their oldest slot when full, and at most ``max_series`` series are
+kept (the least recently written is dropped first). Memory is therefore
+``max_series * bytes_per_series`` however long the process runs.
+
+Samples are expected in time order per series; a sample older than the
+series' latest is counted in ``late`` and dropped. Values are stored as
+doubles, so counters above 2**53 lose precision. Naive timestamps are taken as
+is and aware ones are converted to UTC; queries return naive datetimes.
+"""
+import threading
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
+
+from .batch import epoch_microseconds
+from .models import BaseMetric, get_serialization_plan
+
+_EPOCH = datetime(1970, 1, 1)
+
+SeriesKey = Tuple[str, Optional[str], Optional[str], Optional[str], str]
+
+
+class Tier(NamedTuple):
+    """A downsampling tier: buckets of ``seconds``, keeping the latest ``capacity`` of them."""
+    name: str
+    seconds: int
+    capacity: int
+
+
+# One hour of 1m buckets, one day of 5m buckets and one week of 1h buckets
+DEFAULT_TIERS: Tuple[Tier, ...] = (Tier("1m", 60, 60), Tier("5m", 300, 288), Tier("1h", 3600, 168))
+
+
+class SeriesInfo(NamedTuple):
+    """Identity of one stored series."""
+    metric_type: str
+    metric_identifier: Optional[str]
+    entity: Optional[str]
+    observer: Optional[str]
+    field: str
+
+
+class Sample(NamedTuple):
+    timestamp: datetime
+    value: float
+
+
+class Rollup(NamedTuple):
+    """Aggregate of the samples in one tier bucket starting at ``start``."""
+    start: datetime
+    min: float
+    max: float
+    last: float
+    sum: float
+    samples: int
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.samples
+
+
+class SeriesData(NamedTuple):
+    """A query result: the series and its samples (raw) or rollups (tiers), oldest first."""
+    series: SeriesInfo
+    points: Sequence[Union[Sample, Rollup]]
+
+
+class MetricStoreStats(NamedTuple):
+    series: int
+    samples: int
+    late: int
+    evicted_series: int
+    memory_bytes: int
+
+    def summary(self) -> str:
+        return (f"Stored {self.samples} samples in {self.series} series ({self.memory_bytes / 1e6:.1f} MB), "
+                f"{self.late} late, {self.evicted_series} series evicted")
+
+
+def _series_order(info: SeriesInfo) -> Tuple[str, ...]:
+    """Sort key for series identities, some parts of which may be None."""
+    return tuple(part or "" for part in info)
+
+
+def _datetime(microseconds: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=microseconds)
+
+
+def _zeros(typecode: str, capacity: int) -> array:
+    return array(typecode, bytes(array(typecode).itemsize * capacity))
+
+
+class _Ring:
+    """Fixed-capacity circular index shared by the parallel arrays of one buffer."""
+
+    __slots__ = ("capacity", "head", "size")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.head = 0  # slot the next entry is written to
+        self.size = 0
+
+    def advance(self) -> int:
+        slot = self.head
+        self.head = (slot + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        return slot
+
+    def newest(self) -> int:
+        return (self.head - 1) % self.capacity
+
+    def slots(self) -> Iterable[int]:
+        """Occupied slots, oldest first."""
+        start = (self.head - self.size) % self.capacity
+        return ((start + i) % self.capacity for i in range(self.size))
+
+
+class _TierBuffer:
+    __slots__ = ("width", "ring", "start", "min", "max", "last", "sum", "count")
+
+    def __init__(self, tier: Tier) -> None:
+        self.width = tier.seconds * 1_000_000
+        self.ring = _Ring(tier.capacity)
+        self.start = _zeros('q', tier.capacity)
+        self.min = _zeros('d', tier.capacity)
+        self.max = _zeros('d', tier.capacity)
+        self.last = _zeros('d', tier.capacity)
+        self.sum = _zeros('d', tier.capacity)
+        self.count = _zeros('q', tier.capacity)
+
+    def add(self, timestamp_us: int, value: float) -> None:
+        bucket = timestamp_us - timestamp_us % self.width
+        ring = self.ring
+        if ring.size and self.start[ring.newest()] == bucket:
+            slot = ring.newest()
+            if value < self.min[slot]:
+                self.min[slot] = value
+            if value > self.max[slot]:
+                self.max[slot] = value
+            self.last[slot] = value
+            self.sum[slot] += value
+            self.count[slot] += 1
+            return
+        slot = ring.advance()
+        self.start[slot] = bucket
+        self.min[slot] = self.max[slot] = self.last[slot] = self.sum[slot] = value
+        self.count[slot] = 1
+
+    def rollups(self, start_us: int, end_us: int) -> List[Rollup]:
+        return [Rollup(_datetime(self.start[s]), self.min[s], self.max[s], self.last[s], self.sum[s], self.count[s])
+                for s in self.ring.slots() if start_us <= self.start[s] <= end_us]
+
+
+class _Series:
+    __slots__ = ("info", "ring", "timestamps", "values", "tiers")
+
+    def __init__(self, info: SeriesInfo, raw_capacity: int, tiers: Tuple[Tier, ...]) -> None:
+        self.info = info
+        self.ring = _Ring(raw_capacity)
+        self.timestamps = _zeros('q', raw_capacity)
+        self.values = _zeros('d', raw_capacity)
+        self.tiers = {tier.name: _TierBuffer(tier) for tier in tiers}
+
+    def add(self, timestamp_us: int, value: float) -> bool:
+        ring = self.ring
+        if ring.size and timestamp_us < self.timestamps[ring.newest()]:
+            return False
+        slot = ring.advance()
+        self.timestamps[slot] = timestamp_us
+        self.values[slot] = value
+        for tier in self.tiers.values():
+            tier.add(timestamp_us, value)
+        return True
+
+    def samples(self, start_us: int, end_us: int) -> List[Sample]:
+        return [Sample(_datetime(self.timestamps[s]), self.values[s]) for s in self.ring.slots()
+                if start_us <= self.timestamps[s] <= end_us]
+
+
+class MetricStore:
+    """Bounded in-process history of every numeric metric field, queryable by time range and series attributes."""
+
+    def __init__(self, raw_capacity: int = 720, tiers: Iterable[Tier] = DEFAULT_TIERS, max_series: int = 100_000) -> None:
+        self.raw_capacity = raw_capacity
+        self.tiers = tuple(tiers)
+        self.max_series = max_series
+        self._series: "OrderedDict[SeriesKey, _Series]" = OrderedDict()
+        self._fields: Dict[Type[BaseMetric], Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        self.samples = 0
+        self.late = 0
+        self.evicted_series = 0
+
+    @property
+    def bytes_per_series(self) -> int:
+        """Array storage allocated for each series (8-byte timestamps and values, 48 bytes per tier bucket)."""
+        return 16 * self.raw_capacity + sum(48 * tier.capacity for tier in self.tiers)
+
+    def _numeric_fields(self, metric_cls: Type[BaseMetric]) -> Tuple[str, ...]:
+        names = self._fields.get(metric_cls)
+        if names is None:
+            fields = get_serialization_plan(metric_cls).fields
+            names = self._fields[metric_cls] = tuple(
+                f.name for f in fields if metric_cls.model_fields[f.name].annotation in (Optional[int], Optional[float], int, float))
+        return names
+
+    def add(self, metric: BaseMetric) -> int:
+        """Records every numeric value of a snapshot; returns the number of samples stored."""
+        metric_cls = type(metric)
+        timestamp_us = epoch_microseconds(metric.timestamp)
+        entity = metric.source_entity_uri or metric.source_entity_address
+        data = metric.__dict__
+        stored = 0
+        with self._lock:
+            for name in self._numeric_fields(metric_cls):
+                value = data[name]
+                if value is None:
+                    continue
+                key = (metric_cls.__name__, metric.metric_identifier, entity, metric.observed_from, name)
+                series = self._series.get(key)
+                if series is None:
+                    if len(self._series) >= self.max_series:
+                        self._series.popitem(last=False)
+                        self.evicted_series += 1
+                    series = self._series[key] = _Series(SeriesInfo(*key), self.raw_capacity, self.tiers)
+                else:
+                    self._series.move_to_end(key)
+                if series.add(timestamp_us, float(value)):
+                    stored += 1
+                else:
+                    self.late += 1
+            self.samples += stored
+        return stored
+
+    def add_all(self, metrics: Iterable[BaseMetric]) -> int:
+        return sum(self.add(metric) for metric in metrics)
+
+    def _matching(self, metric_type: Optional[str], metric_identifier: Optional[str], entity: Optional[str],
+                  observer: Optional[str], field: Optional[str]) -> List[_Series]:
+        return [s for s in self._series.values()
+                if (metric_type is None or s.info.metric_type == metric_type)
+                and (metric_identifier is None or s.info.metric_identifier == metric_identifier)
+                and (entity is None or s.info.entity == entity)
+                and (observer is None or s.info.observer == observer)
+                and (field is None or s.info.field == field)]
+
+    def series(self, metric_type: Optional[str] = None, metric_identifier: Optional[str] = None, entity: Optional[str] = None,
+               observer: Optional[str] = None, field: Optional[str] = None) -> List[SeriesInfo]:
+        """Lists the stored series matching every given filter."""
+        with self._lock:
+            return sorted((s.info for s in self._matching(metric_type, metric_identifier, entity, observer, field)), key=_series_order)
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None, tier: str = "raw",
+              metric_type: Optional[str] = None, metric_identifier: Optional[str] = None, entity: Optional[str] = None,
+              observer: Optional[str] = None, field: Optional[str] = None) -> List[SeriesData]:
+        """Returns the samples (``tier="raw"``) or rollups (e.g. ``tier="5m"``) between ``start`` and ``end`` inclusive.
+
+        Rollups are selected by bucket start. Series with nothing in range are left out.
+        """
+        if tier != "raw" and tier not in {t.name for t in self.tiers}:
+            raise ValueError(f"Unknown tier '{tier}'; use 'raw' or one of {[t.name for t in self.tiers]}")
+        start_us = epoch_microseconds(start) if start is not None else -(1 << 63)
+        end_us = epoch_microseconds(end) if end is not None else (1 << 63) - 1
+        results: List[SeriesData] = []
+        with self._lock:
+            for series in self._matching(metric_type, metric_identifier, entity, observer, field):
+                points: Sequence[Union[Sample, Rollup]]
+                points = series.samples(start_us, end_us) if tier == "raw" else series.tiers[tier].rollups(start_us, end_us)
+                if points:
+                    results.append(SeriesData(series.info, points))
+        results.sort(key=lambda data: _series_order(data.series))
+        return results
+
+    def stats(self) -> MetricStoreStats:
+        with self._lock:
+            count = len(self._series)
+            return MetricStoreStats(count, self.samples, self.late, self.evicted_series, count * self.bytes_per_series)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
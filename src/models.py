@@ -1,5 +1,7 @@
 import re
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, Callable, ClassVar, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Sequence, Tuple, Type, Union
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 import json
@@ -13,8 +15,18 @@ def to_camel_case(snake_str: str) -> str:
     components = snake_str.split('_')
     return components[0] + ''.join(x.title() for x in components[1:])
 
-def format_rdflib_literal(value: Any) -> Literal | URIRef:
-    """Formats a Python value as an RDFLib Literal with appropriate datatype."""
+@lru_cache(maxsize=65536)
+def looks_like_uri(value: str) -> bool:
+    """Returns True if a string value should be serialized as an IRI rather than a string literal (memoized)."""
+    return value.startswith("http://") or value.startswith("https://") or ":" in value.split("://")[0]
+
+def metric_property_uri(field_name: str, prop_name_camel: str) -> URIRef:
+    """Resolves the predicate URI for a metric value field, choosing the BACnet or Corona namespace."""
+    namespace = BACNET if "bacnet" in field_name.lower() or any(term in prop_name_camel.lower() for term in ["who", "cov", "bbmd", "readproperty", "iam", "ihave", "routed", "forwarded"]) else CORONA
+    return namespace[prop_name_camel]
+
+def make_rdflib_term(value: Any) -> Literal | URIRef:
+    """Creates a new RDFLib term for a Python value; see ``format_rdflib_literal`` for the shared, interned version."""
     if isinstance(value, bool):
         return Literal(value, datatype=XSD.boolean)
     elif isinstance(value, int):
@@ -24,7 +36,7 @@ def format_rdflib_literal(value: Any) -> Literal | URIRef:
     elif isinstance(value, datetime):
         return Literal(value.isoformat(timespec='seconds'), datatype=XSD.dateTime)
     elif isinstance(value, str):
-        if value.startswith("http://") or value.startswith("https://") or ":" in value.split("://")[0]:
+        if looks_like_uri(value):
             try:
                 return URIRef(value)
             except Exception:
@@ -34,6 +46,104 @@ def format_rdflib_literal(value: Any) -> Literal | URIRef:
     else:
         return Literal(str(value), datatype=XSD.string)
 
+class TermPoolStats(NamedTuple):
+    """Counters reported by ``TermPool.stats``."""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+def _value_key(value: Any) -> Any:
+    """Pool key for a value: equal datetimes and floats can still have different lexical forms."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+class TermPool:
+    """Bounded LRU cache handing out shared RDFLib terms.
+
+    Graphs of many metrics repeat the same observer and entity IRIs, labels,
+    datatypes and small counter values; interning them stores one term object
+    per distinct value instead of one per triple. Terms are immutable, so
+    sharing them is safe. Keys include the Python type so that ``1``, ``1.0``
+    and ``True`` stay distinct terms, and datetimes and floats are keyed by
+    their text so equal values with different lexical forms (``14:00+02:00``
+    and ``12:00Z``, ``0.0`` and ``-0.0``) do not share a term.
+    """
+
+    def __init__(self, maxsize: int = 65536) -> None:
+        self.maxsize = maxsize
+        self._terms: "OrderedDict[Tuple[Any, ...], Literal | URIRef]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # No lock: each OrderedDict operation is atomic under the GIL, a racing eviction
+    # at worst costs a miss, and the counters are statistics rather than invariants.
+    def _get(self, key: Tuple[Any, ...], factory: Callable[[], Any]) -> Any:
+        terms = self._terms
+        term = terms.get(key)
+        if term is not None:
+            self.hits += 1
+            try:
+                terms.move_to_end(key)
+            except KeyError:
+                pass
+            return term
+        self.misses += 1
+        term = terms[key] = factory()
+        if len(terms) > self.maxsize:
+            try:
+                terms.popitem(last=False)
+                self.evictions += 1
+            except KeyError:
+                pass
+        return term
+
+    def term(self, value: Any) -> Literal | URIRef:
+        """The shared term ``format_rdflib_literal`` makes for ``value``, including its IRI-vs-literal decision for strings."""
+        return self._get((type(value), _value_key(value)), lambda: make_rdflib_term(value))
+
+    def uri(self, value: str) -> URIRef:
+        return self._get((URIRef, value), lambda: URIRef(value))
+
+    def literal(self, value: Any, datatype: Optional[URIRef] = None) -> Literal:
+        return self._get((Literal, type(value), _value_key(value), datatype), lambda: Literal(value, datatype=datatype))
+
+    def stats(self) -> TermPoolStats:
+        return TermPoolStats(self.hits, self.misses, self.evictions, len(self._terms), self.maxsize)
+
+    def clear(self) -> None:
+        """Drops every cached term and resets the counters."""
+        self._terms.clear()
+        self.hits = self.misses = self.evictions = 0
+
+# Predicates of the metadata triples, created once so every graph shares the same term objects
+P_TYPE = URIRef(str(RDF.type))
+P_OBSERVED_FROM = CORONA.observedFrom
+P_OBSERVED_AT = CORONA.observedAt
+P_METRIC_IDENTIFIER = CORONA['metric-identifier']
+P_METRIC_SOURCE = CORONA.metricSource
+P_SOURCE_ADDRESS = CORONA.sourceAddress
+P_COMMENT = URIRef(str(RDFS.comment))
+P_LABEL = URIRef(str(RDFS.label))
+XSD_STRING = URIRef(str(XSD.string))
+
+# Shared by every graph-building path (``format_rdflib_literal``, ``add_metric_to_graph``, ``BaseMetric.to_ttl``)
+DEFAULT_TERM_POOL = TermPool()
+
+def format_rdflib_literal(value: Any) -> Literal | URIRef:
+    """Formats a Python value as an RDFLib Literal with appropriate datatype, interned in ``DEFAULT_TERM_POOL``."""
+    return DEFAULT_TERM_POOL.term(value)
+
 def to_prometheus_metric_name(metric_name: str, prefix: str = "bacnet") -> str:
     """Converts a camelCase or snake_case metric name to Prometheus snake_case format."""
     s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', metric_name)
@@ -45,6 +155,167 @@ def to_prometheus_metric_name(metric_name: str, prefix: str = "bacnet") -> str:
          suffix = "" # Or determine gauge/other types if needed
     return f"{prefix}_{snake_case_name}{suffix}"
 
+def prometheus_label_string(source_entity_uri: Optional[str], source_entity_address: Optional[str], observed_from: Optional[str], metric_identifier: Optional[str]) -> str:
+    """Builds the ``{k="v",...}`` Prometheus label set identifying a metric series."""
+    labels = {}
+    if source_entity_uri:
+        safe_uri = re.sub(r'[^a-zA-Z0-9_]', '_', source_entity_uri)
+        labels["entity_uri"] = safe_uri
+    if source_entity_address:
+        labels["address"] = source_entity_address
+    if observed_from:
+        safe_observer = re.sub(r'[^a-zA-Z0-9_]', '_', observed_from)
+        labels["observer"] = safe_observer
+    if metric_identifier:
+         labels["metric_id"] = metric_identifier
+
+    label_str = ",".join([f'{k}="{v}"' for k, v in labels.items() if v])
+    return f"{{{label_str}}}" if label_str else ""
+
+def haystack_entity_ref(source_entity_uri: Optional[str], source_entity_address: Optional[str]) -> str:
+    """Returns the Haystack ref for the entity a metric is about."""
+    return f"@{source_entity_uri}" if source_entity_uri else f"@addr_{source_entity_address}" if source_entity_address else "@unknown"
+
+# Fields shared by every metric that describe the reading rather than carry a metric value
+METADATA_FIELDS = frozenset({'metric_instance_uri', 'observed_from', 'description', 'metric_identifier', 'metric_name', 'timestamp', 'source_entity_uri', 'source_entity_address'})
+
+class OntologyProperty(NamedTuple):
+    """How a generated model field maps to its ontology property (see ``codegen``)."""
+    predicate: str
+    datatype: Optional[str]
+    prometheus_type: str
+
+class FieldPlan(NamedTuple):
+    """Precomputed serialization metadata for a single metric value field.
+
+    ``datatype`` and ``prometheus_type`` are fixed for classes generated from
+    the ontology; otherwise they are None and follow the value's Python type
+    and the field name, except that fields listed in a class's
+    ``GAUGE_FIELDS`` are always gauges.
+    """
+    name: str
+    key: str
+    predicate: URIRef
+    description: Optional[str]
+    datatype: Optional[URIRef] = None
+    prometheus_type: Optional[str] = None
+
+class PrometheusFamily(NamedTuple):
+    """Precomputed Prometheus family name, type and sanitized help text for a metric value field."""
+    name: str
+    type: str
+    help: Optional[str]
+
+class SerializationPlan:
+    """Per-class serialization plan: everything about a metric's fields that does not depend on the instance."""
+
+    def __init__(self, metric_cls: Type["BaseMetric"]) -> None:
+        # Generated classes carry their ontology IRIs; hand-written ones fall back to name heuristics
+        ontology: Mapping[str, OntologyProperty] = getattr(metric_cls, 'ONTOLOGY_PROPERTIES', {})
+        gauges: FrozenSet[str] = getattr(metric_cls, 'GAUGE_FIELDS', frozenset())
+        fields = []
+        for field_name, pydantic_field in metric_cls.model_fields.items():
+            if field_name in METADATA_FIELDS:
+                continue
+            key = pydantic_field.alias if pydantic_field.alias else to_camel_case(field_name)
+            prop = ontology.get(field_name)
+            if prop is None:
+                fields.append(FieldPlan(field_name, key, metric_property_uri(field_name, key), pydantic_field.description,
+                                        prometheus_type="gauge" if field_name in gauges else None))
+            else:
+                datatype = URIRef(prop.datatype) if prop.datatype else None
+                fields.append(FieldPlan(field_name, key, URIRef(prop.predicate), pydantic_field.description, datatype, prop.prometheus_type))
+        self.metric_cls = metric_cls
+        self.fields: Tuple[FieldPlan, ...] = tuple(fields)
+        type_uri = getattr(metric_cls, 'TYPE_URI', None)
+        self.type_uri: URIRef = URIRef(type_uri) if type_uri else CORONA[metric_cls.__name__]
+        self._prometheus: Dict[str, Tuple[PrometheusFamily, ...]] = {}
+
+    def prometheus_families(self, prefix: str = "bacnet") -> Tuple[PrometheusFamily, ...]:
+        """Returns the Prometheus families for each field (aligned with ``fields``), computed once per prefix."""
+        families = self._prometheus.get(prefix)
+        if families is None:
+            families_list = []
+            for field in self.fields:
+                if field.prometheus_type is None:
+                    name = to_prometheus_metric_name(field.key, prefix)
+                    metric_type = "counter" if name.endswith("_total") else "gauge"
+                else:
+                    metric_type = field.prometheus_type
+                    name = f"{prefix}_{field.name}_total" if metric_type == "counter" else f"{prefix}_{field.name}"
+                help_text = field.description.replace('\n', ' ').replace('\"', '\\"') if field.description else None
+                families_list.append(PrometheusFamily(name, metric_type, help_text))
+            families = self._prometheus[prefix] = tuple(families_list)
+        return families
+
+_PLAN_CACHE: Dict[type, SerializationPlan] = {}
+
+def get_serialization_plan(metric_cls: Type["BaseMetric"]) -> SerializationPlan:
+    """Returns the cached serialization plan for a metric class, compiling it on first use."""
+    plan = _PLAN_CACHE.get(metric_cls)
+    if plan is None:
+        plan = _PLAN_CACHE[metric_cls] = SerializationPlan(metric_cls)
+    return plan
+
+class ConstructionPlan:
+    """Per-class data for building instances from trusted values without pydantic validation."""
+
+    def __init__(self, metric_cls: Type["BaseMetric"]) -> None:
+        self.metric_cls = metric_cls
+        self.field_names: Tuple[str, ...] = tuple(metric_cls.model_fields)
+        # Field names and aliases both resolve to the field name
+        self.keys: Dict[str, str] = {}
+        self.required: Tuple[str, ...] = tuple(name for name, f in metric_cls.model_fields.items() if f.is_required())
+        # Factories and whether each takes the other field values, like pydantic's ``default_factory(data)``
+        self.default_factories: Dict[str, Tuple[Callable[..., Any], bool]] = {}
+        # Every field in declaration order, so constructed instances keep the same attribute order as validated ones
+        self.template: Dict[str, Any] = {}
+        for name, pydantic_field in metric_cls.model_fields.items():
+            self.keys[name] = name
+            if pydantic_field.alias:
+                self.keys[pydantic_field.alias] = name
+            if pydantic_field.default_factory is not None:
+                self.default_factories[name] = (pydantic_field.default_factory, bool(pydantic_field.default_factory_takes_validated_data))
+            self.template[name] = None if pydantic_field.is_required() else pydantic_field.default
+
+    def resolve_columns(self, columns: Sequence[str]) -> Tuple[str, ...]:
+        """Maps column names (field names or aliases) to field names."""
+        try:
+            return tuple(self.keys[column] for column in columns)
+        except KeyError as e:
+            raise ValueError(f"Unknown field {e} for {self.metric_cls.__name__}") from None
+
+    def normalize(self, row: Mapping[str, Any]) -> Dict[str, Any]:
+        """Re-keys a mapping by field name, dropping unknown keys like pydantic's default ``extra='ignore'``."""
+        keys = self.keys
+        return {keys[k]: v for k, v in row.items() if k in keys}
+
+    def construct(self, values: Dict[str, Any]) -> "BaseMetric":
+        """Builds an instance from field-name keyed values, like ``model_construct`` but with less per-call work."""
+        for name in self.required:
+            if name not in values:
+                raise ValueError(f"Missing required field '{name}' for {self.metric_cls.__name__}")
+        data = self.template.copy()
+        data.update(values)
+        for name, (factory, takes_data) in self.default_factories.items():
+            if name not in values:
+                data[name] = factory(data) if takes_data else factory()
+        instance = self.metric_cls.__new__(self.metric_cls)
+        object.__setattr__(instance, '__dict__', data)
+        object.__setattr__(instance, '__pydantic_fields_set__', set(values))
+        object.__setattr__(instance, '__pydantic_extra__', None)
+        object.__setattr__(instance, '__pydantic_private__', None)
+        return instance
+
+_CONSTRUCTION_CACHE: Dict[type, ConstructionPlan] = {}
+
+def get_construction_plan(metric_cls: Type["BaseMetric"]) -> ConstructionPlan:
+    """Returns the cached construction plan for a metric class."""
+    plan = _CONSTRUCTION_CACHE.get(metric_cls)
+    if plan is None:
+        plan = _CONSTRUCTION_CACHE[metric_cls] = ConstructionPlan(metric_cls)
+    return plan
+
 class BaseMetric(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
     """Base model for all performance metrics."""
@@ -58,10 +329,47 @@ class BaseMetric(BaseModel):
     source_entity_uri: Optional[str] = Field(None, description="The URI of the entity (device, interface, application) the metric is about.")
     source_entity_address: Optional[str] = Field(None, description="Network address or other identifier for the source entity.")
 
+    @classmethod
+    def serialization_plan(cls) -> SerializationPlan:
+        """Returns the precompiled serialization plan shared by all instances of this class."""
+        return get_serialization_plan(cls)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Union[Mapping[str, Any], Sequence[Any]]],
+        trusted: bool = False,
+        columns: Optional[Sequence[str]] = None,
+        validation_sample_rate: float = 0.0,
+    ) -> List["BaseMetric"]:
+        """Builds many instances from dicts (keyed by field name or alias) or tuples (in ``columns`` order).
+
+        Tuple rows default to the class's field declaration order. With ``trusted=True``
+        rows skip pydantic validation, so values must already have the right types;
+        ``validation_sample_rate`` (e.g. 0.01) still fully validates every n-th row as a spot check.
+        """
+        plan = get_construction_plan(cls)
+        names = plan.resolve_columns(columns) if columns is not None else plan.field_names
+        stride = max(1, round(1 / validation_sample_rate)) if trusted and validation_sample_rate > 0 else 0
+        instances = []
+        for index, row in enumerate(rows):
+            values = plan.normalize(row) if isinstance(row, Mapping) else dict(zip(names, row))
+            if not trusted or (stride and index % stride == 0):
+                instances.append(cls.model_validate(values))
+            else:
+                instances.append(plan.construct(values))
+        return instances
+
+    def _iter_metric_values(self) -> Iterator[Tuple[FieldPlan, Any]]:
+        """Yields (field plan, value) for every metric value field that is set."""
+        for field in get_serialization_plan(type(self)).fields:
+            value = getattr(self, field.name)
+            if value is not None:
+                yield field, value
+
     def _get_metric_fields(self) -> Dict[str, Any]:
         """Helper to get fields that represent actual metric values, excluding metadata."""
-        exclude_fields = {'metric_instance_uri', 'observed_from', 'description', 'metric_identifier', 'metric_name', 'timestamp', 'source_entity_uri', 'source_entity_address'}
-        return {k: v for k, v in self.model_dump(exclude_none=True).items() if k not in exclude_fields}
+        return {field.name: value for field, value in self._iter_metric_values()}
 
     def to_ttl(self) -> str:
         """Serializes the metric instance to Turtle (TTL) format using RDFLib."""
@@ -79,60 +387,61 @@ class BaseMetric(BaseModel):
         except Exception as e:
             raise ValueError(f"Invalid metric_instance_uri: {self.metric_instance_uri} - {e}")
 
+        plan = get_serialization_plan(type(self))
+        pool = DEFAULT_TERM_POOL
+
         # Add type triple - Use the actual class name
-        g.add((instance_uri, RDF.type, CORONA[self.__class__.__name__]))
+        g.add((instance_uri, P_TYPE, plan.type_uri))
 
         # Add common fields as triples
         if self.observed_from:
-            observed_from_term = format_rdflib_literal(self.observed_from)
-            g.add((instance_uri, CORONA.observedFrom, observed_from_term))
+            g.add((instance_uri, P_OBSERVED_FROM, pool.term(self.observed_from)))
         if self.description:
-            g.add((instance_uri, RDFS.comment, Literal(self.description)))
+            g.add((instance_uri, P_COMMENT, pool.literal(self.description)))
         if self.metric_identifier:
-            g.add((instance_uri, CORONA['metric-identifier'], Literal(self.metric_identifier, datatype=XSD.string)))
+            g.add((instance_uri, P_METRIC_IDENTIFIER, pool.literal(self.metric_identifier, XSD_STRING)))
         if self.metric_name:
-            g.add((instance_uri, RDFS.label, Literal(self.metric_name)))
+            g.add((instance_uri, P_LABEL, pool.literal(self.metric_name)))
         if self.timestamp:
-            g.add((instance_uri, CORONA.observedAt, format_rdflib_literal(self.timestamp)))
+            g.add((instance_uri, P_OBSERVED_AT, pool.term(self.timestamp)))
         if self.source_entity_uri:
             try:
-                source_uri = URIRef(self.source_entity_uri)
-                g.add((instance_uri, CORONA.metricSource, source_uri))
+                g.add((instance_uri, P_METRIC_SOURCE, pool.uri(self.source_entity_uri)))
             except Exception as e:
                 print(f"Warning: Could not create URIRef from source_entity_uri '{self.source_entity_uri}': {e}")
         elif self.source_entity_address:
-            g.add((instance_uri, CORONA.sourceAddress, Literal(self.source_entity_address)))
+            g.add((instance_uri, P_SOURCE_ADDRESS, pool.literal(self.source_entity_address)))
 
         # Add specific metric value fields
-        metric_fields = self._get_metric_fields()
-        for field_name, value in metric_fields.items():
-            if value is None:
-                continue
-
-            pydantic_field = self.model_fields.get(field_name)
-            prop_name_camel = pydantic_field.alias if pydantic_field and pydantic_field.alias else to_camel_case(field_name)
-
-            namespace = BACNET if "bacnet" in field_name.lower() or any(term in prop_name_camel.lower() for term in ["who", "cov", "bbmd", "readproperty", "iam", "ihave", "routed", "forwarded"]) else CORONA
-
-            prop_uri = namespace[prop_name_camel]
-            g.add((instance_uri, prop_uri, format_rdflib_literal(value)))
+        for field in plan.fields:
+            value = getattr(self, field.name)
+            if value is not None:
+                g.add((instance_uri, field.predicate, pool.term(value) if field.datatype is None else pool.literal(value, field.datatype)))
 
         ttl_output = g.serialize(format='turtle')
         return ttl_output
 
+    def to_ntriples(self) -> str:
+        """Serializes the metric to N-Triples, one line per triple, without building a Graph."""
+        from .rdf_writer import format_ntriples
+        return format_ntriples(self)
+
+    def to_nquads(self, graph_name: Optional[str] = None) -> str:
+        """Serializes the metric to N-Quads in the named graph ``graph_name`` (default: derived from ``observed_from``)."""
+        from .rdf_writer import format_nquads, observer_graph
+        return format_nquads(self, observer_graph(self) if graph_name is None else graph_name)
+
     def to_haystack_json(self) -> List[Dict[str, Any]]:
         """Serializes the metric to Project Haystack JSON format (simplified row)."""
-        entity_ref = f"@{self.source_entity_uri}" if self.source_entity_uri else f"@addr_{self.source_entity_address}" if self.source_entity_address else "@unknown"
+        entity_ref = haystack_entity_ref(self.source_entity_uri, self.source_entity_address)
         metrics = []
-        metric_fields = self._get_metric_fields()
-        for field_name, value in metric_fields.items():
-             pydantic_field = self.model_fields.get(field_name)
-             metric_key = pydantic_field.alias if pydantic_field and pydantic_field.alias else to_camel_case(field_name)
+        ts = self.timestamp.isoformat()
+        for field, value in self._iter_metric_values():
              metrics.append({
                  "entity": entity_ref,
-                 "metric": metric_key,
+                 "metric": field.key,
                  "val": value,
-                 "ts": self.timestamp.isoformat(),
+                 "ts": ts,
                  "observer": self.observed_from,
                  "metricId": self.metric_identifier,
              })
@@ -141,36 +450,22 @@ class BaseMetric(BaseModel):
     def to_prometheus(self, prefix: str = "bacnet") -> List[str]:
         """Serializes the metric to Prometheus exposition format."""
         lines = []
-        metric_fields = self._get_metric_fields()
-
-        labels = {}
-        if self.source_entity_uri:
-            safe_uri = re.sub(r'[^a-zA-Z0-9_]', '_', self.source_entity_uri)
-            labels["entity_uri"] = safe_uri
-        if self.source_entity_address:
-            labels["address"] = self.source_entity_address
-        if self.observed_from:
-            safe_observer = re.sub(r'[^a-zA-Z0-9_]', '_', self.observed_from)
-            labels["observer"] = safe_observer
-        if self.metric_identifier:
-             labels["metric_id"] = self.metric_identifier
+        plan = get_serialization_plan(type(self))
 
-        label_str = ",".join([f'{k}="{v}"' for k, v in labels.items() if v])
-        if label_str:
-            label_str = f"{{{label_str}}}"
-        else:
-            label_str = ""
+        label_str = prometheus_label_string(self.source_entity_uri, self.source_entity_address, self.observed_from, self.metric_identifier)
 
-        for field_name, value in metric_fields.items():
-            pydantic_field = self.model_fields.get(field_name)
-            original_name = pydantic_field.alias if pydantic_field and pydantic_field.alias else to_camel_case(field_name)
-            prom_metric_name = to_prometheus_metric_name(original_name, prefix)
+        timestamp_ms = int(self.timestamp.timestamp() * 1000)
+        for field, family in zip(plan.fields, plan.prometheus_families(prefix)):
+            value = getattr(self, field.name)
+            if value is None:
+                continue
+            prom_metric_name = family.name
 
-            metric_type = "counter" if prom_metric_name.endswith("_total") else "gauge"
-            field_description = pydantic_field.description if pydantic_field and pydantic_field.description else (self.description or original_name)
-            sanitized_description = field_description.replace('\n', ' ').replace('\"', '\\"')
+            sanitized_description = family.help
+            if sanitized_description is None:
+                sanitized_description = (self.description or field.key).replace('\n', ' ').replace('\"', '\\"')
             lines.append(f"# HELP {prom_metric_name} {sanitized_description}")
-            lines.append(f"# TYPE {prom_metric_name} {metric_type}")
+            lines.append(f"# TYPE {prom_metric_name} {family.type}")
 
             try:
                 prom_value = float(value)
@@ -178,7 +473,6 @@ class BaseMetric(BaseModel):
                 prom_value = 0.0
                 print(f"Warning: Could not convert value '{value}' for metric '{prom_metric_name}' to float. Setting to 0.")
 
-            timestamp_ms = int(self.timestamp.timestamp() * 1000)
             lines.append(f"{prom_metric_name}{label_str} {prom_value} {timestamp_ms}")
             lines.append("")
 
@@ -212,6 +506,8 @@ class COVNotificationMetric(BaseMetric):
 
 class RouterBBMDMetric(BaseMetric):
     """Metrics related to BACnet Router and BBMD functions."""
+    # Integer fields that report a current level rather than a running total
+    GAUGE_FIELDS: ClassVar[FrozenSet[str]] = frozenset({"routed_devices_seen", "bbmd_entries_count", "foreign_device_registrations"})
     messages_routed: Optional[int] = Field(None, alias="messagesRouted", description="Total number of messages routed by this device acting as a router.")
     messages_forwarded: Optional[int] = Field(None, alias="messagesForwarded", description="Total number of messages forwarded by this device acting as a BBMD.")
     routed_messages_sent: Optional[int] = Field(None, alias="routedMessagesSent", description="Total number of messages routed and sent to other networks.")
@@ -221,6 +517,24 @@ class RouterBBMDMetric(BaseMetric):
     bbmd_entries_count: Optional[int] = Field(None, alias="bbmdEntriesCount", description="Number of entries in the BBMD table.")
     foreign_device_registrations: Optional[int] = Field(None, alias="foreignDeviceRegistrations", description="Number of currently registered foreign devices.")
 
+def metric_classes() -> List[Type[BaseMetric]]:
+    """Returns every BaseMetric subclass, parents before their subclasses."""
+    from . import generated_models  # noqa: F401  (defining the generated classes registers them as subclasses)
+    classes: List[Type[BaseMetric]] = []
+    pending = list(BaseMetric.__subclasses__())
+    while pending:
+        cls = pending.pop(0)
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+def get_metric_class(name: str) -> Type[BaseMetric]:
+    """Returns the BaseMetric subclass called ``name``, e.g. ``"BacnetApplicationMetric"``."""
+    for cls in metric_classes():
+        if cls.__name__ == name:
+            return cls
+    raise ValueError(f"Unknown metric type '{name}'")
+
 if __name__ == '__main__':
     metric_instance = BacnetApplicationMetric(
         metric_instance_uri="http://example.com/metricInstance/bacnetApp/dev1/1714758900",
@@ -0,0 +1,134 @@
+"""Validate many model files in parallel and summarize the results.
+
+Collectors drop TTL files in bulk; validating them one CLI process per file
+re-imports pyshacl and re-parses the shapes every time. ``validate_files``
+expands files, directories and glob patterns, validates the files across a
+``ProcessPoolExecutor`` whose workers each load the shapes graph once, and
+returns a ``ValidationSummary`` that can be rendered as JSON.
+"""
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from pyshacl import validate
+from rdflib import Graph
+
+from .chunked_validation import SH
+from .graph_cache import load_graph
+from .validate_model import shapes_file_path
+
+
+class FileValidationResult(NamedTuple):
+    """The outcome of validating one model file."""
+    path: str
+    conforms: bool
+    violations: int
+    results: int
+    triples: int
+    seconds: float
+    error: Optional[str] = None
+
+
+class ValidationSummary(NamedTuple):
+    """Per-file results plus the totals a CI gate needs."""
+    results: List[FileValidationResult]
+    seconds: float
+
+    @property
+    def conforms(self) -> bool:
+        return all(r.conforms for r in self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "conforms": self.conforms,
+            "files": len(self.results),
+            "failed": sum(1 for r in self.results if not r.conforms),
+            "errors": sum(1 for r in self.results if r.error),
+            "violations": sum(r.violations for r in self.results),
+            "seconds": round(self.seconds, 4),
+            "results": [dict(r._asdict(), seconds=round(r.seconds, 4)) for r in self.results],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+def expand_model_paths(patterns: Iterable[str], extension: str = ".ttl") -> List[str]:
+    """Expands files, directories (searched recursively for ``extension``) and glob patterns, in order and without duplicates.
+
+    Patterns that match nothing are kept as-is so they are reported as errors rather than silently dropped.
+    """
+    paths: List[str] = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(glob.escape(pattern), "**", f"*{extension}"), recursive=True))
+        elif glob.has_magic(pattern):
+            matches = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def validate_file(path: str, shapes_graph: Graph, inference: Optional[str] = "rdfs") -> FileValidationResult:
+    """Validates one model file; parse and validation errors are reported in the result."""
+    start = time.perf_counter()
+    try:
+        data_graph = Graph().parse(path, format="turtle")
+        conforms, results_graph, _ = validate(data_graph, shacl_graph=shapes_graph, inference=inference, debug=False)
+    except Exception as e:
+        return FileValidationResult(path, False, 0, 0, 0, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+    severities = [results_graph.value(r, SH.resultSeverity) for r in results_graph.objects(None, SH.result)]
+    return FileValidationResult(
+        path, bool(conforms), sum(1 for s in severities if s == SH.Violation), len(severities),
+        len(data_graph), time.perf_counter() - start,
+    )
+
+
+# Shapes graph held by each pool worker, loaded once in the initializer
+_worker_shapes: Optional[Graph] = None
+
+
+def _init_worker(shapes_path: str, use_cache: bool) -> None:
+    global _worker_shapes
+    _worker_shapes = load_graph(shapes_path, format="turtle", use_cache=use_cache)
+
+
+def _validate_in_worker(path: str, inference: Optional[str]) -> FileValidationResult:
+    assert _worker_shapes is not None
+    return validate_file(path, _worker_shapes, inference)
+
+
+def validate_files(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    inference: Optional[str] = "rdfs",
+    shapes_path: str = shapes_file_path,
+    use_cache: bool = True,
+) -> ValidationSummary:
+    """Validates every file in ``paths`` (already expanded) across ``workers`` processes.
+
+    ``workers`` defaults to the CPU count; with one worker, or one file, the files are validated in this process.
+    """
+    start = time.perf_counter()
+    paths = list(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        shapes_graph = load_graph(shapes_path, format="turtle", use_cache=use_cache)
+        results = [validate_file(path, shapes_graph, inference) for path in paths]
+    else:
+        # Warm the parse cache once so the workers all load the binary form
+        if use_cache:
+            load_graph(shapes_path, format="turtle")
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths)), initializer=_init_worker,
+                                 initargs=(shapes_path, use_cache)) as pool:
+            results = list(pool.map(_validate_in_worker, paths, [inference] * len(paths)))
+    return ValidationSummary(results, time.perf_counter() - start)
@@ -0,0 +1,192 @@
+"""Single-pass index over an ontology graph for metric analysis.
+
+``OntologyIndex`` walks the graph's triples once, recording for every subject
+its types, first label and comment, domains and super-properties. Properties
+(``rdf:type rdf:Property``) are then categorized by domain, by direct
+``rdfs:subPropertyOf``, as Lifetime vs Sampled (following the
+``subPropertyOf`` hierarchy), and by a configurable list of ``NameRule``
+substring rules. Queries never touch the graph again, and ``to_dict`` gives a
+JSON-friendly view for ``corona-cli analyze --json``.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import RDF, RDFS
+from rdflib.term import Node
+
+from .constants import CORONA
+
+
+class NameRule(NamedTuple):
+    """Puts a property in ``category`` when its IRI contains any of ``substrings``."""
+    category: str
+    title: str
+    substrings: Tuple[str, ...]
+    case_sensitive: bool = False
+
+
+# The categories printed by ``analyze``, in output order
+DEFAULT_NAME_RULES: Tuple[NameRule, ...] = (
+    NameRule("general", "General Metric Properties", ("observedFrom", "description", "metric-identifier", "metric-name"), True),
+    NameRule("message", "Message Count Metrics", ("message",)),
+    NameRule("router", "Router-Related Metrics", ("routed",)),
+    NameRule("bbmd", "BBMD-Related Metrics", ("forwarded",)),
+    NameRule("broadcast", "Broadcast-Related Metrics", ("broadcast",)),
+    NameRule("cov", "COV Notification Metrics", ("COVNotification",), True),
+    NameRule("who", "Who* Service Metrics", ("Who",), True),
+)
+
+
+class PropertyInfo:
+    """What the index knows about one property."""
+
+    __slots__ = ("uri", "label", "comment", "domains", "super_properties", "kind", "categories")
+
+    def __init__(self, uri: str) -> None:
+        self.uri = uri
+        self.label: Optional[str] = None
+        self.comment: Optional[str] = None
+        self.domains: List[str] = []
+        self.super_properties: List[str] = []
+        self.kind: Optional[str] = None
+        self.categories: List[str] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _SubjectRecord:
+    __slots__ = ("is_property", "label", "comment", "domains", "super_properties")
+
+    def __init__(self) -> None:
+        self.is_property = False
+        self.label: Optional[str] = None
+        self.comment: Optional[str] = None
+        self.domains: List[str] = []
+        self.super_properties: List[str] = []
+
+
+def metric_namespace(graph: Graph) -> Namespace:
+    """Returns the namespace bound to the ``corona`` prefix in ``graph``, or the package default."""
+    for prefix, namespace in graph.namespaces():
+        if prefix == "corona":
+            return Namespace(str(namespace))
+    return CORONA
+
+
+class OntologyIndex:
+    """Properties of an ontology, categorized in a single pass over its triples."""
+
+    def __init__(self, graph: Graph, name_rules: Sequence[NameRule] = DEFAULT_NAME_RULES,
+                 namespace: Optional[Namespace] = None) -> None:
+        self.name_rules = tuple(name_rules)
+        self.namespace = namespace or metric_namespace(graph)
+        self.triple_count = 0
+        records: Dict[Node, _SubjectRecord] = {}
+        for s, p, o in graph:
+            self.triple_count += 1
+            if p not in _INDEXED_PREDICATES:
+                continue
+            record = records.get(s)
+            if record is None:
+                record = records[s] = _SubjectRecord()
+            if p == RDF.type:
+                record.is_property = record.is_property or o == RDF.Property
+            elif p == RDFS.label:
+                if record.label is None:
+                    record.label = str(o)
+            elif p == RDFS.comment:
+                if record.comment is None:
+                    record.comment = str(o)
+            elif p == RDFS.domain:
+                record.domains.append(str(o))
+            else:
+                record.super_properties.append(str(o))
+
+        self.properties: Dict[str, PropertyInfo] = {}
+        for subject, record in records.items():
+            if not record.is_property or isinstance(subject, Literal):
+                continue
+            info = PropertyInfo(str(subject))
+            info.label, info.comment = record.label, record.comment
+            info.domains, info.super_properties = sorted(record.domains), sorted(record.super_properties)
+            self.properties[info.uri] = info
+        self._labels = {str(s): r.label for s, r in records.items() if r.label is not None}
+
+        # Super-properties are resolved over every subject, since metric base "classes" are used as super-properties
+        parents = {str(s): r.super_properties for s, r in records.items() if r.super_properties}
+        kinds: Dict[str, Optional[str]] = {str(self.namespace.LifetimeMetric): "lifetime", str(self.namespace.SampledMetric): "sampled"}
+        self.by_domain: Dict[str, List[str]] = {}
+        self.by_super_property: Dict[str, List[str]] = {}
+        self.categories: Dict[str, List[str]] = {rule.category: [] for rule in self.name_rules}
+        matchers = [(rule.category, rule.case_sensitive, rule.substrings if rule.case_sensitive else tuple(s.lower() for s in rule.substrings))
+                    for rule in self.name_rules]
+        for uri in sorted(self.properties):
+            info = self.properties[uri]
+            for domain in info.domains:
+                self.by_domain.setdefault(domain, []).append(uri)
+            for parent in info.super_properties:
+                self.by_super_property.setdefault(parent, []).append(uri)
+            info.kind = _resolve_kind(uri, parents, kinds)
+            lowered = uri.lower()
+            for category, case_sensitive, substrings in matchers:
+                target = uri if case_sensitive else lowered
+                if any(s in target for s in substrings):
+                    info.categories.append(category)
+                    self.categories[category].append(uri)
+
+    def label(self, uri: str) -> Optional[str]:
+        """Returns the first ``rdfs:label`` of any indexed subject."""
+        return self._labels.get(uri)
+
+    def category(self, name: str) -> List[PropertyInfo]:
+        return [self.properties[uri] for uri in self.categories.get(name, [])]
+
+    def with_domain(self, domain: str) -> List[PropertyInfo]:
+        return [self.properties[uri] for uri in self.by_domain.get(domain, [])]
+
+    def sub_properties_of(self, parent: str) -> List[PropertyInfo]:
+        return [self.properties[uri] for uri in self.by_super_property.get(parent, [])]
+
+    def of_kind(self, kind: str) -> List[PropertyInfo]:
+        return [info for uri, info in sorted(self.properties.items()) if info.kind == kind]
+
+    def counts(self) -> Dict[str, int]:
+        """The metric counts printed at the top of ``analyze``."""
+        return {
+            "network_interface": len(self.by_super_property.get(str(self.namespace.NetworkInterfaceMetric), [])),
+            "application": len(self.by_domain.get(str(self.namespace.ApplicationMetric), [])),
+            "lifetime": len(self.by_super_property.get(str(self.namespace.LifetimeMetric), [])),
+            "sampled": len(self.by_super_property.get(str(self.namespace.SampledMetric), [])),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "namespace": str(self.namespace),
+            "triples": self.triple_count,
+            "properties": len(self.properties),
+            "counts": self.counts(),
+            "categories": {rule.category: self.categories[rule.category] for rule in self.name_rules},
+            "by_domain": self.by_domain,
+            "by_super_property": self.by_super_property,
+            "details": {uri: info.to_dict() for uri, info in sorted(self.properties.items())},
+        }
+
+
+_INDEXED_PREDICATES = {RDF.type, RDFS.label, RDFS.comment, RDFS.domain, RDFS.subPropertyOf}
+
+
+def _resolve_kind(uri: str, parents: Dict[str, List[str]], kinds: Dict[str, Optional[str]]) -> Optional[str]:
+    """Lifetime or Sampled via the ``subPropertyOf`` hierarchy, memoized in ``kinds``; Lifetime wins if both apply."""
+    if uri in kinds:
+        return kinds[uri]
+    kinds[uri] = None  # guards against subPropertyOf cycles
+    result: Optional[str] = None
+    for parent in parents.get(uri, ()):
+        kind = _resolve_kind(parent, parents, kinds)
+        if kind == "lifetime":
+            result = kind
+            break
+        result = result or kind
+    kinds[uri] = result
+    return result
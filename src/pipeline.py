@@ -0,0 +1,381 @@
+"""asyncio collection pipeline: sources, bounded queues, stages and sinks.
+
+A ``Pipeline`` connects one or more async sources to a chain of stages and
+then to its sinks, with a bounded ``asyncio.Queue`` between every step. A
+slow sink therefore fills the queues and stalls the sources instead of
+buffering without limit (backpressure).
+
+* Sources are async iterables of metrics, e.g. ``SimulatedBacnetSource``.
+* Stages are ``Map`` (a function, run inline or in a thread/process pool),
+  ``Batch`` (groups items by count or delay) and ``Serialize`` (a batch of
+  metrics to text, in an executor).
+* Sinks are ``TextSink`` and ``FileSink`` (rotating, see ``file_sink``) for
+  serialized text, ``PrometheusSink`` for a ``PrometheusRegistry``,
+  ``StoreSink`` for a ``MetricStore`` and ``CollectSink`` for tests.
+
+Every item travels with the time its oldest metric left the source, so
+``Pipeline.run`` can report end-to-end latency as well as throughput.
+"""
+import asyncio
+import collections
+import functools
+import io
+import queue
+import sys
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Iterable, List, NamedTuple, Optional, Sequence, TextIO
+
+from . import demo_metrics
+from .file_sink import RotatingFileSink
+from .metric_store import MetricStore
+from .models import BaseMetric
+from .prometheus import PrometheusRegistry
+
+# Formats whose serialized batches can simply be concatenated
+SERIALIZE_FORMATS = ('ntriples', 'nquads', 'prometheus', 'ndjson')
+
+_END = object()
+
+
+class Envelope(NamedTuple):
+    """An item in flight, with the source time of its oldest metric and how many metrics it carries."""
+    item: Any
+    created: float
+    metrics: int = 1
+
+
+# --- sources -----------------------------------------------------------------
+
+class SimulatedBacnetSource:
+    """Readings from simulated BACnet devices, built on the ``demo_metrics`` samples.
+
+    Each tick emits one metric per demo sample per device, with timestamps
+    ``interval`` seconds apart from ``start``. Like real devices, most counters
+    sit idle between bursts: each one moves every 1 to 7 ticks (depending on
+    the device and field), and table sizes such as ``bbmd_entries_count`` only
+    every ``STEADY_PERIOD`` ticks. With ``realtime=True`` ticks are paced by the wall clock;
+    otherwise metrics are produced as fast as the pipeline takes them.
+    ``ticks=None`` runs until cancelled.
+    """
+
+    STEADY_FIELDS = frozenset({"bbmd_entries_count", "foreign_device_registrations", "routed_devices_seen"})
+    STEADY_PERIOD = 60
+
+    def __init__(self, devices: int = 10, interval: float = 1.0, ticks: Optional[int] = 1,
+                 start: Optional[datetime] = None, realtime: bool = False, observer: str = "http://example.com/observer/simulator") -> None:
+        self.devices = devices
+        self.interval = interval
+        self.ticks = ticks
+        self.start = start or datetime(2024, 1, 1)
+        self.realtime = realtime
+        self.observer = observer
+        self._samples = demo_metrics.generate_all_sample_metrics()
+        self._counters = [
+            [name for name, value in sample if type(value) is int and name in type(sample).model_fields]
+            for sample in self._samples
+        ]
+
+    def reading(self, tick: int, device: int, sample_index: int) -> BaseMetric:
+        """The metric for one device and sample class at one tick."""
+        sample = self._samples[sample_index]
+        timestamp = self.start + timedelta(seconds=tick * self.interval)
+        update = {
+            "metric_instance_uri": f"urn:corona:sim:{device}:{sample_index}:{tick}",
+            "source_entity_uri": f"http://example.com/device/sim{device}",
+            "source_entity_address": f"10.{device >> 16 & 255}.{device >> 8 & 255}.{device & 255}",
+            "observed_from": self.observer,
+            "metric_identifier": f"sim_{sample_index}_{device}",
+            "timestamp": timestamp,
+        }
+        for n, name in enumerate(self._counters[sample_index]):
+            period = self.STEADY_PERIOD if name in self.STEADY_FIELDS else 1 + (device + n) % 7
+            update[name] = getattr(sample, name) + tick // period * period
+        return sample.model_copy(update=update)
+
+    async def __aiter__(self) -> AsyncIterator[BaseMetric]:
+        loop = asyncio.get_running_loop()
+        began = loop.time()
+        tick = 0
+        while self.ticks is None or tick < self.ticks:
+            if self.realtime:
+                await asyncio.sleep(max(0.0, began + tick * self.interval - loop.time()))
+            for device in range(self.devices):
+                for sample_index in range(len(self._samples)):
+                    yield self.reading(tick, device, sample_index)
+                # Let consumers run between devices even when queues never fill
+                await asyncio.sleep(0)
+            tick += 1
+
+
+# --- stages ------------------------------------------------------------------
+
+class Stage:
+    """A step between two queues; subclasses override ``process`` (or ``run`` for full control)."""
+
+    async def process(self, item: Any) -> Any:
+        """Transforms one item; returning None drops it."""
+        return item
+
+    async def run(self, inbox: "asyncio.Queue[Any]", outbox: "asyncio.Queue[Any]") -> None:
+        while True:
+            envelope = await inbox.get()
+            if envelope is _END:
+                await outbox.put(_END)
+                return
+            result = await self.process(envelope.item)
+            if result is not None:
+                await outbox.put(envelope._replace(item=result))
+
+
+class Map(Stage):
+    """Applies ``func`` to each item, inline or in ``executor`` with up to ``concurrency`` calls in flight.
+
+    Results are emitted in input order. With a ``ProcessPoolExecutor``
+    ``func`` and the items must be picklable (module-level functions and
+    ``functools.partial`` of them are).
+    """
+
+    def __init__(self, func: Callable[[Any], Any], executor: Optional[Executor] = None, concurrency: int = 1) -> None:
+        self.func = func
+        self.executor = executor
+        self.concurrency = max(1, concurrency)
+
+    async def process(self, item: Any) -> Any:
+        return self.func(item)
+
+    async def run(self, inbox: "asyncio.Queue[Any]", outbox: "asyncio.Queue[Any]") -> None:
+        if self.executor is None:
+            return await super().run(inbox, outbox)
+        loop = asyncio.get_running_loop()
+        in_flight: Deque[Any] = collections.deque()
+
+        async def emit_oldest() -> None:
+            envelope, future = in_flight.popleft()
+            result = await future
+            if result is not None:
+                await outbox.put(envelope._replace(item=result))
+
+        while True:
+            envelope = await inbox.get()
+            if envelope is _END:
+                break
+            in_flight.append((envelope, loop.run_in_executor(self.executor, self.func, envelope.item)))
+            if len(in_flight) >= self.concurrency:
+                await emit_oldest()
+        while in_flight:
+            await emit_oldest()
+        await outbox.put(_END)
+
+
+class Batch(Stage):
+    """Groups items into lists of up to ``size``, emitting early once the oldest has waited ``max_delay`` seconds."""
+
+    def __init__(self, size: int = 256, max_delay: float = 0.1) -> None:
+        self.size = size
+        self.max_delay = max_delay
+
+    async def run(self, inbox: "asyncio.Queue[Any]", outbox: "asyncio.Queue[Any]") -> None:
+        loop = asyncio.get_running_loop()
+        items: List[Any] = []
+        created = 0.0
+        count = 0
+        deadline = 0.0
+        while True:
+            if items:
+                try:
+                    envelope = await asyncio.wait_for(inbox.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    envelope = None
+            else:
+                envelope = await inbox.get()
+            if envelope is not None and envelope is not _END:
+                if not items:
+                    created, count, deadline = envelope.created, 0, loop.time() + self.max_delay
+                items.append(envelope.item)
+                created = min(created, envelope.created)
+                count += envelope.metrics
+            if items and (envelope is None or envelope is _END or len(items) >= self.size):
+                await outbox.put(Envelope(items, created, count))
+                items = []
+            if envelope is _END:
+                await outbox.put(_END)
+                return
+
+
+def render(output_format: str, metrics: Sequence[BaseMetric]) -> str:
+    """Serializes a batch of metrics to one of ``SERIALIZE_FORMATS``; module level so process pools can run it."""
+    from .stream_convert import stream_writer  # imported here to keep worker start-up light
+    if output_format not in SERIALIZE_FORMATS:
+        raise ValueError(f"Format '{output_format}' cannot be serialized in batches; use one of {SERIALIZE_FORMATS}")
+    buffer = io.StringIO()
+    writer = stream_writer(output_format, buffer)
+    for metric in metrics:
+        writer.write_metric(metric)
+    return buffer.getvalue()
+
+
+class Serialize(Map):
+    """Serializes batches (lists) of metrics to text, in ``executor`` if given."""
+
+    def __init__(self, output_format: str, executor: Optional[Executor] = None, concurrency: int = 1) -> None:
+        if output_format not in SERIALIZE_FORMATS:
+            raise ValueError(f"Format '{output_format}' cannot be serialized in batches; use one of {SERIALIZE_FORMATS}")
+        super().__init__(functools.partial(render, output_format), executor, concurrency)
+
+
+# --- sinks -------------------------------------------------------------------
+
+class Sink(ABC):
+    """Consumes items at the end of a pipeline."""
+
+    @abstractmethod
+    async def write(self, item: Any) -> None:
+        """Consumes one item."""
+
+    async def close(self) -> None:
+        """Called once after the last item."""
+
+
+class TextSink(Sink):
+    """Writes serialized text to a stream."""
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+
+    async def write(self, item: str) -> None:
+        self.stream.write(item)
+
+    async def close(self) -> None:
+        self.stream.flush()
+
+
+class FileSink(Sink):
+    """Appends serialized text to a file through a ``RotatingFileSink``, which writes from its own thread.
+
+    ``options`` (``max_bytes``, ``max_interval``, ``compress``, ...) configure
+    rotation and batching. When the file sink's queue is full the write waits
+    in a thread, so backpressure reaches the pipeline without blocking the loop.
+    """
+
+    def __init__(self, path: str, **options: Any) -> None:
+        self.path = path
+        self.file = RotatingFileSink(path, **options)
+
+    async def write(self, item: str) -> None:
+        try:
+            self.file.write(item, timeout=0)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self.file.write, item)
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.file.close)
+
+
+class PrometheusSink(Sink):
+    """Feeds metrics (or batches of metrics) into a ``PrometheusRegistry``."""
+
+    def __init__(self, registry: PrometheusRegistry) -> None:
+        self.registry = registry
+
+    async def write(self, item: Any) -> None:
+        self.registry.update(item if isinstance(item, list) else [item])
+
+
+class StoreSink(Sink):
+    """Records metrics (or batches of metrics) in a ``MetricStore``."""
+
+    def __init__(self, store: MetricStore) -> None:
+        self.store = store
+
+    async def write(self, item: Any) -> None:
+        self.store.add_all(item if isinstance(item, list) else [item])
+
+
+class CollectSink(Sink):
+    """Keeps every item in ``items``."""
+
+    def __init__(self) -> None:
+        self.items: List[Any] = []
+
+    async def write(self, item: Any) -> None:
+        self.items.append(item)
+
+
+# --- pipeline ----------------------------------------------------------------
+
+class PipelineStats(NamedTuple):
+    """What a run delivered: metric counts, throughput and end-to-end latency (seconds)."""
+    metrics: int
+    items: int
+    seconds: float
+    latency_p50: float
+    latency_p95: float
+    latency_max: float
+
+    @property
+    def throughput(self) -> float:
+        return self.metrics / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.metrics} metrics in {self.seconds:.2f}s ({self.throughput:,.0f}/s), latency "
+                f"p50 {self.latency_p50 * 1000:.1f} ms, p95 {self.latency_p95 * 1000:.1f} ms, max {self.latency_max * 1000:.1f} ms")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Pipeline:
+    """Runs sources through stages into sinks over bounded queues of ``queue_size`` items."""
+
+    def __init__(self, sources: Iterable[AsyncIterable[Any]], stages: Sequence[Stage] = (), sinks: Sequence[Sink] = (),
+                 queue_size: int = 1024) -> None:
+        self.sources = list(sources)
+        self.stages = list(stages)
+        self.sinks = list(sinks)
+        self.queue_size = queue_size
+
+    async def _pump(self, source: AsyncIterable[Any], outbox: "asyncio.Queue[Any]") -> None:
+        loop = asyncio.get_running_loop()
+        async for item in source:
+            await outbox.put(Envelope(item, loop.time()))
+
+    async def _feed(self, outbox: "asyncio.Queue[Any]") -> None:
+        await asyncio.gather(*(self._pump(source, outbox) for source in self.sources))
+        await outbox.put(_END)
+
+    async def _drain(self, inbox: "asyncio.Queue[Any]", latencies: List[float], counts: List[int]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            envelope = await inbox.get()
+            if envelope is _END:
+                break
+            for sink in self.sinks:
+                await sink.write(envelope.item)
+            latencies.append(loop.time() - envelope.created)
+            counts[0] += envelope.metrics
+        for sink in self.sinks:
+            await sink.close()
+
+    async def run(self) -> PipelineStats:
+        """Runs until every source is exhausted and everything has reached the sinks."""
+        queues: List[asyncio.Queue[Any]] = [asyncio.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        latencies: List[float] = []
+        counts = [0]
+        began = time.perf_counter()
+        tasks = [asyncio.ensure_future(self._feed(queues[0]))]
+        tasks.extend(asyncio.ensure_future(stage.run(queues[i], queues[i + 1])) for i, stage in enumerate(self.stages))
+        tasks.append(asyncio.ensure_future(self._drain(queues[-1], latencies, counts)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        latencies.sort()
+        return PipelineStats(counts[0], len(latencies), time.perf_counter() - began,
+                             _percentile(latencies, 0.5), _percentile(latencies, 0.95), latencies[-1] if latencies else 0.0)
@@ -0,0 +1,189 @@
+"""Prometheus exposition registry and a stdlib HTTP exporter.
+
+``BaseMetric.to_prometheus`` renders one metric at a time and repeats the
+``# HELP``/``# TYPE`` header for every sample. The registry here groups the
+latest sample of each series into families so each header is written once,
+renders each label set once per series, and caches the rendered (and gzipped)
+payload until the next update so repeated scrapes are free.
+"""
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models import BaseMetric, get_serialization_plan, prometheus_label_string
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+class _Family:
+    """One metric family: its header and the latest (value, timestamp) per series."""
+
+    __slots__ = ("name", "type", "help", "series")
+
+    def __init__(self, name: str, metric_type: str, help_text: str) -> None:
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.series: Dict[str, Tuple[float, int]] = {}
+
+
+class PrometheusRegistry:
+    """Collects samples from many metric instances and renders a valid exposition payload."""
+
+    def __init__(self, prefix: str = "bacnet") -> None:
+        self.prefix = prefix
+        self._families: Dict[str, _Family] = {}
+        self._labels: Dict[LabelKey, str] = {}
+        self._lock = threading.Lock()
+        self._payload: Optional[bytes] = None
+        self._payload_gzip: Optional[bytes] = None
+        self.version = 0
+
+    def _label_string(self, metric: BaseMetric) -> str:
+        key = (metric.source_entity_uri, metric.source_entity_address, metric.observed_from, metric.metric_identifier)
+        label_str = self._labels.get(key)
+        if label_str is None:
+            label_str = self._labels[key] = prometheus_label_string(*key)
+        return label_str
+
+    def _add(self, metric: BaseMetric) -> bool:
+        plan = get_serialization_plan(type(metric))
+        label_str = self._label_string(metric)
+        timestamp_ms = int(metric.timestamp.timestamp() * 1000)
+        changed = False
+        for field, family_plan in zip(plan.fields, plan.prometheus_families(self.prefix)):
+            value = getattr(metric, field.name)
+            if value is None:
+                continue
+            try:
+                prom_value = float(value)
+            except (ValueError, TypeError):
+                prom_value = 0.0
+            family = self._families.get(family_plan.name)
+            if family is None:
+                family = self._families[family_plan.name] = _Family(family_plan.name, family_plan.type, family_plan.help or field.key)
+            sample = (prom_value, timestamp_ms)
+            if family.series.get(label_str) != sample:
+                family.series[label_str] = sample
+                changed = True
+        return changed
+
+    def update(self, metrics: Iterable[BaseMetric]) -> bool:
+        """Records the latest sample of every series in ``metrics``; returns True if anything changed."""
+        with self._lock:
+            changed = False
+            for metric in metrics:
+                changed = self._add(metric) or changed
+            if changed:
+                self._invalidate()
+            return changed
+
+    def add(self, metric: BaseMetric) -> bool:
+        """Records a single metric instance."""
+        return self.update((metric,))
+
+    def clear(self) -> None:
+        """Drops every family and series."""
+        with self._lock:
+            self._families.clear()
+            self._labels.clear()
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._payload = None
+        self._payload_gzip = None
+        self.version += 1
+
+    def series_count(self) -> int:
+        with self._lock:
+            return sum(len(family.series) for family in self._families.values())
+
+    def render_lines(self) -> List[str]:
+        """Renders the exposition as lines, one HELP/TYPE header per family."""
+        with self._lock:
+            return self._render_lines()
+
+    def _render_lines(self) -> List[str]:
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            name = family.name
+            lines.extend(f"{name}{labels} {value} {ts}" for labels, (value, ts) in family.series.items())
+        return lines
+
+    def _render_locked(self) -> bytes:
+        if self._payload is None:
+            lines = self._render_lines()
+            self._payload = ("\n".join(lines) + "\n" if lines else "").encode("utf-8")
+        return self._payload
+
+    def render(self) -> bytes:
+        """Returns the UTF-8 exposition payload, re-rendering only after an update."""
+        with self._lock:
+            return self._render_locked()
+
+    def render_gzip(self) -> bytes:
+        """Returns the gzip-compressed payload, compressed once per update."""
+        # Render and compress under one lock hold so an update in between cannot leave a stale gzip payload cached
+        with self._lock:
+            if self._payload_gzip is None:
+                self._payload_gzip = gzip.compress(self._render_locked(), compresslevel=6)
+            return self._payload_gzip
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: PrometheusRegistry
+    path_prefix = "/metrics"
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != self.path_prefix:
+            self.send_error(404)
+            return
+        accepts_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = self.registry.render_gzip() if accepts_gzip else self.registry.render()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        if accepts_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Scrapes are frequent; keep the exporter quiet
+        pass
+
+
+class PrometheusExporter:
+    """Serves a registry on ``/metrics`` from a background thread."""
+
+    def __init__(self, registry: PrometheusRegistry, host: str = "127.0.0.1", port: int = 9108) -> None:
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self.registry = registry
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self.server.server_address[:2]
+        return str(host), port
+
+    def start(self) -> None:
+        """Starts serving in a daemon thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="corona-prometheus", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Serves in the calling thread until interrupted."""
+        self.server.serve_forever()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,158 @@
+"""Incremental counter-to-rate conversion for lifetime counters.
+
+The models carry raw ``corona:LifetimeMetric`` totals such as
+``read_property_requests``. ``CounterRateEngine`` turns successive snapshots
+into deltas and per-second rates. It keeps only the previous sample of each
+series, keyed by (``metric_identifier``, source entity, field), so every update
+is O(1) per counter. A counter that goes backwards is treated as a wraparound of
+the unsignedLong range when the previous value was within ``wrap_window`` of
+the maximum, and as a reset (the counter restarted from zero) otherwise.
+
+Only monotonic counters get rates (see ``rate_field_names``): integer fields
+that report a current level, such as ``bbmd_entries_count``, are gauges whose
+drops are not resets, so they are skipped.
+
+``update`` takes one model instance; ``update_batch`` takes a whole interval's
+``MetricBatch`` and works directly on its columns.
+"""
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+from .batch import MetricBatch, counter_field_names, epoch_microseconds
+from .models import BaseMetric, get_serialization_plan
+
+# xsd:unsignedLong counters wrap at 2**64
+UNSIGNED_LONG_MODULUS = 2 ** 64
+
+SeriesId = Tuple[Optional[str], Optional[str]]
+
+
+_RATE_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def rate_field_names(metric_cls: Type[BaseMetric]) -> Tuple[str, ...]:
+    """Names of the monotonic counter fields of a metric class, in plan order.
+
+    Generated classes mark ontology counters (``corona:LifetimeMetric``
+    properties and counter datatypes) with ``prometheus_type == "counter"``;
+    for hand-written classes every integer field the serialization plan does
+    not type as a gauge (see ``GAUGE_FIELDS``) is one.
+    """
+    names = _RATE_FIELDS.get(metric_cls)
+    if names is None:
+        integers = set(counter_field_names(metric_cls))
+        names = tuple(field.name for field in get_serialization_plan(metric_cls).fields
+                      if field.prometheus_type == "counter" or (field.prometheus_type is None and field.name in integers))
+        _RATE_FIELDS[metric_cls] = names
+    return names
+
+
+class RateSample(NamedTuple):
+    """The change of one counter between two consecutive snapshots."""
+    metric_identifier: Optional[str]
+    source: Optional[str]
+    field: str
+    timestamp: datetime
+    delta: int
+    seconds: float
+    rate: float
+    reset: bool = False
+    wrapped: bool = False
+
+
+class CounterRateEngine:
+    """Converts counter snapshots into delta/rate samples, remembering only the last sample per series."""
+
+    def __init__(self, modulus: int = UNSIGNED_LONG_MODULUS, wrap_window: float = 0.01) -> None:
+        self.modulus = modulus
+        self._wrap_floor = modulus - int(modulus * wrap_window)
+        # field -> (metric_identifier, source) -> (value, epoch microseconds)
+        self._previous: Dict[str, Dict[SeriesId, Tuple[int, int]]] = {}
+        self.resets = 0
+        self.wraps = 0
+        self.out_of_order = 0
+
+    def _step(self, series: Dict[SeriesId, Tuple[int, int]], series_id: SeriesId, value: int, timestamp_us: int) -> Optional[Tuple[int, int, bool, bool]]:
+        """Records a sample; returns (delta, elapsed microseconds, reset, wrapped) if there was a previous one."""
+        previous = series.get(series_id)
+        if previous is None:
+            series[series_id] = (value, timestamp_us)
+            return None
+        previous_value, previous_us = previous
+        if timestamp_us <= previous_us:
+            # Late or duplicate snapshot; the newer sample stays the reference
+            self.out_of_order += 1
+            return None
+        series[series_id] = (value, timestamp_us)
+        delta = value - previous_value
+        if delta >= 0:
+            return delta, timestamp_us - previous_us, False, False
+        if previous_value >= self._wrap_floor:
+            self.wraps += 1
+            return delta + self.modulus, timestamp_us - previous_us, False, True
+        self.resets += 1
+        return value, timestamp_us - previous_us, True, False
+
+    def update(self, metric: BaseMetric) -> List[RateSample]:
+        """Feeds one snapshot and returns a sample for every counter seen before in its series."""
+        series_id = (metric.metric_identifier, metric.source_entity_uri or metric.source_entity_address)
+        timestamp_us = epoch_microseconds(metric.timestamp)
+        samples = []
+        for name in rate_field_names(type(metric)):
+            value = getattr(metric, name)
+            if value is None:
+                continue
+            step = self._step(self._previous.setdefault(name, {}), series_id, value, timestamp_us)
+            if step is not None:
+                delta, elapsed_us, reset, wrapped = step
+                seconds = elapsed_us / 1_000_000
+                samples.append(RateSample(series_id[0], series_id[1], name, metric.timestamp, delta, seconds, delta / seconds, reset, wrapped))
+        return samples
+
+    def update_batch(self, batch: MetricBatch) -> List[RateSample]:
+        """Feeds every reading of a batch, in timestamp order, column by column."""
+        rows = len(batch)
+        identifiers = batch.metadata['metric_identifier']
+        uris = batch.metadata['source_entity_uri']
+        addresses = batch.metadata['source_entity_address']
+        # One shared series id per distinct (identifier, source) code pair
+        ids_by_codes: Dict[Tuple[int, int, int], SeriesId] = {}
+        series_ids: List[SeriesId] = []
+        for row in range(rows):
+            codes = (identifiers.codes[row], uris.codes[row], addresses.codes[row])
+            series_id = ids_by_codes.get(codes)
+            if series_id is None:
+                series_id = ids_by_codes[codes] = (identifiers.values[codes[0]], uris.values[codes[1]] or addresses.values[codes[2]])
+            series_ids.append(series_id)
+        timestamps = batch.timestamps
+        order = sorted(range(rows), key=timestamps.__getitem__)
+
+        samples = []
+        for name in rate_field_names(batch.metric_cls):
+            column = batch.counters[name]
+            series = self._previous.setdefault(name, {})
+            data, mask = column.data, column.mask
+            for row in order:
+                if not mask[row]:
+                    continue
+                step = self._step(series, series_ids[row], data[row], timestamps[row])
+                if step is not None:
+                    delta, elapsed_us, reset, wrapped = step
+                    seconds = elapsed_us / 1_000_000
+                    series_id = series_ids[row]
+                    samples.append(RateSample(series_id[0], series_id[1], name, batch.timestamp_at(row), delta, seconds, delta / seconds, reset, wrapped))
+        return samples
+
+    def series_count(self) -> int:
+        return sum(len(series) for series in self._previous.values())
+
+    def expire(self, before: datetime) -> int:
+        """Forgets series whose last sample is older than ``before``; returns how many were dropped."""
+        cutoff = epoch_microseconds(before)
+        dropped = 0
+        for series in self._previous.values():
+            stale = [series_id for series_id, (_, timestamp_us) in series.items() if timestamp_us < cutoff]
+            for series_id in stale:
+                del series[series_id]
+            dropped += len(stale)
+        return dropped
@@ -0,0 +1,318 @@
+"""Streaming RDF writers for bulk metric export.
+
+These writers emit the same triples as ``corona_tool.add_metric_to_graph`` but
+write them straight to a text stream, one metric at a time, without building an
+rdflib ``Graph``. Memory use is therefore constant in the number of metrics.
+
+N-Triples and N-Quads output is one self-contained statement per line, so
+files can be split at any line boundary and bulk-loaded in parallel chunks.
+``NQuadsStreamWriter`` places each metric in a named graph chosen by a
+``graph_name`` function: ``observer_graph`` (the default) or ``interval_graph``.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from rdflib.namespace import RDF, RDFS, XSD
+
+from .constants import CORONA, BACNET
+from .models import BaseMetric, get_serialization_plan, looks_like_uri
+
+DEFAULT_PREFIXES: Dict[str, str] = {
+    "corona": str(CORONA),
+    "bacnet": str(BACNET),
+    "xsd": str(XSD),
+    "rdf": str(RDF),
+    "rdfs": str(RDFS),
+}
+
+_PN_LOCAL = re.compile(r'^[A-Za-z_][A-Za-z0-9_\-]*$')
+_STRING_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r'})
+_IRI_ESCAPES = str.maketrans({c: f"%{ord(c):02X}" for c in '<>"{}|^`\\ '})
+
+_EPOCH = datetime(1970, 1, 1)
+
+_RDF_TYPE = str(RDF.type)
+_OBSERVED_FROM = str(CORONA.observedFrom)
+_OBSERVED_AT = str(CORONA.observedAt)
+_METRIC_IDENTIFIER = str(CORONA['metric-identifier'])
+_METRIC_SOURCE = str(CORONA.metricSource)
+_SOURCE_ADDRESS = str(CORONA.sourceAddress)
+_COMMENT = str(RDFS.comment)
+_LABEL = str(RDFS.label)
+_XSD_STRING = str(XSD.string)
+_XSD_BOOLEAN = str(XSD.boolean)
+_XSD_INTEGER = str(XSD.integer)
+_XSD_FLOAT = str(XSD.float)
+_XSD_DATETIME = str(XSD.dateTime)
+
+# (predicate IRI, object) pairs; an object is either ('iri', value) or ('literal', lexical, datatype IRI or None)
+Statement = Tuple[str, Tuple[Any, ...]]
+
+
+def value_object(value: Any) -> Tuple[Any, ...]:
+    """Mirrors ``format_rdflib_literal`` without creating rdflib terms."""
+    if isinstance(value, bool):
+        return ('literal', 'true' if value else 'false', _XSD_BOOLEAN)
+    elif isinstance(value, int):
+        return ('literal', str(value), _XSD_INTEGER)
+    elif isinstance(value, float):
+        return ('literal', str(value), _XSD_FLOAT)
+    elif isinstance(value, datetime):
+        return ('literal', value.isoformat(timespec='seconds'), _XSD_DATETIME)
+    elif isinstance(value, str):
+        if looks_like_uri(value):
+            return ('iri', value)
+        return ('literal', value, _XSD_STRING)
+    return ('literal', str(value), _XSD_STRING)
+
+
+# How each string metadata field of BaseMetric maps to a statement
+_METADATA_STATEMENTS: Dict[str, Callable[[str], Statement]] = {
+    'observed_from': lambda v: (_OBSERVED_FROM, value_object(v)),
+    'description': lambda v: (_COMMENT, ('literal', v, None)),
+    'metric_identifier': lambda v: (_METRIC_IDENTIFIER, ('literal', v, _XSD_STRING)),
+    'metric_name': lambda v: (_LABEL, ('literal', v, None)),
+    'source_entity_uri': lambda v: (_METRIC_SOURCE, ('iri', v)),
+    'source_entity_address': lambda v: (_SOURCE_ADDRESS, ('literal', v, None)),
+}
+
+
+def metadata_statement(field_name: str, value: str) -> Statement:
+    """Returns the statement for a string metadata field such as ``observed_from``."""
+    return _METADATA_STATEMENTS[field_name](value)
+
+
+def type_statement(metric_cls: type) -> Statement:
+    """Returns the ``rdf:type`` statement for a metric class."""
+    return _RDF_TYPE, ('iri', get_serialization_plan(metric_cls).type_uri)
+
+
+def timestamp_statement(timestamp: datetime) -> Statement:
+    """Returns the ``corona:observedAt`` statement for a timestamp."""
+    return _OBSERVED_AT, value_object(timestamp)
+
+
+def metadata_statements(metric: BaseMetric) -> Iterator[Statement]:
+    """Yields the statements for a metric's metadata fields (everything but its type and values)."""
+    for name in ('observed_from', 'description', 'metric_identifier', 'metric_name'):
+        value = getattr(metric, name)
+        if value:
+            yield metadata_statement(name, value)
+    if metric.timestamp:
+        yield timestamp_statement(metric.timestamp)
+    if metric.source_entity_uri:
+        yield metadata_statement('source_entity_uri', metric.source_entity_uri)
+    elif metric.source_entity_address:
+        yield metadata_statement('source_entity_address', metric.source_entity_address)
+
+
+def metric_statements(metric: BaseMetric) -> Iterator[Statement]:
+    """Yields the (predicate, object) pairs describing a metric instance, in graph-building order."""
+    yield type_statement(type(metric))
+    yield from metadata_statements(metric)
+    for field in get_serialization_plan(type(metric)).fields:
+        value = getattr(metric, field.name)
+        if value is not None:
+            yield field.predicate, value_object(value) if field.datatype is None else ('literal', str(value), field.datatype)
+
+
+def format_iri(uri: str) -> str:
+    """Formats an IRI term as ``<...>``."""
+    return f"<{uri.translate(_IRI_ESCAPES)}>"
+
+
+def format_term(obj: Tuple[Any, ...], iri: Callable[[str], str] = format_iri) -> str:
+    """Formats an object term produced by ``metric_statements``; ``iri`` formats IRIs and datatypes."""
+    if obj[0] == 'iri':
+        return iri(obj[1])
+    lexical = f'"{obj[1].translate(_STRING_ESCAPES)}"'
+    return f"{lexical}^^{iri(obj[2])}" if obj[2] else lexical
+
+
+def format_ntriples(metric: BaseMetric) -> str:
+    """Returns the N-Triples lines for a single metric."""
+    subject = format_iri(metric.metric_instance_uri)
+    return "".join(f"{subject} {format_iri(p)} {format_term(o)} .\n" for p, o in metric_statements(metric))
+
+
+class NTriplesStreamWriter:
+    """Writes metrics to a text stream as N-Triples, one line per triple."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.metrics_written = 0
+
+    def iri(self, uri: str) -> str:
+        """Formats an IRI term."""
+        return format_iri(uri)
+
+    def term(self, obj: Tuple[Any, ...]) -> str:
+        """Formats an object term produced by ``metric_statements``."""
+        return format_term(obj, self.iri)
+
+    def write_header(self) -> None:
+        """N-Triples has no header; provided for interface symmetry with the Turtle writer."""
+
+    def format_metric(self, metric: BaseMetric) -> str:
+        """Returns the serialized block for a single metric."""
+        return format_ntriples(metric)
+
+    def write_metric(self, metric: BaseMetric) -> None:
+        """Serializes a single metric and writes it to the stream."""
+        self.stream.write(self.format_metric(metric))
+        self.metrics_written += 1
+
+    def write_footer(self) -> None:
+        """Nothing follows the last metric in N-Triples or Turtle; provided for interface symmetry with other stream writers."""
+
+    def write_all(self, metrics: Iterable[BaseMetric]) -> int:
+        """Writes the header followed by every metric in ``metrics``; returns the number written."""
+        self.write_header()
+        for metric in metrics:
+            self.write_metric(metric)
+        self.write_footer()
+        return self.metrics_written
+
+
+class TurtleFormatter:
+    """Formats IRIs, terms and metric subject blocks as Turtle against a fixed set of prefixes, without a stream."""
+
+    def __init__(self, prefixes: Optional[Dict[str, str]] = None) -> None:
+        self.prefixes = dict(DEFAULT_PREFIXES if prefixes is None else prefixes)
+        # Longest namespace first so nested namespaces resolve to the most specific prefix
+        self._namespaces = sorted(((ns, p) for p, ns in self.prefixes.items()), key=lambda x: -len(x[0]))
+        self._qnames: Dict[str, str] = {}
+
+    def header(self) -> str:
+        """Returns the ``@prefix`` declarations."""
+        return "".join(f"@prefix {p}: <{ns}> .\n" for p, ns in self.prefixes.items()) + "\n"
+
+    def iri(self, uri: str) -> str:
+        """Formats an IRI as a prefixed name when it falls in a bound namespace, else as ``<...>``."""
+        qname = self._qnames.get(uri)
+        if qname is None:
+            qname = format_iri(uri)
+            for ns, prefix in self._namespaces:
+                if uri.startswith(ns) and _PN_LOCAL.match(uri[len(ns):]):
+                    qname = f"{prefix}:{uri[len(ns):]}"
+                    break
+            # Only predicates, classes and datatypes are cached; their number is bounded by the schema
+            if len(self._qnames) < 4096:
+                self._qnames[uri] = qname
+        return qname
+
+    def term(self, obj: Tuple[Any, ...]) -> str:
+        """Formats an object term produced by ``metric_statements``, with prefixed datatypes."""
+        return format_term(obj, self.iri)
+
+    def format_head(self, metric: BaseMetric) -> str:
+        """Returns the start of a metric's subject block (subject, type and metadata) without the closing `` .``."""
+        head = f"{format_iri(metric.metric_instance_uri)} a {self.iri(type_statement(type(metric))[1][1])}"
+        for p, o in metadata_statements(metric):
+            head += f" ;\n    {self.iri(p)} {format_iri(o[1]) if o[0] == 'iri' else self.term(o)}"
+        return head
+
+    def format_metric(self, metric: BaseMetric) -> str:
+        """Returns the Turtle subject block for a single metric."""
+        predicate_objects = []
+        for p, o in metric_statements(metric):
+            predicate = "a" if p == _RDF_TYPE else self.iri(p)
+            obj = format_iri(o[1]) if o[0] == 'iri' and p != _RDF_TYPE else self.term(o)
+            predicate_objects.append(f"{predicate} {obj}")
+        return f"{format_iri(metric.metric_instance_uri)} " + " ;\n    ".join(predicate_objects) + " .\n\n"
+
+
+class TurtleStreamWriter(NTriplesStreamWriter):
+    """Writes metrics to a text stream as Turtle, emitting the prefixes once and one subject block per metric."""
+
+    def __init__(self, stream: TextIO, prefixes: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(stream)
+        self.formatter = TurtleFormatter(prefixes)
+        self.prefixes = self.formatter.prefixes
+
+    def iri(self, uri: str) -> str:
+        """Formats an IRI as a prefixed name when it falls in a bound namespace, else as ``<...>``."""
+        return self.formatter.iri(uri)
+
+    def write_header(self) -> None:
+        """Writes the ``@prefix`` declarations."""
+        self.stream.write(self.formatter.header())
+
+    def format_head(self, metric: BaseMetric) -> str:
+        """Returns the start of a metric's subject block (subject, type and metadata) without the closing `` .``."""
+        return self.formatter.format_head(metric)
+
+    def format_metric(self, metric: BaseMetric) -> str:
+        """Returns the Turtle subject block for a single metric."""
+        return self.formatter.format_metric(metric)
+
+
+def observer_graph(metric: BaseMetric) -> Optional[str]:
+    """Names the graph after the metric's observer; metrics without one go to the default graph."""
+    observer = metric.observed_from
+    if not observer:
+        return None
+    return observer if looks_like_uri(observer) else f"urn:corona:observer:{quote(observer, safe='')}"
+
+
+def interval_graph(seconds: int = 3600) -> Callable[[BaseMetric], Optional[str]]:
+    """Returns a ``graph_name`` function naming a graph per collection interval of ``seconds``.
+
+    Graphs are named by the ISO 8601 interval, e.g.
+    ``urn:corona:interval:2024-01-01T00:00:00Z/PT3600S``; naive timestamps are taken as UTC.
+    """
+    if seconds < 1:
+        raise ValueError("Interval must be at least one second")
+    names: Dict[int, str] = {}
+
+    def graph_name(metric: BaseMetric) -> Optional[str]:
+        timestamp = metric.timestamp
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        delta = timestamp - _EPOCH
+        start = (delta.days * 86400 + delta.seconds) // seconds * seconds
+        name = names.get(start)
+        if name is None:
+            label = (_EPOCH + timedelta(seconds=start)).isoformat()
+            name = f"urn:corona:interval:{label}Z/PT{seconds}S"
+            if len(names) < 4096:
+                names[start] = name
+        return name
+    return graph_name
+
+
+def format_nquads(metric: BaseMetric, graph: Optional[str]) -> str:
+    """Returns the N-Quads lines for a single metric in the named graph ``graph`` (None: the default graph)."""
+    end = f" {format_iri(graph)} .\n" if graph else " .\n"
+    subject = format_iri(metric.metric_instance_uri)
+    return "".join(f"{subject} {format_iri(p)} {format_term(o)}{end}" for p, o in metric_statements(metric))
+
+
+class NQuadsStreamWriter(NTriplesStreamWriter):
+    """Writes metrics as N-Quads, putting each metric's statements in the named graph given by ``graph_name``."""
+
+    def __init__(self, stream: TextIO, graph_name: Callable[[BaseMetric], Optional[str]] = observer_graph) -> None:
+        super().__init__(stream)
+        self.graph_name = graph_name
+
+    def format_metric(self, metric: BaseMetric) -> str:
+        """Returns the N-Quads lines for a single metric."""
+        return format_nquads(metric, self.graph_name(metric))
+
+
+def write_metrics_ttl(metrics: Iterable[BaseMetric], stream: TextIO) -> int:
+    """Streams ``metrics`` to ``stream`` as Turtle; returns the number of metrics written."""
+    return TurtleStreamWriter(stream).write_all(metrics)
+
+
+def write_metrics_ntriples(metrics: Iterable[BaseMetric], stream: TextIO) -> int:
+    """Streams ``metrics`` to ``stream`` as N-Triples; returns the number of metrics written."""
+    return NTriplesStreamWriter(stream).write_all(metrics)
+
+
+def write_metrics_nquads(metrics: Iterable[BaseMetric], stream: TextIO,
+                         graph_name: Callable[[BaseMetric], Optional[str]] = observer_graph) -> int:
+    """Streams ``metrics`` to ``stream`` as N-Quads; returns the number of metrics written."""
+    return NQuadsStreamWriter(stream, graph_name).write_all(metrics)
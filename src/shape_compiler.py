@@ -0,0 +1,479 @@
+"""Compile SHACL shapes into native Python checks for metric objects.
+
+Most constraints in ``data/corona-shapes.ttl`` are simple per-value or
+cardinality checks (``sh:datatype``, ``sh:minCount``/``sh:maxCount``,
+``sh:pattern``, ``sh:nodeKind``). ``compile_shapes`` reads a shapes graph once
+and turns every ``sh:targetClass`` node shape into plain Python check
+functions that run directly against the statements of a ``BaseMetric`` (as
+produced by ``rdf_writer.metric_statements``) or against ``MetricBatch``
+columns, without building an rdflib graph.
+
+Constraints that cannot be compiled (``sh:class``, ``sh:node``, logical and
+SPARQL constraints, non-IRI paths, ...) are recorded per shape; the validator
+can fall back to pyshacl for exactly those constraints.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from pyshacl import validate
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS, XSD
+from rdflib.term import Node
+
+from .batch import CounterColumn, FloatColumn, MetricBatch, StringColumn, ValueColumn
+from .chunked_validation import SH
+from .constants import CORONA
+from .models import BaseMetric, get_serialization_plan
+from .rdf_writer import format_ntriples, metadata_statement, metric_statements, type_statement, value_object
+
+# Object terms use the rdf_writer layout: ('iri', value), ('bnode', id) or ('literal', lexical, datatype IRI or None)
+Obj = Tuple[Any, ...]
+# The object a batch column holds for a row, or None
+ColumnReader = Callable[[int], Optional[Obj]]
+
+_RDF_LANGSTRING = str(RDF.langString)
+_XSD_STRING = str(XSD.string)
+_XSD_INTEGER = str(XSD.integer)
+
+# Property shape parameters that carry no constraint
+_NON_CONSTRAINT_PARAMETERS = {SH.path, SH.description, SH.name, SH.message, SH.severity, SH.order, SH.group, SH.defaultValue, SH.deactivated, RDF.type}
+_RANGE_OPERATORS: Dict[Node, str] = {SH.minInclusive: '>=', SH.minExclusive: '>', SH.maxInclusive: '<=', SH.maxExclusive: '<'}
+_NODE_SHAPE_PARAMETERS = {SH.targetClass, SH.property, SH.description, SH.name, SH.message, SH.severity, SH.deactivated, RDF.type, RDFS.label, RDFS.comment}
+
+_INTEGER_RANGES: Dict[str, Tuple[Optional[int], Optional[int]]] = {
+    str(XSD.integer): (None, None),
+    str(XSD.long): (-2**63, 2**63 - 1),
+    str(XSD.int): (-2**31, 2**31 - 1),
+    str(XSD.short): (-2**15, 2**15 - 1),
+    str(XSD.byte): (-2**7, 2**7 - 1),
+    str(XSD.nonNegativeInteger): (0, None),
+    str(XSD.positiveInteger): (1, None),
+    str(XSD.nonPositiveInteger): (None, 0),
+    str(XSD.negativeInteger): (None, -1),
+    str(XSD.unsignedLong): (0, 2**64 - 1),
+    str(XSD.unsignedInt): (0, 2**32 - 1),
+    str(XSD.unsignedShort): (0, 2**16 - 1),
+    str(XSD.unsignedByte): (0, 2**8 - 1),
+}
+_INTEGER_LEXICAL = re.compile(r'^[+-]?[0-9]+$')
+_FLOAT_LEXICAL = re.compile(r'^([+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][+-]?[0-9]+)?|[+-]?INF|NaN)$')
+_DECIMAL_LEXICAL = re.compile(r'^[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)$')
+_DATETIME_LEXICAL = re.compile(r'^-?[0-9]{4,}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}(\.[0-9]+)?(Z|[+-][0-9]{2}:[0-9]{2})?$')
+_DATE_LEXICAL = re.compile(r'^-?[0-9]{4,}-[0-9]{2}-[0-9]{2}(Z|[+-][0-9]{2}:[0-9]{2})?$')
+_OTHER_LEXICAL = {
+    str(XSD.float): _FLOAT_LEXICAL,
+    str(XSD.double): _FLOAT_LEXICAL,
+    str(XSD.decimal): _DECIMAL_LEXICAL,
+    str(XSD.dateTime): _DATETIME_LEXICAL,
+    str(XSD.date): _DATE_LEXICAL,
+    str(XSD.boolean): re.compile(r'^(true|false|1|0)$'),
+}
+
+
+def is_well_formed(lexical: str, datatype: str) -> bool:
+    """Returns False when ``lexical`` is not a valid lexical form for a known XSD datatype."""
+    bounds = _INTEGER_RANGES.get(datatype)
+    if bounds is not None:
+        if not _INTEGER_LEXICAL.match(lexical.strip()):
+            return False
+        value = int(lexical)
+        return (bounds[0] is None or value >= bounds[0]) and (bounds[1] is None or value <= bounds[1])
+    pattern = _OTHER_LEXICAL.get(datatype)
+    return pattern is None or bool(pattern.match(lexical.strip()))
+
+
+def object_from_term(term: Node) -> Obj:
+    """Converts an rdflib term to the object layout used by the compiled checks."""
+    if isinstance(term, Literal):
+        datatype = str(term.datatype) if term.datatype else (_RDF_LANGSTRING if term.language else None)
+        return ('literal', str(term), datatype)
+    if isinstance(term, BNode):
+        return ('bnode', str(term))
+    return ('iri', str(term))
+
+
+def _display(obj: Obj) -> str:
+    if obj[0] == 'iri':
+        return f"<{obj[1]}>"
+    if obj[0] == 'bnode':
+        return f"_:{obj[1]}"
+    return f'"{obj[1]}"' + (f"^^<{obj[2]}>" if obj[2] else "")
+
+
+class ShapeViolation(NamedTuple):
+    """A single validation result produced by a compiled check."""
+    focus_node: str
+    path: str
+    component: str
+    value: Optional[Obj]
+    message: str
+    severity: str
+    shape: str
+
+
+# A value check returns (component, message) when the value violates it, else None
+ValueCheck = Callable[[Obj], Optional[Tuple[str, str]]]
+
+
+def _compile_datatype(datatype: str) -> ValueCheck:
+    message = f"Value is not Literal with datatype {datatype}"
+
+    def check(obj: Obj) -> Optional[Tuple[str, str]]:
+        if obj[0] == 'literal':
+            actual = obj[2] if obj[2] is not None else _XSD_STRING
+            if actual == datatype and is_well_formed(obj[1], datatype):
+                return None
+            if datatype == str(RDFS.Literal):
+                return None
+        return ("DatatypeConstraintComponent", message)
+    return check
+
+
+# Object kinds (as in Obj) each sh:nodeKind allows
+_NODE_KINDS: Dict[Node, Set[str]] = {
+    SH.IRI: {'iri'}, SH.BlankNode: {'bnode'}, SH.Literal: {'literal'},
+    SH.BlankNodeOrIRI: {'iri', 'bnode'}, SH.BlankNodeOrLiteral: {'bnode', 'literal'}, SH.IRIOrLiteral: {'iri', 'literal'},
+}
+
+
+def _compile_node_kind(kind: Node) -> ValueCheck:
+    allowed = _NODE_KINDS[kind]
+    message = f"Value is not of Node Kind sh:{str(kind).split('#')[-1]}"
+
+    def check(obj: Obj) -> Optional[Tuple[str, str]]:
+        return None if obj[0] in allowed else ("NodeKindConstraintComponent", message)
+    return check
+
+
+def _compile_pattern(pattern: str, flags: str) -> ValueCheck:
+    regex = re.compile(pattern, (re.IGNORECASE if 'i' in flags else 0) | (re.MULTILINE if 'm' in flags else 0)
+                       | (re.DOTALL if 's' in flags else 0) | (re.VERBOSE if 'x' in flags else 0))
+    message = f"Value does not match pattern '{pattern}'"
+
+    def check(obj: Obj) -> Optional[Tuple[str, str]]:
+        # Blank nodes never match; IRIs and literals match on their string form
+        if obj[0] != 'bnode' and regex.search(obj[1]):
+            return None
+        return ("PatternConstraintComponent", message)
+    return check
+
+
+def _compile_length(limit: int, is_min: bool) -> ValueCheck:
+    component = "MinLengthConstraintComponent" if is_min else "MaxLengthConstraintComponent"
+    message = f"String length not {'>=' if is_min else '<='} {limit}"
+
+    def check(obj: Obj) -> Optional[Tuple[str, str]]:
+        if obj[0] != 'bnode' and (len(obj[1]) >= limit if is_min else len(obj[1]) <= limit):
+            return None
+        return (component, message)
+    return check
+
+
+def _compile_range(bound: Node, op: str) -> ValueCheck:
+    component = {'>=': "MinInclusiveConstraintComponent", '>': "MinExclusiveConstraintComponent",
+                 '<=': "MaxInclusiveConstraintComponent", '<': "MaxExclusiveConstraintComponent"}[op]
+    limit = Decimal(str(bound))
+    message = f"Value is not {op} {bound}"
+
+    def check(obj: Obj) -> Optional[Tuple[str, str]]:
+        if obj[0] == 'literal':
+            try:
+                value = Decimal(obj[1])
+            except InvalidOperation:
+                return (component, message)
+            if {'>=': value >= limit, '>': value > limit, '<=': value <= limit, '<': value < limit}[op]:
+                return None
+        return (component, message)
+    return check
+
+
+class CompiledPropertyShape:
+    """Native checks for one ``sh:property`` shape with an IRI path."""
+
+    def __init__(self, node_shape: str, path: str, severity: str) -> None:
+        self.node_shape = node_shape
+        self.path = path
+        self.severity = severity
+        self.min_count: Optional[int] = None
+        self.max_count: Optional[int] = None
+        self.value_checks: List[ValueCheck] = []
+
+    def check_values(self, focus: str, values: List[Obj]) -> Iterator[ShapeViolation]:
+        """Checks the values of ``path`` on one focus node."""
+        if self.min_count is not None and len(values) < self.min_count:
+            yield ShapeViolation(focus, self.path, "MinCountConstraintComponent", None,
+                                 f"Less than {self.min_count} values on <{focus}>->{self.path}", self.severity, self.node_shape)
+        if self.max_count is not None and len(values) > self.max_count:
+            yield ShapeViolation(focus, self.path, "MaxCountConstraintComponent", None,
+                                 f"More than {self.max_count} values on <{focus}>->{self.path}", self.severity, self.node_shape)
+        for value in values:
+            for check in self.value_checks:
+                failure = check(value)
+                if failure is not None:
+                    yield ShapeViolation(focus, self.path, failure[0], value, failure[1], self.severity, self.node_shape)
+
+
+class CompiledNodeShape:
+    """A ``sh:targetClass`` node shape: its compiled property checks and the constraints left to pyshacl."""
+
+    def __init__(self, shape: str, target_classes: Set[str]) -> None:
+        self.shape = shape
+        self.target_classes = target_classes
+        self.properties: List[CompiledPropertyShape] = []
+        # (path or None for node-level, constraint parameter IRI) pairs that were not compiled
+        self.uncompiled: List[Tuple[Optional[str], str]] = []
+
+
+class CompiledShapes:
+    """Compiled shapes for every target class, with pyshacl fallback for constraints that could not be compiled."""
+
+    def __init__(self, shapes_graph: Graph, ontology_graph: Optional[Graph] = None) -> None:
+        self.shapes_graph = shapes_graph
+        self.node_shapes: List[CompiledNodeShape] = []
+        self._superclasses = _superclass_closure([g for g in (shapes_graph, ontology_graph) if g is not None])
+        self._by_types: Dict[FrozenSet[str], Tuple[List[CompiledPropertyShape], bool]] = {}
+        for shape in set(shapes_graph.subjects(SH.targetClass, None)):
+            self.node_shapes.append(self._compile_node_shape(shape))
+
+    def _compile_node_shape(self, shape: Node) -> CompiledNodeShape:
+        g = self.shapes_graph
+        compiled = CompiledNodeShape(str(shape), {str(c) for c in g.objects(shape, SH.targetClass)})
+        for p in set(g.predicates(shape, None)):
+            if p not in _NODE_SHAPE_PARAMETERS:
+                compiled.uncompiled.append((None, str(p)))
+        node_severity = g.value(shape, SH.severity) or SH.Violation
+        for prop in g.objects(shape, SH.property):
+            if (prop, SH.deactivated, Literal(True)) in g:
+                continue
+            path = g.value(prop, SH.path)
+            if not isinstance(path, URIRef):
+                compiled.uncompiled.extend((None, str(p)) for p in set(g.predicates(prop, None)) if p not in _NON_CONSTRAINT_PARAMETERS)
+                continue
+            severity = str(g.value(prop, SH.severity) or node_severity).split('#')[-1]
+            property_shape = CompiledPropertyShape(compiled.shape, str(path), severity)
+            flags = str(g.value(prop, SH.flags) or "")
+            for parameter, value in g.predicate_objects(prop):
+                if parameter in _NON_CONSTRAINT_PARAMETERS or parameter == SH.flags:
+                    continue
+                if parameter == SH.datatype:
+                    property_shape.value_checks.append(_compile_datatype(str(value)))
+                elif parameter == SH.minCount:
+                    property_shape.min_count = int(str(value))
+                elif parameter == SH.maxCount:
+                    property_shape.max_count = int(str(value))
+                elif parameter == SH.pattern:
+                    property_shape.value_checks.append(_compile_pattern(str(value), flags))
+                elif parameter == SH.nodeKind:
+                    property_shape.value_checks.append(_compile_node_kind(value))
+                elif parameter in (SH.minLength, SH.maxLength):
+                    property_shape.value_checks.append(_compile_length(int(str(value)), parameter == SH.minLength))
+                elif parameter in _RANGE_OPERATORS:
+                    property_shape.value_checks.append(_compile_range(value, _RANGE_OPERATORS[parameter]))
+                else:
+                    compiled.uncompiled.append((str(path), str(parameter)))
+            compiled.properties.append(property_shape)
+        return compiled
+
+    @property
+    def uncompiled(self) -> List[Tuple[str, Optional[str], str]]:
+        """(node shape, path, parameter) for every constraint that is left to pyshacl."""
+        return [(ns.shape, path, param) for ns in self.node_shapes for path, param in ns.uncompiled]
+
+    def types_with_superclasses(self, types: Iterable[str]) -> FrozenSet[str]:
+        result: Set[str] = set()
+        for t in types:
+            result.add(t)
+            result.update(self._superclasses.get(t, ()))
+        return frozenset(result)
+
+    def checks_for(self, types: Iterable[str]) -> Tuple[List[CompiledPropertyShape], bool]:
+        """Returns the property checks applying to a node with ``types`` and whether any fallback applies."""
+        key = frozenset(types)
+        cached = self._by_types.get(key)
+        if cached is None:
+            all_types = self.types_with_superclasses(key)
+            applicable = [ns for ns in self.node_shapes if ns.target_classes & all_types]
+            cached = self._by_types[key] = (
+                [p for ns in applicable for p in ns.properties],
+                any(ns.uncompiled for ns in applicable),
+            )
+        return cached
+
+
+def _superclass_closure(graphs: List[Graph]) -> Dict[str, Set[str]]:
+    parents: Dict[str, Set[str]] = {}
+    for graph in graphs:
+        for s, o in graph.subject_objects(RDFS.subClassOf):
+            parents.setdefault(str(s), set()).add(str(o))
+    closure: Dict[str, Set[str]] = {}
+    for cls in parents:
+        seen: Set[str] = set()
+        stack = list(parents[cls])
+        while stack:
+            parent = stack.pop()
+            if parent not in seen:
+                seen.add(parent)
+                stack.extend(parents.get(parent, ()))
+        closure[cls] = seen
+    return closure
+
+
+def compile_shapes(shapes: Union[Graph, str], ontology: Union[Graph, str, None] = None) -> CompiledShapes:
+    """Compiles a shapes graph (or a Turtle file path) into native checks."""
+    shapes_graph = shapes if isinstance(shapes, Graph) else Graph().parse(shapes, format="turtle")
+    ontology_graph = ontology if isinstance(ontology, Graph) or ontology is None else Graph().parse(ontology, format="turtle")
+    return CompiledShapes(shapes_graph, ontology_graph)
+
+
+def _group_by_predicate(statements: Iterable[Tuple[str, Obj]]) -> Dict[str, List[Obj]]:
+    grouped: Dict[str, List[Obj]] = {}
+    for predicate, obj in statements:
+        # Plans hold URIRef predicates, which never compare equal to plain strings
+        grouped.setdefault(str(predicate), []).append(obj)
+    return grouped
+
+
+def _counter_reader(column: CounterColumn, datatype: str) -> ColumnReader:
+    def read(row: int) -> Optional[Obj]:
+        value = column[row]
+        return None if value is None else ('literal', str(value), datatype)
+    return read
+
+
+def _float_reader(column: FloatColumn, datatype: Optional[str]) -> ColumnReader:
+    def read(row: int) -> Optional[Obj]:
+        value = column[row]
+        if value is None:
+            return None
+        return value_object(value) if datatype is None else ('literal', str(value), datatype)
+    return read
+
+
+def _value_reader(column: ValueColumn) -> ColumnReader:
+    def read(row: int) -> Optional[Obj]:
+        value = column[row]
+        return None if value is None else value_object(value)
+    return read
+
+
+def _metadata_reader(name: str, column: StringColumn, skip_if: Optional[StringColumn] = None) -> ColumnReader:
+    def read(row: int) -> Optional[Obj]:
+        value = column[row]
+        if not value or (skip_if is not None and skip_if[row]):
+            return None
+        return metadata_statement(name, value)[1]
+    return read
+
+
+class ShapeValidator:
+    """Validates metrics, batches or graphs with compiled shapes, optionally falling back to pyshacl."""
+
+    def __init__(self, compiled: CompiledShapes, fallback: bool = True) -> None:
+        self.compiled = compiled
+        self.fallback = fallback
+        self._fallback_keys = {(path, param) for _, path, param in compiled.uncompiled}
+
+    def validate_statements(self, focus: str, statements: Iterable[Tuple[str, Obj]]) -> List[ShapeViolation]:
+        """Runs the native checks for one focus node given its (predicate, object) statements."""
+        grouped = _group_by_predicate(statements)
+        checks, _ = self.compiled.checks_for(str(o[1]) for o in grouped.get(str(RDF.type), ()) if o[0] == 'iri')
+        return [v for check in checks for v in check.check_values(focus, grouped.get(check.path, []))]
+
+    def validate_metric(self, metric: BaseMetric) -> List[ShapeViolation]:
+        """Validates one metric instance; uncompiled constraints go through pyshacl when fallback is enabled."""
+        statements = list(metric_statements(metric))
+        violations = self.validate_statements(metric.metric_instance_uri, statements)
+        _, needs_fallback = self.compiled.checks_for((str(type_statement(type(metric))[1][1]),))
+        if needs_fallback and self.fallback:
+            data = Graph().parse(data=format_ntriples(metric), format="nt")
+            violations.extend(self._fallback_violations(data))
+        return violations
+
+    def validate_batch(self, batch: MetricBatch) -> List[ShapeViolation]:
+        """Validates a ``MetricBatch`` column by column, checking each distinct value once."""
+        checks, needs_fallback = self.compiled.checks_for((str(type_statement(batch.metric_cls)[1][1]),))
+        plan = get_serialization_plan(batch.metric_cls)
+        rows = len(batch)
+        columns: Dict[str, ColumnReader] = {}
+        for field in plan.fields:
+            if field.name in batch.counters:
+                columns[str(field.predicate)] = _counter_reader(batch.counters[field.name], str(field.datatype or _XSD_INTEGER))
+            elif field.name in batch.floats:
+                columns[str(field.predicate)] = _float_reader(batch.floats[field.name], str(field.datatype) if field.datatype else None)
+            else:
+                columns[str(field.predicate)] = _value_reader(batch.values[field.name])
+        source_uris = batch.metadata['source_entity_uri']
+        for name, column in batch.metadata.items():
+            # sourceAddress is only emitted for readings without a source_entity_uri
+            columns[metadata_statement(name, "x")[0]] = _metadata_reader(name, column, source_uris if name == 'source_entity_address' else None)
+        type_obj = type_statement(batch.metric_cls)[1]
+        columns[str(RDF.type)] = lambda row: type_obj
+        columns[str(CORONA.observedAt)] = lambda row: value_object(batch.timestamp_at(row))
+
+        violations: List[ShapeViolation] = []
+        for check in checks:
+            reader = columns.get(check.path)
+            # Check each distinct object once; a batch's columns hold at most one value per reading
+            cache: Dict[Obj, List[ShapeViolation]] = {}
+            for row in range(rows):
+                focus = batch.instance_uris[row]
+                obj = reader(row) if reader else None
+                if obj is None:
+                    violations.extend(check.check_values(focus, []))
+                    continue
+                template = cache.get(obj)
+                if template is None:
+                    template = cache[obj] = list(check.check_values("", [obj]))
+                violations.extend(v._replace(focus_node=focus) for v in template)
+        if needs_fallback and self.fallback:
+            data = Graph().parse(data=batch.to_ntriples(), format="nt")
+            violations.extend(self._fallback_violations(data))
+        return violations
+
+    def validate_graph(self, data_graph: Graph) -> List[ShapeViolation]:
+        """Validates every typed subject of an rdflib graph; useful to compare against pyshacl."""
+        # SHACL class targets follow rdfs:subClassOf triples in the data graph as well
+        data_superclasses = _superclass_closure([data_graph])
+        violations: List[ShapeViolation] = []
+        for subject in set(data_graph.subjects(RDF.type, None)):
+            statements = [(str(p), object_from_term(o)) for p, o in data_graph.predicate_objects(subject)]
+            types = {o[1] for p, o in statements if p == str(RDF.type) and o[0] == 'iri'}
+            types.update(*(data_superclasses.get(t, ()) for t in list(types)))
+            checks, _ = self.compiled.checks_for(types)
+            grouped = _group_by_predicate(statements)
+            violations.extend(v for check in checks for v in check.check_values(str(subject), grouped.get(check.path, [])))
+        if self.fallback and any(ns.uncompiled for ns in self.compiled.node_shapes):
+            violations.extend(self._fallback_violations(data_graph))
+        return violations
+
+    def _fallback_violations(self, data_graph: Graph) -> Iterator[ShapeViolation]:
+        """Runs pyshacl and keeps only results for constraints that were not compiled natively."""
+        _, results, _ = validate(data_graph, shacl_graph=self.compiled.shapes_graph, inference=None, debug=False)
+        for result in results.objects(None, SH.result):
+            path = results.value(result, SH.resultPath)
+            component = str(results.value(result, SH.sourceConstraintComponent))
+            parameter = _COMPONENT_PARAMETERS.get(component)
+            if (str(path) if path is not None else None, parameter) not in self._fallback_keys and (None, parameter) not in self._fallback_keys:
+                continue
+            value = results.value(result, SH.value)
+            yield ShapeViolation(
+                str(results.value(result, SH.focusNode)),
+                str(path) if path is not None else "",
+                component.split('#')[-1],
+                object_from_term(value) if value is not None else None,
+                str(results.value(result, SH.resultMessage) or ""),
+                str(results.value(result, SH.resultSeverity)).split('#')[-1],
+                "",
+            )
+
+
+# Maps constraint components back to the shape parameter that declares them
+_COMPONENT_PARAMETERS = {
+    str(SH[name + "ConstraintComponent"]): str(SH[name[0].lower() + name[1:]])
+    for name in ("Class", "Node", "Property", "QualifiedMinCount", "QualifiedMaxCount", "Closed", "HasValue", "In",
+                 "Equals", "Disjoint", "LessThan", "LessThanOrEquals", "Not", "And", "Or", "Xone", "UniqueLang", "LanguageIn", "SPARQL")
+}
+_COMPONENT_PARAMETERS[str(SH.QualifiedMinCountConstraintComponent)] = str(SH.qualifiedValueShape)
+_COMPONENT_PARAMETERS[str(SH.QualifiedMaxCountConstraintComponent)] = str(SH.qualifiedValueShape)
+_COMPONENT_PARAMETERS[str(SH.SPARQLConstraintComponent)] = str(SH.sparql)
@@ -0,0 +1,177 @@
+"""Stream NDJSON metric records to any output format in constant memory.
+
+``corona-cli generate`` renders a handful of demo metrics into one string.
+``convert_stream`` instead reads NDJSON records one line at a time, each a
+metric's fields plus a ``type`` naming its model class (the same shape as the
+daemon's ``convert`` items), and writes each metric as soon as it is parsed.
+Memory stays flat however large the input is.
+
+Output formats are ``ttl`` and ``ntriples`` (the ``rdf_writer`` stream
+writers), ``prometheus``, ``haystack`` (a JSON array written incrementally),
+``haystack-grid`` and ``zinc`` (one grid row per metric, see ``haystack``) and
+``ndjson`` (the input shape, so conversions round-trip).
+"""
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Type
+
+from pydantic import ValidationError
+
+from .change_filter import ChangeFilter
+from .haystack import HaystackGridWriter, ZincGridWriter
+from .models import BaseMetric, get_metric_class
+from .rdf_writer import NQuadsStreamWriter, NTriplesStreamWriter, TurtleStreamWriter
+
+OUTPUT_FORMATS = ('ttl', 'ntriples', 'nquads', 'prometheus', 'haystack', 'haystack-grid', 'zinc', 'ndjson')
+
+
+class RecordError(NamedTuple):
+    """An input line that could not be turned into a metric."""
+    line: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"line {self.line}: {self.message}"
+
+
+def _record_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        first = error.errors(include_url=False)[0]
+        location = ".".join(str(part) for part in first['loc'])
+        return f"{error.error_count()} validation error(s), first: {location}: {first['msg']}"
+    return str(error)
+
+
+def read_ndjson_metrics(lines: Iterable[str], default_type: Optional[str] = None,
+                        errors: Optional[List[RecordError]] = None) -> Iterator[BaseMetric]:
+    """Yields a metric per non-blank NDJSON line.
+
+    Records name their model class in ``type``; ``default_type`` is used for
+    records without one. Bad records raise ``ValueError`` unless an ``errors``
+    list is given, in which case they are recorded there and skipped.
+    """
+    classes: Dict[str, Type[BaseMetric]] = {}
+    default_cls = get_metric_class(default_type) if default_type else None
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            if default_cls is not None and '"type"' not in line:
+                # No discriminator to look at, so pydantic can parse the JSON itself
+                yield default_cls.model_validate_json(line)
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record is not a JSON object")
+            type_name = record.pop('type', None) or default_type
+            if not type_name:
+                raise ValueError("record is missing its 'type'")
+            metric_cls = classes.get(type_name)
+            if metric_cls is None:
+                metric_cls = classes[type_name] = get_metric_class(type_name)
+            yield metric_cls.model_validate(record)
+        except ValueError as e:  # includes json.JSONDecodeError and pydantic's ValidationError
+            error = RecordError(number, _record_message(e))
+            if errors is None:
+                raise ValueError(str(error)) from e
+            errors.append(error)
+
+
+def metric_to_ndjson(metric: BaseMetric) -> str:
+    """Encodes a metric as one NDJSON record (without the newline), readable by ``read_ndjson_metrics``."""
+    return f'{{"type":"{type(metric).__name__}",{metric.model_dump_json()[1:]}'
+
+
+class PrometheusStreamWriter:
+    """Writes each metric's Prometheus exposition lines as it arrives."""
+
+    def __init__(self, stream: TextIO, prefix: str = "bacnet") -> None:
+        self.stream = stream
+        self.prefix = prefix
+        self.metrics_written = 0
+
+    def write_header(self) -> None:
+        """Prometheus text has no header."""
+
+    def write_metric(self, metric: BaseMetric) -> None:
+        lines = metric.to_prometheus(self.prefix)
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+        self.metrics_written += 1
+
+    def write_footer(self) -> None:
+        """Prometheus text has no footer."""
+
+
+class HaystackStreamWriter:
+    """Writes Haystack rows as a single JSON array, identical to ``json.dumps`` of the whole list."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.metrics_written = 0
+        self._separator = ""
+
+    def write_header(self) -> None:
+        self.stream.write("[")
+
+    def write_metric(self, metric: BaseMetric) -> None:
+        for row in metric.to_haystack_json():
+            self.stream.write(self._separator + json.dumps(row))
+            self._separator = ", "
+        self.metrics_written += 1
+
+    def write_footer(self) -> None:
+        self.stream.write("]\n")
+
+
+class NDJSONStreamWriter:
+    """Writes one NDJSON record per metric."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.metrics_written = 0
+
+    def write_header(self) -> None:
+        """NDJSON has no header."""
+
+    def write_metric(self, metric: BaseMetric) -> None:
+        self.stream.write(metric_to_ndjson(metric) + "\n")
+        self.metrics_written += 1
+
+    def write_footer(self) -> None:
+        """NDJSON has no footer."""
+
+
+_WRITERS: Dict[str, Callable[..., object]] = {
+    'ttl': TurtleStreamWriter,
+    'ntriples': NTriplesStreamWriter,
+    'nquads': NQuadsStreamWriter,
+    'prometheus': PrometheusStreamWriter,
+    'haystack': HaystackStreamWriter,
+    'haystack-grid': HaystackGridWriter,
+    'zinc': ZincGridWriter,
+    'ndjson': NDJSONStreamWriter,
+}
+
+
+def stream_writer(output_format: str, stream: TextIO, **options: Any):
+    """Returns the stream writer for one of ``OUTPUT_FORMATS``; ``options`` go to its constructor (e.g. ``graph_name`` for nquads)."""
+    try:
+        writer_cls = _WRITERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unknown output format '{output_format}'") from None
+    return writer_cls(stream, **options)
+
+
+def convert_stream(lines: Iterable[str], stream: TextIO, output_format: str, default_type: Optional[str] = None,
+                   errors: Optional[List[RecordError]] = None, changes: Optional[ChangeFilter] = None, **options: Any) -> int:
+    """Converts NDJSON ``lines`` to ``output_format`` on ``stream`` one record at a time; returns the metrics written.
+
+    With ``changes``, only what that ``ChangeFilter`` lets through is written.
+    """
+    writer = stream_writer(output_format, stream, **options)
+    writer.write_header()
+    metrics = read_ndjson_metrics(lines, default_type, errors)
+    for metric in metrics if changes is None else changes.filter_all(metrics):
+        writer.write_metric(metric)
+    writer.write_footer()
+    return writer.metrics_written
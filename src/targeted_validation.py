@@ -0,0 +1,208 @@
+"""Shape-targeted SHACL validation against a precomputed class hierarchy.
+
+``pyshacl.validate(..., inference="rdfs")`` expands the whole data graph with
+every RDFS entailment on each call, although the shapes only care whether a
+node is an instance of a class they target or constrain with ``sh:class``, and
+about the few predicates they use as paths. ``TargetedValidator`` instead:
+
+* computes the class and property hierarchy (``rdfs:subClassOf``,
+  ``rdfs:subPropertyOf``, ``rdfs:domain``, ``rdfs:range``) once, from the
+  cached RDFS closure of the ontology (``graph_cache.load_rdfs_closure``),
+  extended per run with the schema triples found in the data;
+* adds to a copy of the data graph only the entailed ``rdf:type`` triples for
+  classes the shapes mention, and super-property triples for predicates the
+  shapes use as paths;
+* skips node shapes whose target classes have no instances, and runs pyshacl
+  over the remaining shapes with inference turned off.
+
+Results match RDFS-inferred validation for shapes that only depend on those
+types and paths, which covers every shape in ``data/corona-shapes.ttl``.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from pyshacl import validate
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS
+from rdflib.term import Node
+
+from .chunked_validation import SH, ValidationReportBuilder, schema_subjects
+from .graph_cache import content_hash, load_graph, load_rdfs_closure
+
+_TARGET_PREDICATES = (SH.targetNode, SH.targetSubjectsOf, SH.targetObjectsOf, SH.target)
+
+
+class Hierarchy(NamedTuple):
+    """Transitive super-classes and super-properties, plus declared domains and ranges."""
+    superclasses: Dict[Node, Set[Node]]
+    superproperties: Dict[Node, Set[Node]]
+    domains: Dict[Node, Set[Node]]
+    ranges: Dict[Node, Set[Node]]
+
+
+class TargetPlan(NamedTuple):
+    """What ``TargetedValidator.prepare`` decided for one data graph."""
+    graph: Graph
+    shapes: List[Node]
+    skipped: List[Node]
+    inferred: int
+
+    def summary(self) -> str:
+        return f"Validated {len(self.shapes)} of {len(self.shapes) + len(self.skipped)} shapes, {self.inferred} inferred triples"
+
+
+def _transitive(pairs: Iterable[Tuple[Node, Node]]) -> Dict[Node, Set[Node]]:
+    parents: Dict[Node, Set[Node]] = {}
+    for child, parent in pairs:
+        if child != parent:
+            parents.setdefault(child, set()).add(parent)
+    closure: Dict[Node, Set[Node]] = {}
+    for node in parents:
+        seen: Set[Node] = set()
+        stack = list(parents[node])
+        while stack:
+            parent = stack.pop()
+            if parent not in seen and parent != node:
+                seen.add(parent)
+                stack.extend(parents.get(parent, ()))
+        closure[node] = seen
+    return closure
+
+
+def hierarchy(graphs: Iterable[Graph]) -> Hierarchy:
+    """Reads the class and property hierarchy of ``graphs`` into transitive lookup tables."""
+    graphs = list(graphs)
+    domains: Dict[Node, Set[Node]] = {}
+    ranges: Dict[Node, Set[Node]] = {}
+    for graph in graphs:
+        for p, c in graph.subject_objects(RDFS.domain):
+            domains.setdefault(p, set()).add(c)
+        for p, c in graph.subject_objects(RDFS.range):
+            ranges.setdefault(p, set()).add(c)
+    return Hierarchy(
+        _transitive(pair for graph in graphs for pair in graph.subject_objects(RDFS.subClassOf)),
+        _transitive(pair for graph in graphs for pair in graph.subject_objects(RDFS.subPropertyOf)),
+        domains,
+        ranges,
+    )
+
+
+class TargetedValidator:
+    """Validates data graphs against a shapes graph without running RDFS inference over them."""
+
+    def __init__(self, shapes_graph: Graph, ontology_graph: Optional[Graph] = None) -> None:
+        self.shapes_graph = shapes_graph
+        self._schema = [g for g in (ontology_graph,) if g is not None]
+        self.hierarchy = hierarchy(self._schema)
+        g = shapes_graph
+        # Classes whose instances the shapes look at, and the predicates they follow
+        self.classes: Set[Node] = set(g.objects(None, SH.targetClass)) | set(g.objects(None, SH["class"]))
+        self.paths: Set[Node] = {p for p in g.objects(None, SH.path) if isinstance(p, URIRef)}
+        self.shape_targets: Dict[Node, Optional[Set[Node]]] = {}
+        for shape in set(g.subjects(SH.targetClass, None)) | {s for p in _TARGET_PREDICATES for s in g.subjects(p, None)}:
+            classes = set(g.objects(shape, SH.targetClass))
+            # Implicit class targets and other target kinds can't be ruled out by class alone
+            implicit = (shape, RDF.type, RDFS.Class) in g or (shape, RDF.type, OWL.Class) in g
+            other = any((shape, p, None) in g for p in _TARGET_PREDICATES)
+            self.shape_targets[shape] = None if implicit or other else classes
+            if implicit:
+                self.classes.add(shape)
+
+    def prepare(self, data_graph: Graph) -> TargetPlan:
+        """Returns a copy of ``data_graph`` with the entailments the shapes need, and the shapes worth running."""
+        schema = schema_subjects(data_graph)
+        if schema:
+            data_schema = Graph()
+            for s in schema:
+                for triple in data_graph.triples((s, None, None)):
+                    data_schema.add(triple)
+            h = hierarchy(self._schema + [data_schema])
+        else:
+            h = self.hierarchy
+
+        graph = Graph()
+        for prefix, namespace in data_graph.namespaces():
+            graph.bind(prefix, namespace, override=False)
+        graph += data_graph
+        inferred = 0
+
+        for p, supers in h.superproperties.items():
+            needed = supers & self.paths
+            if needed:
+                for s, o in data_graph.subject_objects(p):
+                    for q in needed:
+                        if (s, q, o) not in graph:
+                            graph.add((s, q, o))
+                            inferred += 1
+
+        def needed_types(classes: Iterable[Node]) -> Set[Node]:
+            needed = set()
+            for c in classes:
+                if c in self.classes:
+                    needed.add(c)
+                needed.update(h.superclasses.get(c, set()) & self.classes)
+            return needed
+
+        def add_types(node: Node, types: Iterable[Node]) -> int:
+            added = 0
+            for c in types:
+                if (node, RDF.type, c) not in graph:
+                    graph.add((node, RDF.type, c))
+                    added += 1
+            return added
+
+        # Super-classes of asserted types, then types implied by domains and ranges (of a predicate or its super-properties)
+        for c in set(data_graph.objects(None, RDF.type)):
+            needed = needed_types([c]) - {c}
+            if needed:
+                for s in data_graph.subjects(RDF.type, c):
+                    inferred += add_types(s, needed)
+        candidates: Dict[Node, Set[Node]] = {}
+        for p in set(h.domains) | set(h.ranges) | set(h.superproperties):
+            props = {p} | h.superproperties.get(p, set())
+            domain = set().union(*(h.domains.get(q, ()) for q in props))
+            range_ = set().union(*(h.ranges.get(q, ()) for q in props))
+            if not domain and not range_:
+                continue
+            for s, o in data_graph.subject_objects(p):
+                if domain:
+                    candidates.setdefault(s, set()).update(domain)
+                if range_ and not isinstance(o, Literal):
+                    candidates.setdefault(o, set()).update(range_)
+
+        for node, types in candidates.items():
+            inferred += add_types(node, needed_types(types))
+
+        present = set(graph.objects(None, RDF.type))
+        shapes: List[Node] = []
+        skipped: List[Node] = []
+        for shape, classes in self.shape_targets.items():
+            (shapes if classes is None or classes & present else skipped).append(shape)
+        return TargetPlan(graph, sorted(shapes, key=str), sorted(skipped, key=str), inferred)
+
+    def validate(self, data_graph: Graph, plan: Optional[TargetPlan] = None) -> Tuple[bool, Graph, str]:
+        """Returns ``(conforms, results_graph, results_text)`` like ``pyshacl.validate(..., inference="rdfs")``.
+
+        ``plan`` is ``prepare(data_graph)`` if the caller already has it.
+        """
+        if plan is None:
+            plan = self.prepare(data_graph)
+        if not plan.shapes:
+            return ValidationReportBuilder().build()
+        # pyshacl can only select named shapes; with a blank node shape in play, run them all
+        named: List[Union[str, URIRef]] = [s for s in plan.shapes if isinstance(s, URIRef)]
+        use_shapes = named if plan.skipped and len(named) == len(plan.shapes) else None
+        return validate(plan.graph, shacl_graph=self.shapes_graph, inference=None, use_shapes=use_shapes, debug=False)
+
+
+# (shapes hash, ontology hash) -> validator, so repeated validations in one process share the hierarchy
+_validators: Dict[Tuple[str, Optional[str]], TargetedValidator] = {}
+
+
+def load_targeted_validator(shapes_path: str, ontology_path: Optional[str] = None, use_cache: bool = True) -> TargetedValidator:
+    """Builds (once per process) a validator for a shapes file and the RDFS closure of an ontology file."""
+    key = (content_hash(shapes_path), content_hash(ontology_path) if ontology_path else None)
+    validator = _validators.get(key)
+    if validator is None:
+        ontology = load_rdfs_closure(ontology_path, use_cache=use_cache) if ontology_path else None
+        validator = _validators[key] = TargetedValidator(load_graph(shapes_path, use_cache=use_cache), ontology)
+    return validator
@@ -1,7 +1,12 @@
-from rdflib import Graph, RDF, RDFS
+from rdflib import Graph
 from pyshacl import validate
+import json
 import os
-from .constants import CORONA
+from .chunked_validation import validate_chunked
+from .graph_cache import content_hash, load_graph
+from .ontology_index import OntologyIndex
+from .targeted_validation import load_targeted_validator
+from .validation_cache import ValidationCache, validate_cached
 
 # File paths - get absolute paths based on script location
 script_dir = os.path.dirname(os.path.abspath(__file__)) # src directory
@@ -12,8 +17,19 @@ example_model_path = os.path.join(project_root, "examples", "corona-ASHRAE135ct.
 shapes_file_path = os.path.join(project_root, "data", "corona-shapes.ttl")
 ontology_path = os.path.join(project_root, "data", "corona-ontology.ttl")
 
-def validate_model(model_path: str | None = None, analyze_flag: bool = False) -> None:
-    """Validates a given model file against SHACL shapes and optionally analyzes the ontology."""
+def validate_model(model_path: str | None = None, analyze_flag: bool = False, chunk_size: int | None = None, workers: int = 1,
+                   use_cache: bool = True, result_cache: ValidationCache | None = None, targeted: bool = False) -> bool:
+    """Validates a given model file against SHACL shapes and optionally analyzes the ontology.
+
+    When ``chunk_size`` is given the data graph is validated in chunks of that many metric
+    instances (across ``workers`` processes) and the results are merged into one report; this
+    bounds pyshacl's working memory, but the data file is still parsed into one graph first.
+    The shapes (and ontology) graphs are loaded through the on-disk parse cache unless
+    ``use_cache`` is False. With a ``result_cache`` only metric instances it has no verdict
+    for are validated (see ``validation_cache``). With ``targeted`` the data is expanded from the
+    precomputed ontology hierarchy instead of full RDFS inference and shapes without instances are
+    skipped (see ``targeted_validation``). Returns True if the model conforms.
+    """
     # Use the provided model path if available, otherwise use the default example
     effective_model_path = model_path if model_path else example_model_path
 
@@ -31,26 +47,43 @@ def validate_model(model_path: str | None = None, analyze_flag: bool = False) ->
     except Exception as e:
         print(f"An error occurred while processing the model file: {effective_model_path}")
         print(f"Error: {e}")
-        return  # Return instead of sys.exit
+        return False  # Return instead of sys.exit
 
     # Load the SHACL shapes
-    shapes_graph = Graph()
     try:
-        shapes_graph.parse(current_shapes_file_path, format="turtle")
+        shapes_graph = load_graph(current_shapes_file_path, format="turtle", use_cache=use_cache)
         print(f"Loaded SHACL shapes from {current_shapes_file_path}")
         print(f"Shapes graph contains {len(shapes_graph)} triples")
     except Exception as e:
         print(f"An error occurred while processing the shapes file: {current_shapes_file_path}")
         print(f"Error: {e}")
-        return  # Return instead of sys.exit
+        return False  # Return instead of sys.exit
 
     # Perform validation
-    conforms, results_graph, results_text = validate(
-        data_graph,
-        shacl_graph=shapes_graph,
-        inference="rdfs",  # Enable RDFS reasoning
-        debug=False
-    )
+    if targeted and chunk_size:
+        raise ValueError("Targeted validation cannot be combined with chunking")
+    validator = load_targeted_validator(current_shapes_file_path, current_ontology_path, use_cache=use_cache) if targeted else None
+    if result_cache is not None:
+        conforms, results_graph, results_text = validate_cached(
+            data_graph, shapes_graph, result_cache, content_hash(current_shapes_file_path),
+            inference="rdfs", chunk_size=chunk_size, workers=workers, targeted=validator
+        )
+        print(result_cache.stats().summary())
+    elif validator is not None:
+        plan = validator.prepare(data_graph)
+        print(plan.summary())
+        conforms, results_graph, results_text = validator.validate(data_graph, plan)
+    elif chunk_size:
+        conforms, results_graph, results_text = validate_chunked(
+            data_graph, shapes_graph, chunk_size=chunk_size, workers=workers, inference="rdfs"
+        )
+    else:
+        conforms, results_graph, results_text = validate(
+            data_graph,
+            shacl_graph=shapes_graph,
+            inference="rdfs",  # Enable RDFS reasoning
+            debug=False
+        )
 
     # Print results
     if conforms:
@@ -61,247 +94,49 @@ def validate_model(model_path: str | None = None, analyze_flag: bool = False) ->
 
     # Additional ontology analysis
     if analyze_flag:
-        analyze_ontology(current_ontology_path)  # Pass path to analyze_ontology
+        analyze_ontology(current_ontology_path, use_cache=use_cache)  # Pass path to analyze_ontology
+
+    return bool(conforms)
 
-def analyze_ontology(ont_path: str | None = ontology_path) -> None:
-    """Analyze the Corona ontology and print metrics statistics."""
-    print("\n--- Corona Ontology Analysis ---")
+def analyze_ontology(ont_path: str | None = ontology_path, use_cache: bool = True, json_output: bool = False) -> None:
+    """Analyze the Corona ontology and print metrics statistics, or the full index as JSON."""
+    if not json_output:
+        print("\n--- Corona Ontology Analysis ---")
 
     # Use the provided ontology path if available, otherwise use the default
     effective_ont_path = ont_path if ont_path else ontology_path
 
     # Load the ontology
-    ontology_graph = Graph()
     try:
-        ontology_graph.parse(effective_ont_path, format="turtle")
-        print(f"Successfully loaded the Corona ontology from {effective_ont_path}.")
-        print(f"Ontology contains {len(ontology_graph)} triples.")
+        ontology_graph = load_graph(effective_ont_path, format="turtle", use_cache=use_cache)
     except Exception as e:
         print(f"Error loading ontology: {e}")
         return
 
-    # Count metrics by type
-    count_metrics(ontology_graph)
-    
-    # List general metric properties
-    list_general_metric_properties(ontology_graph)
-    
-    # List message count metrics
-    list_message_count_metrics(ontology_graph)
-    
-    # List router-related metrics
-    list_router_metrics(ontology_graph)
-    
-    # List BBMD-related metrics
-    list_bbmd_metrics(ontology_graph)
-    
-    # List broadcast-related metrics
-    list_broadcast_metrics(ontology_graph)
-    
-    # List COV notification metrics
-    list_cov_metrics(ontology_graph)
-    
-    # List Who* service metrics (WhoIs and WhoHas)
-    list_who_metrics(ontology_graph)
-
-def count_metrics(graph):
-    """Count the different types of metrics in the graph."""
-    # Network interface metrics
-    network_metrics = list(graph.subjects(predicate=RDFS.subPropertyOf, 
-                                        object=CORONA.NetworkInterfaceMetric))
-    print(f"Network interface metrics: {len(network_metrics)}")
-    
-    # Application metrics with domain ApplicationMetric
-    app_metrics = list(graph.subjects(predicate=RDFS.domain, 
-                                   object=CORONA.ApplicationMetric))
-    print(f"Application metrics: {len(app_metrics)}")
-    
-    # Lifetime metrics
-    lifetime_metrics = list(graph.subjects(predicate=RDFS.subPropertyOf, 
-                                        object=CORONA.LifetimeMetric))
-    print(f"Lifetime metrics: {len(lifetime_metrics)}")
-
-def list_router_metrics(graph):
-    """List all router-related metrics."""
-    print("\n=== Router-Related Metrics ===")
-    
-    router_metrics = []
-    
-    # Find metrics with 'routed' or 'messagesRouted' in their name
-    for s, p, o in graph.triples((None, RDF.type, RDF.Property)):
-        if 'routed' in str(s).lower() or 'messagesRouted' in str(s):
-            # Get the label if available
-            labels = list(graph.objects(s, RDFS.label))
-            label = labels[0] if labels else "No label"
-            
-            # Get the comment if available
-            comments = list(graph.objects(s, RDFS.comment))
-            comment = comments[0] if comments else "No description"
-            
-            router_metrics.append((s, label, comment))
-    
-    # Sort by name and print
-    for s, label, comment in sorted(router_metrics, key=lambda x: str(x[0])):
-        print(f"  - {s}")
-        print(f"    Label: {label}")
-        print(f"    Description: {comment}")
-        print()
-
-def list_bbmd_metrics(graph):
-    """List all BBMD-related metrics."""
-    print("\n=== BBMD-Related Metrics ===")
-    
-    bbmd_metrics = []
-    
-    # Find metrics with 'forwarded' in their name
-    for s, p, o in graph.triples((None, RDF.type, RDF.Property)):
-        if 'forwarded' in str(s).lower():
-            # Get the label if available
-            labels = list(graph.objects(s, RDFS.label))
-            label = labels[0] if labels else "No label"
-            
-            # Get the comment if available
-            comments = list(graph.objects(s, RDFS.comment))
-            comment = comments[0] if comments else "No description"
-            
-            bbmd_metrics.append((s, label, comment))
-    
-    # Sort by name and print
-    for s, label, comment in sorted(bbmd_metrics, key=lambda x: str(x[0])):
-        print(f"  - {s}")
-        print(f"    Label: {label}")
-        print(f"    Description: {comment}")
-        print()
-
-def list_broadcast_metrics(graph):
-    """List all broadcast-related metrics."""
-    print("\n=== Broadcast-Related Metrics ===")
-    
-    broadcast_metrics = []
-    
-    # Find metrics with 'broadcast' in their name
-    for s, p, o in graph.triples((None, RDF.type, RDF.Property)):
-        if 'broadcast' in str(s).lower():
-            # Get the label if available
-            labels = list(graph.objects(s, RDFS.label))
-            label = labels[0] if labels else "No label"
-            
-            # Get the comment if available
-            comments = list(graph.objects(s, RDFS.comment))
-            comment = comments[0] if comments else "No description"
-            
-            broadcast_metrics.append((s, label, comment))
-    
-    # Sort by name and print
-    for s, label, comment in sorted(broadcast_metrics, key=lambda x: str(x[0])):
-        print(f"  - {s}")
-        print(f"    Label: {label}")
-        print(f"    Description: {comment}")
-        print()
-
-def list_cov_metrics(graph):
-    """List all COV notification-related metrics."""
-    print("\n=== COV Notification Metrics ===")
-    
-    cov_metrics = []
-    
-    # Find metrics with 'COVNotification' in their name
-    for s, p, o in graph.triples((None, RDF.type, RDF.Property)):
-        if 'COVNotification' in str(s):
-            # Get the label if available
-            labels = list(graph.objects(s, RDFS.label))
-            label = labels[0] if labels else "No label"
-            
-            # Get the comment if available
-            comments = list(graph.objects(s, RDFS.comment))
-            comment = comments[0] if comments else "No description"
-            
-            cov_metrics.append((s, label, comment))
-    
-    # Sort by name and print
-    for s, label, comment in sorted(cov_metrics, key=lambda x: str(x[0])):
-        print(f"  - {s}")
-        print(f"    Label: {label}")
-        print(f"    Description: {comment}")
-        print()
-
-def list_who_metrics(graph):
-    """List all Who* service-related metrics."""
-    print("\n=== Who* Service Metrics ===")
-    
-    who_metrics = []
-    
-    # Find metrics with 'Who' in their name
-    for s, p, o in graph.triples((None, RDF.type, RDF.Property)):
-        if 'Who' in str(s):
-            # Get the label if available
-            labels = list(graph.objects(s, RDFS.label))
-            label = labels[0] if labels else "No label"
-            
-            # Get the comment if available
-            comments = list(graph.objects(s, RDFS.comment))
-            comment = comments[0] if comments else "No description"
-            
-            who_metrics.append((s, label, comment))
-    
-    # Sort by name and print
-    for s, label, comment in sorted(who_metrics, key=lambda x: str(x[0])):
-        print(f"  - {s}")
-        print(f"    Label: {label}")
-        print(f"    Description: {comment}")
-        print()
-
-def list_general_metric_properties(graph):
-    """List all general metric properties."""
-    print("\n=== General Metric Properties ===")
-    
-    general_properties = []
-    
-    # Find general metric properties
-    general_property_names = ['observedFrom', 'description', 'metric-identifier', 'metric-name']
-    for s, p, o in graph.triples((None, RDF.type, RDF.Property)):
-        for prop_name in general_property_names:
-            if prop_name in str(s):
-                # Get the label if available
-                labels = list(graph.objects(s, RDFS.label))
-                label = labels[0] if labels else "No label"
-                
-                # Get the comment if available
-                comments = list(graph.objects(s, RDFS.comment))
-                comment = comments[0] if comments else "No description"
-                
-                general_properties.append((s, label, comment))
-                break
-    
-    # Sort by name and print
-    for s, label, comment in sorted(general_properties, key=lambda x: str(x[0])):
-        print(f"  - {s}")
-        print(f"    Label: {label}")
-        print(f"    Description: {comment}")
-        print()
-
-def list_message_count_metrics(graph):
-    """List all message count metrics."""
-    print("\n=== Message Count Metrics ===")
-    
-    message_metrics = []
-    
-    # Find metrics with 'message' in their name
-    for s, p, o in graph.triples((None, RDF.type, RDF.Property)):
-        if 'message' in str(s).lower() or 'bacnetmessage' in str(s).lower():
-            # Get the label if available
-            labels = list(graph.objects(s, RDFS.label))
-            label = labels[0] if labels else "No label"
-            
-            # Get the comment if available
-            comments = list(graph.objects(s, RDFS.comment))
-            comment = comments[0] if comments else "No description"
-            
-            message_metrics.append((s, label, comment))
-    
-    # Sort by name and print
-    for s, label, comment in sorted(message_metrics, key=lambda x: str(x[0])):
-        print(f"  - {s}")
-        print(f"    Label: {label}")
-        print(f"    Description: {comment}")
-        print()
\ No newline at end of file
+    index = OntologyIndex(ontology_graph)
+    if json_output:
+        print(json.dumps(index.to_dict(), indent=2))
+        return
+    print(f"Successfully loaded the Corona ontology from {effective_ont_path}.")
+    print(f"Ontology contains {len(ontology_graph)} triples.")
+    print_ontology_index(index)
+
+def analyze_ontology_graph(ontology_graph: Graph) -> None:
+    """Print metrics statistics for an already loaded ontology graph."""
+    print_ontology_index(OntologyIndex(ontology_graph))
+
+def print_ontology_index(index: OntologyIndex) -> None:
+    """Print the metric counts and every name-rule category of an ontology index."""
+    counts = index.counts()
+    print(f"Network interface metrics: {counts['network_interface']}")
+    print(f"Application metrics: {counts['application']}")
+    print(f"Lifetime metrics: {counts['lifetime']}")
+    print(f"Sampled metrics: {counts['sampled']}")
+
+    for rule in index.name_rules:
+        print(f"\n=== {rule.title} ===")
+        for info in index.category(rule.category):
+            print(f"  - {info.uri}")
+            print(f"    Label: {info.label or 'No label'}")
+            print(f"    Description: {info.comment or 'No description'}")
+            print()
@@ -0,0 +1,201 @@
+"""Memoized SHACL verdicts per metric instance, keyed by content hash.
+
+Repeated ``validate`` runs over a rolling window of files see mostly the same
+metric instances. ``validate_cached`` splits the data graph into instances the
+way ``chunked_validation`` does, hashes each instance's self-contained
+description (blank nodes canonicalized) together with the shapes file's hash,
+the data graph's schema triples and the inference mode, and only runs pyshacl
+over the instances whose hash it has not seen before. Cached results are
+merged with the fresh ones into one report.
+
+The verdict stored for an instance is the set of validation results whose
+focus node is part of its description, as N-Triples, and whether the instance
+conforms: if pyshacl reported the run as conforming every instance does (even
+with warning results, under ``allow_warnings``), otherwise an instance
+conforms only if it has no results, as pyshacl counts warnings and infos
+against conformance by default. If a fresh result cannot
+be tied to any instance nothing from that run is cached, so a miss is always
+safe. Like chunked validation, this assumes shapes look at most one hop away
+from the focus node.
+
+``ValidationCache`` is an LRU map of these verdicts that can be saved to and
+loaded from disk (by default in the ``graph_cache`` directory).
+"""
+import hashlib
+import marshal
+import os
+import sys
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from pyshacl import validate
+from rdflib import BNode, Graph
+from rdflib.compare import to_canonical_graph
+from rdflib.term import Node
+
+from .chunked_validation import (SH, Triple, ValidationReportBuilder, copy_description, instance_roots, instance_triples,
+                                 schema_subjects, validate_chunked)
+from .graph_cache import cache_dir, write_atomically
+from .targeted_validation import TargetedValidator
+
+# Bump when the key derivation or the on-disk layout changes
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def default_cache_path() -> str:
+    return os.path.join(cache_dir(), f"validation-results-v{CACHE_FORMAT_VERSION}.bin")
+
+
+def triples_digest(triples: Iterable[Triple]) -> str:
+    """Returns a SHA-256 of ``triples`` that does not depend on order or blank node labels."""
+    triples = list(triples)
+    if any(isinstance(term, BNode) for triple in triples for term in triple):
+        graph = Graph()
+        for triple in triples:
+            graph.add(triple)
+        triples = list(to_canonical_graph(graph))
+    lines = sorted(f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in triples)
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+class ValidationCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    entries: int
+    evictions: int
+
+    def summary(self) -> str:
+        return f"Validation cache: {self.hits} hits, {self.misses} misses ({self.entries} entries, {self.evictions} evicted)"
+
+
+class ValidationCache:
+    """LRU map from instance hash to ``(conforms, results N-Triples)``, persistable with ``save``."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bool, str]]" = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> "ValidationCache":
+        """Reads a saved cache, or starts an empty one if ``path`` is missing or unreadable."""
+        path = path or default_cache_path()
+        cache = cls(path, max_entries)
+        try:
+            with open(path, "rb") as f:
+                version, entries = marshal.loads(f.read())
+            if version != CACHE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported cache format version {version}")
+        except FileNotFoundError:
+            return cache
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            print(f"Warning: Ignoring unreadable validation cache {cache.path}: {e}", file=sys.stderr)
+            return cache
+        for key, conforms, results_nt in entries[-max_entries:]:
+            cache._entries[key] = (conforms, results_nt)
+        return cache
+
+    def save(self) -> None:
+        """Writes the entries, least recently used first, to ``path``."""
+        if self.path is None:
+            raise ValueError("ValidationCache has no path to save to")
+        entries = [(key, conforms, results_nt) for key, (conforms, results_nt) in self._entries.items()]
+        write_atomically(self.path, marshal.dumps((CACHE_FORMAT_VERSION, entries)))
+
+    def get(self, key: str) -> Optional[Tuple[bool, str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, conforms: bool, results_nt: str) -> None:
+        self._entries[key] = (conforms, results_nt)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> ValidationCacheStats:
+        return ValidationCacheStats(self.hits, self.misses, len(self._entries), self.evictions)
+
+
+def _verdicts(results_graph: Graph, instances: Dict[Node, Set[Triple]]) -> Optional[Dict[Node, Graph]]:
+    """Splits results by the instance whose description holds their focus node; None if one belongs to no instance."""
+    owners: Dict[Node, List[Node]] = {}
+    for root, triples in instances.items():
+        for s, _, o in triples:
+            for node in (s, o):
+                owned_by = owners.setdefault(node, [])
+                if not owned_by or owned_by[-1] != root:
+                    owned_by.append(root)
+    verdicts = {root: Graph() for root in instances}
+    report = BNode()
+    for result in results_graph.objects(None, SH.result):
+        focus = results_graph.value(result, SH.focusNode)
+        roots = owners.get(focus) if focus is not None else None
+        if not roots:
+            return None
+        for root in roots:
+            copy_description(results_graph, result, verdicts[root])
+            verdicts[root].add((report, SH.result, result))
+    return verdicts
+
+
+def validate_cached(data_graph: Graph, shapes_graph: Graph, cache: ValidationCache, shapes_digest: str,
+                    inference: Optional[str] = "rdfs", chunk_size: Optional[int] = None,
+                    workers: int = 1, targeted: Optional[TargetedValidator] = None) -> Tuple[bool, Graph, str]:
+    """Validates only the instances ``cache`` has no verdict for and returns a merged ``(conforms, results_graph, results_text)``.
+
+    ``shapes_digest`` identifies the shapes (e.g. ``graph_cache.content_hash`` of the shapes file).
+    Fresh instances are validated together, in chunks with ``chunk_size``, or by ``targeted``.
+    """
+    schema = schema_subjects(data_graph)
+    schema_triples = [t for s in schema for t in data_graph.triples((s, None, None))]
+    mode = "targeted" if targeted is not None else inference
+    context = f"{shapes_digest}\n{triples_digest(schema_triples)}\n{mode}\n"
+
+    builder = ValidationReportBuilder()
+    fresh: Dict[Node, Set[Triple]] = {}
+    keys: Dict[Node, str] = {}
+    for root in instance_roots(data_graph, schema):
+        triples = instance_triples(data_graph, root, schema)
+        key = hashlib.sha256((context + triples_digest(triples)).encode("utf-8")).hexdigest()
+        cached = cache.get(key)
+        if cached is None:
+            fresh[root] = triples
+            keys[root] = key
+        else:
+            conforms, results_nt = cached
+            builder.add(conforms, Graph().parse(data=results_nt, format="nt") if results_nt else Graph())
+
+    if fresh:
+        graph = Graph()
+        for prefix, namespace in data_graph.namespaces():
+            graph.bind(prefix, namespace, override=False)
+        for triple in schema_triples:
+            graph.add(triple)
+        for triples in fresh.values():
+            for triple in triples:
+                graph.add(triple)
+        if targeted is not None:
+            conforms, results_graph, _ = targeted.validate(graph)
+        elif chunk_size:
+            conforms, results_graph, _ = validate_chunked(graph, shapes_graph, chunk_size=chunk_size, workers=workers, inference=inference)
+        else:
+            conforms, results_graph, _ = validate(graph, shacl_graph=shapes_graph, inference=inference, debug=False)
+        builder.add(conforms, results_graph)
+        verdicts = _verdicts(results_graph, fresh)
+        if verdicts is not None:
+            for root, verdict in verdicts.items():
+                results_nt = verdict.serialize(format="nt") if len(verdict) else ""
+                cache.put(keys[root], conforms or not results_nt, results_nt)
+    return builder.build()
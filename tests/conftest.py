@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_environment(tmp_path_factory):
+    """Keeps tests out of the user's parse cache and away from any corona daemon they have running."""
+    base = tmp_path_factory.mktemp("env")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("CORONA_CACHE_DIR", str(base / "cache"))
+        mp.setenv("CORONA_SOCKET", str(base / "no-daemon.sock"))
+        yield
@@ -0,0 +1,97 @@
+import os
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+
+import pytest
+from click.testing import CliRunner
+
+from corona_framework.archive import (
+    ArchiveError,
+    ArchiveReader,
+    ArchiveWriter,
+    decode_delta_of_delta,
+    decode_xor_floats,
+    encode_delta_of_delta,
+    encode_xor_floats,
+    write_archive,
+)
+from corona_framework.corona_tool import cli
+from corona_framework.models import BacnetApplicationMetric, RouterBBMDMetric
+from corona_framework.stream_convert import metric_to_ndjson
+
+START = datetime(2024, 1, 1)
+
+
+def app_metric(device, i, **values):
+    return BacnetApplicationMetric(
+        metric_instance_uri=f"urn:corona:archive:{device}:{i}", metric_identifier=f"dev{device}",
+        source_entity_uri=f"http://example.com/device/{device}", timestamp=START + timedelta(minutes=i),
+        readPropertyRequests=100 + 7 * i, readPropertyResponses=(i if i % 3 else None), **values)
+
+
+@pytest.fixture
+def metrics():
+    router = [RouterBBMDMetric(metric_instance_uri=f"urn:corona:router:{i}", metric_identifier="router",
+                               timestamp=START + timedelta(minutes=i, seconds=30), messagesRouted=i, routed_via="urn:gw")
+              for i in range(50)]
+    return [app_metric(d, i) for i in range(50) for d in range(3)] + router
+
+
+def test_codecs_round_trip():
+    values = [0, 5, 10, 15, 21, -3, 2 ** 64 - 1, 7]
+    assert decode_delta_of_delta(memoryview(encode_delta_of_delta(values)), len(values)) == values
+    floats = [0.0, 1.5, 1.5, -2.25, float("inf"), 1e-300]
+    assert decode_xor_floats(memoryview(encode_xor_floats(floats)), len(floats)) == floats
+    # A regular series costs one byte per reading
+    assert len(encode_delta_of_delta(range(0, 60_000_000 * 100, 60_000_000))) < 110
+
+
+def test_round_trip_in_timestamp_order(tmp_path, metrics):
+    path = str(tmp_path / "metrics.arc")
+    # A small chunk size exercises range pruning across chunks
+    assert write_archive(path, reversed(metrics), chunk_size=16) == len(metrics)
+    with ArchiveReader(path) as reader:
+        assert len(reader) == len(metrics)
+        assert {s.metric_type for s in reader.series()} == {"BacnetApplicationMetric", "RouterBBMDMetric"}
+        restored = list(reader.read())
+        assert [m.timestamp for m in restored] == sorted(m.timestamp for m in metrics)
+        by_uri = attrgetter("metric_instance_uri")
+        assert sorted(restored, key=by_uri) == sorted(metrics, key=by_uri)
+        assert restored[0].read_property_responses is None and restored[-1].routed_via == "urn:gw"
+
+        window = list(reader.read(START + timedelta(minutes=10), START + timedelta(minutes=12)))
+        assert [m.timestamp for m in window] == sorted(m.timestamp for m in metrics if 10 <= (m.timestamp - START).total_seconds() / 60 <= 12)
+        assert list(reader.read(metric_type="RouterBBMDMetric", end=START)) == []
+        assert len(list(reader.read(metric_identifier="dev1"))) == 50
+
+
+def test_aware_timestamps_and_bad_files(tmp_path):
+    path = str(tmp_path / "aware.arc")
+    aware = app_metric(0, 1).model_copy(update={"timestamp": datetime(2024, 1, 1, 14, tzinfo=timezone(timedelta(hours=2)))})
+    with ArchiveWriter(path) as writer:
+        writer.add(aware)
+    with ArchiveReader(path) as reader:
+        (restored,) = reader.read()
+    assert restored.timestamp == aware.timestamp and restored.timestamp.tzinfo == timezone.utc
+
+    bad = tmp_path / "bad.arc"
+    bad.write_bytes(b"not an archive at all, really not")
+    with pytest.raises(ArchiveError):
+        ArchiveReader(str(bad))
+
+
+def test_archive_cli(tmp_path, metrics):
+    source = tmp_path / "in.ndjson"
+    source.write_text("".join(metric_to_ndjson(m) + "\n" for m in metrics))
+    path = str(tmp_path / "cli.arc")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["archive", "create", str(source), "-o", path])
+    assert result.exit_code == 0 and os.path.getsize(path) < source.stat().st_size / 10
+
+    result = runner.invoke(cli, ["archive", "info", path])
+    assert result.exit_code == 0 and "4 series, 200 metrics" in result.output
+
+    result = runner.invoke(cli, ["archive", "export", path, "--format", "ndjson", "--type", "RouterBBMDMetric",
+                                 "--start", "2024-01-01T00:10:00", "--end", "2024-01-01T00:19:59"])
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [metric_to_ndjson(m) for m in metrics[150:] if 10 <= m.messages_routed < 20]
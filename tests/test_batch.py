@@ -0,0 +1,102 @@
+import io
+from datetime import datetime, timezone
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from corona_framework.batch import MetricBatch, ValueColumn
+from corona_framework.generated_models import NetworkInterfaceMetric
+from corona_framework.models import COVNotificationMetric, RouterBBMDMetric
+from corona_framework.rdf_writer import write_metrics_ntriples
+
+
+def router_metrics(count: int = 20):
+    """Router readings from a handful of devices sharing observers."""
+    return [
+        RouterBBMDMetric(
+            metric_instance_uri=f"urn:corona:metric:router:{i}",
+            source_entity_uri=f"urn:corona:device:gw{i % 3}" if i % 4 else None,
+            source_entity_address=f"10.0.0.{i % 3}",
+            observed_from="urn:corona:observer:1",
+            metric_identifier=f"router_gw{i % 3}",
+            timestamp=datetime(2024, 5, 1, 12, 0, i),
+            messages_routed=1000 + i,
+            messages_forwarded=None if i % 2 else 50,
+            routed_via="urn:corona:device:core" if i % 5 == 0 else None,
+            bbmd_entries_count=2**64 - 1,
+        )
+        for i in range(count)
+    ]
+
+
+def test_batch_round_trips_model_instances():
+    """Columns preserve every field, including nulls and full unsignedLong range."""
+    metrics = router_metrics()
+    batch = MetricBatch.from_metrics(metrics)
+    assert len(batch) == len(metrics)
+    assert batch.metadata["observed_from"].values == [None, "urn:corona:observer:1"]
+    assert [m.model_dump() for m in batch.to_metrics()] == [m.model_dump() for m in metrics]
+
+
+def test_batch_rejects_invalid_rows_without_corrupting_columns():
+    batch = MetricBatch(RouterBBMDMetric)
+    batch.append(router_metrics(1)[0])
+    bad = router_metrics(1)[0].model_copy(update={"messages_routed": -1})
+    with pytest.raises(ValueError):
+        batch.append(bad)
+    with pytest.raises(TypeError):
+        batch.append(COVNotificationMetric(metric_instance_uri="urn:corona:metric:cov:1"))
+    aware = router_metrics(1)[0].model_copy(update={"timestamp": datetime(2024, 5, 1, tzinfo=timezone.utc)})
+    with pytest.raises(ValueError):
+        batch.append(aware)
+    assert len(batch) == 1 and all(len(c) == 1 for c in batch.counters.values())
+
+
+def test_batch_serializers_match_per_metric_output():
+    """Column-wise serializers produce the same content as the per-object serializers."""
+    metrics = router_metrics()
+    batch = MetricBatch.from_metrics(metrics)
+
+    expected_rows = sorted((r["entity"], r["metric"], r["val"], r["ts"]) for m in metrics for r in m.to_haystack_json())
+    assert sorted((r["entity"], r["metric"], r["val"], r["ts"]) for r in batch.to_haystack_json()) == expected_rows
+
+    expected_samples = sorted(line for m in metrics for line in m.to_prometheus() if line and not line.startswith("#"))
+    lines = batch.to_prometheus()
+    assert sorted(line for line in lines if line and not line.startswith("#")) == expected_samples
+    assert lines.count("# TYPE bacnet_messages_routed counter") + lines.count("# TYPE bacnet_messages_routed gauge") == 1
+    assert "# TYPE bacnet_bbmd_entries_count gauge" in lines
+
+    reference = io.StringIO()
+    write_metrics_ntriples(metrics, reference)
+    assert isomorphic(
+        Graph().parse(data=batch.to_ntriples(), format="nt"),
+        Graph().parse(data=reference.getvalue(), format="nt"),
+    )
+
+
+
+def test_float_and_other_fields_get_typed_columns():
+    metrics = [
+        NetworkInterfaceMetric(metric_instance_uri=f"urn:corona:metric:if:{i}", source_entity_uri="urn:corona:device:gw",
+                               timestamp=datetime(2024, 5, 1, 12, 0, i), bytes_sent=i, network_utilization=None if i == 2 else i / 3)
+        for i in range(4)
+    ]
+    batch = MetricBatch.from_metrics(metrics)
+    assert list(batch.floats) == ["network_utilization"] and not batch.values
+    assert batch.floats["network_utilization"].data.typecode == "d"
+    assert [m.model_dump() for m in batch.to_metrics()] == [m.model_dump() for m in metrics]
+
+    reference = io.StringIO()
+    write_metrics_ntriples(metrics, reference)
+    assert isomorphic(Graph().parse(data=batch.to_ntriples(), format="nt"), Graph().parse(data=reference.getvalue(), format="nt"))
+    expected_samples = sorted(line for m in metrics for line in m.to_prometheus() if line and not line.startswith("#"))
+    assert sorted(line for line in batch.to_prometheus() if line and not line.startswith("#")) == expected_samples
+    expected_rows = sorted((r["metric"], r["val"], r["ts"]) for m in metrics for r in m.to_haystack_json())
+    assert sorted((r["metric"], r["val"], r["ts"]) for r in batch.to_haystack_json()) == expected_rows
+
+    # Booleans and strings share one dictionary without True and 1 colliding
+    column = ValueColumn()
+    for value in (True, 1, None, "x", True):
+        column.append(value)
+    assert [column[row] for row in range(len(column))] == [True, 1, None, "x", True] and type(column[1]) is int
@@ -0,0 +1,37 @@
+import importlib.util
+import os
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def suite():
+    spec = importlib.util.spec_from_file_location("corona_bench_suite", os.path.join(project_root, "benchmarks", "suite.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def results(throughput, peak_bytes):
+    return {"results": {"to_ttl@1k": {"throughput": throughput, "peak_bytes": peak_bytes}}}
+
+
+def test_compare_flags_regressions_past_threshold(suite):
+    baseline = results(1000.0, 10 << 20)
+    assert suite.compare_results(baseline, results(850.0, 11 << 20), threshold=0.2) == []
+    regressions = suite.compare_results(baseline, results(700.0, 20 << 20), threshold=0.2)
+    assert len(regressions) == 2 and regressions[0].startswith("to_ttl@1k: throughput")
+    # Benchmarks missing from the new run are not regressions
+    assert suite.compare_results(baseline, {"results": {}}) == []
+
+
+def test_synthetic_metrics_and_run(suite):
+    chunks = list(suite.iter_metric_chunks(7, chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    metrics = [m for c in chunks for m in c]
+    assert len({m.metric_instance_uri for m in metrics}) == 7
+    assert [m.model_dump() for m in suite.make_metrics(7)] == [m.model_dump() for m in metrics]
+    result = suite.run_benchmark(suite.BENCHMARKS[1], 20, measure_memory=True, repeat=1)
+    assert result["count"] == 20 and result["throughput"] > 0 and result["peak_bytes"] >= 0
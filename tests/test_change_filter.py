@@ -0,0 +1,60 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from corona_framework.change_filter import ChangeFilter
+from corona_framework.models import RouterBBMDMetric
+from corona_framework.stream_convert import convert_stream, metric_to_ndjson
+
+START = datetime(2024, 1, 1)
+
+
+def snapshot(minute, routed, bbmd_entries=10, device="http://example.com/device/r1", **extra):
+    return RouterBBMDMetric(
+        metric_instance_uri=f"urn:router:{device}:{minute}", source_entity_uri=device, metric_identifier="router_1",
+        timestamp=START + timedelta(minutes=minute), messages_routed=routed, bbmd_entries_count=bbmd_entries, **extra)
+
+
+def test_fields_mode_emits_only_changed_fields():
+    changes = ChangeFilter()
+    first = snapshot(0, 100)
+    assert changes.filter(first) is first
+    assert changes.filter(snapshot(1, 100)) is None
+
+    changed = changes.filter(snapshot(2, 150))
+    assert changed.messages_routed == 150 and changed.bbmd_entries_count is None
+    assert changed.metric_instance_uri.endswith(":2") and changed.timestamp == START + timedelta(minutes=2)
+    assert [row["metric"] for row in changed.to_haystack_json()] == ["messagesRouted"]
+
+    # Other series are tracked separately, and unset fields never count as changes
+    assert changes.filter(snapshot(2, 150, device="http://example.com/device/r2")) is not None
+    assert changes.filter(RouterBBMDMetric(metric_instance_uri="urn:x", source_entity_uri="http://example.com/device/r1",
+                                           metric_identifier="router_1", timestamp=START, messages_routed=150)) is None
+
+    stats = changes.stats()
+    assert (stats.seen, stats.emitted, stats.suppressed, stats.series) == (5, 3, 2, 2)
+    assert (stats.fields_seen, stats.fields_emitted) == (9, 5)
+
+
+def test_instances_mode_and_heartbeat():
+    changes = ChangeFilter('instances', heartbeat=600)
+    emitted = [changes.filter(snapshot(minute, 100 + (minute == 3))) for minute in range(12)]
+    # Minute 0 is new, minute 3 changed, minute 4 changed back, and minute 10 is the heartbeat
+    assert [m is not None for m in emitted] == [m in (0, 3, 4, 10) for m in range(12)]
+    assert emitted[3].bbmd_entries_count == 10
+    assert changes.stats().heartbeats == 1
+
+    with pytest.raises(ValueError):
+        ChangeFilter('values')
+
+
+def test_convert_stream_with_changes():
+    lines = [metric_to_ndjson(snapshot(minute, 100 + minute // 5)) for minute in range(20)]
+    out = io.StringIO()
+    written = convert_stream(lines, out, 'ndjson', changes=ChangeFilter())
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert written == len(records) == 4
+    assert [r["messages_routed"] for r in records] == [100, 101, 102, 103]
+    assert records[0]["bbmd_entries_count"] == 10 and all(r["bbmd_entries_count"] is None for r in records[1:])
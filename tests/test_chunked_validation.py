@@ -0,0 +1,98 @@
+import os
+
+import pytest
+from pyshacl import validate
+from rdflib import BNode, Graph
+
+from corona_framework.chunked_validation import SH, iter_chunks, validate_chunked
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHAPES_FILE_PATH = os.path.join(project_root, "data", "corona-shapes.ttl")
+EXAMPLE_FILE_PATH = os.path.join(project_root, "examples", "corona-ASHRAE135ct.ttl")
+
+# Instances that violate the shapes in several ways, plus schema triples that RDFS inference relies on
+VIOLATIONS_TTL = """
+@prefix corona: <http://coronastandard.org/2022#> .
+@prefix net: <http://www.example.org/network-ontology#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+corona:NetworkInterfaceMetric rdfs:subClassOf corona:PerformanceMetric .
+net:Iface rdfs:subClassOf net:HWNetEntity .
+<urn:m:1> a corona:NetworkInterfaceMetric ; corona:bytesReceived "x" ; corona:observedFrom <urn:iface:1> .
+<urn:iface:1> a net:Iface .
+<urn:m:2> a corona:NetworkInterfaceMetric ; corona:observedFrom <urn:iface:2> .
+<urn:iface:2> a net:Unknown .
+<urn:m:3> a corona:PerformanceMetric ; corona:metric-identifier "a", "b" .
+<urn:m:4> a corona:NetworkInterfaceMetric ; corona:observedFrom [ a net:Iface ] .
+"""
+
+
+@pytest.fixture(scope="module")
+def shapes_graph():
+    return Graph().parse(SHAPES_FILE_PATH, format="turtle")
+
+
+@pytest.fixture(scope="module")
+def data_graph():
+    graph = Graph().parse(EXAMPLE_FILE_PATH, format="turtle")
+    graph.parse(data=VIOLATIONS_TTL, format="turtle")
+    return graph
+
+
+def result_keys(results_graph: Graph):
+    """Result identities with blank nodes replaced by their description, since chunks may relabel them."""
+    def normalize(node):
+        if not isinstance(node, BNode):
+            return node
+        return frozenset((p, "_:b" if isinstance(o, BNode) else o) for p, o in results_graph.predicate_objects(node))
+
+    return {
+        tuple(normalize(results_graph.value(r, p)) for p in (SH.focusNode, SH.resultPath, SH.sourceConstraintComponent, SH.value))
+        for r in results_graph.objects(None, SH.result)
+    }
+
+
+def test_chunks_cover_every_instance(data_graph):
+    chunks = list(iter_chunks(data_graph, chunk_size=2))
+    assert len(chunks) > 1
+    covered = set().union(*(set(chunk) for chunk in chunks))
+    assert covered == set(data_graph)
+
+
+@pytest.mark.parametrize("chunk_size,workers", [(1, 1), (3, 1), (2, 2)])
+def test_chunked_results_match_full_graph_validation(shapes_graph, data_graph, chunk_size, workers):
+    full_conforms, full_results, _ = validate(data_graph, shacl_graph=shapes_graph, inference="rdfs", debug=False)
+    conforms, results, text = validate_chunked(data_graph, shapes_graph, chunk_size=chunk_size, workers=workers)
+
+    assert conforms == full_conforms is False
+    full_keys = result_keys(full_results)
+    assert result_keys(results) == full_keys
+    assert f"Results ({len(full_keys)}):" in text
+
+
+def test_results_on_different_blank_nodes_stay_apart(shapes_graph):
+    data = Graph().parse(data="""
+        @prefix corona: <http://coronastandard.org/2022#> .
+        [] a corona:PerformanceMetric ; corona:metric-identifier "a" ; corona:observedFrom <urn:device:1> .
+        [] a corona:PerformanceMetric ; corona:metric-identifier "b" ; corona:observedFrom <urn:device:1> .
+        """, format="turtle")
+    full_results = validate(data, shacl_graph=shapes_graph, inference="rdfs", debug=False)[1]
+    for workers in (1, 2):
+        results = validate_chunked(data, shapes_graph, chunk_size=1, workers=workers)[1]
+        assert len(result_keys(results)) == len(result_keys(full_results)) == 2
+
+
+def test_inverse_paths_see_the_referencing_node():
+    shapes = Graph().parse(data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        <urn:shape> a sh:NodeShape ; sh:targetObjectsOf <urn:observes> ;
+            sh:property [ sh:path [ sh:inversePath <urn:observes> ] ; sh:class <urn:Observer> ] .
+        """, format="turtle")
+    data = Graph().parse(data="""
+        <urn:obs:1> a <urn:Observer> ; <urn:observes> <urn:dev:1> .
+        <urn:dev:1> a <urn:Device> .
+        <urn:obs:2> <urn:observes> <urn:dev:2> .
+        <urn:dev:2> a <urn:Device> .
+        """, format="turtle")
+    full_results = validate(data, shacl_graph=shapes, debug=False)[1]
+    results = validate_chunked(data, shapes, chunk_size=1, inference=None)[1]
+    assert result_keys(results) == result_keys(full_results) and len(result_keys(results)) == 1
@@ -0,0 +1,78 @@
+import io
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, XSD
+
+from corona_framework import codegen, generated_models
+from corona_framework.batch import MetricBatch
+from corona_framework.graph_cache import load_graph
+from corona_framework.generated_models import ApplicationMetric, NetworkInterfaceMetric
+from corona_framework.models import BaseMetric, get_metric_class
+from corona_framework.rdf_writer import write_metrics_ntriples, write_metrics_ttl
+from corona_framework.validate_model import ontology_path, shapes_file_path
+
+ONT = "http://example.org/standards/corona/metrics#"
+
+
+@pytest.fixture
+def interface_metric():
+    return NetworkInterfaceMetric(
+        metric_instance_uri="http://example.com/metric/if1", observed_from="http://example.com/observer/1",
+        description='eth0 "uplink"', metric_identifier="if_1", source_entity_uri="http://example.com/device/1",
+        timestamp=datetime(2024, 1, 1, 12), bytesReceived=1500, packets_sent=12, network_utilization=37.5, link_speed=100)
+
+
+def test_generated_module_is_up_to_date():
+    with open(codegen.DEFAULT_OUTPUT, encoding="utf-8") as f:
+        assert f.read() == codegen.generate_models()
+
+
+def test_every_ontology_property_is_placed():
+    specs = codegen.model_specs(load_graph(ontology_path), load_graph(shapes_file_path))
+    assert [spec.name for spec in specs] == ["ApplicationMetric", "LifetimeMetric", "NetworkInterfaceMetric", "SampledMetric"]
+    placed = {prop.key for spec in specs for prop in spec.properties}
+    # 48 properties, of which observedFrom, description, metric-identifier and metric-name are BaseMetric metadata
+    assert len(placed) == 44 and {"bytesReceived", "readCommandLatency", "totalRequests", "routedVia"} <= placed
+    link_speed = next(p for p in specs[2].properties if p.key == "linkSpeed")
+    assert (link_speed.datatype, link_speed.python_type, link_speed.minimum, link_speed.prometheus_type) == (str(XSD.unsignedInt), "int", 0, "gauge")
+
+
+def test_ttl_uses_ontology_iris_and_datatypes(interface_metric):
+    g = Graph().parse(data=interface_metric.to_ttl(), format="turtle")
+    subject = URIRef(interface_metric.metric_instance_uri)
+    assert (subject, RDF.type, URIRef(ONT + "NetworkInterfaceMetric")) in g
+    assert (subject, URIRef(ONT + "bytesReceived"), Literal("1500", datatype=XSD.unsignedLong)) in g
+    assert (subject, URIRef(ONT + "networkUtilization"), Literal("37.5", datatype=XSD.float)) in g
+
+    # The unrolled serializer, the rdflib path and the stream writers agree
+    assert isomorphic(g, Graph().parse(data=BaseMetric.to_ttl(interface_metric), format="turtle"))
+    out = io.StringIO()
+    write_metrics_ttl([interface_metric], out)
+    assert isomorphic(g, Graph().parse(data=out.getvalue(), format="turtle"))
+    batch_out = io.StringIO()
+    MetricBatch.from_metrics([interface_metric]).write_ntriples(batch_out)
+    nt_out = io.StringIO()
+    write_metrics_ntriples([interface_metric], nt_out)
+    assert isomorphic(Graph().parse(data=batch_out.getvalue(), format="nt"), Graph().parse(data=nt_out.getvalue(), format="nt"))
+
+
+def test_prometheus_and_haystack_match_generic_serializers(interface_metric):
+    assert interface_metric.to_prometheus("net") == BaseMetric.to_prometheus(interface_metric, "net")
+    assert interface_metric.to_haystack_json() == BaseMetric.to_haystack_json(interface_metric)
+    lines = interface_metric.to_prometheus()
+    assert "# TYPE bacnet_bytes_received_total counter" in lines and "# TYPE bacnet_link_speed gauge" in lines
+
+    # Resource-valued properties have no sample to export
+    routed = ApplicationMetric(metric_instance_uri="urn:x", routedVia="http://example.com/router", messagesRouted=3)
+    assert not any("routed_via" in line for line in routed.to_prometheus())
+    assert [row["metric"] for row in routed.to_haystack_json()] == ["messagesRouted", "routedVia"]
+
+
+def test_generated_classes_are_registered_and_validated():
+    assert get_metric_class("NetworkInterfaceMetric") is generated_models.NetworkInterfaceMetric
+    with pytest.raises(ValidationError):
+        NetworkInterfaceMetric(metric_instance_uri="urn:x", bytesSent=-1)
@@ -0,0 +1,119 @@
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from click.testing import CliRunner
+
+from corona_framework import demo_metrics
+from corona_framework.corona_tool import cli
+from corona_framework import daemon
+from corona_framework.daemon import CoronaDaemon, DaemonClient, DaemonError, connect_if_running, render_metrics
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_FILE_PATH = os.path.join(project_root, "examples", "corona-ASHRAE135ct.ttl")
+
+
+@pytest.fixture(scope="module")
+def running_daemon(tmp_path_factory):
+    # Unix socket paths are length-limited, so keep this one short
+    socket_path = os.path.join(str(tmp_path_factory.mktemp("d")), "c.sock")
+    server = CoronaDaemon(socket_path=socket_path, workers=1)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_ping_validate_and_analyze(running_daemon):
+    with DaemonClient(running_daemon.socket_path) as client:
+        assert client.request("ping")["pid"] == os.getpid()
+        with open(EXAMPLE_FILE_PATH) as f:
+            result = client.validate(f.read())
+        assert result["conforms"] is True and result["triples"] > 0
+        assert "=== Router-Related Metrics ===" in client.analyze()
+
+
+def test_convert_matches_local_rendering(running_daemon):
+    metrics = demo_metrics.generate_all_sample_metrics()
+    with DaemonClient(running_daemon.socket_path) as client:
+        for output_format in ("ttl", "prometheus", "haystack", "json"):
+            assert client.convert(metrics, output_format) == render_metrics(metrics, output_format)
+        with pytest.raises(DaemonError, match="Unknown metric type"):
+            client.request("convert", metrics=[{"type": "NoSuchMetric"}], format="ttl")
+
+
+def test_concurrent_clients_and_bad_requests(running_daemon):
+    def ping(_):
+        with DaemonClient(running_daemon.socket_path) as client:
+            return client.request("ping")["workers"]
+
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(ping, range(8))) == [1] * 8
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(running_daemon.socket_path)
+        stream = sock.makefile("rwb")
+        stream.write(b"not json\n{\"id\": 7, \"op\": \"frobnicate\"}\n")
+        stream.flush()
+        first, second = json.loads(stream.readline()), json.loads(stream.readline())
+    assert first["ok"] is False and "Invalid request" in first["error"]
+    assert second == {"id": 7, "ok": False, "error": "ValueError: Unknown op 'frobnicate'"}
+
+
+def test_cli_uses_running_daemon(running_daemon, monkeypatch):
+    monkeypatch.setenv("CORONA_SOCKET", running_daemon.socket_path)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["validate"])
+    assert "Validated by corona daemon" in result.output
+    assert "Validation successful" in result.output
+
+    local = runner.invoke(cli, ["generate", "--type", "app", "--format", "prometheus", "--no-daemon"])
+    remote = runner.invoke(cli, ["generate", "--type", "app", "--format", "prometheus"])
+    # Sample metrics carry fresh timestamps, so compare everything but the sample lines' timestamps
+    assert [line.rsplit(" ", 1)[0] for line in remote.output.splitlines()] == \
+        [line.rsplit(" ", 1)[0] for line in local.output.splitlines()]
+
+
+def test_connect_if_running_without_daemon(tmp_path):
+    assert connect_if_running(str(tmp_path / "missing.sock")) is None
+
+
+def test_refuses_sockets_other_users_can_reach(running_daemon, monkeypatch):
+    os.chmod(running_daemon.socket_path, 0o666)
+    try:
+        assert connect_if_running(running_daemon.socket_path) is None
+    finally:
+        os.chmod(running_daemon.socket_path, 0o600)
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(running_daemon.socket_path).st_uid + 1)
+    assert connect_if_running(running_daemon.socket_path) is None
+
+
+def test_default_socket_is_in_a_private_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv("CORONA_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(daemon.tempfile, "gettempdir", lambda: str(tmp_path))
+    path = daemon.default_socket_path()
+    assert os.path.dirname(path) != str(tmp_path)
+    server = CoronaDaemon(workers=1)
+    server.start()
+    try:
+        assert daemon.is_private(os.path.dirname(path)) and daemon.is_private(path)
+    finally:
+        server.stop()
+
+
+def test_hung_daemon_falls_back_to_local(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "h.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung:
+        hung.bind(socket_path)
+        hung.listen()  # accepts connections but never answers
+        os.chmod(socket_path, 0o600)
+        with connect_if_running(socket_path, timeout=0.1) as client, pytest.raises(OSError):
+            client.request("ping")
+
+        monkeypatch.setenv("CORONA_SOCKET", socket_path)
+        monkeypatch.setattr(daemon, "CLIENT_TIMEOUT", 0.1)
+        result = CliRunner().invoke(cli, ["validate", "--no-result-cache", EXAMPLE_FILE_PATH])
+    assert result.exit_code == 0 and "Validated by corona daemon" not in result.output
+    assert "Validation successful" in result.output
@@ -0,0 +1,77 @@
+import asyncio
+import gzip
+import time
+
+import pytest
+
+from corona_framework.file_sink import RotatingFileSink
+from corona_framework.pipeline import Batch, FileSink, Pipeline, Serialize, SimulatedBacnetSource, render
+
+
+def read_all(path):
+    """The concatenated contents of every segment, oldest first."""
+    segments = sorted(path.parent.glob(path.name + ".*"), key=lambda p: int(p.name.split(".")[-2 if p.suffix == ".gz" else -1]))
+    parts = [gzip.decompress(p.read_bytes()).decode() if p.suffix == ".gz" else p.read_text() for p in segments]
+    return "".join(parts) + path.read_text()
+
+
+def test_batches_and_flushes_on_close(tmp_path):
+    path = tmp_path / "out.nt"
+    with RotatingFileSink(str(path), batch_bytes=1 << 20, flush_interval=60) as sink:
+        for i in range(100):
+            sink.write(f"line {i}\n")
+        sink.flush()
+        assert path.read_text().count("\n") == 100
+        sink.write("last\n")
+    assert path.read_text().endswith("line 99\nlast\n")
+    stats = sink.stats()
+    assert stats.chunks_written == 101 and stats.flushes == 2 and stats.queue_depth == 0
+    assert "corona_file_sink_chunks_written_total 101" in sink.prometheus_lines()
+    with pytest.raises(ValueError):
+        sink.write("after close\n")
+
+
+def test_batch_bytes_counts_encoded_bytes(tmp_path):
+    path = tmp_path / "out.nt"
+    with RotatingFileSink(str(path), batch_bytes=8, flush_interval=60) as sink:
+        sink.write("éééé")  # four characters, eight UTF-8 bytes
+        deadline = time.monotonic() + 5
+        while sink.stats().flushes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sink.stats().flushes == 1 and sink.stats().bytes_written == 8
+    assert path.read_text(encoding="utf-8") == "éééé"
+
+
+def test_rotates_by_size_and_compresses(tmp_path):
+    path = tmp_path / "out.nt"
+    (tmp_path / "out.nt.3.gz").write_bytes(gzip.compress(b""))
+    lines = [f"{i:04d} " + "x" * 94 + "\n" for i in range(50)]
+    with RotatingFileSink(str(path), max_bytes=1000, compress=True, batch_bytes=300) as sink:
+        for line in lines:
+            sink.write(line)
+    # Numbering continues after the segments already on disk, and no segment is split mid-chunk
+    assert not (tmp_path / "out.nt.4").exists()
+    assert sink.stats().rotations == 4
+    assert all(len(gzip.decompress((tmp_path / f"out.nt.{n}.gz").read_bytes())) == 1000 for n in range(4, 8))
+    assert read_all(path) == "".join(lines)
+
+
+def test_rotates_idle_file_by_interval(tmp_path):
+    path = tmp_path / "out.txt"
+    with RotatingFileSink(str(path), max_interval=0.05, flush_interval=0.01) as sink:
+        sink.write("a\n")
+        deadline = time.monotonic() + 5
+        while sink.stats().rotations == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert (tmp_path / "out.txt.1").read_text() == "a\n"
+    assert path.read_text() == ""
+
+
+def test_pipeline_file_sink(tmp_path):
+    path = tmp_path / "sim.nt"
+    source = SimulatedBacnetSource(devices=20, ticks=2)
+    sink = FileSink(str(path), max_bytes=50_000, max_queue=2)
+    stats = asyncio.run(Pipeline([source], [Batch(size=16), Serialize("ntriples")], [sink], queue_size=2).run())
+    expected = render("ntriples", [source.reading(t, d, s) for t in range(2) for d in range(20) for s in range(len(source._samples))])
+    assert read_all(path) == expected
+    assert sink.file.stats().rotations > 0 and stats.metrics == 120
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, RDFS
+
+from corona_framework import graph_cache
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ONTOLOGY_PATH = os.path.join(project_root, "data", "corona-ontology.ttl")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setenv("CORONA_CACHE_DIR", str(directory))
+    return directory
+
+
+def test_encode_decode_round_trip():
+    graph = Graph().parse(ONTOLOGY_PATH, format="turtle")
+    graph.add((URIRef("urn:x"), RDFS.label, Literal("étiquette", lang="fr")))
+    decoded = graph_cache.decode_graph(graph_cache.encode_graph(graph))
+    assert isomorphic(graph, decoded)
+    assert dict(decoded.namespaces())["corona"] == dict(graph.namespaces())["corona"]
+
+
+def test_load_graph_uses_cache_and_rebuilds_on_change(cache_dir, tmp_path):
+    source = tmp_path / "onto.ttl"
+    source.write_text("<urn:A> <http://www.w3.org/2000/01/rdf-schema#subClassOf> <urn:B> .\n")
+
+    first = graph_cache.load_graph(str(source))
+    assert len(os.listdir(cache_dir)) == 1
+    assert isomorphic(graph_cache.load_graph(str(source)), first)
+
+    source.write_text("<urn:A> <http://www.w3.org/2000/01/rdf-schema#subClassOf> <urn:C> .\n")
+    changed = graph_cache.load_graph(str(source))
+    assert (URIRef("urn:A"), RDFS.subClassOf, URIRef("urn:C")) in changed
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_no_cache_and_corrupt_entries(cache_dir, tmp_path, capsys):
+    source = tmp_path / "onto.ttl"
+    source.write_text("<urn:a> a <urn:A> .\n<urn:A> <http://www.w3.org/2000/01/rdf-schema#subClassOf> <urn:B> .\n")
+
+    graph_cache.load_graph(str(source), use_cache=False)
+    assert not cache_dir.exists()
+
+    closure = graph_cache.load_rdfs_closure(str(source))
+    assert (URIRef("urn:a"), RDF.type, URIRef("urn:B")) in closure
+    for name in os.listdir(cache_dir):
+        (cache_dir / name).write_bytes(b"not a cache entry")
+    assert isomorphic(graph_cache.load_rdfs_closure(str(source)), closure)
+    captured = capsys.readouterr()
+    assert captured.out == "" and "Ignoring unreadable cache entry" in captured.err
+
+
+def test_unwritable_cache_only_warns_on_stderr(tmp_path, monkeypatch, capsys):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setenv("CORONA_CACHE_DIR", str(blocker / "cache"))
+    source = tmp_path / "onto.ttl"
+    source.write_text("<urn:a> a <urn:A> .\n")
+    assert len(graph_cache.load_graph(str(source))) == 1
+    captured = capsys.readouterr()
+    assert captured.out == "" and "Could not write cache entry" in captured.err
+
+
+def test_failed_write_leaves_no_temporary_file(cache_dir, monkeypatch, capsys):
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(graph_cache.os, "replace", fail)
+    graph_cache.write_atomically(str(cache_dir / "entry.bin"), b"data")
+    assert os.listdir(cache_dir) == [] and "disk full" in capsys.readouterr().err
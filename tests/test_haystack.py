@@ -0,0 +1,83 @@
+import io
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from corona_framework.demo_metrics import generate_all_sample_metrics
+from corona_framework.haystack import HaystackGridWriter, ZincGridWriter, _GridWriter, haystack_columns, ref_id, utc_datetime
+from corona_framework.models import BacnetApplicationMetric, RouterBBMDMetric
+
+
+@pytest.fixture(scope="module")
+def metrics():
+    return generate_all_sample_metrics()
+
+
+def test_json_grid_has_one_row_per_metric(metrics):
+    out = io.StringIO()
+    assert HaystackGridWriter(out).write_all(metrics) == len(metrics)
+    grid = json.loads(out.getvalue())
+    assert grid["_kind"] == "grid" and grid["meta"] == {"ver": "3.0"}
+    columns = [c["name"] for c in grid["cols"]]
+    assert len(grid["rows"]) == len(metrics)
+    for metric, row in zip(metrics, grid["rows"]):
+        assert set(row) <= set(columns)
+        # Every per-value dict from to_haystack_json is one cell of the metric's row
+        for value_row in metric.to_haystack_json():
+            assert row[value_row["metric"]] == value_row["val"]
+        assert row["entity"]["_kind"] == "ref" and row["entity"]["dis"] == metric.source_entity_uri
+        assert row["ts"] == {"_kind": "dateTime", "val": utc_datetime(metric.timestamp), "tz": "UTC"}
+
+
+def test_zinc_grid(metrics):
+    out = io.StringIO()
+    ZincGridWriter(out, [BacnetApplicationMetric]).write_all(metrics[:1])
+    version, header, row = out.getvalue().splitlines()
+    assert version == 'ver:"3.0"'
+    columns = header.split(",")
+    assert columns == haystack_columns([BacnetApplicationMetric])
+    cells = row.split(",")
+    assert len(cells) == len(columns)
+    assert cells[0] == f'@{ref_id(metrics[0].source_entity_uri)} "{metrics[0].source_entity_uri}"'
+    assert cells[columns.index("readPropertyRequests")] == str(metrics[0].read_property_requests)
+    assert cells[columns.index("directedWhoHasRequestsSent")] == ""
+
+    # Metrics whose keys are not columns of the grid are rejected
+    with pytest.raises(ValueError):
+        ZincGridWriter(io.StringIO(), [BacnetApplicationMetric]).write_metric(
+            RouterBBMDMetric(metric_instance_uri="urn:x", messagesRouted=1))
+
+
+def test_zinc_strings_and_timestamps():
+    metric = RouterBBMDMetric(
+        metric_instance_uri="urn:x", source_entity_address="10.0.0.1", metric_identifier='a "$b"\n',
+        timestamp=datetime(2024, 5, 1, 14, 0, tzinfo=timezone(timedelta(hours=2))), routed_via="urn:router")
+    out = io.StringIO()
+    ZincGridWriter(out, [RouterBBMDMetric]).write_all([metric])
+    row = out.getvalue().splitlines()[2]
+    assert row.startswith('@addr_10.0.0.1 "addr_10.0.0.1",2024-05-01T12:00:00Z UTC,,"a \\"\\$b\\"\\n",')
+    assert row.endswith('"urn:router",,,')
+
+
+def test_grid_writers_must_implement_every_part():
+    class HeaderOnly(_GridWriter):
+        def write_header(self):
+            pass
+
+    with pytest.raises(TypeError):
+        HeaderOnly(io.StringIO())
+
+
+def test_naive_timestamps_are_local_time_like_prometheus(monkeypatch):
+    monkeypatch.setenv("TZ", "Etc/GMT-2")
+    time.tzset()
+    try:
+        metric = RouterBBMDMetric(metric_instance_uri="urn:x", timestamp=datetime(2024, 5, 1, 14, 0), messages_routed=1)
+        assert utc_datetime(metric.timestamp) == "2024-05-01T12:00:00Z"
+        sample = next(line for line in metric.to_prometheus() if line.startswith("bacnet_messages_routed"))
+        assert sample.endswith(f" {int(datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc).timestamp() * 1000)}")
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from corona_framework.metric_store import MetricStore, Tier
+from corona_framework.models import RouterBBMDMetric
+from corona_framework.pipeline import Pipeline, SimulatedBacnetSource, StoreSink
+
+START = datetime(2024, 1, 1)
+
+
+def snapshot(seconds, routed, device="http://example.com/device/r1", **extra):
+    return RouterBBMDMetric(
+        metric_instance_uri=f"urn:router:{device}:{seconds}", source_entity_uri=device, metric_identifier="router_1",
+        timestamp=START + timedelta(seconds=seconds), messages_routed=routed, **extra)
+
+
+def test_raw_ring_keeps_latest_samples_and_filters():
+    store = MetricStore(raw_capacity=5)
+    for i in range(8):
+        assert store.add(snapshot(i * 10, 100 + i, bbmd_entries_count=3)) == 2
+    store.add(snapshot(0, 1, device="http://example.com/device/r2", observed_from="http://example.com/observer/1"))
+
+    [routed] = store.query(field="messages_routed", entity="http://example.com/device/r1")
+    assert [p.value for p in routed.points] == [103, 104, 105, 106, 107]
+    assert routed.points[0].timestamp == START + timedelta(seconds=30)
+    assert routed.series == ("RouterBBMDMetric", "router_1", "http://example.com/device/r1", None, "messages_routed")
+
+    window = store.query(START + timedelta(seconds=40), START + timedelta(seconds=60), field="messages_routed")
+    assert [[p.value for p in data.points] for data in window] == [[104, 105, 106]]
+    assert [s.entity for s in store.series(observer="http://example.com/observer/1")] == ["http://example.com/device/r2"]
+    assert len(store.series(metric_type="RouterBBMDMetric")) == 3
+
+    # Out-of-order samples are dropped rather than rewriting the rollups
+    assert store.add(snapshot(5, 1)) == 0
+    stats = store.stats()
+    assert (stats.series, stats.samples, stats.late) == (3, 17, 1)
+
+
+def test_rollups_per_tier():
+    store = MetricStore(raw_capacity=10, tiers=[Tier("1m", 60, 3), Tier("5m", 300, 2)])
+    for i in range(30):  # one sample every 20 s for 10 minutes
+        store.add(snapshot(i * 20, i))
+
+    [minutes] = store.query(tier="1m")
+    assert len(minutes.points) == 3  # the ring keeps the latest three buckets
+    last = minutes.points[-1]
+    assert last.start == START + timedelta(minutes=9)
+    assert (last.min, last.max, last.last, last.sum, last.samples, last.mean) == (27, 29, 29, 84, 3, 28)
+
+    five = store.query(START + timedelta(minutes=5), tier="5m")[0].points
+    assert [(p.start, p.samples, p.min, p.max) for p in five] == [(START + timedelta(minutes=5), 15, 15, 29)]
+    with pytest.raises(ValueError):
+        store.query(tier="1h")
+
+
+def test_memory_is_bounded():
+    store = MetricStore(raw_capacity=4, tiers=[Tier("1m", 60, 2)], max_series=2)
+    assert store.bytes_per_series == 16 * 4 + 48 * 2
+    for device in range(5):
+        store.add(snapshot(0, device, device=f"http://example.com/device/{device}"))
+    stats = store.stats()
+    assert (stats.series, stats.evicted_series, stats.memory_bytes) == (2, 3, 2 * store.bytes_per_series)
+    assert [s.entity for s in store.series()] == ["http://example.com/device/3", "http://example.com/device/4"]
+
+
+def test_store_sink():
+    store = MetricStore()
+    source = SimulatedBacnetSource(devices=2, ticks=3, interval=60)
+    asyncio.run(Pipeline([source], sinks=[StoreSink(store)]).run())
+    [requests] = store.query(metric_type="BacnetApplicationMetric", field="read_property_requests",
+                             entity="http://example.com/device/sim1")
+    assert len(requests.points) == 3
+    assert [p.value for p in requests.points] == sorted(p.value for p in requests.points)
+
+
+def test_series_with_missing_identity_parts_sort():
+    store = MetricStore()
+    store.add(snapshot(0, 1))
+    store.add(RouterBBMDMetric(metric_instance_uri="urn:router:anon", timestamp=START, messages_routed=2))
+    assert [s.metric_identifier for s in store.series()] == [None, "router_1"]
+    assert [data.series.entity for data in store.query(field="messages_routed")] == [None, "http://example.com/device/r1"]
@@ -166,3 +166,79 @@ def test_bacnet_application_metric_minimal(shapes_graph, ontology_graph):
     print(f"\nGenerated TTL for minimal BacnetApplicationMetric:\n{ttl_output}")
     validate_rdf(ttl_output, shapes_graph, ontology_graph)
 
+
+
+def test_from_rows_trusted_matches_validated():
+    """Trusted bulk construction builds the same instances as validated construction."""
+    timestamp = datetime(2024, 1, 1, 12, 0, 0)
+    rows = [
+        {"metric_instance_uri": f"urn:corona:metric:bulk:{i}", "observedFrom": "urn:corona:observer:bulk",
+         "timestamp": timestamp, "readPropertyRequests": i}
+        for i in range(5)
+    ]
+    trusted = BacnetApplicationMetric.from_rows(rows, trusted=True)
+    validated = BacnetApplicationMetric.from_rows(rows)
+    assert trusted == validated
+    assert trusted[3].model_fields_set == validated[3].model_fields_set
+    assert trusted[3].to_ttl() == validated[3].to_ttl()
+
+    columns = ["metric_instance_uri", "timestamp", "readPropertyRequests"]
+    tuples = BacnetApplicationMetric.from_rows([(r["metric_instance_uri"], timestamp, r["readPropertyRequests"]) for r in rows],
+                                               trusted=True, columns=columns)
+    assert [m.read_property_requests for m in tuples] == list(range(5))
+    assert tuples[0].observed_from is None and tuples[0].timestamp == timestamp
+
+    # Trusted rows skip validation, but sampled rows are still checked
+    bad = [{"metric_instance_uri": "urn:corona:metric:bulk:bad", "readPropertyRequests": "many"}] * 4
+    assert BacnetApplicationMetric.from_rows(bad, trusted=True)[0].read_property_requests == "many"
+    with pytest.raises(ValueError):
+        BacnetApplicationMetric.from_rows(bad, trusted=True, validation_sample_rate=0.5)
+    with pytest.raises(ValueError):
+        BacnetApplicationMetric.from_rows([{"readPropertyRequests": 1}], trusted=True)
+
+
+def test_term_pool_interns_terms():
+    """The term pool returns shared instances, keeps value types apart and evicts least recently used terms."""
+    from corona_framework.models import TermPool, format_rdflib_literal
+
+    pool = TermPool(maxsize=3)
+    observer = pool.term("http://example.com/observer/1")
+    assert pool.term("http://example.com/observer/1") is observer
+    assert pool.term(1) is not pool.term(True) and pool.term(1) is not pool.term(1.0)
+    assert pool.stats().evictions == 1  # the observer was least recently used
+    assert pool.term("http://example.com/observer/1") is not observer
+    stats = pool.stats()
+    assert (stats.hits, stats.misses, stats.size) == (2, 5, 3) and stats.hit_rate == pytest.approx(2 / 7)
+
+    assert pool.literal("label") == pool.literal("label") and pool.literal("x") is pool.literal("x")
+    assert format_rdflib_literal("urn:a") is format_rdflib_literal("urn:a")
+    assert str(format_rdflib_literal("plain words").datatype).endswith("#string")
+
+
+def test_term_pool_keeps_lexical_forms_apart():
+    """Equal datetimes in different zones, and 0.0 and -0.0, keep their own lexical forms."""
+    from datetime import timedelta, timezone
+
+    from corona_framework.models import TermPool, make_rdflib_term
+
+    pool = TermPool()
+    local = datetime(2024, 5, 1, 14, tzinfo=timezone(timedelta(hours=2)))
+    utc = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    assert local == utc
+    assert str(pool.term(local)) == "2024-05-01T14:00:00+02:00"
+    assert str(pool.term(utc)) == str(make_rdflib_term(utc)) == "2024-05-01T12:00:00+00:00"
+    assert str(pool.term(0.0)) != str(pool.term(-0.0)) == str(make_rdflib_term(-0.0))
+    assert str(pool.literal(local)) != str(pool.literal(utc))
+
+
+def test_graphs_share_term_objects():
+    """Metrics from the same observer share one term object per repeated value across graphs."""
+    from corona_framework.corona_tool import add_metric_to_graph
+    from corona_framework.models import P_OBSERVED_FROM
+
+    g = Graph()
+    for i in range(3):
+        add_metric_to_graph(BacnetApplicationMetric(metric_instance_uri=f"urn:m:{i}", observed_from="urn:observer:shared",
+                                                     timestamp=datetime(2024, 1, 1), readPropertyRequests=i), g)
+    observers = list(g.objects(None, P_OBSERVED_FROM))
+    assert len(observers) == 3 and all(o is observers[0] for o in observers)
@@ -0,0 +1,59 @@
+import json
+import os
+import shutil
+
+import pytest
+from click.testing import CliRunner
+
+from corona_framework.corona_tool import cli
+from corona_framework.multi_validation import expand_model_paths, validate_files
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_FILE_PATH = os.path.join(project_root, "examples", "corona-ASHRAE135ct.ttl")
+
+INVALID_TTL = """
+@prefix corona: <http://coronastandard.org/2022#> .
+<urn:m:1> a corona:PerformanceMetric ; corona:metric-identifier "a", "b" .
+"""
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    models = tmp_path / "models"
+    (models / "nested").mkdir(parents=True)
+    shutil.copy(EXAMPLE_FILE_PATH, models / "good.ttl")
+    shutil.copy(EXAMPLE_FILE_PATH, models / "nested" / "good2.ttl")
+    (models / "bad.ttl").write_text(INVALID_TTL)
+    (models / "broken.ttl").write_text("this is not turtle")
+    (models / "notes.txt").write_text("ignored")
+    return models
+
+
+def test_expand_model_paths(model_dir):
+    from_dir = expand_model_paths([str(model_dir)])
+    assert [os.path.relpath(p, model_dir) for p in from_dir] == ["bad.ttl", "broken.ttl", "good.ttl", os.path.join("nested", "good2.ttl")]
+    assert expand_model_paths([str(model_dir / "g*.ttl"), str(model_dir / "good.ttl")]) == [str(model_dir / "good.ttl")]
+    assert expand_model_paths(["missing.ttl"]) == ["missing.ttl"]
+
+
+@pytest.mark.parametrize("workers", [1, 2, None])
+def test_validate_files_summary(model_dir, workers):
+    summary = validate_files(expand_model_paths([str(model_dir)]), workers=workers)
+    by_name = {os.path.basename(r.path): r for r in summary.results}
+    assert not summary.conforms
+    assert by_name["good.ttl"].conforms and by_name["good.ttl"].triples > 0
+    assert not by_name["bad.ttl"].conforms and by_name["bad.ttl"].violations >= 2
+    assert by_name["broken.ttl"].error and not by_name["broken.ttl"].conforms
+    data = summary.to_dict()
+    assert (data["files"], data["failed"], data["errors"]) == (4, 2, 1)
+
+
+def test_cli_json_summary_and_exit_code(model_dir):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["validate", "--no-daemon", "--json", str(model_dir / "**" / "good*.ttl")])
+    assert result.exit_code == 0
+    assert json.loads(result.output)["files"] == 2
+
+    result = runner.invoke(cli, ["validate", "--no-daemon", str(model_dir)])
+    assert result.exit_code == 1
+    assert "2/4 file(s) conform" in result.output
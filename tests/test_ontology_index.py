@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+from rdflib import Graph, Namespace
+from rdflib.namespace import RDF, RDFS
+
+from corona_framework.corona_tool import cli
+from corona_framework.ontology_index import NameRule, OntologyIndex
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ONTOLOGY_PATH = os.path.join(project_root, "data", "corona-ontology.ttl")
+ONT = Namespace("http://example.org/standards/corona/metrics#")
+
+
+@pytest.fixture(scope="module")
+def ontology_graph():
+    return Graph().parse(ONTOLOGY_PATH, format="turtle")
+
+
+def test_categories_match_substring_scan(ontology_graph):
+    index = OntologyIndex(ontology_graph)
+    properties = sorted(str(s) for s in ontology_graph.subjects(RDF.type, RDF.Property))
+    assert sorted(index.properties) == properties
+    assert index.categories["router"] == [p for p in properties if "routed" in p.lower()]
+    assert index.categories["who"] == [p for p in properties if "Who" in p]
+    assert index.categories["general"] == [p for p in properties if any(
+        name in p for name in ("observedFrom", "description", "metric-identifier", "metric-name"))]
+
+    routed = index.properties[str(ONT.messagesRouted)]
+    assert routed.label == str(ontology_graph.value(ONT.messagesRouted, RDFS.label))
+    assert routed.kind == "lifetime"
+
+
+def test_counts_and_kinds(ontology_graph):
+    index = OntologyIndex(ontology_graph)
+    counts = index.counts()
+    assert counts["network_interface"] == len(set(ontology_graph.subjects(RDFS.subPropertyOf, ONT.NetworkInterfaceMetric)))
+    assert counts["application"] == len(set(ontology_graph.subjects(RDFS.domain, ONT.ApplicationMetric)))
+    assert len(index.of_kind("lifetime")) >= counts["lifetime"] > 0
+    assert [info.uri for info in index.with_domain(str(ONT.ApplicationMetric))] == index.by_domain[str(ONT.ApplicationMetric)]
+
+
+def test_custom_rules_and_transitive_kind():
+    graph = Graph().parse(data="""
+        @prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        @prefix corona: <urn:c#> .
+        corona:base a rdf:Property ; rdfs:subPropertyOf corona:SampledMetric .
+        corona:leafLatency a rdf:Property ; rdfs:subPropertyOf corona:base ; rdfs:label "Leaf" .
+        corona:loopA a rdf:Property ; rdfs:subPropertyOf corona:loopB .
+        corona:loopB a rdf:Property ; rdfs:subPropertyOf corona:loopA .
+    """, format="turtle")
+    index = OntologyIndex(graph, name_rules=[NameRule("latency", "Latency", ("LATENCY",))])
+    assert index.categories == {"latency": ["urn:c#leafLatency"]}
+    assert index.properties["urn:c#leafLatency"].kind == "sampled"
+    assert index.properties["urn:c#loopA"].kind is None
+
+
+def test_analyze_json_output():
+    result = CliRunner().invoke(cli, ["analyze", "--json"])
+    data = json.loads(result.output)
+    assert data["properties"] > 0
+    assert data["counts"]["application"] > 0
@@ -0,0 +1,90 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from corona_framework.demo_metrics import generate_all_sample_metrics
+from corona_framework.pipeline import (Batch, CollectSink, Map, Pipeline, PrometheusSink, Serialize, SimulatedBacnetSource, Sink,
+                                       Stage, TextSink, render)
+from corona_framework.prometheus import PrometheusRegistry
+
+
+class SlowSink(CollectSink):
+    async def write(self, item):
+        await asyncio.sleep(0.001)
+        await super().write(item)
+
+
+def test_simulated_source_readings():
+    source = SimulatedBacnetSource(devices=3, ticks=2, interval=60)
+    sink = CollectSink()
+    stats = asyncio.run(Pipeline([source], sinks=[sink]).run())
+    samples = len(generate_all_sample_metrics())
+    assert stats.metrics == stats.items == len(sink.items) == 3 * 2 * samples
+    assert len({m.metric_instance_uri for m in sink.items}) == len(sink.items)
+    first, later = source.reading(0, 1, 0), source.reading(7, 1, 0)
+    assert (later.timestamp - first.timestamp).total_seconds() == 7 * 60
+    assert later.read_property_requests > first.read_property_requests
+    assert later.source_entity_uri == "http://example.com/device/sim1"
+
+
+def test_batches_serialize_in_order_through_an_executor():
+    source = SimulatedBacnetSource(devices=5, ticks=2)
+    expected = render("ntriples", [source.reading(t, d, s) for t in range(2) for d in range(5) for s in range(len(source._samples))])
+    out = io.StringIO()
+    with ThreadPoolExecutor(4) as executor:
+        stages = [Batch(size=4), Serialize("ntriples", executor, concurrency=4)]
+        stats = asyncio.run(Pipeline([source], stages, [TextSink(out)], queue_size=2).run())
+    assert out.getvalue() == expected
+    assert stats.metrics == 30 and stats.items == 8
+    assert 0 <= stats.latency_p50 <= stats.latency_p95 <= stats.latency_max
+
+    with pytest.raises(ValueError):
+        Serialize("ttl")
+
+
+def test_backpressure_bounds_the_queues():
+    seen = []
+
+    class Watch(Stage):
+        def __init__(self):
+            self.queues = None
+
+        async def run(self, inbox, outbox):
+            self.queues = (inbox, outbox)
+            await super().run(inbox, outbox)
+
+        async def process(self, item):
+            seen.append(max(q.qsize() for q in self.queues))
+            return item
+
+    sink = SlowSink()
+    stats = asyncio.run(Pipeline([SimulatedBacnetSource(devices=10)], [Watch()], [sink], queue_size=3).run())
+    assert stats.metrics == len(sink.items)
+    assert max(seen) <= 3
+
+
+def test_map_filters_and_prometheus_sink():
+    registry = PrometheusRegistry()
+    stages = [Map(lambda m: m if m.metric_identifier.startswith("sim_0_") else None), Batch(size=100, max_delay=0.01)]
+    stats = asyncio.run(Pipeline([SimulatedBacnetSource(devices=4)], stages, [PrometheusSink(registry)]).run())
+    assert stats.metrics == 4 and stats.items == 1
+    assert 'metric_id="sim_0_3"' in registry.render().decode()
+
+
+def test_stage_errors_propagate():
+    def fail(metric):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(Pipeline([SimulatedBacnetSource(devices=2, ticks=None)], [Map(fail)], [CollectSink()]).run())
+
+
+def test_sinks_must_implement_write():
+    class CloseOnly(Sink):
+        async def close(self):
+            pass
+
+    with pytest.raises(TypeError):
+        CloseOnly()
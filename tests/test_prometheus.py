@@ -0,0 +1,64 @@
+import gzip
+import urllib.request
+
+from corona_framework.demo_metrics import generate_all_sample_metrics
+from corona_framework.prometheus import PrometheusExporter, PrometheusRegistry
+
+
+def many_devices(count: int):
+    """Demo metrics repeated for ``count`` devices."""
+    metrics = []
+    for i in range(count):
+        for sample in generate_all_sample_metrics():
+            metrics.append(sample.model_copy(update={"source_entity_uri": f"urn:corona:device:{i}", "metric_instance_uri": f"urn:m:{i}"}))
+    return metrics
+
+
+def test_registry_writes_each_family_header_once():
+    registry = PrometheusRegistry()
+    assert registry.update(many_devices(50))
+    lines = registry.render().decode().splitlines()
+    assert registry.render_lines() == lines
+
+    type_lines = [line for line in lines if line.startswith("# TYPE ")]
+    assert len(type_lines) == len(set(type_lines))
+    assert "# TYPE bacnet_messages_routed gauge" in type_lines
+    # Fields a class declares as gauges are typed that way, without the counter suffix
+    assert "# TYPE bacnet_bbmd_entries_count gauge" in type_lines
+    assert not any(line.startswith("# TYPE bacnet_bbmd_entries_count_total") for line in type_lines)
+    samples = [line for line in lines if line.startswith("bacnet_messages_routed{")]
+    assert len(samples) == 50
+    assert registry.series_count() == len([line for line in lines if not line.startswith("#")])
+
+
+def test_registry_caches_payload_until_changed():
+    registry = PrometheusRegistry()
+    metrics = many_devices(3)
+    registry.update(metrics)
+    payload = registry.render()
+    version = registry.version
+    # Re-submitting identical samples does not invalidate the cached payload
+    assert not registry.update(metrics)
+    assert registry.render() is payload and registry.version == version
+
+    changed = metrics[0].model_copy(update={"read_property_requests": 1})
+    assert registry.add(changed)
+    assert registry.render() is not payload
+
+
+def test_exporter_serves_plain_and_gzip():
+    registry = PrometheusRegistry()
+    registry.update(many_devices(2))
+    exporter = PrometheusExporter(registry, port=0)
+    exporter.start()
+    try:
+        url = "http://%s:%d/metrics" % exporter.address
+        with urllib.request.urlopen(url) as response:
+            plain = response.read()
+            assert response.headers["Content-Type"].startswith("text/plain")
+        request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert gzip.decompress(response.read()) == plain == registry.render()
+    finally:
+        exporter.stop()
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from corona_framework.batch import MetricBatch
+from corona_framework.generated_models import NetworkInterfaceMetric
+from corona_framework.models import BacnetApplicationMetric, RouterBBMDMetric
+from corona_framework.rates import UNSIGNED_LONG_MODULUS, CounterRateEngine, rate_field_names
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def snapshot(seconds: int, requests: int, source: str = "urn:device:1", **fields) -> BacnetApplicationMetric:
+    return BacnetApplicationMetric(
+        metric_instance_uri=f"urn:metric:{source}:{seconds}", metric_identifier="app", source_entity_uri=source,
+        timestamp=START + timedelta(seconds=seconds), read_property_requests=requests, **fields,
+    )
+
+
+def test_rates_resets_and_wraparound():
+    engine = CounterRateEngine()
+    assert engine.update(snapshot(0, 100)) == []
+
+    (sample,) = engine.update(snapshot(10, 150))
+    assert (sample.field, sample.delta, sample.seconds, sample.rate) == ("read_property_requests", 50, 10.0, 5.0)
+    assert sample.source == "urn:device:1" and not sample.reset
+
+    (reset,) = engine.update(snapshot(20, 30))
+    assert reset.reset and reset.delta == 30
+
+    engine.update(snapshot(30, UNSIGNED_LONG_MODULUS - 10))
+    (wrapped,) = engine.update(snapshot(40, 5))
+    assert wrapped.wrapped and wrapped.delta == 15
+    assert (engine.resets, engine.wraps) == (1, 1)
+
+    # Late snapshots are ignored and do not move the reference sample
+    assert engine.update(snapshot(35, 1)) == []
+    assert engine.update(snapshot(50, 25))[0].delta == 20
+
+
+def test_series_are_independent():
+    engine = CounterRateEngine()
+    engine.update(snapshot(0, 10, source="urn:device:1"))
+    engine.update(snapshot(0, 1000, source="urn:device:2"))
+    assert engine.update(snapshot(5, 20, source="urn:device:1"))[0].delta == 10
+    assert engine.update(snapshot(5, 1500, source="urn:device:2"))[0].delta == 500
+    assert engine.series_count() == 2
+    assert engine.expire(START + timedelta(seconds=6)) == 2
+    assert engine.series_count() == 0
+
+
+def test_batch_path_matches_incremental_path():
+    metrics = [
+        snapshot(t, 100 * t + (7 if source.endswith("2") else 0), source=source, who_is_requests_sent=t // 2)
+        for t in (30, 0, 10, 20) for source in ("urn:device:1", "urn:device:2")
+    ]
+    metrics.append(snapshot(40, 3))  # reset on device 1
+    incremental = CounterRateEngine()
+    expected = [s for m in sorted(metrics, key=lambda m: m.timestamp) for s in incremental.update(m)]
+
+    bulk = CounterRateEngine()
+    samples = bulk.update_batch(MetricBatch.from_metrics(metrics))
+    assert sorted(samples) == sorted(expected)
+    assert bulk.resets == incremental.resets == 1
+
+    router = RouterBBMDMetric(metric_instance_uri="urn:r:1", metric_identifier="r", timestamp=START, messages_routed=1)
+    assert bulk.update(router) == []
+
+
+def test_gauges_are_not_counters():
+    def router(seconds, entries, routed):
+        return RouterBBMDMetric(metric_instance_uri=f"urn:r:{seconds}", metric_identifier="r", source_entity_uri="urn:device:r",
+                                timestamp=START + timedelta(seconds=seconds), bbmd_entries_count=entries, messages_routed=routed)
+
+    assert "bbmd_entries_count" not in rate_field_names(RouterBBMDMetric)
+    assert "messages_routed" in rate_field_names(RouterBBMDMetric)
+    # Generated classes follow the ontology: counters get rates, gauges such as link speed do not
+    assert "bytes_received" in rate_field_names(NetworkInterfaceMetric)
+    assert "link_speed" not in rate_field_names(NetworkInterfaceMetric)
+
+    engine = CounterRateEngine()
+    engine.update(router(0, 5, 100))
+    samples = engine.update(router(10, 3, 120))
+    assert [(s.field, s.delta, s.reset) for s in samples] == [("messages_routed", 20, False)]
+    assert engine.resets == 0
+
+    bulk = CounterRateEngine()
+    assert [s.field for s in bulk.update_batch(MetricBatch.from_metrics([router(0, 5, 100), router(10, 3, 120)]))] == ["messages_routed"]
@@ -0,0 +1,91 @@
+import io
+from datetime import datetime
+
+from rdflib import Dataset, Graph, URIRef
+from rdflib.compare import isomorphic
+
+from corona_framework.corona_tool import add_metric_to_graph
+from corona_framework.demo_metrics import generate_all_sample_metrics
+from corona_framework.models import BacnetApplicationMetric, RouterBBMDMetric
+from corona_framework.rdf_writer import interval_graph, observer_graph, write_metrics_nquads, write_metrics_ntriples, write_metrics_ttl
+
+
+def reference_graph(metrics) -> Graph:
+    """Builds the graph that `generate --format ttl` serializes."""
+    g = Graph()
+    for metric in metrics:
+        add_metric_to_graph(metric, g)
+    return g
+
+
+def edge_case_metrics():
+    """Metrics exercising escaping and the URI-vs-literal decision."""
+    timestamp = datetime(2024, 5, 1, 12, 0, 0)
+    return [
+        BacnetApplicationMetric(
+            metric_instance_uri="urn:corona:metric:edge:1",
+            observed_from="observer without scheme",
+            description='Line one\nLine "two" with a \\ backslash',
+            metric_identifier="edge_1",
+            metric_name="Edge",
+            timestamp=timestamp,
+            source_entity_address="10.0.0.9",
+            readPropertyRequests=0,
+        ),
+        RouterBBMDMetric(
+            metric_instance_uri="urn:corona:metric:edge:2",
+            observed_from="urn:corona:observer:1",
+            timestamp=timestamp,
+            routed_via="urn:corona:device:router",
+            messages_routed=2**63,
+        ),
+    ]
+
+
+def test_streaming_ttl_matches_graph_output():
+    """The streamed Turtle parses to the same graph as add_metric_to_graph builds."""
+    metrics = generate_all_sample_metrics() + edge_case_metrics()
+    buffer = io.StringIO()
+    assert write_metrics_ttl(metrics, buffer) == len(metrics)
+
+    streamed = Graph().parse(data=buffer.getvalue(), format="turtle")
+    assert isomorphic(streamed, reference_graph(metrics))
+    # Prefixes are written exactly once
+    assert buffer.getvalue().count("@prefix corona:") == 1
+
+
+def test_streaming_ntriples_matches_graph_output():
+    """The streamed N-Triples parse to the same graph and are one triple per line."""
+    metrics = generate_all_sample_metrics() + edge_case_metrics()
+    buffer = io.StringIO()
+    write_metrics_ntriples(metrics, buffer)
+
+    lines = buffer.getvalue().splitlines()
+    streamed = Graph().parse(data=buffer.getvalue(), format="nt")
+    assert len(lines) == len(streamed)
+    assert isomorphic(streamed, reference_graph(metrics))
+
+
+def test_streaming_nquads_places_metrics_in_named_graphs():
+    """Each metric lands in its observer's graph, matching add_metric_to_graph on a Dataset."""
+    metrics = generate_all_sample_metrics() + edge_case_metrics()
+    buffer = io.StringIO()
+    write_metrics_nquads(metrics, buffer)
+    streamed = Dataset().parse(data=buffer.getvalue(), format="nquads")
+
+    reference = Dataset()
+    for metric in metrics:
+        add_metric_to_graph(metric, reference, graph_name=observer_graph(metric))
+    names = {observer_graph(m) for m in metrics}
+    assert "urn:corona:observer:observer%20without%20scheme" in names
+    for name in names:
+        assert isomorphic(streamed.graph(URIRef(name)), reference.graph(URIRef(name)))
+    assert "".join(m.to_nquads() for m in metrics) == buffer.getvalue()
+    assert "".join(m.to_ntriples() for m in metrics).count("\n") == len(buffer.getvalue().splitlines())
+
+
+def test_interval_graphs():
+    metrics = edge_case_metrics()
+    quarter_hour = interval_graph(900)
+    assert quarter_hour(metrics[0]) == "urn:corona:interval:2024-05-01T12:00:00Z/PT900S"
+    assert metrics[0].to_nquads("urn:g").endswith(" <urn:g> .\n")
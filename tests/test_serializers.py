@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from corona_framework.constants import BACNET, CORONA
+from corona_framework.models import (
+    BacnetApplicationMetric,
+    RouterBBMDMetric,
+    get_serialization_plan,
+    to_prometheus_metric_name,
+)
+
+
+def sample_app_metric() -> BacnetApplicationMetric:
+    return BacnetApplicationMetric(
+        metric_instance_uri="urn:corona:metric:app:1",
+        source_entity_uri="urn:corona:device:1",
+        observed_from="urn:corona:observer:1",
+        metric_identifier="app_1",
+        timestamp=datetime(2024, 5, 1, 12, 0, 0),
+        readPropertyRequests=150,
+        total_bacnet_messages_sent=200,
+    )
+
+
+def test_serialization_plan_is_compiled_once_per_class():
+    """The plan is cached per class and resolves predicates, keys and Prometheus families."""
+    plan = get_serialization_plan(BacnetApplicationMetric)
+    assert BacnetApplicationMetric.serialization_plan() is plan
+    assert get_serialization_plan(RouterBBMDMetric) is not plan
+
+    fields = {field.name: field for field in plan.fields}
+    assert "metric_instance_uri" not in fields
+    assert fields["read_property_requests"].key == "readPropertyRequests"
+    assert fields["read_property_requests"].predicate == BACNET.readPropertyRequests
+    assert fields["total_broadcasts_received"].predicate == CORONA.totalBroadcastsReceived
+
+    families = plan.prometheus_families("bacnet")
+    assert plan.prometheus_families("bacnet") is families
+    assert [f.name for f in families] == [to_prometheus_metric_name(f.key, "bacnet") for f in plan.fields]
+
+
+def test_serializers_only_emit_set_fields():
+    """Unset optional fields are skipped by every serializer."""
+    metric = sample_app_metric()
+    assert metric._get_metric_fields() == {"read_property_requests": 150, "total_bacnet_messages_sent": 200}
+    assert [row["metric"] for row in metric.to_haystack_json()] == ["readPropertyRequests", "totalBACnetMessagesSent"]
+
+    samples = [line for line in metric.to_prometheus() if line and not line.startswith("#")]
+    assert samples[0].startswith('bacnet_read_property_requests_total{entity_uri="urn_corona_device_1"')
+    assert samples[0].split()[-2] == "150.0"
@@ -0,0 +1,100 @@
+import os
+from datetime import datetime
+
+import pytest
+from pyshacl import validate
+from rdflib import BNode, Graph
+
+from corona_framework.batch import MetricBatch
+from corona_framework.chunked_validation import SH
+from corona_framework.models import BacnetApplicationMetric
+from corona_framework.shape_compiler import ShapeValidator, compile_shapes, is_well_formed
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHAPES_FILE_PATH = os.path.join(project_root, "data", "corona-shapes.ttl")
+EXAMPLE_FILE_PATH = os.path.join(project_root, "examples", "corona-ASHRAE135ct.ttl")
+
+VIOLATIONS_TTL = """
+@prefix corona: <http://coronastandard.org/2022#> .
+@prefix net: <http://www.example.org/network-ontology#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+corona:NetworkInterfaceMetric rdfs:subClassOf corona:PerformanceMetric .
+<urn:m:1> a corona:NetworkInterfaceMetric ; corona:bytesReceived "x" ; corona:bytesSent "-1"^^xsd:unsignedLong ; corona:observedFrom <urn:iface:1> .
+<urn:iface:1> a net:Iface .
+<urn:m:2> a corona:NetworkInterfaceMetric ; corona:observedFrom "not an iri" .
+<urn:m:3> a corona:PerformanceMetric ; corona:metric-identifier "a", "b" ; corona:observedFrom <urn:iface:1> .
+<urn:m:4> a corona:ApplicationMetric ; corona:readPropertyRequests "12"^^xsd:unsignedLong .
+"""
+
+# Shapes over the namespaces the pydantic models serialize to
+MODEL_SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix corona: <http://example.com/corona#> .
+@prefix bacnet: <https://data.ashrae.org/bacnet#> .
+corona:AppShape a sh:NodeShape ;
+    sh:targetClass corona:BacnetApplicationMetric ;
+    sh:property [ sh:path corona:observedFrom ; sh:minCount 1 ; sh:nodeKind sh:IRI ] ;
+    sh:property [ sh:path corona:metric-identifier ; sh:maxCount 1 ; sh:pattern "^[a-z-]+$" ] ;
+    sh:property [ sh:path bacnet:readPropertyRequests ; sh:datatype xsd:integer ; sh:maxInclusive 1000 ] .
+"""
+
+
+def result_keys(results_graph: Graph):
+    def normalize(node):
+        return None if node is None or isinstance(node, BNode) else str(node)
+
+    return {
+        (str(results_graph.value(r, SH.focusNode)), normalize(results_graph.value(r, SH.resultPath)),
+         str(results_graph.value(r, SH.sourceConstraintComponent)).split("#")[-1])
+        for r in results_graph.objects(None, SH.result)
+    }
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    return compile_shapes(SHAPES_FILE_PATH)
+
+
+def test_corona_shapes_compile_with_fallback_for_sh_class(compiled):
+    assert len(compiled.node_shapes) == 5
+    assert [param.split("#")[-1] for _, _, param in compiled.uncompiled] == ["class"]
+
+
+def test_compiled_results_match_pyshacl(compiled):
+    data_graph = Graph().parse(EXAMPLE_FILE_PATH, format="turtle")
+    data_graph.parse(data=VIOLATIONS_TTL, format="turtle")
+    _, results_graph, _ = validate(data_graph, shacl_graph=compiled.shapes_graph, inference=None, debug=False)
+
+    violations = ShapeValidator(compiled).validate_graph(data_graph)
+    assert {(v.focus_node, v.path or None, v.component) for v in violations} == result_keys(results_graph)
+    assert any(v.component == "DatatypeConstraintComponent" and v.value[1] == "-1" for v in violations)
+
+
+def test_metric_and_batch_validation():
+    validator = ShapeValidator(compile_shapes(Graph().parse(data=MODEL_SHAPES_TTL, format="turtle")))
+    good = BacnetApplicationMetric(
+        metric_instance_uri="urn:metric:1", observed_from="urn:device:1", metric_identifier="read-requests",
+        timestamp=datetime(2024, 1, 1), read_property_requests=10,
+    )
+    bad = good.model_copy(update={
+        "metric_instance_uri": "urn:metric:2", "observed_from": "device 1",
+        "metric_identifier": "Read_Requests", "read_property_requests": 5000,
+    })
+    assert validator.validate_metric(good) == []
+    assert {v.component for v in validator.validate_metric(bad)} == {
+        "NodeKindConstraintComponent", "PatternConstraintComponent", "MaxInclusiveConstraintComponent",
+    }
+
+    batch = MetricBatch.from_metrics([good, bad, good.model_copy(update={"metric_instance_uri": "urn:metric:3"})])
+    batch_violations = validator.validate_batch(batch)
+    assert {v.focus_node for v in batch_violations} == {"urn:metric:2"}
+    assert sorted(batch_violations) == sorted(validator.validate_metric(bad))
+
+
+def test_is_well_formed():
+    assert is_well_formed("42", "http://www.w3.org/2001/XMLSchema#unsignedLong")
+    assert not is_well_formed("-1", "http://www.w3.org/2001/XMLSchema#unsignedLong")
+    assert not is_well_formed("1.5", "http://www.w3.org/2001/XMLSchema#integer")
+    assert is_well_formed("2024-01-01T00:00:00", "http://www.w3.org/2001/XMLSchema#dateTime")
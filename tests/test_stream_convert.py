@@ -0,0 +1,65 @@
+import io
+import json
+
+import pytest
+from click.testing import CliRunner
+from rdflib import Graph
+
+from corona_framework import daemon
+from corona_framework.corona_tool import cli
+from corona_framework.demo_metrics import generate_all_sample_metrics
+from corona_framework.stream_convert import convert_stream, metric_to_ndjson, read_ndjson_metrics
+
+
+@pytest.fixture(scope="module")
+def metrics():
+    return generate_all_sample_metrics()
+
+
+@pytest.fixture(scope="module")
+def ndjson_lines(metrics):
+    return [metric_to_ndjson(m) + "\n" for m in metrics]
+
+
+def test_ndjson_round_trip(metrics, ndjson_lines):
+    assert list(read_ndjson_metrics(ndjson_lines)) == metrics
+    assert json.loads(ndjson_lines[0]) == daemon.metric_to_request(metrics[0])
+    # Records without a type fall back to the default class
+    untyped = json.dumps(metrics[0].model_dump(mode='json'))
+    assert list(read_ndjson_metrics([untyped], default_type=type(metrics[0]).__name__)) == metrics[:1]
+
+
+@pytest.mark.parametrize("output_format", ["ttl", "prometheus", "haystack"])
+def test_output_matches_batch_rendering(metrics, ndjson_lines, output_format):
+    out = io.StringIO()
+    assert convert_stream(ndjson_lines, out, output_format) == len(metrics)
+    expected = daemon.render_metrics(metrics, output_format)
+    assert out.getvalue().rstrip("\n") == expected.rstrip("\n")
+
+
+def test_ntriples_output_parses(metrics, ndjson_lines):
+    out = io.StringIO()
+    convert_stream(ndjson_lines, out, "ntriples")
+    graph = Graph().parse(data=out.getvalue(), format="nt")
+    assert len(set(graph.subjects())) >= len(metrics)
+
+
+def test_invalid_records_are_skipped_or_raise(ndjson_lines):
+    lines = ["not json\n", '{"type": "Nope"}\n', "\n"] + ndjson_lines[:1]
+    errors = []
+    assert len(list(read_ndjson_metrics(lines, errors=errors))) == 1
+    assert [e.line for e in errors] == [1, 2]
+    with pytest.raises(ValueError, match="line 1"):
+        list(read_ndjson_metrics(lines))
+
+
+def test_convert_command(tmp_path, ndjson_lines):
+    source = tmp_path / "in.ndjson"
+    source.write_text("".join(ndjson_lines) + '{"type": "Nope"}\n')
+    output = tmp_path / "out.ndjson"
+    result = CliRunner().invoke(cli, ["convert", str(source), "--format", "ndjson", "-o", str(output)])
+    assert result.exit_code == 1
+    assert output.read_text() == "".join(ndjson_lines)
+
+    result = CliRunner().invoke(cli, ["convert", "--format", "prometheus"], input="".join(ndjson_lines))
+    assert result.exit_code == 0 and "# TYPE" in result.output
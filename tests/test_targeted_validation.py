@@ -0,0 +1,104 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+from pyshacl import validate
+from rdflib import BNode, Graph, URIRef
+from rdflib.namespace import RDF
+
+from corona_framework.chunked_validation import SH
+from corona_framework.corona_tool import cli
+from corona_framework.targeted_validation import TargetedValidator, load_targeted_validator
+from corona_framework.validate_model import ontology_path, shapes_file_path
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_FILE_PATH = os.path.join(project_root, "examples", "corona-ASHRAE135ct.ttl")
+CORONA = "http://coronastandard.org/2022#"
+
+VIOLATIONS_TTL = """
+@prefix corona: <http://coronastandard.org/2022#> .
+@prefix net: <http://www.example.org/network-ontology#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+corona:NetworkInterfaceMetric rdfs:subClassOf corona:PerformanceMetric .
+net:Iface rdfs:subClassOf net:HWNetEntity .
+<urn:m:1> a corona:NetworkInterfaceMetric ; corona:bytesReceived "x" ; corona:observedFrom <urn:iface:1> .
+<urn:iface:1> a net:Iface .
+<urn:m:2> a corona:NetworkInterfaceMetric ; corona:observedFrom <urn:iface:2> .
+<urn:iface:2> a net:Unknown .
+<urn:m:3> a corona:PerformanceMetric ; corona:metric-identifier "a", "b" .
+<urn:m:4> a corona:NetworkInterfaceMetric ; corona:observedFrom [ a net:Iface ] .
+"""
+
+# Types that only RDFS entailment (via domain and sub-property) makes visible to the shapes
+ENTAILED_TTL = """
+@prefix corona: <http://coronastandard.org/2022#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+<urn:p:measured> rdfs:domain corona:PerformanceMetric .
+<urn:p:counted> rdfs:subPropertyOf <urn:p:measured> .
+<urn:m:5> <urn:p:counted> 1 ; corona:metric-identifier "a", "b" .
+"""
+
+
+@pytest.fixture(scope="module")
+def validator():
+    return load_targeted_validator(shapes_file_path, ontology_path)
+
+
+def result_keys(results_graph):
+    # Blank nodes by their description, without types: full RDFS inference copies entailed types into the report
+    def normalize(node):
+        if not isinstance(node, BNode):
+            return node
+        return frozenset((p, "_:b" if isinstance(o, BNode) else o) for p, o in results_graph.predicate_objects(node) if p != RDF.type)
+
+    return {
+        tuple(normalize(results_graph.value(r, p)) for p in (SH.focusNode, SH.resultPath, SH.sourceConstraintComponent, SH.value))
+        for r in results_graph.objects(None, SH.result)
+    }
+
+
+@pytest.mark.parametrize("extra", [VIOLATIONS_TTL, ENTAILED_TTL, ""])
+def test_results_match_rdfs_inference(validator, extra):
+    data = Graph().parse(EXAMPLE_FILE_PATH, format="turtle")
+    data.parse(data=extra, format="turtle")
+    full_conforms, full_results, _ = validate(data, shacl_graph=validator.shapes_graph, inference="rdfs", debug=False)
+    before = len(data)
+    conforms, results, _ = validator.validate(data)
+    assert conforms == full_conforms and result_keys(results) == result_keys(full_results)
+    assert len(data) == before
+
+
+def test_plan_adds_only_needed_types_and_skips_untargeted_shapes(validator):
+    data = Graph().parse(data=ENTAILED_TTL, format="turtle")
+    plan = validator.prepare(data)
+    m5 = URIRef("urn:m:5")
+    assert (m5, RDF.type, URIRef(CORONA + "PerformanceMetric")) in plan.graph
+    assert (m5, URIRef("urn:p:measured"), None) not in plan.graph  # not a shape path
+    assert plan.shapes == [URIRef(CORONA + "PerformanceMetricShape")] and len(plan.skipped) == 4
+    assert plan.inferred == 1
+
+    assert validator.validate(Graph())[0] is True
+    assert load_targeted_validator(shapes_file_path, ontology_path) is validator
+
+
+def test_ontology_hierarchy_is_used():
+    shapes = Graph().parse(data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        <urn:shape> a sh:NodeShape ; sh:targetClass <urn:Metric> ;
+            sh:property [ sh:path <urn:value> ; sh:minCount 1 ] .
+        """, format="turtle")
+    ontology = Graph().parse(data="""
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        <urn:Counter> rdfs:subClassOf <urn:Metric> .
+        """, format="turtle")
+    data = Graph().parse(data="<urn:c> a <urn:Counter> .", format="turtle")
+    assert TargetedValidator(shapes).validate(data)[0] is True
+    conforms, results, _ = TargetedValidator(shapes, ontology).validate(data)
+    assert conforms is False and {key[0] for key in result_keys(results)} == {URIRef("urn:c")}
+
+
+def test_cli_targeted(tmp_path, monkeypatch):
+    monkeypatch.setenv("CORONA_CACHE_DIR", str(tmp_path))
+    result = CliRunner().invoke(cli, ["validate", "--targeted", "--no-result-cache", EXAMPLE_FILE_PATH])
+    assert result.exit_code == 0 and "Validated 0 of 5 shapes" in result.output
+    assert CliRunner().invoke(cli, ["validate", "--targeted", "--chunk-size", "2", EXAMPLE_FILE_PATH]).exit_code == 2
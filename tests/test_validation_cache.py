@@ -0,0 +1,129 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+from pyshacl import validate
+from rdflib import BNode, Graph, URIRef
+
+from corona_framework.chunked_validation import SH
+from corona_framework.corona_tool import cli
+from corona_framework.validation_cache import ValidationCache, triples_digest, validate_cached
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHAPES_FILE_PATH = os.path.join(project_root, "data", "corona-shapes.ttl")
+EXAMPLE_FILE_PATH = os.path.join(project_root, "examples", "corona-ASHRAE135ct.ttl")
+
+VIOLATIONS_TTL = """
+@prefix corona: <http://coronastandard.org/2022#> .
+@prefix net: <http://www.example.org/network-ontology#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+corona:NetworkInterfaceMetric rdfs:subClassOf corona:PerformanceMetric .
+net:Iface rdfs:subClassOf net:HWNetEntity .
+<urn:m:1> a corona:NetworkInterfaceMetric ; corona:bytesReceived "x" ; corona:observedFrom <urn:iface:1> .
+<urn:iface:1> a net:Iface .
+<urn:m:2> a corona:NetworkInterfaceMetric ; corona:observedFrom <urn:iface:2> .
+<urn:iface:2> a net:Unknown .
+<urn:m:3> a corona:PerformanceMetric ; corona:metric-identifier "a", "b" .
+<urn:m:4> a corona:NetworkInterfaceMetric ; corona:observedFrom [ a net:Iface ] .
+"""
+
+
+@pytest.fixture(scope="module")
+def shapes_graph():
+    return Graph().parse(SHAPES_FILE_PATH, format="turtle")
+
+
+@pytest.fixture
+def data_graph():
+    graph = Graph().parse(EXAMPLE_FILE_PATH, format="turtle")
+    graph.parse(data=VIOLATIONS_TTL, format="turtle")
+    return graph
+
+
+def result_keys(results_graph):
+    def normalize(node):
+        if not isinstance(node, BNode):
+            return node
+        return frozenset((p, "_:b" if isinstance(o, BNode) else o) for p, o in results_graph.predicate_objects(node))
+
+    return {
+        tuple(normalize(results_graph.value(r, p)) for p in (SH.focusNode, SH.resultPath, SH.sourceConstraintComponent, SH.value))
+        for r in results_graph.objects(None, SH.result)
+    }
+
+
+def test_digest_ignores_order_and_blank_node_labels():
+    first = Graph().parse(data="<urn:a> <urn:p> [ <urn:q> 1 ] ; <urn:r> 2 .", format="turtle")
+    second = Graph().parse(data="<urn:a> <urn:r> 2 ; <urn:p> [ <urn:q> 1 ] .", format="turtle")
+    changed = Graph().parse(data="<urn:a> <urn:r> 3 ; <urn:p> [ <urn:q> 1 ] .", format="turtle")
+    assert triples_digest(first) == triples_digest(second) != triples_digest(changed)
+
+
+def test_cached_verdicts_match_full_validation(shapes_graph, data_graph):
+    full_conforms, full_results, _ = validate(data_graph, shacl_graph=shapes_graph, inference="rdfs", debug=False)
+    cache = ValidationCache()
+
+    conforms, results, _ = validate_cached(data_graph, shapes_graph, cache, "shapes")
+    assert conforms == full_conforms is False and result_keys(results) == result_keys(full_results)
+    instances = cache.stats().misses
+    # A metric and the one device it observes both describe the pair, so they share an entry (three such pairs here)
+    assert cache.stats().hits == 0 and len(cache) == instances - 3
+
+    # A second run is served from the cache, with the same report
+    conforms, results, text = validate_cached(data_graph, shapes_graph, cache, "shapes")
+    assert conforms is False and result_keys(results) == result_keys(full_results)
+    assert cache.stats().hits == instances and f"Results ({len(result_keys(full_results))}):" in text
+
+    # Fixing one metric re-validates only it and the interface it observes
+    data_graph.remove((URIRef("urn:m:1"), URIRef("http://coronastandard.org/2022#bytesReceived"), None))
+    conforms, results, _ = validate_cached(data_graph, shapes_graph, cache, "shapes")
+    expected = validate(data_graph, shacl_graph=shapes_graph, inference="rdfs", debug=False)[1]
+    assert result_keys(results) == result_keys(expected)
+    assert cache.stats().misses == instances + 2
+
+    # Other shapes never reuse these verdicts
+    validate_cached(data_graph, shapes_graph, cache, "other-shapes")
+    assert cache.stats().misses == 2 * instances + 2
+
+
+def test_cached_verdicts_with_warnings_match_pyshacl():
+    shapes = Graph().parse(data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        <urn:shape> a sh:NodeShape ; sh:targetClass <urn:Metric> ; sh:severity sh:Warning ;
+            sh:property [ sh:path <urn:value> ; sh:minCount 1 ] .
+        """, format="turtle")
+    data = Graph().parse(data="<urn:m> a <urn:Metric> .", format="turtle")
+    expected = validate(data, shacl_graph=shapes, debug=False)[0]
+    cache = ValidationCache()
+    fresh = validate_cached(data, shapes, cache, "shapes", inference=None)
+    cached = validate_cached(data, shapes, cache, "shapes", inference=None)
+    assert cache.stats().hits == 1
+    assert fresh[0] is cached[0] is expected and len(result_keys(cached[1])) == 1
+
+
+def test_cache_persists_with_lru_eviction(tmp_path, capsys):
+    path = str(tmp_path / "results.bin")
+    cache = ValidationCache(path, max_entries=2)
+    cache.put("a", True, "")
+    cache.put("b", False, "<urn:x> <urn:y> <urn:z> .\n")
+    assert cache.get("a") == (True, "")
+    cache.put("c", True, "")
+    assert cache.stats().evictions == 1 and cache.get("b") is None
+    cache.save()
+
+    loaded = ValidationCache.load(path, max_entries=1)
+    assert len(loaded) == 1 and loaded.get("c") == (True, "")
+    (tmp_path / "bad.bin").write_bytes(b"junk")
+    assert len(ValidationCache.load(str(tmp_path / "bad.bin"))) == 0
+    captured = capsys.readouterr()
+    assert captured.out == "" and "Ignoring unreadable validation cache" in captured.err
+
+
+def test_cli_reports_hits(tmp_path, monkeypatch):
+    monkeypatch.setenv("CORONA_CACHE_DIR", str(tmp_path))
+    runner = CliRunner()
+    first = runner.invoke(cli, ["validate", "--no-daemon", EXAMPLE_FILE_PATH])
+    second = runner.invoke(cli, ["validate", "--no-daemon", EXAMPLE_FILE_PATH])
+    assert first.exit_code == second.exit_code == 0
+    assert "Validation cache: 0 hits" in first.output
+    assert " 0 misses" in second.output